@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Pakete als Staging-Ordner bereitstellen.
+
+Plant einen synthetischen Baum und legt die Pakete dann an:
+
+    kopie seriell   shutil.copy2 Datei für Datei (wie Kopieren von Hand)
+    hardlink        stelle_pakete_bereit, Staging auf demselben Laufwerk
+    kopie parallel  stelle_pakete_bereit, Staging auf anderem Laufwerk (--ziel)
+    wiederholung    zweiter Aufruf mit demselben Plan (alles vorhanden)
+
+Geprüft wird, dass jede Datei des Plans mit der richtigen Größe im
+Staging-Ordner liegt.
+
+    python benchmarks/bench_bereitstellen.py --dateien 5000 --ziel /dev/shm
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+
+def kopiere_seriell(quelle: Path, plan: list[dict], staging: Path) -> None:
+    praefix = os.path.join(str(quelle), "")
+    for pid, dateien in dms_kern.pakete_aus_vorschlaegen(plan):
+        for pfad, _ in dateien:
+            ziel = os.path.join(str(staging), pid, pfad[len(praefix):])
+            os.makedirs(os.path.dirname(ziel), exist_ok=True)
+            shutil.copy2(pfad, ziel)
+
+
+def pruefe(quelle: Path, plan: list[dict], staging: Path) -> int:
+    """Anzahl fehlender oder falsch großer Dateien im Staging-Ordner."""
+    praefix = os.path.join(str(quelle), "")
+    abweichungen = 0
+    for pid, dateien in dms_kern.pakete_aus_vorschlaegen(plan):
+        for pfad, groesse in dateien:
+            try:
+                if os.stat(os.path.join(str(staging), pid, pfad[len(praefix):])).st_size != groesse:
+                    abweichungen += 1
+            except OSError:
+                abweichungen += 1
+    return abweichungen
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=5000)
+    parser.add_argument("--max-dateigroesse", type=int, default=256 * 1024)
+    parser.add_argument("--max-groesse", type=int, default=64 * 1024 * 1024,
+                        help="Paketgrenze in Bytes (klein, damit es viele Pakete gibt)")
+    parser.add_argument("--worker", type=int, default=dms_kern.STANDARD_VERSCHIEBE_WORKER)
+    parser.add_argument("--ziel", type=Path,
+                        default=Path("/dev/shm") if Path("/dev/shm").is_dir() else None,
+                        help="Basis auf einem anderen Laufwerk für den Kopierpfad")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    fehlerhaft = False
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle = Path(tmp) / "quelle"
+        info = erzeuge_baum(quelle, tiefe=3, verzweigung=5, dateien_gesamt=args.dateien,
+                            anteil_ungueltig=0.0, max_dateigroesse=args.max_dateigroesse,
+                            seed=args.seed)
+        ergebnis = dms_kern.fuehre_analyse_durch(quelle, Path(tmp) / "ziel", set(), True,
+                                                 max_groesse=args.max_groesse)
+        plan = ergebnis["paketvorschlaege"]
+        print(f"{info['dateien']:,} Dateien, {dms_kern.formatiere_groesse(info['bytes'])}, "
+              f"{sum(len(e['pakete']) for e in plan)} Pakete")
+
+        varianten = [("kopie seriell", Path(tmp) / "staging_seriell", None),
+                     ("hardlink", Path(tmp) / "staging", args.worker)]
+        fremd = None
+        if args.ziel is not None and os.stat(args.ziel).st_dev != os.stat(tmp).st_dev:
+            fremd = Path(tempfile.mkdtemp(prefix="dms_bench_", dir=args.ziel))
+            varianten.append(("kopie parallel", fremd / "staging", args.worker))
+        varianten.append(("wiederholung", Path(tmp) / "staging", args.worker))
+
+        try:
+            for name, staging, worker in varianten:
+                start = time.perf_counter()
+                if worker is None:
+                    kopiere_seriell(quelle, plan, staging)
+                    zusatz = ""
+                else:
+                    b = dms_kern.stelle_pakete_bereit(quelle,
+                                                      dms_kern.pakete_aus_vorschlaegen(plan),
+                                                      staging, worker=worker)
+                    zusatz = (f"verlinkt {b['verlinkt']}, kopiert {b['kopiert']} "
+                              f"({dms_kern.formatiere_groesse(b['bytes_kopiert'])}), "
+                              f"vorhanden {b['vorhanden']}")
+                    if b["fehler"]:
+                        print(f"  Fehler: {b['fehler'][:3]}")
+                        fehlerhaft = True
+                dauer = time.perf_counter() - start
+                abweichungen = pruefe(quelle, plan, staging)
+                fehlerhaft |= abweichungen > 0
+                print(f"  {name:<15}{dauer:8.3f} s  {zusatz}"
+                      f"{'' if not abweichungen else f'  {abweichungen} ABWEICHUNGEN'}")
+        finally:
+            if fremd is not None:
+                shutil.rmtree(fremd, ignore_errors=True)
+
+    if fehlerhaft:
+        print("FEHLER: Staging-Ordner entspricht nicht dem Plan")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
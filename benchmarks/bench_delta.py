@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Delta-Pakete gegen das Upload-Manifest des letzten Uploads.
+
+Ablauf auf einem synthetischen Baum:
+
+    1. Analyse, Upload-Manifest erfassen, speichern und wieder laden
+    2. Analyse mit Delta ohne Änderung (es darf kein Paket entstehen)
+    3. Einen Anteil der Dateien ändern: größer, gleiche Größe mit anderem
+       Inhalt, nur angefasst (mtime), neu angelegt, gelöscht
+    4. Analyse mit Delta; geprüft wird, dass die Pakete genau die neuen und
+       geänderten Dateien enthalten und die Zähler stimmen
+
+Zum Vergleich misst der Benchmark den Speicher des Delta-Vergleichs
+(Dict je Verzeichnis) gegen ein naives Dict aller Pfade des Manifests.
+Mit ``--hash`` speichert das Manifest Inhaltshashes; nur angefasste
+Dateien gelten dann als unverändert, sonst als geändert.
+
+    python benchmarks/bench_delta.py --dateien 100000 --anteil 0.01 --hash
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+
+def analyse(quelle: Path, ziel: Path, manifest: dms_kern.Uploadmanifest | None) -> tuple[dict, float]:
+    start = time.perf_counter()
+    ergebnis = dms_kern.fuehre_analyse_durch(quelle, ziel, set(), True, uploadmanifest=manifest)
+    return ergebnis, time.perf_counter() - start
+
+
+def gepackt(ergebnis: dict) -> set[str]:
+    return {p for e in ergebnis["paketvorschlaege"] for inhalt in e["inhalte"]
+            for p, _ in dms_kern.paket_dateien(inhalt)}
+
+
+def aendere(dateien: list[Path], anteil: float, seed: int) -> dict[str, set[str]]:
+    """Ändert je ``anteil`` der Dateien auf eine Art; Rückgabe: Pfade je Art."""
+    zufall = random.Random(seed)
+    mit_inhalt = [p for p in dateien if p.stat().st_size > 0]
+    anzahl = max(1, int(len(dateien) * anteil))
+    auswahl = zufall.sample(mit_inhalt, 4 * anzahl)
+    arten = {"groesse": auswahl[:anzahl], "inhalt": auswahl[anzahl:2 * anzahl],
+             "angefasst": auswahl[2 * anzahl:3 * anzahl], "entfernt": auswahl[3 * anzahl:]}
+    for pfad in arten["groesse"]:
+        with open(pfad, "ab") as f:
+            f.write(b"+")
+    for pfad in arten["inhalt"]:
+        with open(pfad, "r+b") as f:
+            f.write(b"\x01")
+    for pfad in arten["groesse"] + arten["inhalt"] + arten["angefasst"]:
+        st = pfad.stat()
+        os.utime(pfad, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+    for pfad in arten["entfernt"]:
+        pfad.unlink()
+    arten["neu"] = []
+    for i, pfad in enumerate(zufall.sample(mit_inhalt[:len(mit_inhalt) // 2], anzahl)):
+        neu = pfad.with_name(f"neu_{i:06d}.dat")
+        neu.write_bytes(b"neu")
+        arten["neu"].append(neu)
+    return {art: {str(p) for p in pfade} for art, pfade in arten.items()}
+
+
+def speicher_spitze(funktion) -> tuple[object, int]:
+    tracemalloc.start()
+    try:
+        wert = funktion()
+        return wert, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=100_000)
+    parser.add_argument("--tiefe", type=int, default=4)
+    parser.add_argument("--verzweigung", type=int, default=6)
+    parser.add_argument("--anteil", type=float, default=0.01,
+                        help="Anteil der Dateien je Änderungsart")
+    parser.add_argument("--hash", action="store_true", help="Inhaltshashes im Manifest")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    fehlerhaft = False
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle, ziel = Path(tmp) / "quelle", Path(tmp) / "ziel"
+        info = erzeuge_baum(quelle, tiefe=args.tiefe, verzweigung=args.verzweigung,
+                            dateien_gesamt=args.dateien, anteil_ungueltig=0.0,
+                            max_dateigroesse=64 * 1024, seed=args.seed, sparse=True)
+        print(f"{info['dateien']:,} Dateien in {info['ordner']:,} Ordnern, "
+              f"Hash {'ja' if args.hash else 'nein'}")
+
+        ergebnis, dauer = analyse(quelle, ziel, None)
+        start = time.perf_counter()
+        upload = dms_kern.erfasse_uploadmanifest(
+            quelle, ergebnis["scan_ergebnis"]["gueltige_dateien"],
+            ergebnis["scan_ergebnis"]["ordnerbaum"], ergebnis["paketvorschlaege"],
+            mit_hash=args.hash)
+        erfassen = time.perf_counter() - start
+        datei = Path(tmp) / "upload.sqlite3"
+        start = time.perf_counter()
+        upload.speichere_datei(datei, quelle)
+        speichern = time.perf_counter() - start
+        start = time.perf_counter()
+        manifest = dms_kern.Uploadmanifest.lade_datei(datei)
+        laden = time.perf_counter() - start
+        print(f"  Analyse {dauer:6.2f} s, Manifest erfassen {erfassen:6.2f} s, speichern "
+              f"{speichern:5.2f} s, laden {laden:5.2f} s "
+              f"({len(manifest):,} Dateien, {datei.stat().st_size / 2**20:.1f} MiB)")
+
+        ergebnis, dauer = analyse(quelle, ziel, manifest)
+        delta = ergebnis["scan_ergebnis"]["delta"]
+        ok = not gepackt(ergebnis) and delta["anzahl_unveraendert"] == len(manifest)
+        fehlerhaft |= not ok
+        print(f"  Delta ohne Änderung   {dauer:6.2f} s  {len(gepackt(ergebnis)):,} Dateien gepackt"
+              f"{'' if ok else '  FEHLER'}")
+
+        dateien = sorted(p for p in quelle.rglob("*") if p.is_file())
+        arten = aendere(dateien, args.anteil, args.seed)
+        geaendert = arten["groesse"] | arten["inhalt"] | (set() if args.hash else arten["angefasst"])
+        ergebnis, dauer = analyse(quelle, ziel, manifest)
+        delta = ergebnis["scan_ergebnis"]["delta"]
+        erwartet = {"anzahl_neu": len(arten["neu"]), "anzahl_geaendert": len(geaendert),
+                    "anzahl_entfernt": len(arten["entfernt"])}
+        ok = (gepackt(ergebnis) == arten["neu"] | geaendert
+              and all(delta[k] == v for k, v in erwartet.items()))
+        fehlerhaft |= not ok
+        print(f"  Delta nach Änderungen {dauer:6.2f} s  {delta['anzahl_neu']:,} neu, "
+              f"{delta['anzahl_geaendert']:,} geändert, {delta['anzahl_entfernt']:,} entfernt, "
+              f"{len(gepackt(ergebnis)):,} Dateien gepackt{'' if ok else '  FEHLER'}")
+
+        tabelle = ergebnis["scan_ergebnis"]["gueltige_dateien"]
+        start = time.perf_counter()
+        _, spitze = speicher_spitze(lambda: dms_kern.berechne_delta(quelle, tabelle, manifest))
+        vergleich = time.perf_counter() - start
+        _, naiv = speicher_spitze(lambda: {
+            (verz, manifest.tabelle.name(i)): (manifest.tabelle.groessen[i], manifest.mtimes[i])
+            for verz, (anfang, ende) in manifest.bereiche().items() for i in range(anfang, ende)})
+        print(f"  Vergleich allein {vergleich:6.2f} s (mit tracemalloc), Speicher-Spitze "
+              f"{spitze / 2**20:6.1f} MiB, naives Dict aller Pfade {naiv / 2**20:6.1f} MiB")
+
+    if fehlerhaft:
+        print("FEHLER: Delta enthält nicht genau die neuen und geänderten Dateien")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
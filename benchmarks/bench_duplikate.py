@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Duplikaterkennung (Größe → Teil-Hash → Voll-Hash).
+
+Legt einen Baum mit echten Dateiinhalten an: einzigartige Dateien,
+Kopien davon, gleich große Dateien mit anderem Inhalt und – als harter Fall –
+Dateien, die sich nur in der Mitte unterscheiden (gleicher Teil-Hash, erst
+der Voll-Hash trennt sie). Gemessen wird ``finde_duplikate`` für jede
+Worker-Anzahl; das Ergebnis wird mit einem naiven Voll-Hash aller Dateien
+verglichen.
+
+``--latenz-ms`` verzögert jedes Öffnen einer Datei (wie ein Roundtrip zum
+Netzlaufwerk); daran zeigt sich, dass die Threads trotz GIL skalieren.
+
+    python benchmarks/bench_duplikate.py --dateien 2000 --worker 1 4 8 --latenz-ms 5
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_duplikate  # noqa: E402
+import dms_kern  # noqa: E402
+
+
+def erzeuge_dateien(wurzel: Path, dateien: int, max_groesse: int, anteil_kopien: float,
+                    seed: int) -> None:
+    zufall = random.Random(seed)
+    originale: list[bytes] = []
+    for nr in range(dateien):
+        ordner = wurzel / f"Vorgang_{nr // 50:04d}"
+        ordner.mkdir(parents=True, exist_ok=True)
+        art = zufall.random()
+        if originale and art < anteil_kopien:
+            inhalt = zufall.choice(originale)
+        elif originale and art < anteil_kopien + 0.05:
+            # gleiche Größe, Anfang und Ende wie ein Original, Mitte anders
+            vorlage = bytearray(zufall.choice(originale))
+            if len(vorlage) > 2 * dms_kern.DUPLIKAT_BLOCK:
+                vorlage[len(vorlage) // 2] ^= 0xFF
+            else:
+                vorlage[0] ^= 0xFF
+            inhalt = bytes(vorlage)
+        else:
+            groesse = zufall.choice([zufall.randint(1, 4096), zufall.randint(1, max_groesse)])
+            inhalt = zufall.randbytes(groesse)
+            originale.append(inhalt)
+        (ordner / f"Dokument_{nr:06d}.pdf").write_bytes(inhalt)
+
+
+def naive_gruppen(tabelle: dms_kern.DateiTabelle) -> list[list[str]]:
+    """Referenz: jede Datei komplett hashen."""
+    nach_inhalt: dict[tuple[int, bytes], list[str]] = {}
+    for i in range(len(tabelle)):
+        if tabelle.groessen[i] == 0:
+            continue
+        with open(tabelle.pfad(i), "rb") as f:
+            digest = hashlib.sha256(f.read()).digest()
+        nach_inhalt.setdefault((tabelle.groessen[i], digest), []).append(tabelle.pfad(i))
+    return sorted(sorted(g) for g in nach_inhalt.values() if len(g) > 1)
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=2000)
+    parser.add_argument("--max-groesse", type=int, default=2 * 1024 * 1024,
+                        help="Größte Datei in Bytes")
+    parser.add_argument("--anteil-kopien", type=float, default=0.3)
+    parser.add_argument("--worker", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latenz-ms", type=float, default=0.0,
+                        help="Künstliche Latenz pro Öffnen (Netzlaufwerk simulieren)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle = Path(tmp) / "quelle"
+        erzeuge_dateien(quelle, args.dateien, args.max_groesse, args.anteil_kopien, args.seed)
+        scan = dms_kern.scanne_quellordner(quelle, Path(tmp) / "ziel", set(), True)
+        tabelle = scan["gueltige_dateien"]
+        gesamt = sum(tabelle.groessen)
+        print(f"{len(tabelle):,} Dateien, {dms_kern.formatiere_groesse(gesamt)}")
+
+        erwartet = naive_gruppen(tabelle)
+
+        if args.latenz_ms > 0:
+            def open_mit_latenz(*a, **kw):
+                time.sleep(args.latenz_ms / 1000)
+                return open(*a, **kw)
+
+            dms_duplikate.open = open_mit_latenz  # verdeckt das eingebaute open nur dort
+
+        fehlerhaft = False
+        basis = None
+        for worker in args.worker:
+            start = time.perf_counter()
+            ergebnis = dms_kern.finde_duplikate(tabelle, worker)
+            dauer = time.perf_counter() - start
+            basis = basis or dauer
+            gefunden = sorted(g["dateien"] for g in ergebnis["gruppen"])
+            korrekt = gefunden == erwartet and not ergebnis["fehler"]
+            fehlerhaft |= not korrekt
+            print(f"  worker={worker:<3} {dauer:7.3f} s  ×{basis / dauer:5.2f}  "
+                  f"{ergebnis['anzahl_duplikate']} Duplikate, "
+                  f"{dms_kern.formatiere_groesse(ergebnis['bytes_gespart'])} gespart, "
+                  f"gelesen {ergebnis['bytes_gelesen'] / max(1, gesamt):.0%} der Daten "
+                  f"({ergebnis['kandidaten']} Kandidaten)  "
+                  f"{'OK' if korrekt else 'ABWEICHUNG'}")
+
+        # Ausschließen: Plan enthält jede Datei genau einmal
+        dms_kern.schliesse_duplikate_aus(scan["ordnerbaum"], tabelle, ergebnis)
+        dms_kern.berechne_ordnergroessen(scan["ordnerbaum"])
+        erwartete_groesse = gesamt - ergebnis["bytes_gespart"]
+        if scan["ordnerbaum"].groesse != erwartete_groesse:
+            print(f"FEHLER: Ordnergröße nach Ausschluss {scan['ordnerbaum'].groesse}, "
+                  f"erwartet {erwartete_groesse}")
+            fehlerhaft = True
+        if "open" in vars(dms_duplikate):
+            del dms_duplikate.open
+
+    if fehlerhaft:
+        print("FEHLER: Ergebnis weicht vom naiven Voll-Hash ab")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
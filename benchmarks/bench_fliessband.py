@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Paketbildung im Fließband (Ergebnisse schon während des Scans).
+
+Vergleicht auf demselben synthetischen Baum
+
+    nacheinander   Scan, danach Ordnergrößen und Paketbildung
+    fließband      jeder fertig gescannte Ordner der obersten Ebene wird
+                   sofort in einem eigenen Thread geplant (``teilergebnis``)
+
+Gemessen werden die Zeit bis zum ersten geplanten Ordner, die Gesamtzeit
+und die Planung, die nach dem Scan noch übrig bleibt. Geprüft wird, dass
+der Plan (Ebenen, Pakete, Dateien je Paket, Warnungen) identisch ist.
+
+``--latenz-ms`` verzögert scandir/stat wie in ``bench_plan_anwenden.py``
+(Netzlaufwerk); dort dauert der Scan Stunden und das Fließband zeigt die
+ersten Pakete nach Sekunden.
+
+    python benchmarks/bench_fliessband.py --dateien 20000 --latenz-ms 0.5
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from bench_plan_anwenden import setze_latenz  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+
+def vergleichbar(paketvorschlaege: list[dict]) -> list[tuple]:
+    return [(str(e["ordner"]), e["pakete"],
+             [list(dms_kern.paket_dateien(inhalt)) for inhalt in e["inhalte"]],
+             e["warnungen"], e["unterordner_aufgeteilt"]) for e in paketvorschlaege]
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=20_000)
+    parser.add_argument("--tiefe", type=int, default=4)
+    parser.add_argument("--verzweigung", type=int, default=6)
+    parser.add_argument("--max-dateigroesse", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--max-groesse", type=int, default=64 * 1024 * 1024,
+                        help="Paketgrenze in Bytes (klein, damit Unterbäume aufgeteilt werden)")
+    parser.add_argument("--scan-worker", type=int, default=1)
+    parser.add_argument("--latenz-ms", type=float, default=0.0,
+                        help="Künstliche Latenz pro scandir/stat (Netzlaufwerk simulieren)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle = Path(tmp) / "quelle"
+        info = erzeuge_baum(quelle, tiefe=args.tiefe, verzweigung=args.verzweigung,
+                            dateien_gesamt=args.dateien, anteil_ungueltig=0.0,
+                            max_dateigroesse=args.max_dateigroesse,
+                            groessenverteilung="lognormal", seed=args.seed, sparse=True)
+        print(f"{info['dateien']:,} Dateien in {info['ordner']:,} Ordnern, "
+              f"{dms_kern.formatiere_groesse(info['bytes'])}, Latenz {args.latenz_ms} ms")
+        if args.latenz_ms > 0:
+            setze_latenz(args.latenz_ms)
+
+        plaene = {}
+        for name in ("nacheinander", "fließband"):
+            erstes: list[float] = []
+
+            def teilergebnis(_ereignis: dict) -> None:
+                if not erstes:
+                    erstes.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            with dms_kern.Laufstatistik() as statistik:
+                ergebnis = dms_kern.fuehre_analyse_durch(
+                    quelle, Path(tmp) / "ziel", set(), True, scan_worker=args.scan_worker,
+                    max_groesse=args.max_groesse, laufstatistik=statistik,
+                    teilergebnis=teilergebnis if name == "fließband" else None)
+            plaene[name] = vergleichbar(ergebnis["paketvorschlaege"])
+            nach_scan = (statistik.stufen.get("ordnergroessen", 0.0)
+                         + statistik.stufen.get("paketbildung", 0.0))
+            erster = erstes[0] if erstes else statistik.gesamt_s
+            print(f"  {name:<14} erstes Ergebnis {erster:7.2f} s, gesamt {statistik.gesamt_s:7.2f} s, "
+                  f"Planung nach dem Scan {nach_scan * 1000:8.1f} ms  "
+                  f"({sum(len(e['pakete']) for e in ergebnis['paketvorschlaege']):,} Pakete "
+                  f"in {len(ergebnis['paketvorschlaege']):,} Ebenen)")
+
+    gleich = plaene["nacheinander"] == plaene["fließband"]
+    print(f"  Paketplan identisch: {'ja' if gleich else 'NEIN'}")
+    return 0 if gleich else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Verschiebejournal – Aufwand und Wiederaufnahme nach Absturz.
+
+Teil 1 misst einen echten Lauf auf Kopien desselben synthetischen Baums:
+
+    ohne Journal       verschiebt während des Scans (--ohne-journal)
+    Journal            alle Verschiebungen vorab im Journal, Ergebnisse
+                       blockweise festgeschrieben (ein fsync pro Block)
+    Journal je Datei   wie oben, aber ein fsync pro Datei (block_zeilen=1)
+
+Teil 2 bricht einen Lauf nach der Hälfte der Verschiebungen hart ab
+(``os._exit`` im Kindprozess, wie Standby oder Stromausfall) und vergleicht
+
+    fortsetzen         Journal lesen, Rest verschieben, Log neu schreiben
+    neu beginnen       Journal verwerfen, neu scannen, Rest verschieben
+
+Geprüft wird, dass das Fortsetzen dasselbe Logfile (ohne Zeitstempel),
+denselben Paketplan und dieselben Zieldateien ergibt wie ein Lauf ohne
+Unterbrechung. ``--latenz-ms`` verzögert scandir/stat wie in
+``bench_plan_anwenden.py`` (Netzlaufwerk).
+
+    python benchmarks/bench_journal.py --dateien 20000 --latenz-ms 0.5
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from bench_plan_anwenden import setze_latenz  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+_ABSTURZ = """
+import os, sys
+sys.path.insert(0, {kern!r})
+import dms_kern
+from pathlib import Path
+zaehler = [0]
+original = os.replace
+def replace_mit_absturz(*a, **kw):
+    zaehler[0] += 1
+    if zaehler[0] > {nach}:
+        os._exit(9)
+    return original(*a, **kw)
+os.replace = replace_mit_absturz
+quelle, ziel = Path({quelle!r}), Path({ziel!r})
+dms_kern.fuehre_analyse_durch(quelle, ziel, {endungen!r}, False,
+                              journal=dms_kern.oeffne_journal(quelle, ziel))
+"""
+
+
+def vergleichbar(ergebnis: dict, quelle: Path, ziel: Path) -> tuple[list, list, list]:
+    """Log ohne Zeitstempel, Paketplan und Zieldateien – unabhängig vom Ort der Kopie."""
+    ziel_quelle = ziel / quelle.name
+
+    def relativ(text: str) -> str:
+        return text.replace(str(ziel_quelle), "Z").replace(str(quelle), "Q")
+
+    with open(ergebnis["scan_ergebnis"]["logdatei"], encoding="utf-8") as f:
+        log = [relativ(zeile.split(";", 1)[1]) for zeile in f.read().splitlines()[1:]]
+    plan = [[[(relativ(p), g) for p, g in dms_kern.paket_dateien(inhalt)]
+             for inhalt in e["inhalte"]] for e in ergebnis["paketvorschlaege"]]
+    dateien = sorted(str(p.relative_to(ziel_quelle)) for p in ziel_quelle.rglob("*") if p.is_file())
+    return log, plan, dateien
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=20_000)
+    parser.add_argument("--tiefe", type=int, default=3)
+    parser.add_argument("--verzweigung", type=int, default=6)
+    parser.add_argument("--anteil-ungueltig", type=float, default=0.25)
+    parser.add_argument("--latenz-ms", type=float, default=0.0,
+                        help="Künstliche Latenz pro scandir/stat (Netzlaufwerk simulieren)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    endungen = set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN)
+    fehlerhaft = False
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        vorlage = Path(tmp) / "vorlage"
+        info = erzeuge_baum(vorlage / "quelle", tiefe=args.tiefe, verzweigung=args.verzweigung,
+                            dateien_gesamt=args.dateien, anteil_ungueltig=args.anteil_ungueltig,
+                            max_dateigroesse=4096, seed=args.seed, sparse=True)
+
+        def kopie(name: str) -> tuple[Path, Path]:
+            shutil.copytree(vorlage, Path(tmp) / name, copy_function=shutil.copy2)
+            return Path(tmp) / name / "quelle", Path(tmp) / name / "ziel"
+
+        kopien = {name: kopie(name) for name in
+                  ("ohne", "journal", "je_datei", "fortsetzen", "neu")}
+        print(f"{info['dateien']:,} Dateien in {info['ordner']:,} Ordnern, "
+              f"Latenz {args.latenz_ms} ms")
+
+        # Teil 2 vorbereiten: harte Abbrüche im Kindprozess (ohne Latenz)
+        anzahl_ungueltig = None
+        for name in ("fortsetzen", "neu"):
+            quelle, ziel = kopien[name]
+            if anzahl_ungueltig is None:
+                regeln = dms_kern.Dateiregeln(endungen)
+                anzahl_ungueltig = sum(1 for p in quelle.rglob("*")
+                                       if p.is_file() and regeln.regel(p.name) is not None)
+            skript = _ABSTURZ.format(kern=str(Path(dms_kern.__file__).parent),
+                                     nach=anzahl_ungueltig // 2, quelle=str(quelle),
+                                     ziel=str(ziel), endungen=endungen)
+            subprocess.run([sys.executable, "-c", skript], check=False)
+
+        if args.latenz_ms > 0:
+            setze_latenz(args.latenz_ms)
+
+        print("Echter Lauf:")
+        referenz = None
+        for name, beschreibung, journal_block in (("ohne", "ohne Journal", None),
+                                                  ("journal", "Journal", 500),
+                                                  ("je_datei", "Journal je Datei", 1)):
+            quelle, ziel = kopien[name]
+            journal = (None if journal_block is None else dms_kern.Verschiebejournal(
+                dms_kern.journal_pfad(quelle, ziel), block_zeilen=journal_block))
+            start = time.perf_counter()
+            ergebnis = dms_kern.fuehre_analyse_durch(quelle, ziel, endungen, False,
+                                                     journal=journal)
+            dauer = time.perf_counter() - start
+            werte = vergleichbar(ergebnis, quelle, ziel)
+            referenz = referenz or werte
+            gleich = werte == referenz
+            fehlerhaft |= not gleich
+            print(f"  {beschreibung:<18}{dauer:8.2f} s  "
+                  f"{ergebnis['scan_ergebnis']['anzahl_ungueltig']:,} verschoben"
+                  f"{'' if gleich else '  ABWEICHUNG'}")
+
+        print(f"Nach Absturz bei {anzahl_ungueltig // 2:,} von {anzahl_ungueltig:,} "
+              "Verschiebungen:")
+        for name, beschreibung in (("fortsetzen", "fortsetzen"), ("neu", "neu beginnen")):
+            quelle, ziel = kopien[name]
+            if name == "neu":
+                dms_kern.journal_pfad(quelle, ziel).unlink()
+            journal = dms_kern.oeffne_journal(quelle, ziel)
+            start = time.perf_counter()
+            ergebnis = dms_kern.fuehre_analyse_durch(quelle, ziel, endungen, False,
+                                                     journal=journal)
+            dauer = time.perf_counter() - start
+            log, plan, dateien = vergleichbar(ergebnis, quelle, ziel)
+            vollstaendig = log == referenz[0]
+            if name == "fortsetzen":
+                korrekt = (log, plan, dateien) == referenz
+                fehlerhaft |= not korrekt
+                zusatz = "Log, Plan und Ziel wie ohne Absturz" if korrekt else "ABWEICHUNG"
+            else:
+                zusatz = f"Log {'vollständig' if vollstaendig else 'unvollständig'}"
+            print(f"  {beschreibung:<18}{dauer:8.2f} s  {len(log):,} Logzeilen, {zusatz}")
+
+    if fehlerhaft:
+        print("FEHLER: Ergebnis weicht vom Lauf ohne Unterbrechung ab")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Paketbildung gegen die geschätzte ZIP-Größe (``Kompressionsschaetzer``).
+
+Legt einen Baum aus gut komprimierbaren (Text, CSV, Logs), nicht
+komprimierbaren (zufällige Bytes wie JPEG/ZIP) und gemischten Dateien an
+und vergleicht
+
+    roh          Paketbildung nach Dateigröße (bisher)
+    komprimiert  Paketbildung nach geschätzter ZIP-Größe, je ``--sicherheit``
+
+Gezeigt werden Paketanzahl, Dauer der Schätzung, gelesene Bytes und
+Cache-Treffer. Danach baut ``baue_zip_pakete`` die ZIPs: gemessen werden
+das größte Verhältnis ZIP / Schätzung und wie viele Pakete neu aufgeteilt
+werden mussten. Geprüft wird, dass kein ZIP die Paketgrenze überschreitet
+und jedes ZIP genau die Dateien seines Pakets (mit ihrer Größe) enthält.
+
+    python benchmarks/bench_kompression.py --dateien 3000 --max-groesse 8388608
+"""
+
+import argparse
+import math
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+
+WOERTER = ("Antrag Bescheid Gemeinde Verwaltung Akte Vorgang Frist Stellungnahme Anlage "
+           "Protokoll Sitzung Beschluss Haushalt Vergabe Bauamt Ordnungsamt").split()
+
+
+def _zeilen(erzeuge, groesse: int) -> bytes:
+    zeilen = []
+    laenge = 0
+    while laenge < groesse:
+        zeile = erzeuge(len(zeilen))
+        zeilen.append(zeile)
+        laenge += len(zeile)
+    return "".join(zeilen).encode()[:groesse]
+
+
+def _inhalt(zufall: random.Random, art: str, groesse: int) -> bytes:
+    if art == "text":
+        return _zeilen(lambda _: " ".join(zufall.choices(WOERTER, k=12)) + "\n", groesse)
+    if art == "csv":
+        return _zeilen(lambda i: f"{i};{zufall.randrange(10**6)};{zufall.random():.4f}\n", groesse)
+    if art == "zufall":
+        return zufall.randbytes(groesse)
+    # gemischt: komprimierbarer Kopf, zufälliger Rest (wie PDF mit eingebetteten Bildern)
+    kopf = groesse // 3
+    return _inhalt(zufall, "text", kopf) + zufall.randbytes(groesse - kopf)
+
+
+ARTEN = ((".txt", "text"), (".csv", "csv"), (".log", "text"), (".jpg", "zufall"),
+         (".zip", "zufall"), (".pdf", "gemischt"))
+
+
+def erzeuge_gemischten_baum(wurzel: Path, dateien: int, ordner: int, max_dateigroesse: int,
+                            seed: int) -> dict:
+    zufall = random.Random(seed)
+    median = max(1, max_dateigroesse // 50)
+    anzahl_bytes = 0
+    for i in range(dateien):
+        endung, art = zufall.choice(ARTEN)
+        groesse = min(max_dateigroesse, int(zufall.lognormvariate(math.log(median), 1.2)))
+        pfad = wurzel / f"ordner_{i % ordner:03d}" / f"sub_{i % 3}" / f"datei_{i:05d}{endung}"
+        pfad.parent.mkdir(parents=True, exist_ok=True)
+        pfad.write_bytes(_inhalt(zufall, art, groesse))
+        anzahl_bytes += groesse
+    return {"dateien": dateien, "bytes": anzahl_bytes}
+
+
+def pruefe_zips(quelle: Path, zielordner: Path, plan: list[dict], max_groesse: int) -> bool:
+    """Jedes ZIP enthält genau die Dateien seines Pakets und bleibt unter der Grenze."""
+    for pid, dateien in dms_kern.pakete_aus_vorschlaegen(plan):
+        zipdatei = zielordner / f"{pid}.zip"
+        if not zipdatei.is_file() or zipdatei.stat().st_size > max_groesse and len(dateien) > 1:
+            return False
+        erwartet = {Path(p).relative_to(quelle).as_posix(): g for p, g in dateien}
+        with zipfile.ZipFile(zipdatei) as zf:
+            if {i.filename: i.file_size for i in zf.infolist()} != erwartet:
+                return False
+            if zf.testzip() is not None:
+                return False
+    return True
+
+
+def lauf(quelle: Path, tmp: Path, args, sicherheit: float | None) -> bool:
+    schaetzer = None if sicherheit is None else dms_kern.Kompressionsschaetzer(sicherheit)
+    with dms_kern.Laufstatistik() as statistik:
+        ergebnis = dms_kern.fuehre_analyse_durch(quelle, tmp / "ziel", set(), True,
+                                                 max_groesse=args.max_groesse,
+                                                 laufstatistik=statistik, kompression=schaetzer)
+    plan = ergebnis["paketvorschlaege"]
+    pakete = sum(len(e["pakete"]) for e in plan)
+    name = "roh" if sicherheit is None else f"komprimiert {sicherheit:.0%}"
+    zeile = f"  {name:<17}{pakete:5} Pakete  Analyse {statistik.gesamt_s:6.2f} s"
+    kompression = ergebnis["scan_ergebnis"].get("kompression")
+    if kompression:
+        zeile += (f" (Schätzung {statistik.stufen.get('kompression', 0.0):5.2f} s, "
+                  f"{kompression['bytes_gelesen'] / max(1, kompression['bytes']):.0%} der Bytes "
+                  f"gelesen, aus dem Cache "
+                  f"{kompression['aus_endung'] + kompression['aus_signatur']:,} von "
+                  f"{kompression['anzahl_dateien']:,} Dateien)")
+    print(zeile)
+
+    zielordner = tmp / f"zips_{name.replace(' ', '_').replace('%', '')}"
+    start = time.perf_counter()
+    zips = dms_kern.baue_zip_pakete(quelle, plan, zielordner, max_groesse=args.max_groesse,
+                                    worker=args.worker)
+    dauer = time.perf_counter() - start
+    ok = not zips["fehler"] and pruefe_zips(quelle, zielordner, plan, args.max_groesse)
+    abweichung = zips["abweichung_max"]
+    print(f"  {'':<17}{zips['pakete']:5} ZIPs    Bau     {dauer:6.2f} s  "
+          f"{dms_kern.formatiere_groesse(zips['bytes'])} → "
+          f"{dms_kern.formatiere_groesse(zips['zips_bytes'])}, neu aufgeteilt "
+          f"{zips['neu_aufgeteilt']} (+{zips['zusaetzliche_pakete']})"
+          + (f", größtes ZIP/Schätzung {abweichung:.1%}" if abweichung is not None else "")
+          + ("" if ok else "  ABWEICHUNG"))
+    return ok
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=3000)
+    parser.add_argument("--ordner", type=int, default=12)
+    parser.add_argument("--max-dateigroesse", type=int, default=2 * 1024 * 1024)
+    parser.add_argument("--max-groesse", type=int, default=8 * 1024 * 1024,
+                        help="Paketgrenze in Bytes (klein, damit viele Pakete entstehen)")
+    parser.add_argument("--sicherheit", type=float, nargs="+", default=[0.0, 0.05],
+                        help="Sicherheitsaufschläge (Anteil) für die komprimierte Planung")
+    parser.add_argument("--worker", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle = Path(tmp) / "quelle"
+        info = erzeuge_gemischten_baum(quelle, args.dateien, args.ordner,
+                                       args.max_dateigroesse, args.seed)
+        print(f"{info['dateien']:,} Dateien, {dms_kern.formatiere_groesse(info['bytes'])}, "
+              f"Paketgrenze {dms_kern.formatiere_groesse(args.max_groesse)}")
+        ok &= lauf(quelle, Path(tmp), args, None)
+        for sicherheit in args.sicherheit:
+            ok &= lauf(quelle, Path(tmp), args, sicherheit)
+
+    if not ok:
+        print("FEHLER: ZIP-Inhalt weicht vom Paketplan ab oder ZIP zu groß")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
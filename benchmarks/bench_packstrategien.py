@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Packstrategien im Vergleich.
+
+Erzeugt pro Größenverteilung viele synthetische Ebenen (Listen von Einheiten)
+und vergleicht für jede Strategie die Anzahl der Pakete, den mittleren
+Füllgrad (Summe der Einheiten / (Pakete × Paketgrenze)) und die Planungszeit.
+„namensreihenfolge“ ist der Standard und das bisherige Verhalten (alphabetisch,
+der Reihe nach).
+
+    python benchmarks/bench_packstrategien.py --ebenen 200 --einheiten 4 40
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+
+GIB = dms_kern.MAX_PAKET_GROESSE
+
+
+def verteilung_gleich(zufall: random.Random) -> int:
+    return zufall.randint(1, GIB)
+
+
+def verteilung_lognormal(zufall: random.Random) -> int:
+    # Viele kleine Ordner, wenige große (typisch für Abteilungslaufwerke)
+    return max(1, min(GIB, int(zufall.lognormvariate(math.log(GIB / 12), 1.2))))
+
+
+def verteilung_bimodal(zufall: random.Random) -> int:
+    if zufall.random() < 0.4:
+        return zufall.randint(int(GIB * 0.5), int(GIB * 0.7))
+    return zufall.randint(1, int(GIB * 0.15))
+
+
+VERTEILUNGEN = {
+    "gleichverteilt": verteilung_gleich,
+    "lognormal": verteilung_lognormal,
+    "bimodal": verteilung_bimodal,
+}
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ebenen", type=int, default=200, help="Ebenen pro Verteilung")
+    parser.add_argument("--einheiten", type=int, nargs=2, default=[4, 40],
+                        metavar=("MIN", "MAX"), help="Einheiten pro Ebene")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for vert_name, verteilung in VERTEILUNGEN.items():
+        zufall = random.Random(args.seed)
+        ebenen = [
+            [(f"Ordner: {i:03d}", verteilung(zufall))
+             for i in range(zufall.randint(*args.einheiten))]
+            for _ in range(args.ebenen)
+        ]
+        gesamt = sum(g for ebene in ebenen for _, g in ebene)
+        untergrenze = sum(math.ceil(sum(g for _, g in e) / GIB) for e in ebenen)
+
+        print(f"\n{vert_name}: {args.ebenen} Ebenen, untere Schranke {untergrenze} Pakete")
+        print(f"  {'Strategie':24s} {'Pakete':>8s} {'Füllgrad':>9s} {'Zeit':>10s}")
+        for name in dms_kern.PACKSTRATEGIEN:
+            start = time.perf_counter()
+            anzahl = 0
+            for ebene in ebenen:
+                anzahl += len(dms_kern.packe_einheiten(ebene, GIB, name))
+            dauer = time.perf_counter() - start
+            fuellgrad = gesamt / (anzahl * GIB) if anzahl else 0.0
+            print(f"  {name:24s} {anzahl:8d} {fuellgrad:8.1%} {dauer * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main_benchmark()
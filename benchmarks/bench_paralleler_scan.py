@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: serieller vs. paralleler Ordner-Scan.
+
+Simuliert ein Netzlaufwerk, indem jedes ``os.scandir`` künstlich um eine
+feste Latenz verzögert wird, und misst ``scanne_quellordner`` (Trockenlauf)
+mit unterschiedlich vielen Scan-Workern. Bei reiner Latenz sollte der
+Speedup bis zur Worker-Zahl annähernd linear sein (begrenzt durch die
+Breite des Baums). Weicht ein Ergebnis vom seriellen ab, endet der
+Benchmark mit Exit-Code 1.
+
+    python benchmarks/bench_paralleler_scan.py --latenz-ms 5 --worker 1 2 4 8 16
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+
+def mit_latenz(latenz_s: float):
+    """Liefert einen ``os.scandir``-Ersatz, der vor jedem Listing wartet."""
+    original = os.scandir
+
+    def scandir_mit_latenz(pfad="."):
+        time.sleep(latenz_s)
+        return original(pfad)
+
+    return original, scandir_mit_latenz
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latenz-ms", type=float, default=5.0)
+    parser.add_argument("--worker", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--tiefe", type=int, default=3)
+    parser.add_argument("--verzweigung", type=int, default=6)
+    parser.add_argument("--dateien-pro-ordner", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle = Path(tmp) / "quelle"
+        info = erzeuge_baum(quelle, tiefe=args.tiefe, verzweigung=args.verzweigung,
+                            dateien_pro_ordner=args.dateien_pro_ordner)
+        zielbasis = Path(tmp) / "ziel"
+        print(f"Baum: {info['ordner']} Ordner, {info['dateien']} Dateien, "
+              f"Latenz {args.latenz_ms} ms/Listing")
+
+        original, ersatz = mit_latenz(args.latenz_ms / 1000)
+        referenz = None
+        basis_zeit = None
+        gleich = True
+        os.scandir = ersatz
+        try:
+            for worker in args.worker:
+                start = time.perf_counter()
+                ergebnis = dms_kern.scanne_quellordner(
+                    quelle, zielbasis, set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN),
+                    trockenlauf=True, scan_worker=worker,
+                )
+                dauer = time.perf_counter() - start
+                vergleich = (ergebnis["gueltige_dateien"], ergebnis["anzahl_ungueltig"])
+                if referenz is None:
+                    referenz, basis_zeit = vergleich, dauer
+                gleich &= vergleich == referenz
+                identisch = "ja" if vergleich == referenz else "NEIN"
+                print(f"  worker={worker:3d}  {dauer:7.3f} s  "
+                      f"Speedup {basis_zeit / dauer:5.2f}x  identisch: {identisch}")
+        finally:
+            os.scandir = original
+    return 0 if gleich else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
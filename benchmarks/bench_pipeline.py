@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Laufzeit der Pipeline-Stufen auf synthetischen Bäumen.
+
+Erzeugt für jede Stufe der Dateianzahl (Standard 10.000 und 100.000, mit
+``--dateien 10000 100000 1000000`` auch 1 Mio.) einen deterministischen Baum
+und misst getrennt:
+
+    scan          scanne_quellordner (Trockenlauf, inkl. Ordnerbaum und Log)
+    ordnergroessen berechne_ordnergroessen
+    planung       erstelle_paketvorschlaege
+    ausgabetext   erstelle_ausgabetext
+
+Die Dateien werden als Sparse-Dateien angelegt (bei den Standardgrößen bis
+256 MiB je Datei wären es sonst Dutzende bis Hunderte GB); ``--voll-schreiben``
+schreibt sie wirklich, etwa um den Einfluss des Plattencaches zu messen.
+Die Ergebnisse werden als JSON geschrieben; mit ``--vergleich alt.json``
+werden die Zeiten gegen einen früheren Lauf gestellt.
+
+    python benchmarks/bench_pipeline.py --ausgabe ergebnis.json
+    python benchmarks/bench_pipeline.py --vergleich ergebnis.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from synthetik import GROESSENVERTEILUNGEN, erzeuge_baum  # noqa: E402
+
+STUFEN = ("scan", "ordnergroessen", "planung", "ausgabetext")
+
+
+def miss_pipeline(quelle: Path, ziel: Path, scan_worker: int, max_groesse: int) -> dict:
+    """Führt die Pipeline einmal aus; Rückgabe: Zeiten je Stufe und Kennzahlen."""
+    zeiten: dict[str, float] = {}
+
+    start = time.perf_counter()
+    scan = dms_kern.scanne_quellordner(quelle, ziel, set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN),
+                                       trockenlauf=True, scan_worker=scan_worker)
+    zeiten["scan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dms_kern.berechne_ordnergroessen(scan["ordnerbaum"])
+    zeiten["ordnergroessen"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    plan = dms_kern.erstelle_paketvorschlaege(scan["ordnerbaum"], max_groesse)
+    zeiten["planung"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    text = dms_kern.erstelle_ausgabetext(quelle, ziel, True, scan, plan)
+    zeiten["ausgabetext"] = time.perf_counter() - start
+
+    return {
+        "zeiten_s": zeiten,
+        "gueltige_dateien": len(scan["gueltige_dateien"]),
+        "ungueltige_dateien": scan["anzahl_ungueltig"],
+        "pakete": sum(len(e["pakete"]) for e in plan),
+        "ebenen": len(plan),
+        "ausgabetext_zeichen": len(text),
+    }
+
+
+def vergleiche(alt: dict, neu: dict) -> None:
+    alte_laeufe = {lauf["dateien"]: lauf for lauf in alt.get("laeufe", [])}
+    print("\nVergleich (neu / alt):")
+    for lauf in neu["laeufe"]:
+        alter_lauf = alte_laeufe.get(lauf["dateien"])
+        if alter_lauf is None:
+            print(f"  {lauf['dateien']:>9,} Dateien: kein Vergleichswert")
+            continue
+        teile = []
+        for stufe in STUFEN:
+            a, n = alter_lauf["zeiten_s"].get(stufe), lauf["zeiten_s"][stufe]
+            teile.append(f"{stufe} {n / a:5.2f}x" if a else f"{stufe} –")
+        print(f"  {lauf['dateien']:>9,} Dateien: " + ", ".join(teile))
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Dateianzahlen, je eine Messung (Standard: 10000 100000)")
+    parser.add_argument("--tiefe", type=int, default=4)
+    parser.add_argument("--verzweigung", type=int, default=6)
+    parser.add_argument("--verteilung", choices=GROESSENVERTEILUNGEN, default="lognormal",
+                        help="Größenverteilung der Dateien")
+    parser.add_argument("--max-dateigroesse", type=int, default=256 * 1024 * 1024)
+    parser.add_argument("--anteil-ungueltig", type=float, default=0.05)
+    parser.add_argument("--sparse", action="store_true", default=True,
+                        help="Sparse-Dateien anlegen (Standard; große Bäume ohne Plattenplatz)")
+    parser.add_argument("--voll-schreiben", dest="sparse", action="store_false",
+                        help="Dateien wirklich schreiben (belegt den vollen Plattenplatz)")
+    parser.add_argument("--scan-worker", type=int, default=1)
+    parser.add_argument("--max-groesse", type=int, default=dms_kern.MAX_PAKET_GROESSE,
+                        help="Paketgrenze in Bytes")
+    parser.add_argument("--wiederholungen", type=int, default=1,
+                        help="Messungen je Stufe; gemeldet wird die schnellste")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ausgabe", type=Path, help="Ergebnis-JSON (Standard: nur Konsole)")
+    parser.add_argument("--vergleich", type=Path, help="Früheres Ergebnis-JSON zum Vergleich")
+    args = parser.parse_args()
+    if not args.sparse:
+        print(f"Hinweis: --voll-schreiben schreibt bis zu "
+              f"{dms_kern.formatiere_groesse(args.max_dateigroesse * max(args.dateien))} "
+              "je Baum", file=sys.stderr)
+
+    ergebnis = {
+        "erstellt": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plattform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parameter": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "laeufe": [],
+    }
+
+    for dateien in args.dateien:
+        with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+            quelle = Path(tmp) / "quelle"
+            start = time.perf_counter()
+            info = erzeuge_baum(quelle, tiefe=args.tiefe, verzweigung=args.verzweigung,
+                                anteil_ungueltig=args.anteil_ungueltig,
+                                max_dateigroesse=args.max_dateigroesse, seed=args.seed,
+                                dateien_gesamt=dateien, groessenverteilung=args.verteilung,
+                                sparse=args.sparse)
+            erzeugung = time.perf_counter() - start
+
+            messungen = [miss_pipeline(quelle, Path(tmp) / "ziel", args.scan_worker,
+                                       args.max_groesse)
+                         for _ in range(max(1, args.wiederholungen))]
+            lauf = dict(messungen[0])
+            lauf["zeiten_s"] = {s: min(m["zeiten_s"][s] for m in messungen) for s in STUFEN}
+            lauf.update({"dateien": info["dateien"], "ordner": info["ordner"],
+                         "bytes": info["bytes"], "erzeugung_s": erzeugung})
+        ergebnis["laeufe"].append(lauf)
+
+        z = lauf["zeiten_s"]
+        print(f"{info['dateien']:>9,} Dateien, {info['ordner']:,} Ordner, "
+              f"{dms_kern.formatiere_groesse(info['bytes'])} (erzeugt in {erzeugung:.1f} s)")
+        for stufe in STUFEN:
+            print(f"    {stufe:<15}{z[stufe]:9.4f} s")
+        print(f"    → {lauf['pakete']} Pakete auf {lauf['ebenen']} Ebenen")
+
+    if args.ausgabe:
+        with open(args.ausgabe, "w", encoding="utf-8") as f:
+            json.dump(ergebnis, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nErgebnis geschrieben: {args.ausgabe}")
+    if args.vergleich:
+        with open(args.vergleich, "r", encoding="utf-8") as f:
+            vergleiche(json.load(f), ergebnis)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: gespeicherten Verschiebeplan anwenden statt neu zu scannen.
+
+Vergleicht den üblichen Ablauf
+
+    bisher   Trockenlauf + echter Lauf (zweiter vollständiger Scan)
+    plan     Trockenlauf mit Verschiebeplan + Plan anwenden
+
+auf zwei identischen Kopien eines synthetischen Baums. Geprüft wird, dass
+beide Abläufe dieselben Dateien verschieben, dasselbe Logfile (ohne
+Zeitstempel) und denselben Paketplan ergeben.
+
+``--latenz-ms`` verzögert jedes ``os.scandir``, jedes ``os.stat`` und das
+erste ``DirEntry.stat()`` je Eintrag – so verhält sich ein unter Linux
+eingebundenes Netzlaufwerk (SMB/NFS), bei dem jedes stat ein Roundtrip ist.
+
+    python benchmarks/bench_plan_anwenden.py --dateien 50000 --latenz-ms 2
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+
+class _EintragMitLatenz:
+    """``os.DirEntry`` mit Roundtrip beim ersten ``stat()``."""
+
+    __slots__ = ("_eintrag", "_latenz_s", "_stat", "name", "path")
+
+    def __init__(self, eintrag: os.DirEntry, latenz_s: float) -> None:
+        self._eintrag = eintrag
+        self._latenz_s = latenz_s
+        self._stat = None
+        self.name = eintrag.name
+        self.path = eintrag.path
+
+    def is_dir(self, **kw) -> bool:
+        return self._eintrag.is_dir(**kw)
+
+    def is_symlink(self) -> bool:
+        return self._eintrag.is_symlink()
+
+    def stat(self, **kw) -> os.stat_result:
+        if self._stat is None:
+            time.sleep(self._latenz_s)
+            self._stat = self._eintrag.stat(**kw)
+        return self._stat
+
+
+class _ScandirMitLatenz:
+    def __init__(self, it, latenz_s: float) -> None:
+        self._it = it
+        self._latenz_s = latenz_s
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._it.close()
+
+    def __iter__(self):
+        return (_EintragMitLatenz(e, self._latenz_s) for e in self._it)
+
+
+def setze_latenz(latenz_ms: float) -> None:
+    original_scandir, original_stat = os.scandir, os.stat
+
+    def scandir_mit_latenz(*a, **kw):
+        time.sleep(latenz_ms / 1000)
+        return _ScandirMitLatenz(original_scandir(*a, **kw), latenz_ms / 1000)
+
+    def stat_mit_latenz(*a, **kw):
+        time.sleep(latenz_ms / 1000)
+        return original_stat(*a, **kw)
+
+    os.scandir, os.stat = scandir_mit_latenz, stat_mit_latenz
+
+
+def lauf(quelle: Path, ziel: Path, endungen: set[str], mit_plan: bool,
+         scan_worker: int) -> tuple[float, float, dict, dms_kern.Laufstatistik]:
+    """Trockenlauf und echter Lauf; Rückgabe: Zeiten, Ergebnis, Statistik des 2. Laufs."""
+    start = time.perf_counter()
+    plan = dms_kern.Verschiebeplan(quelle, ziel, endungen) if mit_plan else None
+    trocken = dms_kern.fuehre_analyse_durch(quelle, ziel, endungen, True,
+                                            scan_worker=scan_worker, verschiebeplan=plan)
+    if plan is not None:
+        plandatei = ziel.parent / "verschiebeplan.sqlite3"
+        plan.speichere_datei(plandatei, trocken["scan_ergebnis"]["gueltige_dateien"])
+    dauer_trocken = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with dms_kern.Laufstatistik() as statistik:
+        if plan is not None:
+            plan = dms_kern.Verschiebeplan.lade_datei(plandatei)
+        echt = dms_kern.fuehre_analyse_durch(quelle, ziel, endungen, False,
+                                             scan_worker=scan_worker, verschiebeplan=plan,
+                                             laufstatistik=statistik)
+    return dauer_trocken, time.perf_counter() - start, echt, statistik
+
+
+def vergleichbar(ergebnis: dict, wurzel: Path) -> tuple[list, list]:
+    basis = str(wurzel)
+    with open(ergebnis["scan_ergebnis"]["logdatei"], encoding="utf-8") as f:
+        log = [zeile.split(";", 1)[1].replace(basis, "") for zeile in f.read().splitlines()[1:]]
+    plan = [[[(p.replace(basis, ""), g) for p, g in dms_kern.paket_dateien(inhalt)]
+             for inhalt in e["inhalte"]] for e in ergebnis["paketvorschlaege"]]
+    return log, plan
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=20_000)
+    parser.add_argument("--tiefe", type=int, default=4)
+    parser.add_argument("--verzweigung", type=int, default=6)
+    parser.add_argument("--anteil-ungueltig", type=float, default=0.05)
+    parser.add_argument("--scan-worker", type=int, default=1)
+    parser.add_argument("--latenz-ms", type=float, default=0.0,
+                        help="Künstliche Latenz pro scandir/stat (Netzlaufwerk simulieren)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    endungen = set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN)
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        wurzel_a, wurzel_b = Path(tmp) / "a", Path(tmp) / "b"
+        info = erzeuge_baum(wurzel_a / "quelle", tiefe=args.tiefe, verzweigung=args.verzweigung,
+                            dateien_gesamt=args.dateien, anteil_ungueltig=args.anteil_ungueltig,
+                            max_dateigroesse=4096, seed=args.seed, sparse=True)
+        shutil.copytree(wurzel_a, wurzel_b, copy_function=shutil.copy2)
+        print(f"{info['dateien']:,} Dateien in {info['ordner']:,} Ordnern, "
+              f"Latenz {args.latenz_ms} ms")
+        if args.latenz_ms > 0:
+            setze_latenz(args.latenz_ms)
+
+        ergebnisse = {}
+        for name, wurzel, mit_plan in (("bisher", wurzel_a, False), ("plan", wurzel_b, True)):
+            trocken, echt, ergebnis, statistik = lauf(wurzel / "quelle", wurzel / "ziel", endungen,
+                                                      mit_plan, args.scan_worker)
+            ergebnisse[name] = vergleichbar(ergebnis, wurzel)
+            print(f"  {name:<8} Trockenlauf {trocken:7.2f} s, echter Lauf {echt:7.2f} s, "
+                  f"gesamt {trocken + echt:7.2f} s  ({statistik.stat_aufrufe:,} stat im 2. Lauf, "
+                  f"{statistik.dateien_verschoben} verschoben)")
+
+    gleich = ergebnisse["bisher"] == ergebnisse["plan"]
+    print(f"  Logfile und Paketplan identisch: {'ja' if gleich else 'NEIN'}")
+    return 0 if gleich else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
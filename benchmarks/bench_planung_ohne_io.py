@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prüf-Benchmark: Paketplanung ohne Dateisystemzugriffe.
+
+Scannt einen synthetischen Baum, sperrt danach alle Dateisystem-Aufrufe
+(``os.stat``, ``os.scandir``, ``os.listdir``, ``Path.stat`` usw. werfen
+einen Fehler) und führt ``berechne_ordnergroessen`` und
+``erstelle_paketvorschlaege`` auf dem Scan-Ergebnis aus. Zusätzlich wird
+der Quellbaum vor der Planung gelöscht: Der Plan muss trotzdem identisch
+zum Plan mit intaktem Baum sein.
+
+Exit-Code 1, wenn die Planung das Dateisystem anfasst oder der Plan abweicht.
+
+    python benchmarks/bench_planung_ohne_io.py --tiefe 4 --verzweigung 5
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+GESPERRTE_OS_FUNKTIONEN = ["stat", "lstat", "scandir", "listdir", "open", "mkdir", "replace"]
+GESPERRTE_PATH_METHODEN = ["stat", "lstat", "exists", "is_dir", "is_file", "iterdir", "open"]
+
+
+class DateisystemZugriff(RuntimeError):
+    pass
+
+
+def _sperre(name: str):
+    def gesperrt(*args, **kwargs):
+        raise DateisystemZugriff(f"Dateisystemzugriff in der Planung: {name}{args!r}")
+    return gesperrt
+
+
+def plane(ordnerbaum: dms_kern.OrdnerKnoten, max_groesse: int) -> list[dict]:
+    dms_kern.berechne_ordnergroessen(ordnerbaum)
+    return dms_kern.erstelle_paketvorschlaege(ordnerbaum, max_groesse)
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tiefe", type=int, default=4)
+    parser.add_argument("--verzweigung", type=int, default=5)
+    parser.add_argument("--dateien-pro-ordner", type=int, default=8)
+    parser.add_argument("--max-groesse", type=int, default=64 * 1024,
+                        help="Paketgrenze in Bytes (klein, damit mehrere Ebenen entstehen)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle = Path(tmp) / "quelle"
+        info = erzeuge_baum(quelle, tiefe=args.tiefe, verzweigung=args.verzweigung,
+                            dateien_pro_ordner=args.dateien_pro_ordner)
+
+        start = time.perf_counter()
+        scan = dms_kern.scanne_quellordner(quelle, Path(tmp) / "ziel",
+                                       set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN), trockenlauf=True)
+        scan_dauer = time.perf_counter() - start
+        referenz = plane(scan["ordnerbaum"], args.max_groesse)
+
+        # Snapshot-Eigenschaft: Quelle weg, Plan muss gleich bleiben
+        shutil.rmtree(quelle)
+
+        originale_os = {n: getattr(os, n) for n in GESPERRTE_OS_FUNKTIONEN}
+        originale_path = {n: getattr(Path, n) for n in GESPERRTE_PATH_METHODEN}
+        for n in GESPERRTE_OS_FUNKTIONEN:
+            setattr(os, n, _sperre(f"os.{n}"))
+        for n in GESPERRTE_PATH_METHODEN:
+            setattr(Path, n, _sperre(f"Path.{n}"))
+        try:
+            start = time.perf_counter()
+            plan = plane(scan["ordnerbaum"], args.max_groesse)
+            plan_dauer = time.perf_counter() - start
+        except DateisystemZugriff as ex:
+            print(f"FEHLER: {ex}")
+            return 1
+        finally:
+            for n, f in originale_os.items():
+                setattr(os, n, f)
+            for n, f in originale_path.items():
+                setattr(Path, n, f)
+
+    print(f"Baum: {info['ordner']} Ordner, {info['dateien']} Dateien")
+    print(f"  Scan:    {scan_dauer:8.4f} s")
+    print(f"  Planung: {plan_dauer:8.4f} s  ({len(plan)} Ebenen, ohne Dateisystemzugriff)")
+    if plan != referenz:
+        print("FEHLER: Plan auf dem Snapshot weicht vom Plan mit intaktem Baum ab")
+        return 1
+    print("OK: Planung ist eine reine Funktion des Scan-Ergebnisses")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Klassifizierung nicht uploadfähiger Dateien (``Dateiregeln``).
+
+Teil 1 – Namensregeln auf ``--namen`` zufälligen Dateinamen (Endungen,
+mehrteilige Endungen, Office-Sperrdateien ``~$…``, ``Thumbs.db``, Namen
+ohne Endung). Gemessen wird die Zeit je Name für
+
+    bisher     ``_endung`` per rfind, dann ``in set`` (nur einfache Endungen)
+    regeln     ``Dateiregeln.klassifiziere`` mit den Standard-Endungen, erweitert um
+               mehrteilige Endungen, Muster und Namen, und mit
+               ``--viele`` zusätzlichen Endungen und Mustern
+    naiv       Schleife über alle Regeln (fnmatch je Muster) als Referenz
+
+Geprüft wird, dass ``regel``, ``klassifiziere`` und die Referenz dieselben Namen treffen.
+
+Teil 2 – Inhaltsprüfung: In einem Baum werden ``--getarnt`` Dateien mit
+harmloser Endung zu Programmen (MZ) und ebenso viele zu Verknüpfungen
+(LNK). Der Trockenlauf mit ``inhalt:mz`` und ``inhalt:lnk`` muss genau
+diese zusätzlich finden; verglichen werden die Scanzeiten ohne
+Inhaltsprüfung und mit 1 bzw. ``--worker`` Threads.
+
+    python benchmarks/bench_regeln.py --namen 200000 --viele 1000 --dateien 20000
+"""
+
+import argparse
+import fnmatch
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+ERWEITERT = [".tar.gz", ".tar.bz2", "~$*.docx", "~$*.xlsx", "~$*.pptx", "thumbs.db",
+             "desktop.ini", "*.tmp", "~*.tmp", ".~lock.*#"]
+ENDUNGEN = [".pdf", ".docx", ".xlsx", ".txt", ".jpg", ".msg", ".exe", ".lnk", ".js", ".gz",
+            ".tar.gz", ".zip", ".tmp", ".bak", ""]
+
+
+def zufallsnamen(anzahl: int, seed: int) -> list[str]:
+    zufall = random.Random(seed)
+    namen = []
+    for i in range(anzahl):
+        art = zufall.random()
+        stamm = f"Dokument_{zufall.randrange(10**6)}"
+        if art < 0.03:
+            namen.append(f"~${stamm}{zufall.choice(('.docx', '.xlsx', '.pdf'))}")
+        elif art < 0.04:
+            namen.append(zufall.choice(("Thumbs.db", "desktop.ini", ".hidden", "README")))
+        else:
+            endung = zufall.choice(ENDUNGEN)
+            namen.append(stamm + (endung.upper() if i % 7 == 0 else endung))
+    return namen
+
+
+def naiv(regeln: frozenset[str], name: str) -> bool:
+    name = name.lower()
+    for regel in regeln:
+        if regel.startswith(dms_kern.INHALT_PRAEFIX):
+            continue
+        if any(z in regel for z in "*?["):
+            if fnmatch.fnmatchcase(name, regel):
+                return True
+        elif regel.startswith("."):
+            if name.endswith(regel) and len(name) > len(regel):
+                return True
+        elif name == regel:
+            return True
+    return False
+
+
+def _endung(name: str) -> str:
+    """Bisherige Endungsermittlung des Scans (ein Funktionsaufruf je Datei)."""
+    i = name.rfind(".")
+    return name[i:].lower() if 0 < i < len(name) - 1 else ""
+
+
+def bisher(endungen: set[str], namen: list[str]) -> int:
+    return sum(1 for name in namen if _endung(name) in endungen)
+
+
+def _anzahl(treffer: list) -> int:
+    return len(treffer) - treffer.count(None)
+
+
+def je_name(funktion, namen: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    treffer = funktion(namen)
+    return (time.perf_counter() - start) / len(namen) * 1e9, treffer
+
+
+def teil_namen(args) -> bool:
+    namen = zufallsnamen(args.namen, args.seed)
+    standard = set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN)
+    viele = ([f".x{i:04d}" for i in range(args.viele)]
+             + [f"projekt_{i}_*.bak" for i in range(args.viele // 2)]
+             + [f"*_{i}.tmp" for i in range(args.viele // 2)])
+    ok = True
+    dateien = [(x, 0) for x in namen]  # Eingabe von klassifiziere, außerhalb der Messung
+    ns_bisher, treffer = je_name(lambda n: bisher(standard, n), namen)
+    ns_standard = None
+    print(f"{len(namen):,} Namen")
+    print(f"  bisher        {len(standard):5} Regeln  {ns_bisher:7.0f} ns/Name  {treffer:,} Treffer")
+    for name, liste in (("standard", standard), ("erweitert", standard | set(ERWEITERT)),
+                        ("viele", standard | set(ERWEITERT) | set(viele))):
+        start = time.perf_counter()
+        regeln = dms_kern.Dateiregeln(liste)
+        uebersetzen = time.perf_counter() - start
+        ns, treffer = je_name(lambda n: _anzahl(regeln.klassifiziere("", dateien)), namen)
+        if ns_standard is None:
+            ns_standard = ns
+        stichprobe = namen[:args.naiv]
+        ns_naiv, treffer_naiv = je_name(
+            lambda n: sum(1 for x in n if naiv(regeln.regeln, x)), stichprobe)
+        gleich = all((regeln.regel(x) is not None) == naiv(regeln.regeln, x) for x in stichprobe)
+        gleich &= regeln.klassifiziere("", dateien) == [regeln.regel(x) for x in namen]
+        ok &= gleich
+        print(f"  regeln {name:<9}{len(regeln.regeln):4} Regeln  {ns:7.0f} ns/Name  "
+              f"{treffer:,} Treffer  (übersetzt in {uebersetzen * 1000:.1f} ms; naiv "
+              f"{ns_naiv:9.0f} ns/Name{'' if gleich else ', ABWEICHUNG'})")
+    print(f"  Standard-Endungen: bisher {ns_bisher:.0f} ns/Name, klassifiziere {ns_standard:.0f} "
+          f"ns/Name ({ns_standard / ns_bisher - 1:+.0%})")
+    return ok
+
+
+KOEPFE = {
+    "mz": b"MZ\x90\x00\x03\x00\x00\x00\x04\x00\x00\x00\xff\xff\x00\x00",
+    "lnk": dms_kern.INHALT_SIGNATUREN["lnk"][0],
+}
+
+
+def teil_inhalt(args) -> bool:
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle = Path(tmp) / "quelle"
+        info = erzeuge_baum(quelle, tiefe=3, verzweigung=6, dateien_gesamt=args.dateien,
+                            anteil_ungueltig=0.05, max_dateigroesse=4096, seed=args.seed)
+        harmlos = sorted(p for p in quelle.rglob("*")
+                         if p.is_file() and p.suffix in (".pdf", ".docx", ".xlsx", ".txt"))
+        getarnt = random.Random(args.seed).sample(harmlos, 2 * args.getarnt)
+        for nr, pfad in enumerate(getarnt):
+            kopf = KOEPFE["mz" if nr < args.getarnt else "lnk"]
+            pfad.write_bytes(kopf + b"\0" * (256 - len(kopf)))
+        print(f"{info['dateien']:,} Dateien, {args.getarnt} getarnte Programme und "
+              f"{args.getarnt} getarnte Verknüpfungen")
+
+        endungen = set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN)
+        basis = None
+        ok = True
+        for name, regeln, worker in (("ohne Inhalt", endungen, 1),
+                                     ("Inhalt", endungen | {"inhalt:mz", "inhalt:lnk"}, 1),
+                                     ("Inhalt", endungen | {"inhalt:mz", "inhalt:lnk"}, args.worker)):
+            start = time.perf_counter()
+            ergebnis = dms_kern.fuehre_analyse_durch(quelle, Path(tmp) / "ziel", regeln, True,
+                                                     hash_worker=worker)
+            dauer = time.perf_counter() - start
+            anzahl = ergebnis["scan_ergebnis"]["anzahl_ungueltig"]
+            if basis is None:
+                basis = anzahl
+                zusaetzlich_ok = True
+            else:
+                zusaetzlich_ok = anzahl - basis == 2 * args.getarnt
+                ok &= zusaetzlich_ok
+            print(f"  {name:<12} {worker:2} Threads  {dauer:6.2f} s  {anzahl:,} nicht uploadfähig"
+                  f"{'' if zusaetzlich_ok else '  FALSCH'}")
+    return ok
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--namen", type=int, default=200_000)
+    parser.add_argument("--viele", type=int, default=1000,
+                        help="Zusätzliche Endungen bzw. Muster im größten Regelsatz")
+    parser.add_argument("--naiv", type=int, default=2000,
+                        help="Namen für die Referenz (naiv ist bei vielen Regeln langsam)")
+    parser.add_argument("--dateien", type=int, default=20_000)
+    parser.add_argument("--getarnt", type=int, default=50)
+    parser.add_argument("--worker", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    ok = teil_namen(args)
+    ok &= teil_inhalt(args)
+    if not ok:
+        print("FEHLER: Klassifizierung weicht ab")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
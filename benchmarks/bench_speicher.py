@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Speicherbedarf pro gescannter Datei.
+
+Vergleicht per ``tracemalloc`` die frühere Ablage der gültigen Dateien
+(``list[(Path, int)]`` plus ``(name, groesse)``-Tupel in jedem Ordnerknoten)
+mit der ``DateiTabelle`` (Spalten in ``array('q')``, Ordnerknoten mit
+``DateiAusschnitt``). Die Dateiliste wird im Speicher erzeugt, so sind auch
+Millionen Dateien ohne Plattenzugriff messbar. Zusätzlich plant beides
+einmal, um zu zeigen, dass der Plan gleich bleibt.
+
+Mit ``--scan`` wird außerdem ein echter Scan eines synthetischen Baums
+(Sparse-Dateien) gemessen.
+
+    python benchmarks/bench_speicher.py --dateien 1000000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from synthetik import GUELTIGE_BEISPIELENDUNGEN, erzeuge_baum  # noqa: E402
+
+
+def erzeuge_listing(dateien: int, pro_ordner: int, seed: int) -> list[tuple[str, list[tuple[str, int]]]]:
+    """Verzeichnisse mit Dateien wie aus dem Scan: ``[(verz, [(name, groesse), ...]), ...]``."""
+    zufall = random.Random(seed)
+    wurzel = os.path.join(os.sep, "Laufwerk", "FB51")
+    listing = []
+    nr = 0
+    ordner_nr = 0
+    while nr < dateien:
+        verz = os.path.join(wurzel, f"Projekt_{ordner_nr // 50:04d}", f"Vorgang_{ordner_nr:06d}")
+        eintraege = []
+        for _ in range(min(pro_ordner, dateien - nr)):
+            name = f"Dokument_{nr:07d}_Angebot{zufall.choice(GUELTIGE_BEISPIELENDUNGEN)}"
+            eintraege.append((name, zufall.randint(0, 50_000_000)))
+            nr += 1
+        listing.append((verz, eintraege))
+        ordner_nr += 1
+    return listing
+
+
+def baue_vorher(wurzel: str, listing) -> tuple[list, dms_kern.OrdnerKnoten]:
+    """Frühere Ablage: Path-Tupel-Liste und Tupel-Listen in den Knoten."""
+    gueltige: list[tuple[Path, int]] = []
+    baum = dms_kern.OrdnerKnoten(os.path.basename(wurzel), wurzel)
+    knoten_nach_pfad = {wurzel: baum}
+    for verz, eintraege in listing:
+        knoten = _knoten(knoten_nach_pfad, verz)
+        for name, groesse in eintraege:
+            gueltige.append((Path(os.path.join(verz, name)), groesse))
+            knoten.dateien.append((name, groesse))
+    return gueltige, baum
+
+
+def baue_nachher(wurzel: str, listing) -> tuple[dms_kern.DateiTabelle, dms_kern.OrdnerKnoten]:
+    """Neue Ablage wie in ``scanne_quellordner``."""
+    tabelle = dms_kern.DateiTabelle()
+    baum = dms_kern.OrdnerKnoten(os.path.basename(wurzel), wurzel)
+    knoten_nach_pfad = {wurzel: baum}
+    for verz, eintraege in listing:
+        knoten = _knoten(knoten_nach_pfad, verz)
+        verz_nr = tabelle.verzeichnis_nr(verz)
+        anfang = len(tabelle)
+        for name, groesse in eintraege:
+            tabelle.anhaengen(verz_nr, name, groesse)
+        knoten.dateien = tabelle.ausschnitt(anfang, len(tabelle))
+    return tabelle, baum
+
+
+def _knoten(knoten_nach_pfad: dict, verz: str) -> dms_kern.OrdnerKnoten:
+    knoten = knoten_nach_pfad.get(verz)
+    if knoten is None:
+        eltern = _knoten(knoten_nach_pfad, os.path.dirname(verz))
+        knoten = knoten_nach_pfad[verz] = eltern.neues_kind(os.path.basename(verz), verz)
+    return knoten
+
+
+def miss(bauen, *args) -> tuple[object, int, float]:
+    """Baut die Struktur und liefert (Ergebnis, belegte Bytes, Dauer)."""
+    gc.collect()
+    tracemalloc.start()
+    vorher = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    ergebnis = bauen(*args)
+    dauer = time.perf_counter() - start
+    belegt = tracemalloc.get_traced_memory()[0] - vorher
+    tracemalloc.stop()
+    return ergebnis, belegt, dauer
+
+
+def plane(baum: dms_kern.OrdnerKnoten) -> list[dict]:
+    dms_kern.berechne_ordnergroessen(baum)
+    plan = dms_kern.erstelle_paketvorschlaege(baum)
+    for eintrag in plan:
+        eintrag.pop("inhalte")
+    return plan
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=200_000)
+    parser.add_argument("--pro-ordner", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scan", action="store_true",
+                        help="Zusätzlich einen echten Scan (Sparse-Dateien) messen")
+    args = parser.parse_args()
+
+    listing = erzeuge_listing(args.dateien, args.pro_ordner, args.seed)
+    wurzel = os.path.join(os.sep, "Laufwerk", "FB51")
+    anzahl = sum(len(e) for _, e in listing)
+    print(f"{anzahl:,} Dateien in {len(listing):,} Ordnern (Python {sys.version.split()[0]})")
+
+    (gueltige, baum_vorher), bytes_vorher, dauer_vorher = miss(baue_vorher, wurzel, listing)
+    plan_vorher = plane(baum_vorher)
+    del gueltige, baum_vorher
+    (tabelle, baum_nachher), bytes_nachher, dauer_nachher = miss(baue_nachher, wurzel, listing)
+    plan_nachher = plane(baum_nachher)
+
+    print(f"  vorher  (Path-Liste + Tupel):   {bytes_vorher / anzahl:7.1f} Bytes/Datei, "
+          f"{bytes_vorher / 1e6:8.1f} MB, {dauer_vorher:6.2f} s")
+    print(f"  nachher (DateiTabelle):         {bytes_nachher / anzahl:7.1f} Bytes/Datei, "
+          f"{bytes_nachher / 1e6:8.1f} MB, {dauer_nachher:6.2f} s")
+    print(f"  Ersparnis: Faktor {bytes_vorher / max(1, bytes_nachher):.1f}; "
+          f"Spalten allein {tabelle.speicherbedarf() / anzahl:.1f} Bytes/Datei")
+    if plan_vorher != plan_nachher:
+        print("FEHLER: Plan mit DateiTabelle weicht ab")
+        return 1
+    print("  Plan identisch: ja")
+
+    if args.scan:
+        with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+            quelle = Path(tmp) / "quelle"
+            info = erzeuge_baum(quelle, tiefe=3, verzweigung=6, dateien_gesamt=args.dateien,
+                                anteil_ungueltig=0.0, max_dateigroesse=10_000_000, sparse=True)
+            scan, belegt, dauer = miss(dms_kern.scanne_quellordner, quelle, Path(tmp) / "ziel",
+                                       set(), True)
+            print(f"  echter Scan: {info['dateien']:,} Dateien, "
+                  f"{belegt / info['dateien']:.1f} Bytes/Datei (Tabelle + Baum + Log), "
+                  f"{dauer:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Upload der Pakete an den lokalen Ersatz-Server (``ersatz_dms.py``).
+
+Misst auf einem synthetischen Baum Durchsatz und Dauer je Paket für eine
+Reihe von Verbindungszahlen (``--verbindungen 1 2 4 8``). ``--latenz-ms``
+verzögert jede Anfrage, ``--bandbreite-mbit`` begrenzt jede Verbindung –
+so verhält sich ein entferntes DMS, bei dem parallele Verbindungen den
+Durchsatz vervielfachen. Danach:
+
+    störungen   ``--fehlerquote`` der PUTs bricht ab oder endet mit 503;
+                Wiederholungen müssen alles vollständig ankommen lassen
+    fortsetzen  Abbruch nach der Hälfte der Bytes, zweiter Lauf mit dem
+                Upload-Zustand; gesendet wird nur der Rest
+    speicher    eine große Datei (``--grosse-datei-mib``); die
+                Speicher-Spitze bleibt beim Lesepuffer, nicht bei der Dateigröße
+
+Nach jedem Lauf wird die Ablage des Servers mit der Quelle verglichen.
+
+    python benchmarks/bench_upload.py --dateien 2000 --latenz-ms 5 --bandbreite-mbit 200
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+import dms_upload  # noqa: E402
+from ersatz_dms import ErsatzDMS  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+
+def vollstaendig(server: ErsatzDMS, quelle: Path, paketvorschlaege: list[dict]) -> bool:
+    """Jede Datei jedes Pakets liegt inhaltsgleich in der Ablage, jedes Paket ist abgeschlossen."""
+    pakete = 0
+    for pid, dateien in dms_kern.pakete_aus_vorschlaegen(paketvorschlaege):
+        pakete += 1
+        for pfad, _ in dateien:
+            ziel = server.ablage / pid / Path(pfad).relative_to(quelle)
+            if not ziel.is_file() or _digest(ziel) != _digest(Path(pfad)):
+                return False
+    return pakete == len(server.abgeschlossen)
+
+
+def _digest(pfad: Path) -> bytes:
+    h = hashlib.blake2b()
+    with open(pfad, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.digest()
+
+
+def lauf(server: ErsatzDMS, quelle: Path, zielbasis: Path, paketvorschlaege: list[dict],
+         verbindungen: int, fortschritt: dms_kern.Fortschritt | None = None) -> dict:
+    zustand = dms_kern.Uploadzustand(dms_kern.uploadzustand_pfad(quelle, zielbasis), server.url)
+    return dms_kern.lade_pakete_hoch(quelle, dms_kern.pakete_aus_vorschlaegen(paketvorschlaege),
+                                     server.url, zustand=zustand, verbindungen=verbindungen,
+                                     versuche=10, fortschritt=fortschritt)
+
+
+def zeile(name: str, ergebnis: dict, server: ErsatzDMS, ok: bool) -> str:
+    dauern = sorted(d for _, _, d in ergebnis["latenzen"]) or [0.0]
+    p95 = dauern[min(len(dauern) - 1, int(0.95 * len(dauern)))]
+    return (f"  {name:<14}{ergebnis['dauer_s']:7.2f} s  "
+            f"{ergebnis['durchsatz_bytes_s'] / 2**20:8.1f} MiB/s  je Paket Median "
+            f"{dauern[len(dauern) // 2]:6.2f} s, 95 % {p95:6.2f} s  "
+            f"{ergebnis['wiederholungen']:4} Wiederholungen, {server.anfragen:,} Anfragen"
+            f"{'' if ok else '  UNVOLLSTÄNDIG'}")
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=2000)
+    parser.add_argument("--tiefe", type=int, default=3)
+    parser.add_argument("--verzweigung", type=int, default=4)
+    parser.add_argument("--max-dateigroesse", type=int, default=512 * 1024)
+    parser.add_argument("--max-groesse", type=int, default=2 * 1024 * 1024,
+                        help="Paketgrenze in Bytes (klein, damit viele Pakete entstehen)")
+    parser.add_argument("--verbindungen", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latenz-ms", type=float, default=5.0)
+    parser.add_argument("--bandbreite-mbit", type=float, default=200.0)
+    parser.add_argument("--fehlerquote", type=float, default=0.1)
+    parser.add_argument("--grosse-datei-mib", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    dms_upload.UPLOAD_PAUSE_S = 0.02  # lokal: kurze Pause vor Wiederholungen statt 0,5 s
+    fehlerhaft = False
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle, zielbasis = Path(tmp) / "quelle", Path(tmp) / "ziel"
+        info = erzeuge_baum(quelle, tiefe=args.tiefe, verzweigung=args.verzweigung,
+                            dateien_gesamt=args.dateien, anteil_ungueltig=0.0,
+                            max_dateigroesse=args.max_dateigroesse,
+                            groessenverteilung="lognormal", seed=args.seed)
+        plan = dms_kern.fuehre_analyse_durch(quelle, zielbasis, set(), True,
+                                             max_groesse=args.max_groesse)["paketvorschlaege"]
+        pakete = sum(len(e["pakete"]) for e in plan)
+        print(f"{info['dateien']:,} Dateien, {dms_kern.formatiere_groesse(info['bytes'])} in "
+              f"{pakete} Paketen; Server: Latenz {args.latenz_ms} ms, "
+              f"{args.bandbreite_mbit or 'unbegrenzt'} Mbit/s je Verbindung")
+
+        server = ErsatzDMS(Path(tmp) / "ablage", latenz_ms=args.latenz_ms,
+                           bandbreite_mbit=args.bandbreite_mbit)
+        server.starte()
+        try:
+            for verbindungen in args.verbindungen:
+                server.leere()
+                ergebnis = lauf(server, quelle, zielbasis, plan, verbindungen)
+                ok = not ergebnis["fehler"] and vollstaendig(server, quelle, plan)
+                fehlerhaft |= not ok
+                print(zeile(f"{verbindungen} Verb.", ergebnis, server, ok))
+
+            verbindungen = max(args.verbindungen)
+            server.leere()
+            server.fehlerquote = args.fehlerquote
+            ergebnis = lauf(server, quelle, zielbasis, plan, verbindungen)
+            server.fehlerquote = 0.0
+            ok = not ergebnis["fehler"] and vollstaendig(server, quelle, plan)
+            fehlerhaft |= not ok
+            print(zeile(f"störungen {args.fehlerquote:.0%}", ergebnis, server, ok))
+
+            server.leere()
+            fortschritt = dms_kern.Fortschritt()
+            haelfte = info["bytes"] // 2
+            original_datei = fortschritt.datei
+
+            def datei_mit_abbruch(groesse: int) -> bool:
+                if fortschritt.bytes + groesse >= haelfte:
+                    fortschritt.abbrechen()
+                return original_datei(groesse)
+
+            fortschritt.datei = datei_mit_abbruch
+            erster = lauf(server, quelle, zielbasis, plan, verbindungen, fortschritt)
+            zweiter = lauf(server, quelle, zielbasis, plan, verbindungen)
+            ok = (erster["abgebrochen"] and not zweiter["fehler"]
+                  and vollstaendig(server, quelle, plan)
+                  and erster["bytes_gesendet"] + zweiter["bytes_gesendet"] == info["bytes"])
+            fehlerhaft |= not ok
+            print(f"  fortsetzen    abgebrochen nach {erster['bytes_gesendet'] / 2**20:.1f} MiB, "
+                  f"{zweiter['bereits_fertig']} Pakete übersprungen, "
+                  f"{zweiter['bytes_gesendet'] / 2**20:.1f} MiB nachgesendet "
+                  f"(zusammen {'genau einmal' if ok else 'ABWEICHUNG'})")
+
+            if args.grosse_datei_mib:
+                gross = Path(tmp) / "gross"
+                (gross / "ordner").mkdir(parents=True)
+                with open(gross / "ordner" / "gross.bin", "wb") as f:
+                    f.truncate(args.grosse_datei_mib * 2**20)
+                plan_gross = dms_kern.fuehre_analyse_durch(gross, zielbasis, set(),
+                                                           True)["paketvorschlaege"]
+                server.leere()
+                server.bytes_pro_s = 0.0
+                tracemalloc.start()
+                start = time.perf_counter()
+                ergebnis = lauf(server, gross, zielbasis, plan_gross, 1)
+                dauer = time.perf_counter() - start
+                spitze = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                ok = not ergebnis["fehler"] and vollstaendig(server, gross, plan_gross)
+                fehlerhaft |= not ok
+                print(f"  speicher      {args.grosse_datei_mib} MiB-Datei in {dauer:.2f} s, "
+                      f"Speicher-Spitze {spitze / 2**20:.1f} MiB"
+                      f"{'' if ok else '  UNVOLLSTÄNDIG'}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    if fehlerhaft:
+        print("FEHLER: Ablage des Servers weicht von der Quelle ab")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Verschiebe-Durchsatz alt (mkdir + shutil.move pro Datei) vs. ``Verschieber``.
+
+Legt einen Baum mit ``--dateien`` ungültigen Dateien an und verschiebt sie
+einmal wie bisher und einmal mit ``dms_kern.Verschieber`` (mkdir-Cache,
+``os.replace`` auf demselben Gerät, Thread-Pool über Gerätegrenzen).
+Liegt ``--ziel`` auf einem anderen Gerät als ``--quelle`` (Standard:
+``/dev/shm``, falls vorhanden), wird der Kopierpfad gemessen.
+``--latenz-ms`` verzögert jedes Löschen der Quelldatei (wie ein Roundtrip
+auf einem Netzlaufwerk), um den Effekt des Thread-Pools sichtbar zu machen.
+
+    python benchmarks/bench_verschieben.py --dateien 5000 --groesse 65536
+    python benchmarks/bench_verschieben.py --dateien 500 --latenz-ms 5
+    python benchmarks/bench_verschieben.py --ziel /mnt/anderes_laufwerk --worker 1 4 8
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+
+
+def lege_dateien_an(wurzel: Path, anzahl: int, groesse: int, pro_ordner: int = 50) -> list[Path]:
+    inhalt = os.urandom(groesse)
+    dateien = []
+    for i in range(anzahl):
+        ordner = wurzel / f"ordner_{i // pro_ordner:04d}" / "unterordner"
+        if i % pro_ordner == 0:
+            ordner.mkdir(parents=True, exist_ok=True)
+        datei = ordner / f"programm_{i:06d}.exe"
+        datei.write_bytes(inhalt)
+        dateien.append(datei)
+    return dateien
+
+
+def verschiebe_alt(quelle: Path, ziel: Path, dateien: list[Path]) -> None:
+    for datei in dateien:
+        zielpfad = ziel / datei.relative_to(quelle)
+        zielpfad.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(datei), str(zielpfad))
+
+
+def verschiebe_neu(quelle: Path, ziel: Path, dateien: list[Path], worker: int) -> dict:
+    fehler: list[str] = []
+    log = dms_kern.LogSchreiber(ziel / "bench_log.txt")
+    log.oeffne()
+    verschieber = dms_kern.Verschieber(ziel, log, fehler, worker)
+    for datei in dateien:
+        verschieber.verschiebe(str(datei.parent), datei, ziel / datei.relative_to(quelle),
+                               ".exe", 0)
+    verschieber.schliesse()
+    log.schliesse()
+    return {"fehler": len(fehler), "umbenannt": verschieber.anzahl_umbenannt,
+            "kopiert": verschieber.anzahl_kopiert}
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=3000)
+    parser.add_argument("--groesse", type=int, default=64 * 1024, help="Bytes pro Datei")
+    parser.add_argument("--quelle", type=Path, default=Path(tempfile.gettempdir()))
+    parser.add_argument("--ziel", type=Path,
+                        default=Path("/dev/shm") if Path("/dev/shm").is_dir() else None,
+                        help="Basis für das Ziel (anderes Gerät → Kopierpfad)")
+    parser.add_argument("--worker", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latenz-ms", type=float, default=0.0,
+                        help="Künstliche Latenz pro Löschvorgang (Netzlaufwerk simulieren)")
+    args = parser.parse_args()
+
+    if args.latenz_ms > 0:
+        original_unlink = os.unlink
+
+        def unlink_mit_latenz(pfad, *a, **kw):
+            time.sleep(args.latenz_ms / 1000)
+            return original_unlink(pfad, *a, **kw)
+
+        os.unlink = unlink_mit_latenz
+
+    zielbasen = [("gleiches Gerät", args.quelle)]
+    if args.ziel is not None:
+        zielbasen.append(("anderes Gerät" if os.stat(args.ziel).st_dev != os.stat(args.quelle).st_dev
+                          else "gleiches Gerät (--ziel)", args.ziel))
+
+    megabyte = args.dateien * args.groesse / 1e6
+    for beschreibung, zielwurzel in zielbasen:
+        print(f"\n{beschreibung}: {args.dateien} Dateien à {args.groesse} Bytes "
+              f"({args.quelle} → {zielwurzel})")
+        varianten = [("alt (mkdir + shutil.move)", None)] + [
+            (f"Verschieber worker={w}", w) for w in args.worker
+        ]
+        for name, worker in varianten:
+            with tempfile.TemporaryDirectory(dir=args.quelle, prefix="dms_q_") as q, \
+                    tempfile.TemporaryDirectory(dir=zielwurzel, prefix="dms_z_") as z:
+                quelle, ziel = Path(q), Path(z)
+                dateien = lege_dateien_an(quelle, args.dateien, args.groesse)
+                start = time.perf_counter()
+                if worker is None:
+                    verschiebe_alt(quelle, ziel, dateien)
+                    info = ""
+                else:
+                    statistik = verschiebe_neu(quelle, ziel, dateien, worker)
+                    info = (f"  (umbenannt {statistik['umbenannt']}, kopiert {statistik['kopiert']}, "
+                            f"Fehler {statistik['fehler']})")
+                dauer = time.perf_counter() - start
+            print(f"  {name:28s} {dauer:7.3f} s  {args.dateien / dauer:9.0f} Dateien/s  "
+                  f"{megabyte / dauer:8.1f} MB/s{info}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
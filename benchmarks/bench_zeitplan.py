@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Upload-Zeitplan (Makespan) – längste Pakete zuerst gegen Planreihenfolge.
+
+Simuliert den Upload über N Verbindungen: jede Verbindung nimmt das nächste
+Paket, sobald sie frei ist (wie ``lade_pakete_hoch``). Verglichen werden
+
+    plan   Reihenfolge des Paketplans
+    lpt    ``plane_upload_zeitplan`` (Longest Processing Time first)
+
+jeweils gegen die untere Schranke max(Summe / N, längstes Paket). Zwei
+Paketmengen:
+
+    analyse  Paketplan eines synthetischen Baums (``fuehre_analyse_durch``)
+    pareto   zufällige Paketgrößen mit schwerem Rand (wenige sehr große)
+
+Mit ``--streuung`` weicht die tatsächliche Dauer jedes Pakets zufällig von
+der Schätzung ab (lognormal, über ``--wiederholungen`` gemittelt) – die
+Reihenfolge beruht dann nur auf Schätzungen. Geprüft wird, dass jeder
+Zeitplan jedes Paket genau einmal enthält, sich die Pakete einer
+Verbindung nicht überlappen und die Simulation ohne Streuung die
+geschätzte Gesamtdauer trifft.
+
+``--echt`` lädt zusätzlich einen kleinen Baum (``--echt-dateien``,
+Paketgrenze ``--echt-max-groesse``) in beiden Reihenfolgen an den
+Ersatz-Server (``ersatz_dms.py``, Bandbreite je Verbindung begrenzt) hoch.
+
+    python benchmarks/bench_zeitplan.py --dateien 5000 --slots 2 4 8 16 --streuung 0.3
+"""
+
+import argparse
+import heapq
+import math
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+
+def pareto_plan(anzahl: int, max_groesse: int, seed: int) -> list[dict]:
+    """Paketvorschläge ohne Dateien mit Pareto-verteilten Größen ≤ ``max_groesse``."""
+    zufall = random.Random(seed)
+    groessen = [min(max_groesse, int(max_groesse / 200 * zufall.paretovariate(1.1)))
+                for _ in range(anzahl)]
+    return [{"ordner": Path("pareto"), "pakete": [[(f"p{i}", g)] for i, g in enumerate(groessen)],
+             "inhalte": [[] for _ in groessen], "warnungen": [], "unterordner_aufgeteilt": []}]
+
+
+def simuliere(dauern: list[float], slots: int) -> float:
+    """Dynamische Verteilung: jedes Paket an die zuerst freie Verbindung; Rückgabe: Makespan."""
+    frei = [0.0] * slots
+    for dauer in dauern:
+        heapq.heapreplace(frei, frei[0] + dauer)
+    return max(frei)
+
+
+def pruefe(zeitplan: dict, anzahl: int) -> bool:
+    ids = [p["id"] for slot in zeitplan["zeitplan"] for p in slot]
+    if sorted(ids) != sorted(zeitplan["pakete"]) or len(set(ids)) != anzahl:
+        return False
+    for slot, ende in zip(zeitplan["zeitplan"], zeitplan["ende_s"]):
+        zeit = 0.0
+        for p in slot:
+            if not math.isclose(p["start_s"], zeit, abs_tol=1e-9) or p["ende_s"] < p["start_s"]:
+                return False
+            zeit = p["ende_s"]
+        if not math.isclose(zeit, ende, abs_tol=1e-9):
+            return False
+    return max(zeitplan["ende_s"]) == zeitplan["gesamtdauer_s"]
+
+
+def vergleiche(name: str, plan: list[dict], slots_liste: list[int], rate: float,
+               streuung: float, wiederholungen: int, seed: int) -> bool:
+    ok = True
+    pakete = sum(len(e["pakete"]) for e in plan)
+    groessen = [sum(g for _, g in p) for e in plan for p in e["pakete"]]
+    print(f"{name}: {pakete:,} Pakete, {dms_kern.formatiere_groesse(sum(groessen))}, "
+          f"größtes {dms_kern.formatiere_groesse(max(groessen, default=0))}")
+    for slots in slots_liste:
+        start = time.perf_counter()
+        lpt = dms_kern.plane_upload_zeitplan(plan, slots, rate)
+        planen = time.perf_counter() - start
+        in_plan = dms_kern.plane_upload_zeitplan(plan, slots, rate, reihenfolge="plan")
+        dauer = {p["id"]: p["ende_s"] - p["start_s"] for slot in lpt["zeitplan"] for p in slot}
+        gueltig = (pruefe(lpt, pakete) and pruefe(in_plan, pakete)
+                   and math.isclose(simuliere([dauer[i] for i in lpt["pakete"]], slots),
+                                    lpt["gesamtdauer_s"], rel_tol=1e-9)
+                   and in_plan["gesamtdauer_s"] == lpt["gesamtdauer_plan_s"])
+        ok &= gueltig
+        schranke = lpt["untere_schranke_s"] or 1.0
+        zeile = (f"  {slots:3} Verb.  plan {dms_kern.formatiere_dauer(in_plan['gesamtdauer_s']):>12} "
+                 f"({in_plan['gesamtdauer_s'] / schranke:5.3f}×)  lpt "
+                 f"{dms_kern.formatiere_dauer(lpt['gesamtdauer_s']):>12} "
+                 f"({lpt['gesamtdauer_s'] / schranke:5.3f}×)  Planung {planen * 1000:6.1f} ms")
+        if streuung > 0:
+            zufall = random.Random(seed + slots)
+            summen = {"plan": 0.0, "lpt": 0.0}
+            for _ in range(wiederholungen):
+                echt = {i: d * zufall.lognormvariate(0.0, streuung) for i, d in dauer.items()}
+                untere = max(sum(echt.values()) / slots, max(echt.values()))
+                for art, zp in (("plan", in_plan), ("lpt", lpt)):
+                    summen[art] += simuliere([echt[i] for i in zp["pakete"]], slots) / untere
+            zeile += (f"  mit Streuung: plan {summen['plan'] / wiederholungen:5.3f}×, "
+                      f"lpt {summen['lpt'] / wiederholungen:5.3f}×")
+        print(zeile + ("" if gueltig else "  UNGÜLTIG"))
+    return ok
+
+
+def echter_upload(tmp: Path, args: argparse.Namespace) -> bool:
+    from ersatz_dms import ErsatzDMS
+
+    quelle = tmp / "echt"
+    erzeuge_baum(quelle, tiefe=args.tiefe, verzweigung=args.verzweigung,
+                 dateien_gesamt=args.echt_dateien, anteil_ungueltig=0.0,
+                 max_dateigroesse=args.echt_max_groesse // 2, groessenverteilung="lognormal",
+                 seed=args.seed, sparse=True)
+    plan = dms_kern.fuehre_analyse_durch(quelle, tmp / "ziel_echt", set(), True,
+                                         max_groesse=args.echt_max_groesse)["paketvorschlaege"]
+    slots = max(args.slots)
+    rate = args.echt_bandbreite_mbit * 1_000_000 / 8
+    ok = True
+    print(f"echt: {sum(len(e['pakete']) for e in plan)} Pakete an den Ersatz-Server, "
+          f"{args.echt_bandbreite_mbit} Mbit/s je Verbindung")
+    with tempfile.TemporaryDirectory(prefix="dms_bench_ablage_") as ablage:
+        server = ErsatzDMS(Path(ablage), bandbreite_mbit=args.echt_bandbreite_mbit)
+        server.starte()
+        try:
+            for reihenfolge in ("plan", "lpt"):
+                server.leere()
+                zeitplan = dms_kern.plane_upload_zeitplan(plan, slots, rate, reihenfolge=reihenfolge)
+                ergebnis = dms_kern.lade_pakete_hoch(
+                    quelle, dms_kern.pakete_aus_vorschlaegen(plan, zeitplan["pakete"]),
+                    server.url, verbindungen=slots)
+                ok &= not ergebnis["fehler"]
+                print(f"  {reihenfolge:<5} {slots:3} Verb.  {ergebnis['dauer_s']:7.2f} s "
+                      f"(geschätzt {zeitplan['gesamtdauer_s']:7.2f} s), "
+                      f"{len(ergebnis['fehler'])} Fehler")
+        finally:
+            server.shutdown()
+            server.server_close()
+    return ok
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dateien", type=int, default=5000)
+    parser.add_argument("--tiefe", type=int, default=3)
+    parser.add_argument("--verzweigung", type=int, default=5)
+    parser.add_argument("--max-dateigroesse", type=int, default=256 * 1024 * 1024)
+    parser.add_argument("--max-groesse", type=int, default=1024 * 1024 * 1024,
+                        help="Paketgrenze in Bytes")
+    parser.add_argument("--slots", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--rate-mib", type=float, default=10.0, help="MiB/s je Verbindung")
+    parser.add_argument("--pareto-pakete", type=int, default=500)
+    parser.add_argument("--streuung", type=float, default=0.3,
+                        help="Sigma der lognormalen Abweichung von der geschätzten Dauer")
+    parser.add_argument("--wiederholungen", type=int, default=50)
+    parser.add_argument("--echt", action="store_true",
+                        help="Analyse-Plan zusätzlich an den Ersatz-Server hochladen")
+    parser.add_argument("--echt-dateien", type=int, default=1000)
+    parser.add_argument("--echt-max-groesse", type=int, default=16 * 1024 * 1024)
+    parser.add_argument("--echt-bandbreite-mbit", type=float, default=100.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rate = args.rate_mib * 2**20
+    ok = True
+    with tempfile.TemporaryDirectory(prefix="dms_bench_") as tmp:
+        quelle, zielbasis = Path(tmp) / "quelle", Path(tmp) / "ziel"
+        erzeuge_baum(quelle, tiefe=args.tiefe, verzweigung=args.verzweigung,
+                     dateien_gesamt=args.dateien, anteil_ungueltig=0.0,
+                     max_dateigroesse=args.max_dateigroesse, groessenverteilung="lognormal",
+                     seed=args.seed, sparse=True)
+        plan = dms_kern.fuehre_analyse_durch(quelle, zielbasis, set(), True,
+                                             max_groesse=args.max_groesse)["paketvorschlaege"]
+        ok &= vergleiche("analyse", plan, args.slots, rate, args.streuung,
+                         args.wiederholungen, args.seed)
+        ok &= vergleiche("pareto", pareto_plan(args.pareto_pakete, args.max_groesse, args.seed),
+                         args.slots, rate, args.streuung, args.wiederholungen, args.seed)
+        if args.echt:
+            ok &= echter_upload(Path(tmp), args)
+
+    if not ok:
+        print("FEHLER: ungültiger Zeitplan oder Upload fehlgeschlagen")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
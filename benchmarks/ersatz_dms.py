@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lokaler Ersatz-Server für den Upload (``dms_kern.lade_pakete_hoch``).
+
+Legt die Dateien unter ``--ablage/<PaketID>/<relativer Pfad>`` ab. Die
+Schnittstelle, die der Uploader erwartet (``<basis>`` ist der Pfad der
+Upload-URL, hier ``/dms``):
+
+    PUT  <basis>/<PaketID>/<Pfad>  Datei speichern; mit ``Content-Range`` ab
+                                   dem angegebenen Byte fortsetzen (416, wenn
+                                   der Stand nicht passt: ganz neu senden)
+    HEAD <basis>/<PaketID>/<Pfad>  ``Content-Length`` = vorhandene Bytes, sonst 404
+    POST <basis>/<PaketID>         Abschluss mit JSON ``{"dateien": n, "bytes": n}``;
+                                   409, wenn Dateien oder Bytes fehlen
+
+Netzwerkfehler, 5xx und 429 gelten als vorübergehend: der Uploader
+wiederholt mit wachsender Pause und setzt eine abgebrochene Datei ab dem
+Stand von HEAD fort. Andere Antworten sind endgültig.
+
+Für Tests und Benchmarks lassen sich eine Latenz pro Anfrage, eine
+Bandbreite pro Verbindung und eine Fehlerquote einstellen (Verbindung
+bricht mitten in der Datei ab oder der Server antwortet 503).
+
+    python benchmarks/ersatz_dms.py --port 8080 --ablage C:\\Temp\\dms --latenz-ms 20
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BASIS = "/dms"
+BLOCK = 64 * 1024
+
+
+class ErsatzDMS(ThreadingHTTPServer):
+    """HTTP/1.1-Server mit persistenten Verbindungen; ``port=0`` wählt einen freien Port."""
+
+    daemon_threads = True
+
+    def __init__(self, ablage: Path, port: int = 0, latenz_ms: float = 0.0,
+                 bandbreite_mbit: float = 0.0, fehlerquote: float = 0.0, seed: int = 1) -> None:
+        super().__init__(("127.0.0.1", port), _Anfrage)
+        self.ablage = ablage
+        self.latenz_s = latenz_ms / 1000
+        self.bytes_pro_s = bandbreite_mbit * 1_000_000 / 8
+        self.fehlerquote = fehlerquote
+        self._zufall = random.Random(seed)
+        self._sperre = threading.Lock()
+        self.anfragen = 0
+        self.bytes_empfangen = 0
+        self.fehler_erzeugt = 0
+        self.abgeschlossen: set[str] = set()
+        ablage.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{BASIS}"
+
+    def starte(self) -> threading.Thread:
+        """Bedient Anfragen in einem Hintergrund-Thread (``shutdown()`` beendet ihn)."""
+        faden = threading.Thread(target=self.serve_forever, name="ersatz-dms", daemon=True)
+        faden.start()
+        return faden
+
+    def leere(self) -> None:
+        """Ablage und Zähler zurücksetzen (zwischen zwei Benchmark-Läufen)."""
+        shutil.rmtree(self.ablage, ignore_errors=True)
+        self.ablage.mkdir(parents=True)
+        self.anfragen = self.bytes_empfangen = self.fehler_erzeugt = 0
+        self.abgeschlossen.clear()
+
+    def zaehle(self, **werte: int) -> None:
+        with self._sperre:
+            for name, wert in werte.items():
+                setattr(self, name, getattr(self, name) + wert)
+
+    def stoerung(self) -> float | None:
+        """Mit ``fehlerquote``: Anteil der Datei, nach dem abgebrochen wird (0 = 503)."""
+        with self._sperre:
+            if self.fehlerquote <= 0 or self._zufall.random() >= self.fehlerquote:
+                return None
+            return self._zufall.choice((0.0, self._zufall.random()))
+
+
+class _Anfrage(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ErsatzDMS
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _antworte(self, status: int, laenge: int = 0, schliessen: bool = False) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(laenge))
+        if schliessen:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+
+    def _teile(self) -> list[str] | None:
+        pfad = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        if not pfad.startswith(BASIS + "/"):
+            return None
+        teile = pfad[len(BASIS) + 1:].split("/")
+        if any(t in ("", ".", "..") or "\\" in t for t in teile):
+            return None
+        return teile
+
+    def _beginne(self) -> list[str] | None:
+        self.server.zaehle(anfragen=1)
+        if self.server.latenz_s:
+            time.sleep(self.server.latenz_s)
+        teile = self._teile()
+        if teile is None:
+            self._antworte(400, schliessen=True)
+        return teile
+
+    def do_HEAD(self) -> None:
+        teile = self._beginne()
+        if teile is None:
+            return
+        ziel = self.server.ablage.joinpath(*teile)
+        if len(teile) < 2 or not ziel.is_file():
+            self._antworte(404)
+            return
+        self._antworte(200, ziel.stat().st_size)
+
+    def do_PUT(self) -> None:
+        teile = self._beginne()
+        if teile is None:
+            return
+        if len(teile) < 2:
+            self._antworte(400, schliessen=True)
+            return
+        laenge = int(self.headers.get("Content-Length", "0"))
+        ziel = self.server.ablage.joinpath(*teile)
+        start = 0
+        bereich = self.headers.get("Content-Range")
+        if bereich:
+            start = int(bereich.split()[1].split("-")[0])
+            vorhanden = ziel.stat().st_size if ziel.is_file() else -1
+            if vorhanden != start:
+                self._antworte(416, schliessen=True)  # Körper nicht lesen: Verbindung schließen
+                return
+
+        stoerung = self.server.stoerung()
+        if stoerung == 0.0:
+            self._antworte(503, schliessen=True)
+            self.server.zaehle(fehler_erzeugt=1)
+            return
+        abbruch_nach = int(laenge * stoerung) if stoerung is not None else None
+
+        ziel.parent.mkdir(parents=True, exist_ok=True)
+        beginn = time.perf_counter()
+        gelesen = 0
+        with open(ziel, "r+b" if start else "wb") as f:
+            f.seek(start)
+            while gelesen < laenge:
+                if abbruch_nach is not None and gelesen >= abbruch_nach:
+                    self.close_connection = True  # wie ein abgerissenes Netz: keine Antwort
+                    self.server.zaehle(fehler_erzeugt=1)
+                    return
+                block = self.rfile.read(min(BLOCK, laenge - gelesen))
+                if not block:
+                    self.close_connection = True
+                    return
+                f.write(block)
+                gelesen += len(block)
+                self.server.zaehle(bytes_empfangen=len(block))
+                if self.server.bytes_pro_s:
+                    rest = gelesen / self.server.bytes_pro_s - (time.perf_counter() - beginn)
+                    if rest > 0:
+                        time.sleep(rest)
+        self._antworte(201)
+
+    def do_POST(self) -> None:
+        teile = self._beginne()
+        if teile is None:
+            return
+        laenge = int(self.headers.get("Content-Length", "0"))
+        try:
+            erwartet = json.loads(self.rfile.read(laenge))
+        except ValueError:
+            self._antworte(400, schliessen=True)
+            return
+        if len(teile) != 1:
+            self._antworte(400)
+            return
+        ordner = self.server.ablage / teile[0]
+        dateien = bytes_gesamt = 0
+        for wurzel, _, namen in os.walk(ordner):
+            for name in namen:
+                dateien += 1
+                bytes_gesamt += os.path.getsize(os.path.join(wurzel, name))
+        if (dateien, bytes_gesamt) != (erwartet.get("dateien"), erwartet.get("bytes")):
+            self._antworte(409)
+            return
+        with self.server._sperre:
+            self.server.abgeschlossen.add(teile[0])
+        self._antworte(200)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ablage", type=Path, required=True, help="Ordner für empfangene Pakete")
+    parser.add_argument("--latenz-ms", type=float, default=0.0, help="Verzögerung je Anfrage")
+    parser.add_argument("--bandbreite-mbit", type=float, default=0.0,
+                        help="Bandbreite je Verbindung (0 = unbegrenzt)")
+    parser.add_argument("--fehlerquote", type=float, default=0.0,
+                        help="Anteil der PUTs, die mit 503 oder Verbindungsabbruch enden")
+    args = parser.parse_args()
+    server = ErsatzDMS(args.ablage, args.port, args.latenz_ms, args.bandbreite_mbit,
+                       args.fehlerquote)
+    print(f"Ersatz-DMS unter {server.url}, Ablage {args.ablage} (Strg+C beendet)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
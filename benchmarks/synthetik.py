@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetische Ordnerbäume für die Benchmarks.
+
+Erzeugt deterministisch (fester Seed) einen Baum mit vorgegebener Tiefe,
+Verzweigung und Dateianzahl pro Ordner bzw. insgesamt. Dateigrößen folgen
+einer wählbaren Verteilung; mit ``sparse=True`` werden die Dateien nur per
+``truncate`` auf ihre Größe gebracht, sodass auch Bäume mit vielen GiB kaum
+Plattenplatz belegen (echte Sparse-Dateien unter Linux/macOS; auf NTFS ohne
+Sparse-Attribut wird der Platz reserviert).
+"""
+
+import math
+import random
+from pathlib import Path
+
+UNGUELTIGE_BEISPIELENDUNGEN = [".exe", ".lnk", ".bat"]
+GUELTIGE_BEISPIELENDUNGEN = [".pdf", ".docx", ".xlsx", ".txt", ".jpg", ".msg"]
+
+
+GROESSENVERTEILUNGEN = ("gleich", "lognormal", "pareto")
+
+
+def ordner_im_baum(tiefe: int, verzweigung: int) -> int:
+    """Ordneranzahl eines vollständigen Baums (Wurzel auf Ebene 0)."""
+    return sum(verzweigung ** e for e in range(tiefe + 1))
+
+
+def _zufallsgroesse(zufall: random.Random, verteilung: str, max_dateigroesse: int) -> int:
+    if verteilung == "gleich":
+        return zufall.randint(0, max_dateigroesse)
+    if verteilung == "lognormal":
+        # Median bei 1/100 des Maximums, breite Streuung wie bei Büro-Ablagen
+        median = max(1, max_dateigroesse // 100)
+        return min(max_dateigroesse, int(zufall.lognormvariate(math.log(median), 1.5)))
+    if verteilung == "pareto":
+        # Viele kleine, wenige sehr große Dateien
+        minimum = max(1, max_dateigroesse // 10_000)
+        return min(max_dateigroesse, int(minimum * zufall.paretovariate(1.1)))
+    raise ValueError(f"Unbekannte Größenverteilung: {verteilung}")
+
+
+def erzeuge_baum(
+    wurzel: Path,
+    tiefe: int = 3,
+    verzweigung: int = 4,
+    dateien_pro_ordner: int = 10,
+    anteil_ungueltig: float = 0.1,
+    max_dateigroesse: int = 4096,
+    seed: int = 42,
+    dateien_gesamt: int | None = None,
+    groessenverteilung: str = "gleich",
+    sparse: bool = False,
+) -> dict:
+    """
+    Legt einen synthetischen Baum unter ``wurzel`` an.
+
+    Mit ``dateien_gesamt`` werden genau so viele Dateien gleichmäßig auf die
+    Ordner verteilt (``dateien_pro_ordner`` wird dann ignoriert).
+
+    Rückgabe: dict mit ``ordner`` (Anzahl), ``dateien`` (Anzahl) und
+    ``bytes`` (logische Gesamtgröße).
+    """
+    if groessenverteilung not in GROESSENVERTEILUNGEN:
+        raise ValueError(f"Unbekannte Größenverteilung: {groessenverteilung}")
+    zufall = random.Random(seed)
+    if dateien_gesamt is not None:
+        basis, rest = divmod(dateien_gesamt, ordner_im_baum(tiefe, verzweigung))
+    anzahl_ordner = 0
+    anzahl_dateien = 0
+    anzahl_bytes = 0
+
+    stapel: list[tuple[Path, int]] = [(wurzel, 0)]
+    while stapel:
+        ordner, ebene = stapel.pop()
+        ordner.mkdir(parents=True, exist_ok=True)
+        if dateien_gesamt is not None:
+            dateien_hier = basis + (1 if anzahl_ordner < rest else 0)
+        else:
+            dateien_hier = dateien_pro_ordner
+        anzahl_ordner += 1
+        for i in range(dateien_hier):
+            if zufall.random() < anteil_ungueltig:
+                endung = zufall.choice(UNGUELTIGE_BEISPIELENDUNGEN)
+            else:
+                endung = zufall.choice(GUELTIGE_BEISPIELENDUNGEN)
+            groesse = _zufallsgroesse(zufall, groessenverteilung, max_dateigroesse)
+            pfad = ordner / f"datei_{i:04d}{endung}"
+            if sparse:
+                with open(pfad, "wb") as f:
+                    f.truncate(groesse)
+            else:
+                pfad.write_bytes(b"\0" * groesse)
+            anzahl_dateien += 1
+            anzahl_bytes += groesse
+        if ebene < tiefe:
+            for j in range(verzweigung):
+                stapel.append((ordner / f"ordner_{ebene}_{j:02d}", ebene + 1))
+
+    return {"ordner": anzahl_ordner, "dateien": anzahl_dateien, "bytes": anzahl_bytes}
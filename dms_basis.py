@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Grundlagen
+====================================
+Konstanten, Konfiguration, Pfadhilfen, Fortschritt und Laufstatistik;
+von allen Stufen genutzt.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+
+# ---------------------------------------------------------------------------
+# Konstanten
+# ---------------------------------------------------------------------------
+MAX_PAKET_GROESSE: int = 1 * 1024 * 1024 * 1024  # 1 GiB
+
+# Packstrategien für die Einheiten einer Ebene (Schlüssel → Anzeigename)
+PACKSTRATEGIEN: dict[str, str] = {
+    "namensreihenfolge": "Alphabetisch (Namensreihenfolge, bisheriges Verhalten)",
+    "best_fit_decreasing": "Best-Fit Decreasing",
+    "first_fit_decreasing": "First-Fit Decreasing",
+    "optimal": "Optimal (Branch & Bound für kleine Ebenen)",
+}
+STANDARD_PACKSTRATEGIE = "namensreihenfolge"  # derselbe Plan wie bisher; BFD auf Wunsch
+OPTIMAL_MAX_EINHEITEN = 16       # darüber fällt "optimal" auf Best-Fit Decreasing zurück
+OPTIMAL_MAX_SUCHKNOTEN = 200_000  # Suchbudget pro Ebene
+
+# Eine Packeinheit: (name, groesse, ...); weitere Elemente werden beim Packen mitgeführt
+Einheit = tuple
+
+DEFAULT_UNGUELTIGE_ENDUNGEN: set[str] = {
+    ".exe", ".bat", ".cmd", ".com",
+    ".ps1", ".psm1", ".vbs", ".js",
+    ".msi", ".msp", ".lnk",
+}
+
+# Inhaltsprüfung: Regel "inhalt:<art>" → (Dateikopf, Mindestgröße in Bytes)
+INHALT_PRAEFIX = "inhalt:"
+INHALT_SIGNATUREN: dict[str, tuple[bytes, int]] = {
+    "mz": (b"MZ", 64),  # DOS/Windows-Programme (EXE, DLL, SCR …), DOS-Header 64 Bytes
+    # Shell-Link: Headergröße 0x4C und CLSID 00021401-0000-0000-C000-000000000046
+    "lnk": (b"L\x00\x00\x00\x01\x14\x02\x00\x00\x00\x00\x00\xc0\x00\x00\x00\x00\x00\x00F", 76),
+}
+INHALT_KOPF = max(len(kopf) for kopf, _ in INHALT_SIGNATUREN.values())  # gelesene Bytes je Datei
+
+KONFIG_DATEINAME = "dms_vorbereitung_config.json"
+STANDARD_ZIELORDNER_NAME = "_NichtUploadfaehig"
+INDEX_DATEINAME = "dms_vorbereitung_index.sqlite3"
+UPLOADMANIFEST_DATEINAME = "Uploadmanifest.sqlite3"  # Standard in der Zielbasis
+
+STANDARD_SCAN_WORKER: int = 8  # Parallele Ordner-Listings (Netzlaufwerke)
+STANDARD_VERSCHIEBE_WORKER: int = 4  # Parallele Kopien bei Verschieben über Laufwerksgrenzen
+MAX_SCAN_WORKER: int = 64
+STANDARD_HASH_WORKER: int = 8  # Parallele Lesezugriffe der Duplikaterkennung
+STANDARD_UPLOAD_VERBINDUNGEN: int = 4  # Gleichzeitig hochgeladene Pakete (je eine HTTP-Verbindung)
+STANDARD_UPLOAD_VERSUCHE: int = 5  # Versuche je Anfrage bei Netzwerkfehlern und 5xx
+STANDARD_UPLOAD_RATE: int = 10 * 1024 * 1024  # Bytes/s je Verbindung für den Zeitplan (ohne Messung)
+DUPLIKAT_BLOCK: int = 64 * 1024  # Anfangs- und Endblock für den Teil-Hash
+STANDARD_ZIP_SICHERHEIT: float = 0.05  # Aufschlag auf die geschätzte komprimierte Größe
+ZIP_STUFE: int = 6  # Deflate-Stufe für Schätzung und ZIP (zlib-Standard)
+ZIP_PROBE_BLOCK: int = 64 * 1024  # Stichprobe für die Schätzung
+ZIP_PROBE_BLOECKE: int = 3  # Anfang, Mitte, Ende; kleinere Dateien werden ganz komprimiert
+ZIP_EINTRAG_KOPF = 30 + 46  # lokaler Kopf + Eintrag im Verzeichnis, je ohne Name
+ZIP_ENDE = 22  # Endsatz des Verzeichnisses (einmal je ZIP)
+UPLOAD_BLOCK = 1024 * 1024  # Lesepuffer je Verbindung – keine Datei liegt ganz im Speicher
+
+VERBOTENE_PFADE = [
+    os.path.normcase(r"C:\\"),
+    os.path.normcase(r"C:\Windows"),
+    os.path.normcase(r"C:\Program Files"),
+    os.path.normcase(r"C:\Program Files (x86)"),
+]
+
+
+# ---------------------------------------------------------------------------
+# Hilfsfunktionen
+# ---------------------------------------------------------------------------
+
+def programmverzeichnis() -> Path:
+    """Gibt das Verzeichnis zurück, in dem das Programm (oder die EXE) liegt."""
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+
+def ist_verbotener_pfad(pfad: Path) -> bool:
+    """Prüft, ob der Pfad ein geschützter Systempfad ist."""
+    norm = os.path.normcase(str(pfad.resolve()))
+    for verboten in VERBOTENE_PFADE:
+        if norm == verboten or norm.startswith(verboten + os.sep):
+            return True
+    # Direkt C:\ ohne Unterordner
+    if len(norm) <= 3 and norm.endswith(("\\", "/")):
+        return True
+    return False
+
+def formatiere_groesse(bytes_wert: int) -> str:
+    """Formatiert Bytes als lesbare Größe."""
+    if bytes_wert >= 1024 * 1024 * 1024:
+        return f"{bytes_wert / (1024**3):.2f} GB"
+    if bytes_wert >= 1024 * 1024:
+        return f"{bytes_wert / (1024**2):.2f} MB"
+    if bytes_wert >= 1024:
+        return f"{bytes_wert / 1024:.2f} KB"
+    return f"{bytes_wert} Bytes"
+
+
+def _arbeite_parallel(
+    funktion: Callable,
+    auftraege: Iterable[tuple],
+    worker: int,
+    fortschritt: "Fortschritt | None" = None,
+    name: str = "arbeit",
+) -> Iterator[tuple[tuple, Future]]:
+    """
+    Führt ``funktion(*auftrag[1:])`` je Auftrag in einem Thread-Pool aus.
+    Liefert ``(auftrag, Future)`` in Auftragsreihenfolge; höchstens ``4 × worker`` Aufträge offen.
+    """
+    offen: deque = deque()
+    with ThreadPoolExecutor(max_workers=worker, thread_name_prefix=name) as pool:
+        try:
+            for auftrag in auftraege:
+                if fortschritt is not None and fortschritt.abgebrochen:
+                    return
+                offen.append((auftrag, pool.submit(funktion, *auftrag[1:])))
+                while len(offen) > 4 * worker or (offen and offen[0][1].done()):
+                    auftrag_fertig, zukunft = offen.popleft()
+                    zukunft.exception()  # wartet
+                    yield auftrag_fertig, zukunft
+            while offen:
+                if fortschritt is not None and fortschritt.abgebrochen:
+                    return
+                auftrag_fertig, zukunft = offen.popleft()
+                zukunft.exception()
+                yield auftrag_fertig, zukunft
+        except KeyboardInterrupt:
+            if fortschritt is not None:
+                fortschritt.abbrechen()
+            raise
+        finally:
+            for _, zukunft in offen:
+                zukunft.cancel()
+
+
+# ---------------------------------------------------------------------------
+# Pfade
+# ---------------------------------------------------------------------------
+
+def _quellwurzelname(quellpfad: Path) -> str:
+    """Name des Quellordners unter der Zielbasis (Laufwerkswurzel ``U:\\`` → ``U``)."""
+    return quellpfad.name or quellpfad.anchor.replace("\\", "").replace(":", "")
+
+
+def _normpfad(pfad: Path | str) -> str:
+    """Normalisierter Pfad-String für schnelle Präfixvergleiche."""
+    return os.path.normcase(os.path.normpath(str(pfad)))
+
+
+def _liegt_in(pfad_norm: str, basis_norm: str) -> bool:
+    """Prüft (rein lexikalisch), ob ``pfad_norm`` gleich ``basis_norm`` ist oder darunter liegt."""
+    if pfad_norm == basis_norm:
+        return True
+    praefix = basis_norm if basis_norm.endswith(os.sep) else basis_norm + os.sep
+    return pfad_norm.startswith(praefix)
+
+
+# ---------------------------------------------------------------------------
+# Fortschritt und Laufstatistik
+# ---------------------------------------------------------------------------
+
+class Fortschritt:
+    """Gedrosselte Fortschrittsmeldungen und Abbruchsignal für lange Läufe."""
+
+    PRUEF_ALLE = 1024
+
+    def __init__(
+        self,
+        rueckruf: Callable[[dict], None] | None = None,
+        intervall: float = 0.2,
+    ) -> None:
+        self.rueckruf = rueckruf
+        self.intervall = intervall
+        self._abbruch = threading.Event()
+        self.phase = ""
+        self.verzeichnis = ""
+        self.dateien = 0
+        self.bytes = 0
+        self._start = time.monotonic()
+        self._letzte_meldung = 0.0
+        self._bis_pruefung = self.PRUEF_ALLE
+
+    @property
+    def abgebrochen(self) -> bool:
+        return self._abbruch.is_set()
+
+    def abbrechen(self) -> None:
+        self._abbruch.set()
+
+    def setze_phase(self, phase: str) -> None:
+        self.phase = phase
+        self._melde()
+
+    def neues_verzeichnis(self, verz: str) -> None:
+        self.verzeichnis = verz
+        self._melde_gedrosselt()
+
+    def datei(self, groesse: int) -> bool:
+        """Zählt eine Datei; ``False``, wenn abgebrochen werden soll."""
+        self.dateien += 1
+        self.bytes += groesse
+        self._bis_pruefung -= 1
+        if not self._bis_pruefung:
+            self._bis_pruefung = self.PRUEF_ALLE
+            self._melde_gedrosselt()
+        return not self._abbruch.is_set()
+
+    def _melde_gedrosselt(self) -> None:
+        if time.monotonic() - self._letzte_meldung >= self.intervall:
+            self._melde()
+
+    def _melde(self) -> None:
+        jetzt = time.monotonic()
+        self._letzte_meldung = jetzt
+        if self.rueckruf is None:
+            return
+        dauer = jetzt - self._start
+        self.rueckruf({
+            "phase": self.phase,
+            "verzeichnis": self.verzeichnis,
+            "dateien": self.dateien,
+            "bytes": self.bytes,
+            "dateien_pro_s": self.dateien / dauer if dauer > 0 else 0.0,
+            "dauer_s": dauer,
+        })
+
+
+class Laufstatistik:
+    """
+    Zeiten (exklusiv je Stufe) und Mengen der Pipeline-Stufen eines Laufs,
+    optional mit Speicher-Spitze (``tracemalloc``).
+    """
+
+    STUFEN_NAMEN = {
+        "index": "Scan-Index",
+        "scan": "Scan",
+        "verschieben": "Verschieben",
+        "duplikate": "Duplikate",
+        "delta": "Delta",
+        "kompression": "Kompression",
+        "ordnergroessen": "Ordnergrößen",
+        "paketbildung": "Paketbildung",
+        "zip": "ZIP-Pakete",
+        "ausgabe": "Ausgabe",
+    }
+
+    def __init__(self, speicher_messen: bool = False) -> None:
+        self.speicher_messen = speicher_messen
+        self.stufen: dict[str, float] = {}
+        self.ordner = 0
+        self.dateien = 0
+        self.stat_aufrufe = 0
+        self.dateien_verschoben = 0
+        self.bytes_verschoben = 0
+        self.gesamt_s = 0.0
+        self.speicher_spitze: int | None = None
+        self._sperre = threading.Lock()
+        self._verschachtelt: list[float] = []
+        self._start = 0.0
+        self._tracemalloc_gestartet = False
+
+    def __enter__(self) -> "Laufstatistik":
+        if self.speicher_messen and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc_gestartet = True
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.gesamt_s = time.perf_counter() - self._start
+        if self.speicher_messen and tracemalloc.is_tracing():
+            self.speicher_spitze = tracemalloc.get_traced_memory()[1]
+            if self._tracemalloc_gestartet:
+                tracemalloc.stop()
+                self._tracemalloc_gestartet = False
+
+    @contextmanager
+    def stufe(self, name: str) -> Iterator[None]:
+        """Misst eine Stufe (nur aus dem Pipeline-Thread verwenden)."""
+        start = time.perf_counter()
+        self._verschachtelt.append(0.0)
+        try:
+            yield
+        finally:
+            dauer = time.perf_counter() - start
+            innen = self._verschachtelt.pop()
+            self.stufen[name] = self.stufen.get(name, 0.0) + dauer - innen
+            if self._verschachtelt:
+                self._verschachtelt[-1] += dauer
+
+    def zaehle_stat(self, anzahl: int) -> None:
+        """Thread-sicher, wird auch aus den Scan-Workern aufgerufen."""
+        with self._sperre:
+            self.stat_aufrufe += anzahl
+
+    def datei_verschoben(self, groesse: int) -> None:
+        self.dateien_verschoben += 1
+        self.bytes_verschoben += groesse
+
+    def _stufen_geordnet(self) -> list[tuple[str, float]]:
+        """Stufen in Pipeline-Reihenfolge (unbekannte Namen am Ende)."""
+        reihenfolge = list(self.STUFEN_NAMEN)
+        return sorted(self.stufen.items(),
+                      key=lambda s: reihenfolge.index(s[0]) if s[0] in reihenfolge else len(reihenfolge))
+
+    def als_dict(self) -> dict:
+        """JSON-fähige Momentaufnahme (für Manifest und Kommandozeile)."""
+        return {
+            "gesamt_s": round(self.gesamt_s, 4),
+            "stufen_s": {name: round(dauer, 4) for name, dauer in self._stufen_geordnet()},
+            "ordner": self.ordner,
+            "dateien": self.dateien,
+            "stat_aufrufe": self.stat_aufrufe,
+            "dateien_verschoben": self.dateien_verschoben,
+            "bytes_verschoben": self.bytes_verschoben,
+            "speicher_spitze_bytes": self.speicher_spitze,
+        }
+
+    def kurztext(self) -> str:
+        """Einzeilige Zusammenfassung für die Statusleiste."""
+        teile = [f"{self.STUFEN_NAMEN.get(n, n)} {d:.1f} s" for n, d in self._stufen_geordnet()]
+        text = f"{self.gesamt_s:.1f} s ({', '.join(teile)}) · {self.dateien:,} Dateien"
+        text += f" · {self.stat_aufrufe:,} stat"
+        if self.dateien_verschoben:
+            text += f" · {formatiere_groesse(self.bytes_verschoben)} verschoben"
+        if self.speicher_spitze is not None:
+            text += f" · Spitze {formatiere_groesse(self.speicher_spitze)}"
+        return text
+
+    def zeilen(self) -> list[str]:
+        """Mehrzeiliger Block für den Ausgabetext."""
+        zeilen = ["Laufstatistik:", f"  Gesamt: {self.gesamt_s:.3f} s"]
+        for name, dauer in self._stufen_geordnet():
+            zeilen.append(f"  {self.STUFEN_NAMEN.get(name, name)}: {dauer:.3f} s")
+        zeilen.append(f"  Ordner: {self.ordner:,}  Dateien: {self.dateien:,}  "
+                      f"stat-Aufrufe: {self.stat_aufrufe:,}")
+        if self.dateien_verschoben:
+            zeilen.append(f"  Verschoben: {self.dateien_verschoben:,} Dateien, "
+                          f"{formatiere_groesse(self.bytes_verschoben)}")
+        if self.speicher_spitze is not None:
+            zeilen.append(f"  Speicher-Spitze: {formatiere_groesse(self.speicher_spitze)}")
+        return zeilen
+
+    def haenge_an_log(self, logdatei: Path) -> str | None:
+        """
+        Hängt eine Zusammenfassungszeile (Aktion ``statistik``) an das CSV-Log an.
+        Rückgabe: Fehlermeldung oder ``None``.
+        """
+        werte = [f"gesamt_s={self.gesamt_s:.3f}"]
+        werte += [f"{name}_s={dauer:.3f}" for name, dauer in self._stufen_geordnet()]
+        werte += [f"ordner={self.ordner}", f"dateien={self.dateien}",
+                  f"stat={self.stat_aufrufe}", f"verschoben={self.dateien_verschoben}"]
+        if self.speicher_spitze is not None:
+            werte.append(f"speicher_spitze={self.speicher_spitze}")
+        zeit = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with open(logdatei, "a", encoding="utf-8") as f:
+                f.write(f"{zeit};statistik;{','.join(werte)};-;-;{self.bytes_verschoben}\n")
+        except OSError as ex:
+            return f"Statistik konnte nicht ins Logfile geschrieben werden: {ex}"
+        return None
+
+
+def messe_stufe(laufstatistik: Laufstatistik | None, name: str):
+    """``laufstatistik.stufe(name)`` oder ein leerer Kontext ohne Statistik."""
+    return laufstatistik.stufe(name) if laufstatistik is not None else nullcontext()
+
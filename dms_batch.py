@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Stapelbetrieb
+=======================================
+Bearbeitet viele Quellordner (z. B. alle Fachbereichslaufwerke) in einem
+``ProcessPoolExecutor``: Scan und Paketbildung laufen je Quellordner in
+einem eigenen Prozess und nutzen so alle Kerne. Jeder Quellordner bekommt
+sein eigenes Logfile; Fehler eines Quellordners (auch ein abgestürzter
+Prozess) betreffen die anderen nicht.
+
+Quellenliste (Textdatei, UTF-8), eine Zeile pro Quellordner, optional mit
+eigener Zielbasis:
+
+    # Kommentar
+    U:\\FB51
+    U:\\FB52;U:\\_NichtUploadfaehig_Gesamt
+"""
+
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from contextlib import nullcontext
+
+from dms_kern import (
+    MAX_PAKET_GROESSE,
+    STANDARD_PACKSTRATEGIE,
+    Laufstatistik,
+    erstelle_paketmanifest,
+    formatiere_groesse,
+    fuehre_analyse_durch,
+    ist_verbotener_pfad,
+    oeffne_journal,
+    schreibe_manifest_json,
+    standard_zielbasis,
+)
+
+
+def lese_quellenliste(datei: Path) -> list[tuple[Path, Path | None]]:
+    """Liest ``Quelle[;Zielbasis]``-Zeilen; leere Zeilen und ``#``-Kommentare werden übersprungen."""
+    quellen: list[tuple[Path, Path | None]] = []
+    with open(datei, "r", encoding="utf-8-sig") as f:
+        for zeile in f:
+            zeile = zeile.strip()
+            if not zeile or zeile.startswith("#"):
+                continue
+            quelle, _, ziel = zeile.partition(";")
+            quellen.append((Path(quelle.strip()), Path(ziel.strip()) if ziel.strip() else None))
+    return quellen
+
+
+def _kennung(nr: int, quellpfad: Path) -> str:
+    """Eindeutiger, dateinamentauglicher Name eines Quellordners im Stapel."""
+    name = quellpfad.name or quellpfad.anchor
+    return f"{nr:03d}_" + re.sub(r"[^\w.-]+", "_", name).strip("_")
+
+
+def bearbeite_quelle(auftrag: dict) -> dict:
+    """
+    Scan und Paketbildung für einen Quellordner (läuft im Worker-Prozess).
+    Liefert eine kompakte, picklebare Zusammenfassung; Ausnahmen als ``status="fehler"``.
+    """
+    quellpfad = Path(auftrag["quelle"])
+    zielbasis = Path(auftrag["zielbasis"])
+    zusammenfassung = {
+        "quelle": str(quellpfad),
+        "zielbasis": str(zielbasis),
+        "kennung": auftrag["kennung"],
+        "status": "ok",
+        "logdatei": None,
+        "manifest": None,
+        "anzahl_ungueltig": 0,
+        "anzahl_pakete": 0,
+        "gesamtgroesse": 0,
+        "warnungen": [],
+        "fehler": [],
+        "dauer_s": 0.0,
+        "laufstatistik": None,
+    }
+    laufstatistik = Laufstatistik() if auftrag.get("statistik") else None
+    start = time.perf_counter()
+    try:
+        if not quellpfad.is_dir():
+            raise FileNotFoundError(f"Quellordner existiert nicht: {quellpfad}")
+        if ist_verbotener_pfad(quellpfad):
+            raise PermissionError(f"Geschützter Systempfad: {quellpfad}")
+
+        # Echte Läufe mit Journal; ein unterbrochener Lauf wird ohne Scan fortgesetzt
+        journal = (None if auftrag["trockenlauf"]
+                   else oeffne_journal(quellpfad, zielbasis, auftrag["kennung"]))
+        if journal is not None and journal.geladen:
+            abweichung = journal.abweichung(quellpfad, set(auftrag["ungueltige_endungen"]))
+            if abweichung is not None:
+                raise ValueError(f"Verschiebejournal passt nicht zu diesem Auftrag: {abweichung} "
+                                 f"({journal.pfad})")
+        with laufstatistik if laufstatistik is not None else nullcontext():
+            ergebnis = fuehre_analyse_durch(
+                quellpfad, zielbasis, set(auftrag["ungueltige_endungen"]), auftrag["trockenlauf"],
+                scan_worker=auftrag["scan_worker"],
+                strategie=auftrag["strategie"],
+                namensreihenfolge=auftrag["namensreihenfolge"],
+                max_groesse=auftrag["max_groesse"],
+                log_zusatz=auftrag["kennung"],
+                laufstatistik=laufstatistik,
+                journal=journal,
+            )
+        scan_ergebnis = ergebnis["scan_ergebnis"]
+        if laufstatistik is not None and scan_ergebnis["logdatei"]:
+            log_fehler = laufstatistik.haenge_an_log(scan_ergebnis["logdatei"])
+            if log_fehler:
+                scan_ergebnis["fehler"].append(log_fehler)
+        manifest = erstelle_paketmanifest(quellpfad, zielbasis, auftrag["trockenlauf"],
+                                          scan_ergebnis, ergebnis["paketvorschlaege"],
+                                          laufstatistik)
+        if auftrag.get("manifest_ordner"):
+            manifest_datei = Path(auftrag["manifest_ordner"]) / f"{auftrag['kennung']}.json"
+            manifest_datei.parent.mkdir(parents=True, exist_ok=True)
+            with open(manifest_datei, "w", encoding="utf-8") as f:
+                schreibe_manifest_json(manifest, f)
+            zusammenfassung["manifest"] = str(manifest_datei)
+
+        zusammenfassung.update({
+            "logdatei": manifest["logdatei"],
+            "anzahl_ungueltig": manifest["anzahl_ungueltig"],
+            "anzahl_pakete": manifest["anzahl_pakete"],
+            "gesamtgroesse": manifest["gesamtgroesse"],
+            "warnungen": [w for e in manifest["ebenen"] for w in e["warnungen"]],
+            "fehler": manifest["fehler"],
+            "laufstatistik": manifest.get("laufstatistik"),
+        })
+    except Exception as ex:
+        zusammenfassung["status"] = "fehler"
+        zusammenfassung["fehler"].append(f"{type(ex).__name__}: {ex}")
+    zusammenfassung["dauer_s"] = time.perf_counter() - start
+    return zusammenfassung
+
+
+def fuehre_batch_durch(
+    quellen: list[tuple[Path, Path | None]],
+    ungueltige_endungen: set[str],
+    trockenlauf: bool,
+    prozesse: int | None = None,
+    scan_worker: int = 4,
+    strategie: str = STANDARD_PACKSTRATEGIE,
+    namensreihenfolge: bool = False,
+    max_groesse: int = MAX_PAKET_GROESSE,
+    manifest_ordner: Path | None = None,
+    melde=None,
+    statistik: bool = False,
+) -> dict:
+    """
+    Bearbeitet alle Quellordner parallel in Prozessen und fasst die Ergebnisse zusammen.
+
+    Rückgabe: dict mit ``quellen`` (Zusammenfassungen in Eingabereihenfolge)
+    und ``gesamt`` (Summen über alle Quellordner).
+    """
+    auftraege = [
+        {
+            "quelle": str(quelle),
+            "zielbasis": str(ziel if ziel is not None else standard_zielbasis(quelle)),
+            "kennung": _kennung(nr, quelle),
+            "ungueltige_endungen": sorted(ungueltige_endungen),
+            "trockenlauf": trockenlauf,
+            "scan_worker": scan_worker,
+            "strategie": strategie,
+            "namensreihenfolge": namensreihenfolge,
+            "max_groesse": max_groesse,
+            "manifest_ordner": str(manifest_ordner) if manifest_ordner else None,
+            "statistik": statistik,
+        }
+        for nr, (quelle, ziel) in enumerate(quellen, 1)
+    ]
+    ergebnisse: dict[int, dict] = {}
+    prozesse = max(1, min(prozesse or os.cpu_count() or 1, len(auftraege) or 1))
+
+    def runde(nummern: list[int], max_prozesse: int) -> list[int]:
+        abgestuerzt: list[int] = []
+        with ProcessPoolExecutor(max_workers=max_prozesse) as pool:
+            zukuenfte = {pool.submit(bearbeite_quelle, auftraege[i]): i for i in nummern}
+            for zukunft in as_completed(zukuenfte):
+                i = zukuenfte[zukunft]
+                try:
+                    ergebnisse[i] = zukunft.result()
+                except BrokenProcessPool:
+                    abgestuerzt.append(i)
+                    continue
+                except Exception as ex:
+                    ergebnisse[i] = _fehlgeschlagen(auftraege[i], ex)
+                if melde is not None:
+                    melde(ergebnisse[i])
+        return abgestuerzt
+
+    abgestuerzt = runde(list(range(len(auftraege))), prozesse)
+    for i in abgestuerzt:
+        # Einzeln wiederholen, damit ein defekter Quellordner keinen anderen mitreißt
+        for j in runde([i], 1):
+            ergebnisse[j] = _fehlgeschlagen(auftraege[j], RuntimeError("Worker-Prozess abgestürzt"))
+            if melde is not None:
+                melde(ergebnisse[j])
+
+    zusammenfassungen = [ergebnisse[i] for i in range(len(auftraege))]
+    return {
+        "quellen": zusammenfassungen,
+        "gesamt": {
+            "quellordner": len(zusammenfassungen),
+            "fehlgeschlagen": sum(1 for z in zusammenfassungen if z["status"] != "ok"),
+            "anzahl_pakete": sum(z["anzahl_pakete"] for z in zusammenfassungen),
+            "gesamtgroesse": sum(z["gesamtgroesse"] for z in zusammenfassungen),
+            "anzahl_ungueltig": sum(z["anzahl_ungueltig"] for z in zusammenfassungen),
+            "anzahl_warnungen": sum(len(z["warnungen"]) for z in zusammenfassungen),
+            "anzahl_fehler": sum(len(z["fehler"]) for z in zusammenfassungen),
+        },
+    }
+
+
+def _fehlgeschlagen(auftrag: dict, ex: BaseException) -> dict:
+    return {
+        "quelle": auftrag["quelle"],
+        "zielbasis": auftrag["zielbasis"],
+        "kennung": auftrag["kennung"],
+        "status": "fehler",
+        "logdatei": None,
+        "manifest": None,
+        "anzahl_ungueltig": 0,
+        "anzahl_pakete": 0,
+        "gesamtgroesse": 0,
+        "warnungen": [],
+        "fehler": [f"{type(ex).__name__}: {ex}"],
+        "dauer_s": 0.0,
+        "laufstatistik": None,
+    }
+
+
+def schreibe_batch_json(batch_ergebnis: dict, datei) -> None:
+    json.dump(batch_ergebnis, datei, indent=2, ensure_ascii=False)
+    datei.write("\n")
+
+
+BATCH_CSV_KOPF = ["Kennung", "Quelle", "Status", "Pakete", "Gesamtgroesse_Bytes",
+                  "Ungueltig", "Warnungen", "Fehler", "Dauer_s", "Logdatei"]
+
+
+def schreibe_batch_csv(batch_ergebnis: dict, datei) -> None:
+    """Eine Zeile pro Quellordner (Semikolon wie Log und Paket-CSV)."""
+    schreiber = csv.writer(datei, delimiter=";", lineterminator="\n")
+    schreiber.writerow(BATCH_CSV_KOPF)
+    for z in batch_ergebnis["quellen"]:
+        schreiber.writerow([z["kennung"], z["quelle"], z["status"], z["anzahl_pakete"],
+                            z["gesamtgroesse"], z["anzahl_ungueltig"], len(z["warnungen"]),
+                            len(z["fehler"]), f"{z['dauer_s']:.2f}", z["logdatei"] or ""])
+
+
+def erstelle_batch_text(batch_ergebnis: dict) -> str:
+    zeilen = ["DMS-Upload-Vorbereitung – Stapelbetrieb", ""]
+    for z in batch_ergebnis["quellen"]:
+        zeichen = "✓" if z["status"] == "ok" else "✗"
+        zeilen.append(f"{zeichen} {z['quelle']}: {z['anzahl_pakete']} Pakete, "
+                      f"{formatiere_groesse(z['gesamtgroesse'])}, "
+                      f"{z['anzahl_ungueltig']} nicht uploadfähig, "
+                      f"{len(z['warnungen'])} Warnungen ({z['dauer_s']:.1f} s)")
+        if z["logdatei"]:
+            zeilen.append(f"    Log: {z['logdatei']}")
+        for fehler in z["fehler"]:
+            zeilen.append(f"    ✗ {fehler}")
+    g = batch_ergebnis["gesamt"]
+    zeilen += [
+        "",
+        f"Gesamt: {g['quellordner']} Quellordner ({g['fehlgeschlagen']} fehlgeschlagen), "
+        f"{g['anzahl_pakete']} Pakete, {formatiere_groesse(g['gesamtgroesse'])}, "
+        f"{g['anzahl_ungueltig']} nicht uploadfähig, {g['anzahl_warnungen']} Warnungen, "
+        f"{g['anzahl_fehler']} Fehler",
+    ]
+    return "\n".join(zeilen)
@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Kommandozeile
+=======================================
+Führt Scan und Paketbildung ohne GUI aus (importiert kein tkinter) und
+schreibt den Paketplan als JSON oder CSV. Nutzt dieselben Kernfunktionen
+wie die Oberfläche (``dms_kern``).
+
+Beispiele:
+    python dms_cli.py U:\\FB51 --ausgabe plan.json
+    python dms_cli.py U:\\FB51 --format csv --ausgabe plan.csv --scan-worker 16
+    python dms_cli.py U:\\FB51 --verschieben --zielbasis U:\\_NichtUploadfaehig_Gesamt
+    python dms_cli.py --batch quellen.txt --prozesse 4 --manifest-ordner plaene
+    python dms_cli.py U:\\FB51 --plan-speichern fb51.plan   (Trockenlauf prüfen, dann:)
+    python dms_cli.py --plan-anwenden fb51.plan
+    python dms_cli.py U:\\FB51 --delta fb51.upload --uploadmanifest fb51.upload
+    python dms_cli.py U:\\FB51 --upload https://dms.example/import/FB51 --upload-verbindungen 8
+    python dms_cli.py U:\\FB51 --komprimiert --zip D:\\Pakete\\FB51
+    (Ein abgebrochener echter Lauf wird beim nächsten gleichen Aufruf aus
+    dem Verschiebejournal fortgesetzt, ohne neuen Scan.)
+
+Exit-Codes:
+    0  alles in Ordnung
+    1  Warnungen (z. B. Dateien > 1 GiB)
+    2  Fehler (Verschieben/Logfile/Index) oder ungültige Argumente
+    3  ungültiger Quellordner (fehlt oder geschützter Systempfad)
+       bzw. im Stapelbetrieb: Quellenliste fehlt oder ist leer
+    130 abgebrochen (Strg+C)
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+
+from dms_batch import (
+    erstelle_batch_text,
+    fuehre_batch_durch,
+    lese_quellenliste,
+    schreibe_batch_csv,
+    schreibe_batch_json,
+)
+from dms_kern import (
+    INDEX_DATEINAME,
+    MAX_PAKET_GROESSE,
+    PACKSTRATEGIEN,
+    STANDARD_HASH_WORKER,
+    STANDARD_PACKSTRATEGIE,
+    STANDARD_SCAN_WORKER,
+    STANDARD_UPLOAD_RATE,
+    STANDARD_UPLOAD_REIHENFOLGE,
+    STANDARD_UPLOAD_VERBINDUNGEN,
+    STANDARD_UPLOAD_VERSUCHE,
+    STANDARD_VERSCHIEBE_WORKER,
+    STANDARD_ZIP_SICHERHEIT,
+    UPLOAD_REIHENFOLGEN,
+    Fortschritt,
+    Kompressionsschaetzer,
+    Laufstatistik,
+    Uploadmanifest,
+    Uploadzustand,
+    Verschiebeplan,
+    baue_zip_pakete,
+    bereitstellung_zeilen,
+    erfasse_uploadmanifest,
+    erstelle_ausgabetext,
+    erstelle_paketmanifest,
+    formatiere_groesse,
+    fuehre_analyse_durch,
+    ist_verbotener_pfad,
+    journal_pfad,
+    lade_konfiguration,
+    lade_pakete_hoch,
+    messe_stufe,
+    normalisiere_regel,
+    oeffne_journal,
+    pakete_aus_vorschlaegen,
+    plane_upload_zeitplan,
+    programmverzeichnis,
+    schreibe_manifest_csv,
+    schreibe_manifest_json,
+    standard_zielbasis,
+    stelle_pakete_bereit,
+    upload_zeilen,
+    uploadzustand_pfad,
+    zeitplan_zeilen,
+    zip_zeilen,
+)
+
+EXIT_OK = 0
+EXIT_WARNUNGEN = 1
+EXIT_FEHLER = 2
+EXIT_EINGABE = 3
+EXIT_ABGEBROCHEN = 130
+
+
+def erstelle_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="dms_cli",
+        description="DMS Upload-Vorbereitung ohne GUI: Scan, Paketplan als JSON/CSV.",
+        epilog="Exit-Codes: 0 OK, 1 Warnungen, 2 Fehler, 3 ungültiger Quellordner, 130 abgebrochen.",
+    )
+    parser.add_argument("quelle", type=Path, nargs="?", help="Quellordner")
+    parser.add_argument("--batch", type=Path, metavar="LISTE",
+                        help="Stapelbetrieb: Textdatei mit einem Quellordner pro Zeile "
+                             "(optional 'Quelle;Zielbasis'); Ausgabe ist die Zusammenfassung")
+    parser.add_argument("--prozesse", type=int, default=None,
+                        help="Stapelbetrieb: parallele Prozesse (Standard: Anzahl Kerne)")
+    parser.add_argument("--manifest-ordner", type=Path,
+                        help="Stapelbetrieb: Paketmanifest je Quellordner als JSON hier ablegen")
+    parser.add_argument("--zielbasis", type=Path,
+                        help="Zielbasis für nicht uploadfähige Dateien "
+                             "(Standard: _NichtUploadfaehig im Quellordner)")
+    parser.add_argument("--verschieben", action="store_true",
+                        help="Ungültige Dateien wirklich verschieben (Standard: Trockenlauf)")
+    parser.add_argument("--plan-speichern", type=Path, metavar="DATEI",
+                        help="Trockenlauf als Verschiebeplan speichern (Dateitabelle, mtimes)")
+    parser.add_argument("--plan-anwenden", type=Path, metavar="DATEI",
+                        help="Gespeicherten Verschiebeplan ohne neuen Scan ausführen "
+                             "(Quellordner, Zielbasis und Endungen aus dem Plan)")
+    parser.add_argument("--plan-streng", action="store_true",
+                        help="Mit --plan-anwenden: seit dem Plan geänderte Dateien nicht verschieben")
+    parser.add_argument("--journal-verwerfen", action="store_true",
+                        help="Journal eines unterbrochenen Laufs verwerfen und neu scannen")
+    parser.add_argument("--ohne-journal", action="store_true",
+                        help="Echter Lauf ohne Verschiebejournal (verschiebt schon während des "
+                             "Scans, nach einem Absturz aber nicht fortsetzbar)")
+    parser.add_argument("--format", choices=["json", "csv", "text"], default="json",
+                        help="Ausgabeformat des Paketplans (Standard: json)")
+    parser.add_argument("--ausgabe", default="-",
+                        help="Zieldatei für den Plan, '-' für stdout (Standard)")
+    parser.add_argument("--endungen",
+                        help="Kommagetrennte Regeln für nicht uploadfähige Dateien: Endungen "
+                             "(.exe, .tar.gz), Muster (~$*.docx), Dateinamen (thumbs.db), "
+                             "Inhaltsprüfung (inhalt:mz, inhalt:lnk); Standard: aus der "
+                             "Konfigurationsdatei")
+    parser.add_argument("--scan-worker", type=int, default=STANDARD_SCAN_WORKER,
+                        help=f"Parallele Ordner-Listings (Standard: {STANDARD_SCAN_WORKER})")
+    parser.add_argument("--strategie", choices=sorted(PACKSTRATEGIEN),
+                        default=STANDARD_PACKSTRATEGIE,
+                        help=f"Packstrategie (Standard: {STANDARD_PACKSTRATEGIE} wie bisher; "
+                             "best_fit_decreasing oder optimal für weniger, vollere Pakete)")
+    parser.add_argument("--namensreihenfolge", action="store_true",
+                        help="Wie --strategie namensreihenfolge (hat Vorrang)")
+    parser.add_argument("--max-groesse", type=int, default=MAX_PAKET_GROESSE,
+                        help="Maximale Paketgröße in Bytes (Standard: 1 GiB)")
+    parser.add_argument("--index", action="store_true",
+                        help=f"Scan-Index nutzen ({INDEX_DATEINAME} neben der Konfiguration)")
+    parser.add_argument("--index-pruefen", action="store_true",
+                        help="Gecachte Dateigrößen per stat prüfen (Scan-Index bzw. --plan-anwenden)")
+    parser.add_argument("--index-neu", action="store_true",
+                        help="Index für den Quellordner neu aufbauen")
+    parser.add_argument("--duplikate", action="store_true",
+                        help="Inhaltsgleiche Dateien suchen (Größe, Teil-Hash, Voll-Hash)")
+    parser.add_argument("--duplikate-ausschliessen", action="store_true",
+                        help="Duplikate nicht in die Pakete aufnehmen (impliziert --duplikate)")
+    parser.add_argument("--hash-worker", type=int, default=STANDARD_HASH_WORKER,
+                        help=f"Parallele Lesezugriffe beim Hashen (Standard: {STANDARD_HASH_WORKER})")
+    parser.add_argument("--delta", type=Path, metavar="MANIFEST",
+                        help="Nur neue und geänderte Dateien packen (Vergleich mit dem "
+                             "Upload-Manifest des letzten Uploads)")
+    parser.add_argument("--uploadmanifest", type=Path, metavar="DATEI",
+                        help="Upload-Manifest der gepackten Dateien speichern (mit --delta "
+                             "inklusive der unveränderten; darf dieselbe Datei sein)")
+    parser.add_argument("--uploadmanifest-hash", action="store_true",
+                        help="Im Upload-Manifest auch Inhaltshashes speichern (liest alle "
+                             "gepackten Dateien; nur angefasste Dateien gelten dann als unverändert)")
+    parser.add_argument("--komprimiert", action="store_true",
+                        help="Gegen die geschätzte ZIP-Größe planen (Stichproben je Datei mit "
+                             "zlib, Cache je Endung und Signatur); --max-groesse gilt dann für "
+                             "das ZIP")
+    parser.add_argument("--zip-sicherheit", type=float, default=STANDARD_ZIP_SICHERHEIT * 100,
+                        metavar="PROZENT",
+                        help="Aufschlag auf die geschätzte ZIP-Größe in Prozent "
+                             f"(Standard: {STANDARD_ZIP_SICHERHEIT * 100:g})")
+    parser.add_argument("--zip", type=Path, metavar="ORDNER",
+                        help="Je Paket ein ZIP in ORDNER bauen (<PaketID>.zip); zu große "
+                             "Pakete werden neu aufgeteilt, der ausgegebene Plan entspricht "
+                             "den ZIPs")
+    parser.add_argument("--bereitstellen", type=Path, metavar="ORDNER",
+                        help="Pro Paket einen Staging-Ordner anlegen (Hardlinks, sonst Kopien)")
+    parser.add_argument("--kopier-worker", type=int, default=STANDARD_VERSCHIEBE_WORKER,
+                        help="Parallele Kopien beim Bereitstellen über Laufwerksgrenzen "
+                             f"(Standard: {STANDARD_VERSCHIEBE_WORKER})")
+    parser.add_argument("--upload", metavar="URL",
+                        help="Pakete nach der Analyse per HTTP hochladen (fortsetzbar; Zustand "
+                             "als Uploadzustand_<Ordner>.sqlite3 in der Zielbasis)")
+    parser.add_argument("--upload-verbindungen", type=int, default=STANDARD_UPLOAD_VERBINDUNGEN,
+                        help="Gleichzeitig hochgeladene Pakete, je eine Verbindung "
+                             f"(Standard: {STANDARD_UPLOAD_VERBINDUNGEN})")
+    parser.add_argument("--upload-versuche", type=int, default=STANDARD_UPLOAD_VERSUCHE,
+                        help="Versuche je Anfrage bei Netzwerkfehlern und 5xx "
+                             f"(Standard: {STANDARD_UPLOAD_VERSUCHE})")
+    parser.add_argument("--upload-rate", type=float, default=STANDARD_UPLOAD_RATE / 2**20,
+                        metavar="MIB_S",
+                        help="Rate je Verbindung in MiB/s für den Zeitplan (gemessen: "
+                             f"„Rate je Verbindung“ im Upload-Bericht; Standard: "
+                             f"{STANDARD_UPLOAD_RATE / 2**20:g})")
+    parser.add_argument("--upload-reihenfolge", choices=sorted(UPLOAD_REIHENFOLGEN),
+                        default=STANDARD_UPLOAD_REIHENFOLGE,
+                        help="Startreihenfolge der Pakete: lpt = längste zuerst (kürzeste "
+                             "Gesamtdauer), plan = wie im Paketplan")
+    parser.add_argument("--zeitplan", action="store_true",
+                        help="Upload-Zeitplan je Verbindung mit geschätzten Endzeiten ausgeben "
+                             "(im Manifest unter 'zeitplan')")
+    parser.add_argument("--fortschritt", action="store_true",
+                        help="Fortschritt auf stderr ausgeben")
+    parser.add_argument("--zwischenergebnisse", action="store_true",
+                        help="Fertig gescannte Ordner der obersten Ebene sofort planen und "
+                             "auf stderr melden (Plan bleibt gleich)")
+    parser.add_argument("--statistik", action="store_true",
+                        help="Laufstatistik je Stufe erfassen (im Manifest unter "
+                             "'laufstatistik', Zeile im Logfile, Kurzfassung auf stderr)")
+    parser.add_argument("--speicher", action="store_true",
+                        help="Zusätzlich die Speicher-Spitze per tracemalloc messen (langsamer)")
+    return parser
+
+
+def _melde_fortschritt(meldung: dict) -> None:
+    print(f"\r{meldung['phase']} {meldung['dateien']:,} Dateien "
+          f"({meldung['dateien_pro_s']:,.0f}/s), {formatiere_groesse(meldung['bytes'])}   ",
+          end="", file=sys.stderr, flush=True)
+
+
+def _melde_teilergebnis(ereignis: dict) -> None:
+    eintraege = ereignis["paketvorschlaege"]
+    if eintraege:
+        info = f"{sum(len(e['pakete']) for e in eintraege)} Pakete in {len(eintraege)} Ebenen"
+        warnungen = sum(len(e["warnungen"]) for e in eintraege)
+        if warnungen:
+            info += f", {warnungen} Warnungen"
+    else:
+        info = "Einheit der obersten Ebene"
+    zeile = f"▸ {ereignis['ordner']} ({formatiere_groesse(ereignis['groesse'])}): {info}"
+    print(f"\r{zeile:<79}", file=sys.stderr, flush=True)  # überschreibt die Fortschrittszeile
+
+
+def _oeffne_ausgabe(ziel: str):
+    if ziel == "-":
+        return sys.stdout
+    return open(ziel, "w", encoding="utf-8", newline="")
+
+
+def _ungueltige_endungen(args, parser: argparse.ArgumentParser) -> set[str]:
+    if args.endungen:
+        try:
+            return {regel for regel in map(normalisiere_regel, args.endungen.split(",")) if regel}
+        except ValueError as ex:
+            parser.error(f"--endungen: {ex}")
+    return lade_konfiguration()
+
+
+def _melde_quelle(zusammenfassung: dict) -> None:
+    zeichen = "✓" if zusammenfassung["status"] == "ok" else "✗"
+    print(f"{zeichen} {zusammenfassung['quelle']} ({zusammenfassung['dauer_s']:.1f} s)",
+          file=sys.stderr, flush=True)
+
+
+def _batch(args, parser: argparse.ArgumentParser) -> int:
+    if args.quelle is not None or args.zielbasis is not None:
+        parser.error("--batch ist nicht mit Quellordner/--zielbasis kombinierbar "
+                     "(Zielbasis je Zeile in der Liste angeben)")
+    try:
+        quellen = lese_quellenliste(args.batch)
+    except OSError as ex:
+        print(f"Fehler: Quellenliste konnte nicht gelesen werden: {ex}", file=sys.stderr)
+        return EXIT_EINGABE
+    if not quellen:
+        print(f"Fehler: Quellenliste ist leer: {args.batch}", file=sys.stderr)
+        return EXIT_EINGABE
+
+    try:
+        batch_ergebnis = fuehre_batch_durch(
+            quellen, _ungueltige_endungen(args, parser), not args.verschieben,
+            prozesse=args.prozesse,
+            scan_worker=max(1, args.scan_worker),
+            strategie=args.strategie,
+            namensreihenfolge=args.namensreihenfolge,
+            max_groesse=args.max_groesse,
+            manifest_ordner=args.manifest_ordner,
+            melde=_melde_quelle if args.fortschritt else None,
+            statistik=args.statistik,
+        )
+    except KeyboardInterrupt:
+        print("\nAbgebrochen.", file=sys.stderr)
+        return EXIT_ABGEBROCHEN
+
+    try:
+        ausgabe = _oeffne_ausgabe(args.ausgabe)
+    except OSError as ex:
+        print(f"Fehler: Ausgabe konnte nicht geöffnet werden: {ex}", file=sys.stderr)
+        return EXIT_FEHLER
+    try:
+        if args.format == "text":
+            ausgabe.write(erstelle_batch_text(batch_ergebnis) + "\n")
+        elif args.format == "json":
+            schreibe_batch_json(batch_ergebnis, ausgabe)
+        else:
+            schreibe_batch_csv(batch_ergebnis, ausgabe)
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_FEHLER
+    finally:
+        if ausgabe is not sys.stdout:
+            ausgabe.close()
+
+    g = batch_ergebnis["gesamt"]
+    print(f"{g['quellordner']} Quellordner ({g['fehlgeschlagen']} fehlgeschlagen), "
+          f"{g['anzahl_pakete']} Pakete, {g['anzahl_ungueltig']} nicht uploadfähige Dateien, "
+          f"{g['anzahl_warnungen']} Warnungen, {g['anzahl_fehler']} Fehler", file=sys.stderr)
+    if g["fehlgeschlagen"] or g["anzahl_fehler"]:
+        return EXIT_FEHLER
+    if g["anzahl_warnungen"]:
+        return EXIT_WARNUNGEN
+    return EXIT_OK
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = erstelle_parser()
+    args = parser.parse_args(argv)
+    if args.batch is not None:
+        return _batch(args, parser)
+    verschiebeplan: Verschiebeplan | None = None
+    if args.plan_anwenden is not None:
+        if args.quelle is not None or args.plan_speichern is not None:
+            parser.error("--plan-anwenden ersetzt Quellordner und --plan-speichern")
+        try:
+            verschiebeplan = Verschiebeplan.lade_datei(args.plan_anwenden, streng=args.plan_streng,
+                                                       pruefen=args.index_pruefen)
+        except (OSError, ValueError, sqlite3.Error) as ex:
+            print(f"Fehler: Verschiebeplan nicht lesbar: {ex}", file=sys.stderr)
+            return EXIT_EINGABE
+        args.quelle, args.zielbasis = verschiebeplan.quellpfad, verschiebeplan.zielbasis
+        args.verschieben = True
+        print(f"Verschiebeplan vom {verschiebeplan.erstellt}: "
+              f"{verschiebeplan.anzahl_verschiebungen()} Verschiebungen", file=sys.stderr)
+    elif args.plan_speichern is not None and args.verschieben:
+        parser.error("--plan-speichern nur im Trockenlauf (ohne --verschieben)")
+    if args.quelle is None:
+        parser.error("Quellordner, --batch oder --plan-anwenden angeben")
+    if args.upload is not None and not args.upload.lower().startswith(("http://", "https://")):
+        parser.error("--upload erwartet eine http:// oder https:// URL")
+    if args.upload_rate <= 0:
+        parser.error("--upload-rate muss größer als 0 sein")
+    if args.zip_sicherheit < 0:
+        parser.error("--zip-sicherheit darf nicht negativ sein")
+    uploadmanifest: Uploadmanifest | None = None
+    if args.delta is not None:
+        try:
+            uploadmanifest = Uploadmanifest.lade_datei(args.delta)
+        except (OSError, ValueError, sqlite3.Error) as ex:
+            print(f"Fehler: Upload-Manifest nicht lesbar: {ex}", file=sys.stderr)
+            return EXIT_EINGABE
+
+    quellpfad: Path = args.quelle
+    if not quellpfad.is_dir():
+        print(f"Fehler: Der Quellordner existiert nicht: {quellpfad}", file=sys.stderr)
+        return EXIT_EINGABE
+    if ist_verbotener_pfad(quellpfad):
+        print(f"Fehler: {quellpfad} ist ein geschützter Systempfad.", file=sys.stderr)
+        return EXIT_EINGABE
+    zielbasis: Path = args.zielbasis or standard_zielbasis(quellpfad)
+
+    ungueltige_endungen = (verschiebeplan.ungueltige_endungen if verschiebeplan is not None
+                           else _ungueltige_endungen(args, parser))
+    if args.plan_speichern is not None:
+        verschiebeplan = Verschiebeplan(quellpfad, zielbasis, ungueltige_endungen)
+
+    trockenlauf = not args.verschieben
+    journal = None
+    if not trockenlauf and not args.ohne_journal:
+        if args.journal_verwerfen:
+            journal_pfad(quellpfad, zielbasis).unlink(missing_ok=True)
+        try:
+            journal = oeffne_journal(quellpfad, zielbasis)
+        except (OSError, ValueError, sqlite3.Error) as ex:
+            print(f"Fehler: Verschiebejournal nicht lesbar: {ex} "
+                  "(--journal-verwerfen startet neu)", file=sys.stderr)
+            return EXIT_EINGABE
+        if journal.geladen:
+            abweichung = journal.abweichung(quellpfad, ungueltige_endungen)
+            if abweichung is not None:
+                print(f"Fehler: Das Verschiebejournal passt nicht zu diesem Aufruf: {abweichung} "
+                      f"({journal.pfad}; --journal-verwerfen startet neu)", file=sys.stderr)
+                return EXIT_EINGABE
+            print(f"Unterbrochener Lauf vom {journal.begonnen} wird fortgesetzt: "
+                  f"{journal.anzahl_offen} von {journal.anzahl_eintraege} Einträgen offen, "
+                  f"kein neuer Scan ({journal.pfad})", file=sys.stderr)
+    fortschritt = Fortschritt(rueckruf=_melde_fortschritt if args.fortschritt else None)
+    laufstatistik = (Laufstatistik(speicher_messen=args.speicher)
+                     if args.statistik or args.speicher else None)
+    text: str | None = None
+    manifest: dict | None = None
+    zips: dict | None = None
+    try:
+        with laufstatistik if laufstatistik is not None else nullcontext():
+            ergebnis = fuehre_analyse_durch(
+                quellpfad, zielbasis, ungueltige_endungen, trockenlauf,
+                scan_worker=max(1, args.scan_worker),
+                index_pfad=programmverzeichnis() / INDEX_DATEINAME if args.index else None,
+                index_pruefen=args.index_pruefen,
+                index_verwerfen=args.index_neu,
+                strategie=args.strategie,
+                namensreihenfolge=args.namensreihenfolge,
+                max_groesse=args.max_groesse,
+                fortschritt=fortschritt,
+                laufstatistik=laufstatistik,
+                duplikate_suchen=args.duplikate or args.duplikate_ausschliessen,
+                duplikate_ausschliessen=args.duplikate_ausschliessen,
+                hash_worker=max(1, args.hash_worker),
+                verschiebeplan=verschiebeplan,
+                journal=journal,
+                teilergebnis=_melde_teilergebnis if args.zwischenergebnisse else None,
+                uploadmanifest=uploadmanifest,
+                kompression=(Kompressionsschaetzer(args.zip_sicherheit / 100)
+                             if args.komprimiert else None),
+            )
+            scan_ergebnis = ergebnis["scan_ergebnis"]
+            paketvorschlaege = ergebnis["paketvorschlaege"]
+            if args.zip is not None and not scan_ergebnis["abgebrochen"]:
+                # Vor der Ausgabe: zu große ZIPs teilen den Plan neu auf
+                with messe_stufe(laufstatistik, "zip"):
+                    try:
+                        zips = baue_zip_pakete(
+                            quellpfad, paketvorschlaege, args.zip, max_groesse=args.max_groesse,
+                            strategie=args.strategie, worker=max(1, args.kopier_worker),
+                            fortschritt=fortschritt)
+                    except (OSError, ValueError) as ex:
+                        scan_ergebnis["fehler"].append(f"ZIP-Pakete nicht möglich: {ex}")
+                    else:
+                        if zips["abgebrochen"]:
+                            scan_ergebnis["abgebrochen"] = True
+            with messe_stufe(laufstatistik, "ausgabe"):
+                if args.format == "text":
+                    text = erstelle_ausgabetext(quellpfad, zielbasis, trockenlauf,
+                                                scan_ergebnis, paketvorschlaege)
+                else:
+                    manifest = erstelle_paketmanifest(quellpfad, zielbasis, trockenlauf,
+                                                      scan_ergebnis, paketvorschlaege)
+                    if zips is not None:
+                        manifest["zip"] = dict(zips, zielordner=str(zips["zielordner"]))
+    except KeyboardInterrupt:
+        print("\nAbgebrochen.", file=sys.stderr)
+        if journal is not None and journal.pfad.is_file():
+            print(f"Verschiebejournal bleibt erhalten, derselbe Aufruf setzt fort: {journal.pfad}",
+                  file=sys.stderr)
+        return EXIT_ABGEBROCHEN
+    finally:
+        if args.fortschritt:
+            print(file=sys.stderr)
+
+    if args.plan_speichern is not None and not scan_ergebnis["abgebrochen"]:
+        try:
+            verschiebeplan.speichere_datei(args.plan_speichern, scan_ergebnis["gueltige_dateien"])
+            print(f"Verschiebeplan gespeichert: {args.plan_speichern}", file=sys.stderr)
+        except (OSError, sqlite3.Error) as ex:
+            fehler = f"Verschiebeplan konnte nicht gespeichert werden: {ex}"
+            scan_ergebnis["fehler"].append(fehler)
+            if manifest is not None:
+                manifest["fehler"].append(fehler)
+
+    if args.uploadmanifest is not None and not scan_ergebnis["abgebrochen"]:
+        fehler_vorher = len(scan_ergebnis["fehler"])
+        try:
+            upload = erfasse_uploadmanifest(
+                quellpfad, scan_ergebnis["gueltige_dateien"], scan_ergebnis["ordnerbaum"],
+                paketvorschlaege, delta=scan_ergebnis.get("delta"),
+                mit_hash=args.uploadmanifest_hash, worker=max(1, args.hash_worker),
+                fehler=scan_ergebnis["fehler"])
+            if upload is not None:
+                upload.speichere_datei(args.uploadmanifest, quellpfad)
+                print(f"Upload-Manifest gespeichert: {args.uploadmanifest} "
+                      f"({len(upload):,} Dateien)", file=sys.stderr)
+        except KeyboardInterrupt:
+            print("\nAbgebrochen, Upload-Manifest nicht gespeichert.", file=sys.stderr)
+            return EXIT_ABGEBROCHEN
+        except (OSError, sqlite3.Error) as ex:
+            scan_ergebnis["fehler"].append(f"Upload-Manifest konnte nicht gespeichert werden: {ex}")
+        if manifest is not None:
+            manifest["fehler"].extend(scan_ergebnis["fehler"][fehler_vorher:])
+
+    zeitplan: dict | None = None
+    if (args.zeitplan or args.upload is not None) and not scan_ergebnis["abgebrochen"]:
+        zeitplan = plane_upload_zeitplan(paketvorschlaege, slots=args.upload_verbindungen,
+                                         bytes_pro_s=args.upload_rate * 2**20,
+                                         reihenfolge=args.upload_reihenfolge)
+        if args.zeitplan:
+            if manifest is not None:
+                manifest["zeitplan"] = zeitplan
+            else:
+                text += "\n\n" + "\n".join(zeitplan_zeilen(zeitplan))
+
+    if laufstatistik is not None:
+        # Erst nach Ende der Messung eintragen, damit die Werte vollständig sind
+        if scan_ergebnis["logdatei"]:
+            log_fehler = laufstatistik.haenge_an_log(scan_ergebnis["logdatei"])
+            if log_fehler:
+                scan_ergebnis["fehler"].append(log_fehler)
+                if manifest is not None:
+                    manifest["fehler"].append(log_fehler)
+        if manifest is not None:
+            manifest["laufstatistik"] = laufstatistik.als_dict()
+        else:
+            text += "\n\n" + "\n".join(laufstatistik.zeilen())
+
+    try:
+        ausgabe = _oeffne_ausgabe(args.ausgabe)
+    except OSError as ex:
+        print(f"Fehler: Ausgabe konnte nicht geöffnet werden: {ex}", file=sys.stderr)
+        return EXIT_FEHLER
+    try:
+        if manifest is None:
+            ausgabe.write(text + "\n")
+        elif args.format == "json":
+            schreibe_manifest_json(manifest, ausgabe)
+        else:
+            schreibe_manifest_csv(manifest, ausgabe)
+    except BrokenPipeError:
+        # Leser hat die Pipe geschlossen (z. B. "| head"); Rest still verwerfen
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_FEHLER
+    finally:
+        if ausgabe is not sys.stdout:
+            ausgabe.close()
+
+    anzahl_warnungen = sum(len(e["warnungen"]) for e in paketvorschlaege)
+    anzahl_pakete = sum(len(e["pakete"]) for e in paketvorschlaege)
+    print(f"{anzahl_pakete} Pakete, {scan_ergebnis['anzahl_ungueltig']} nicht uploadfähige "
+          f"Dateien, {anzahl_warnungen} Warnungen, {len(scan_ergebnis['fehler'])} Fehler",
+          file=sys.stderr)
+    for fehler in scan_ergebnis["fehler"]:
+        print(f"  ✗ {fehler}", file=sys.stderr)
+    duplikate = scan_ergebnis.get("duplikate")
+    if duplikate:
+        print(f"{duplikate['anzahl_duplikate']} Duplikate "
+              f"({formatiere_groesse(duplikate['bytes_gespart'])} einsparbar"
+              f"{', ausgeschlossen' if duplikate['ausgeschlossen'] else ''})", file=sys.stderr)
+    delta = scan_ergebnis.get("delta")
+    if delta:
+        print(f"Delta: {delta['anzahl_neu']} neu, {delta['anzahl_geaendert']} geändert, "
+              f"{delta['anzahl_unveraendert']} unverändert, "
+              f"{delta['anzahl_entfernt']} nicht mehr vorhanden", file=sys.stderr)
+    if zips is not None:
+        print("\n".join(zip_zeilen(zips)), file=sys.stderr)
+    if args.zeitplan and zeitplan is not None:
+        print("\n".join(zeitplan_zeilen(zeitplan)[:3]), file=sys.stderr)
+    if laufstatistik is not None:
+        print(f"Laufstatistik: {laufstatistik.kurztext()}", file=sys.stderr)
+
+    if scan_ergebnis["abgebrochen"]:
+        return EXIT_ABGEBROCHEN
+    if args.bereitstellen is not None:
+        try:
+            bereitstellung = stelle_pakete_bereit(
+                quellpfad, pakete_aus_vorschlaegen(paketvorschlaege), args.bereitstellen,
+                worker=args.kopier_worker,
+                fortschritt=Fortschritt(rueckruf=_melde_fortschritt if args.fortschritt else None),
+            )
+        except KeyboardInterrupt:
+            print("\nAbgebrochen.", file=sys.stderr)
+            return EXIT_ABGEBROCHEN
+        except (OSError, ValueError) as ex:
+            print(f"Fehler: Bereitstellen nicht möglich: {ex}", file=sys.stderr)
+            return EXIT_FEHLER
+        finally:
+            if args.fortschritt:
+                print(file=sys.stderr)
+        print("\n".join(bereitstellung_zeilen(bereitstellung)), file=sys.stderr)
+        if bereitstellung["fehler"]:
+            return EXIT_FEHLER
+    if args.upload is not None:
+        try:
+            upload = lade_pakete_hoch(
+                quellpfad, pakete_aus_vorschlaegen(paketvorschlaege, zeitplan["pakete"]),
+                args.upload,
+                zustand=Uploadzustand(uploadzustand_pfad(quellpfad, zielbasis), args.upload),
+                verbindungen=args.upload_verbindungen, versuche=args.upload_versuche,
+                fortschritt=Fortschritt(rueckruf=_melde_fortschritt if args.fortschritt else None),
+            )
+        except KeyboardInterrupt:
+            print("\nAbgebrochen, der nächste gleiche Aufruf setzt den Upload fort.",
+                  file=sys.stderr)
+            return EXIT_ABGEBROCHEN
+        except (OSError, ValueError, sqlite3.Error) as ex:
+            print(f"Fehler: Upload nicht möglich: {ex}", file=sys.stderr)
+            return EXIT_FEHLER
+        finally:
+            if args.fortschritt:
+                print(file=sys.stderr)
+        print("\n".join(upload_zeilen(upload)), file=sys.stderr)
+        if upload["fehler"]:
+            return EXIT_FEHLER
+    if scan_ergebnis["fehler"] or (zips is not None and zips["fehler"]):
+        return EXIT_FEHLER
+    if anzahl_warnungen:
+        return EXIT_WARNUNGEN
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    # Nötig für den Prozess-Pool im Stapelbetrieb, wenn als EXE gebaut
+    multiprocessing.freeze_support()
+    sys.exit(main())
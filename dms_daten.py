@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Dateitabelle und Ordnerbaum
+=====================================================
+Kompakte Ablage der gültigen Dateien und der In-Memory-Ordnerbaum des Scans.
+"""
+
+import bisect
+import os
+from array import array
+from pathlib import Path
+from typing import Iterator, Sequence
+
+
+# ---------------------------------------------------------------------------
+# Dateitabelle (kompakte Ablage der gültigen Dateien)
+# ---------------------------------------------------------------------------
+
+class DateiTabelle:
+    """
+    Spaltenweise Tabelle der gültigen Dateien (``array('q')`` und ein Namens-``bytearray``).
+    Iteriert wie bisher als ``(Path, groesse)``; etwa 24 Bytes plus Namenslänge je Datei.
+    """
+
+    __slots__ = ("verzeichnisse", "_verz_nr", "verz", "groessen", "_namen", "_namen_ende")
+
+    def __init__(self) -> None:
+        self.verzeichnisse: list[str] = []
+        self._verz_nr: dict[str, int] = {}
+        self.verz = array("q")
+        self.groessen = array("q")
+        self._namen = bytearray()
+        self._namen_ende = array("q")
+
+    def verzeichnis_nr(self, verz: str) -> int:
+        """Nummer des Verzeichnisses (legt es beim ersten Auftreten an)."""
+        nr = self._verz_nr.get(verz)
+        if nr is None:
+            nr = self._verz_nr[verz] = len(self.verzeichnisse)
+            self.verzeichnisse.append(verz)
+        return nr
+
+    def anhaengen(self, verz_nr: int, name: str, groesse: int) -> None:
+        self.verz.append(verz_nr)
+        self.groessen.append(groesse)
+        # surrogatepass: auch nicht dekodierbare Namen (Linux) verlustfrei ablegen
+        self._namen += name.encode("utf-8", "surrogatepass")
+        self._namen_ende.append(len(self._namen))
+
+    def __len__(self) -> int:
+        return len(self.groessen)
+
+    def name(self, i: int) -> str:
+        anfang = self._namen_ende[i - 1] if i else 0
+        return self._namen[anfang:self._namen_ende[i]].decode("utf-8", "surrogatepass")
+
+    def pfad(self, i: int) -> str:
+        return os.path.join(self.verzeichnisse[self.verz[i]], self.name(i))
+
+    def eintraege(self) -> Iterator[tuple[str, str, int]]:
+        """``(verzeichnis, name, groesse)`` in Scan-Reihenfolge, ohne ``Path``-Objekte."""
+        verzeichnisse, namen, enden = self.verzeichnisse, self._namen, self._namen_ende
+        anfang = 0
+        for v, ende, groesse in zip(self.verz, enden, self.groessen):
+            yield verzeichnisse[v], namen[anfang:ende].decode("utf-8", "surrogatepass"), groesse
+            anfang = ende
+
+    def __iter__(self) -> Iterator[tuple[Path, int]]:
+        """Adapter für Code, der die frühere ``list[(Path, int)]`` erwartet."""
+        for verz, name, groesse in self.eintraege():
+            yield Path(os.path.join(verz, name)), groesse
+
+    def __eq__(self, andere: object) -> bool:
+        if isinstance(andere, DateiTabelle):
+            return list(self.eintraege()) == list(andere.eintraege())
+        if isinstance(andere, list):
+            return list(self) == andere
+        return NotImplemented
+
+    def ausschnitt(self, anfang: int, ende: int) -> "DateiAusschnitt":
+        return DateiAusschnitt(self, anfang, ende)
+
+    def spalten(self) -> dict[str, bytes]:
+        """Die Spalten als Bytes (zum Speichern, siehe ``aus_spalten``)."""
+        return {"verz": self.verz.tobytes(), "groessen": self.groessen.tobytes(),
+                "namen": bytes(self._namen), "namen_ende": self._namen_ende.tobytes()}
+
+    @classmethod
+    def aus_spalten(cls, verzeichnisse: list[str], spalten: dict[str, bytes],
+                    tausche_bytes: bool = False) -> "DateiTabelle":
+        tabelle = cls()
+        for verz in verzeichnisse:
+            tabelle.verzeichnis_nr(verz)
+        for name in ("verz", "groessen", "namen_ende"):
+            spalte = getattr(tabelle, "_namen_ende" if name == "namen_ende" else name)
+            spalte.frombytes(spalten[name])
+            if tausche_bytes:
+                spalte.byteswap()
+        tabelle._namen += spalten["namen"]
+        return tabelle
+
+    def speicherbedarf(self) -> int:
+        """Ungefährer Speicher der Spalten in Bytes (ohne Verzeichnisnamen)."""
+        return (self.verz.itemsize * len(self.verz) + self.groessen.itemsize * len(self.groessen)
+                + len(self._namen) + self._namen_ende.itemsize * len(self._namen_ende))
+
+
+class DateiAusschnitt(Sequence):
+    """Zusammenhängender Bereich einer ``DateiTabelle`` als Folge von ``(name, groesse)``."""
+
+    __slots__ = ("tabelle", "anfang", "ende")
+
+    def __init__(self, tabelle: DateiTabelle, anfang: int, ende: int) -> None:
+        self.tabelle = tabelle
+        self.anfang = anfang
+        self.ende = ende
+
+    def __len__(self) -> int:
+        return self.ende - self.anfang
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.tabelle.name(self.anfang + i), self.tabelle.groessen[self.anfang + i]
+
+    def __iter__(self) -> Iterator[tuple[str, int]]:
+        tabelle = self.tabelle
+        namen, enden = tabelle._namen, tabelle._namen_ende
+        anfang = enden[self.anfang - 1] if self.anfang else 0
+        for i in range(self.anfang, self.ende):
+            ende = enden[i]
+            yield namen[anfang:ende].decode("utf-8", "surrogatepass"), tabelle.groessen[i]
+            anfang = ende
+
+    def summe(self) -> int:
+        """Summe der Größen direkt aus der Spalte (ohne Namen zu dekodieren)."""
+        return sum(self.tabelle.groessen[self.anfang:self.ende])
+
+    def __eq__(self, andere: object) -> bool:
+        if isinstance(andere, (DateiAusschnitt, list, tuple)):
+            return list(self) == list(andere)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"DateiAusschnitt({list(self)!r})"
+
+
+# ---------------------------------------------------------------------------
+# Ordnerbaum
+# ---------------------------------------------------------------------------
+
+class OrdnerKnoten:
+    """
+    Ein Verzeichnis im In-Memory-Ordnerbaum des Scans.
+
+    - dateien: gültige Dateien direkt in diesem Ordner als (name, groesse);
+      nach dem Scan ein ``DateiAusschnitt`` der Dateitabelle, sonst eine Liste
+    - kinder: direkte Unterordner nach Name
+    - groesse: Gesamtgröße inkl. Unterordner (nach ``berechne_ordnergroessen``)
+    """
+
+    __slots__ = ("name", "pfad", "eltern", "kinder", "dateien", "groesse")
+
+    def __init__(self, name: str, pfad: str, eltern: "OrdnerKnoten | None" = None) -> None:
+        self.name = name
+        self.pfad = pfad
+        self.eltern = eltern
+        self.kinder: dict[str, OrdnerKnoten] = {}
+        self.dateien: Sequence[tuple[str, int]] = []
+        self.groesse = 0
+
+    def neues_kind(self, name: str, pfad: str) -> "OrdnerKnoten":
+        kind = OrdnerKnoten(name, pfad, self)
+        self.kinder[name] = kind
+        return kind
+
+    def als_path(self) -> Path:
+        return Path(self.pfad)
+
+    def knoten_preorder(self) -> list["OrdnerKnoten"]:
+        """Alle Knoten des Teilbaums (Eltern vor Kindern), iterativ."""
+        ergebnis: list[OrdnerKnoten] = []
+        stapel = [self]
+        while stapel:
+            knoten = stapel.pop()
+            ergebnis.append(knoten)
+            stapel.extend(knoten.kinder.values())
+        return ergebnis
+
+
+def _sortierschluessel_name(name: str) -> str:
+    """Sortierung von Geschwistern wie beim Vergleich von ``Path``-Objekten."""
+    return os.path.normcase(name)
+
+
+def baue_ordnerbaum(quellpfad: Path, gueltige_dateien: list[tuple[Path, int]]) -> OrdnerKnoten:
+    """
+    Baut den Ordnerbaum aus einer flachen Dateiliste (z. B. für gespeicherte Scans).
+    Dateien außerhalb von ``quellpfad`` werden ignoriert.
+    """
+    wurzel = OrdnerKnoten(quellpfad.name, str(quellpfad))
+    knoten_nach_pfad: dict[Path, OrdnerKnoten] = {quellpfad: wurzel}
+
+    for datei, groesse in gueltige_dateien:
+        ordner = datei.parent
+        knoten = knoten_nach_pfad.get(ordner)
+        if knoten is None:
+            fehlend: list[Path] = []
+            vorfahr = ordner
+            while vorfahr not in knoten_nach_pfad:
+                eltern = vorfahr.parent
+                if eltern == vorfahr:
+                    break  # Dateisystemwurzel erreicht → außerhalb von quellpfad
+                fehlend.append(vorfahr)
+                vorfahr = eltern
+            else:
+                knoten = knoten_nach_pfad[vorfahr]
+                for pfad in reversed(fehlend):
+                    knoten = knoten.neues_kind(pfad.name, str(pfad))
+                    knoten_nach_pfad[pfad] = knoten
+            if knoten is None:
+                continue
+        knoten.dateien.append((datei.name, groesse))
+    return wurzel
+
+
+def ordnerbaum_aus_tabelle(quellpfad: Path, tabelle: DateiTabelle) -> OrdnerKnoten:
+    """Baut den Ordnerbaum aus der Dateitabelle eines vollständigen Scans (wie beim Scan)."""
+    wurzel = OrdnerKnoten(quellpfad.name, str(quellpfad))
+    knoten_nach_pfad: dict[str, OrdnerKnoten] = {str(quellpfad): wurzel}
+    for nr, verz in enumerate(tabelle.verzeichnisse):
+        knoten = knoten_nach_pfad.get(verz)
+        if knoten is None:
+            eltern = knoten_nach_pfad[os.path.dirname(verz)]
+            knoten = knoten_nach_pfad[verz] = eltern.neues_kind(os.path.basename(verz), verz)
+        knoten.dateien = tabelle.ausschnitt(bisect.bisect_left(tabelle.verz, nr),
+                                            bisect.bisect_right(tabelle.verz, nr))
+    return wurzel
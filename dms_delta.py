@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Upload-Manifest und Delta
+===================================================
+Nur Neues und Geändertes gegenüber dem letzten Upload packen.
+"""
+
+import bisect
+import os
+import sqlite3
+import sys
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from dms_basis import STANDARD_HASH_WORKER, Fortschritt, _arbeite_parallel
+from dms_daten import DateiAusschnitt, DateiTabelle, OrdnerKnoten
+from dms_duplikate import _voll_hash
+
+
+# ---------------------------------------------------------------------------
+# Upload-Manifest und Delta (nur Neues und Geändertes packen)
+# ---------------------------------------------------------------------------
+
+UPLOADMANIFEST_VERSION = 1
+HASH_LAENGE = 16  # blake2b wie bei der Duplikaterkennung
+
+DELTA_UNVERAENDERT = 0
+DELTA_NEU = 1
+DELTA_GEAENDERT = 2
+
+_UPLOADMANIFEST_SCHEMA = """
+CREATE TABLE meta (
+    schluessel TEXT PRIMARY KEY,
+    wert       TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE verzeichnisse (
+    nr   INTEGER PRIMARY KEY,
+    pfad TEXT NOT NULL              -- relativ zum Quellordner, '' = Quellordner selbst
+);
+CREATE TABLE tabelle (
+    spalte TEXT PRIMARY KEY,
+    daten  BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _relativer_ordner(verz: str, wurzel: str) -> str:
+    """Verzeichnis relativ zum Quellordner (``''`` für den Quellordner selbst)."""
+    if verz == wurzel:
+        return ""
+    return verz[len(os.path.join(wurzel, "")):]
+
+
+class Uploadmanifest:
+    """
+    Stand der gepackten (hochgeladenen) Dateien für spätere Delta-Läufe: Pfad relativ
+    zum Quellordner, Größe, mtime und optional ein Inhaltshash je Datei.
+    """
+
+    def __init__(self, tabelle: DateiTabelle, mtimes: array, hashes: bytes | None = None) -> None:
+        self.tabelle = tabelle
+        self.mtimes = mtimes
+        self.hashes = hashes
+        self.erstellt = ""
+        self.quellpfad = ""
+
+    def __len__(self) -> int:
+        return len(self.tabelle)
+
+    def hash(self, i: int) -> bytes | None:
+        """Inhaltshash der Zeile ``i`` oder ``None``."""
+        if self.hashes is None:
+            return None
+        digest = self.hashes[i * HASH_LAENGE:(i + 1) * HASH_LAENGE]
+        return digest if any(digest) else None
+
+    def bereiche(self) -> dict[str, tuple[int, int]]:
+        """Relatives Verzeichnis → ``(anfang, ende)`` der Zeilen (ein Durchgang)."""
+        bereiche: dict[str, tuple[int, int]] = {}
+        verz = self.tabelle.verz
+        anfang = 0
+        while anfang < len(verz):
+            ende = bisect.bisect_right(verz, verz[anfang], anfang)
+            bereiche[self.tabelle.verzeichnisse[verz[anfang]]] = (anfang, ende)
+            anfang = ende
+        return bereiche
+
+    def speichere_datei(self, pfad: Path, quellpfad: Path) -> None:
+        """Schreibt das Manifest; eine vorhandene Datei wird erst danach ersetzt."""
+        temp = pfad.with_name(pfad.name + ".tmp")
+        temp.unlink(missing_ok=True)
+        spalten = self.tabelle.spalten()
+        spalten["mtimes"] = self.mtimes.tobytes()
+        if self.hashes is not None:
+            spalten["hashes"] = bytes(self.hashes)
+        db = sqlite3.connect(str(temp))
+        try:
+            with db:
+                db.executescript(_UPLOADMANIFEST_SCHEMA)
+                db.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ("version", str(UPLOADMANIFEST_VERSION)),
+                    ("erstellt", datetime.now().isoformat(timespec="seconds")),
+                    ("quellpfad", str(quellpfad)),
+                    ("byteorder", sys.byteorder),
+                ])
+                db.executemany("INSERT INTO verzeichnisse VALUES (?, ?)",
+                               enumerate(self.tabelle.verzeichnisse))
+                db.executemany("INSERT INTO tabelle VALUES (?, ?)", spalten.items())
+        finally:
+            db.close()
+        os.replace(temp, pfad)
+
+    @classmethod
+    def lade_datei(cls, pfad: Path) -> "Uploadmanifest":
+        """Liest ein gespeichertes Manifest; ``ValueError`` bei fremdem Format."""
+        db = sqlite3.connect(f"file:{pfad}?mode=ro", uri=True)
+        try:
+            try:
+                meta = dict(db.execute("SELECT schluessel, wert FROM meta"))
+            except sqlite3.DatabaseError as ex:
+                raise ValueError(f"Kein Upload-Manifest: {pfad} ({ex})") from None
+            if meta.get("version") != str(UPLOADMANIFEST_VERSION) or "quellpfad" not in meta:
+                raise ValueError(f"Upload-Manifest-Version {meta.get('version')} wird nicht "
+                                 f"unterstützt: {pfad}")
+            verzeichnisse = [p for (p,) in db.execute("SELECT pfad FROM verzeichnisse ORDER BY nr")]
+            spalten = dict(db.execute("SELECT spalte, daten FROM tabelle"))
+        finally:
+            db.close()
+        tausche_bytes = meta.get("byteorder") != sys.byteorder
+        mtimes = array("q")
+        mtimes.frombytes(spalten["mtimes"])
+        if tausche_bytes:
+            mtimes.byteswap()
+        manifest = cls(DateiTabelle.aus_spalten(verzeichnisse, spalten, tausche_bytes),
+                       mtimes, spalten.get("hashes"))
+        manifest.erstellt = meta["erstellt"]
+        manifest.quellpfad = meta["quellpfad"]
+        return manifest
+
+
+def _ordner_mtimes(ordner: str, namen: set[str]) -> dict[str, int]:
+    """mtimes der genannten Dateien aus einem Listing des Ordners."""
+    mtimes: dict[str, int] = {}
+    with os.scandir(ordner) as it:
+        for eintrag in it:
+            if eintrag.name in namen:
+                try:
+                    mtimes[eintrag.name] = eintrag.stat().st_mtime_ns
+                except OSError:
+                    pass  # fehlt im Ergebnis und zählt als geändert
+    return mtimes
+
+
+def berechne_delta(
+    quellpfad: Path,
+    tabelle: DateiTabelle,
+    manifest: Uploadmanifest,
+    worker: int = STANDARD_HASH_WORKER,
+    fortschritt: "Fortschritt | None" = None,
+) -> dict:
+    """
+    Vergleicht den Scan Verzeichnis für Verzeichnis mit einem Upload-Manifest.
+
+    Rückgabe: dict mit Schlüsseln:
+        - status: bytearray  (je Zeile: DELTA_UNVERAENDERT/NEU/GEAENDERT)
+        - mtimes: array('q')  (aktuelle mtime geprüfter Zeilen, sonst -1)
+        - hashes: bytearray | None
+        - anzahl_neu, anzahl_geaendert, anzahl_unveraendert, anzahl_entfernt: int
+        - bytes_neu, bytes_geaendert, bytes_unveraendert: int
+        - manifest_erstellt: str
+        - fehler: list[str]
+        - abgebrochen: bool
+    """
+    anzahl = len(tabelle)
+    status = bytearray([DELTA_NEU]) * anzahl
+    mtimes = array("q", [-1]) * anzahl
+    hashes = bytearray(HASH_LAENGE * anzahl) if manifest.hashes is not None else None
+    bereiche = manifest.bereiche()
+    wurzel = str(quellpfad)
+    fehler: list[str] = []
+    gefunden = 0
+
+    def auftraege() -> Iterator[tuple]:
+        nonlocal gefunden
+        alt = manifest.tabelle
+        anfang = 0
+        while anfang < anzahl:
+            verz_nr = tabelle.verz[anfang]
+            ende = bisect.bisect_right(tabelle.verz, verz_nr, anfang)
+            bereich = bereiche.get(_relativer_ordner(tabelle.verzeichnisse[verz_nr], wurzel))
+            if bereich is not None:
+                zeilen = {alt.name(j): j for j in range(*bereich)}
+                kandidaten: dict[str, tuple[int, int]] = {}
+                for i in range(anfang, ende):
+                    name = tabelle.name(i)
+                    j = zeilen.get(name)
+                    if j is None:
+                        continue
+                    gefunden += 1
+                    if alt.groessen[j] != tabelle.groessen[i]:
+                        status[i] = DELTA_GEAENDERT
+                    else:
+                        kandidaten[name] = (i, j)
+                if kandidaten:
+                    yield kandidaten, tabelle.verzeichnisse[verz_nr], kandidaten.keys()
+            anfang = ende
+
+    # Angefasst (andere mtime, gleiche Größe) und Hash bekannt: Inhalt entscheidet
+    nachpruefen: list[tuple[int, int]] = []
+    for (kandidaten, ordner, _), zukunft in _arbeite_parallel(
+            _ordner_mtimes, auftraege(), max(1, worker), fortschritt, "delta"):
+        try:
+            aktuell = zukunft.result()
+        except OSError as ex:
+            fehler.append(f"Delta: {ordner}: {ex}")
+            aktuell = {}
+        for name, (i, j) in kandidaten.items():
+            mtime_ns = aktuell.get(name)
+            if mtime_ns is None:
+                status[i] = DELTA_GEAENDERT
+                continue
+            mtimes[i] = mtime_ns
+            if mtime_ns == manifest.mtimes[j]:
+                status[i] = DELTA_UNVERAENDERT
+                if hashes is not None:
+                    hashes[i * HASH_LAENGE:(i + 1) * HASH_LAENGE] = \
+                        manifest.hashes[j * HASH_LAENGE:(j + 1) * HASH_LAENGE]
+            elif manifest.hash(j) is not None:
+                nachpruefen.append((i, j))
+            else:
+                status[i] = DELTA_GEAENDERT
+
+    auftraege_hash = ((zeilen, tabelle.pfad(zeilen[0]), 0) for zeilen in nachpruefen)
+    for ((i, j), pfad, _), zukunft in _arbeite_parallel(
+            _voll_hash, auftraege_hash, max(1, worker), fortschritt, "delta"):
+        try:
+            digest = zukunft.result()[0]
+        except OSError as ex:
+            fehler.append(f"Delta: {pfad}: {ex}")
+            digest = None
+        if digest is not None and digest == manifest.hash(j):
+            status[i] = DELTA_UNVERAENDERT
+            hashes[i * HASH_LAENGE:(i + 1) * HASH_LAENGE] = digest
+        else:
+            status[i] = DELTA_GEAENDERT
+
+    summen = [0, 0, 0]
+    for groesse, s in zip(tabelle.groessen, status):
+        summen[s] += groesse
+    return {
+        "status": status,
+        "mtimes": mtimes,
+        "hashes": hashes,
+        "anzahl_neu": status.count(DELTA_NEU),
+        "anzahl_geaendert": status.count(DELTA_GEAENDERT),
+        "anzahl_unveraendert": status.count(DELTA_UNVERAENDERT),
+        "anzahl_entfernt": len(manifest) - gefunden,
+        "bytes_neu": summen[DELTA_NEU],
+        "bytes_geaendert": summen[DELTA_GEAENDERT],
+        "bytes_unveraendert": summen[DELTA_UNVERAENDERT],
+        "manifest_erstellt": manifest.erstellt,
+        "fehler": fehler,
+        "abgebrochen": fortschritt is not None and fortschritt.abgebrochen,
+    }
+
+
+def schliesse_unveraenderte_aus(
+    ordnerbaum: "OrdnerKnoten", tabelle: DateiTabelle, delta: dict
+) -> None:
+    """
+    Nimmt die unveränderten Dateien aus dem Ordnerbaum (Delta-Plan).
+    Danach müssen Ordnergrößen und Paketvorschläge neu berechnet werden.
+    """
+    status = delta["status"]
+    knoten_nach_pfad = {k.pfad: k for k in ordnerbaum.knoten_preorder()}
+    anfang = 0
+    while anfang < len(tabelle):
+        verz_nr = tabelle.verz[anfang]
+        ende = bisect.bisect_right(tabelle.verz, verz_nr, anfang)
+        knoten = knoten_nach_pfad.get(tabelle.verzeichnisse[verz_nr])
+        if knoten is not None and DELTA_UNVERAENDERT in status[anfang:ende]:
+            dateien = knoten.dateien
+            if isinstance(dateien, DateiAusschnitt) and dateien.tabelle is tabelle:
+                knoten.dateien = [(tabelle.name(i), tabelle.groessen[i])
+                                  for i in range(dateien.anfang, dateien.ende)
+                                  if status[i] != DELTA_UNVERAENDERT]
+            else:
+                namen = {tabelle.name(i) for i in range(anfang, ende)
+                         if status[i] == DELTA_UNVERAENDERT}
+                knoten.dateien = [(n, g) for n, g in dateien if n not in namen]
+        anfang = ende
+
+
+def erfasse_uploadmanifest(
+    quellpfad: Path,
+    tabelle: DateiTabelle,
+    ordnerbaum: "OrdnerKnoten",
+    paketvorschlaege: list[dict],
+    delta: dict | None = None,
+    mit_hash: bool = False,
+    worker: int = STANDARD_HASH_WORKER,
+    fortschritt: "Fortschritt | None" = None,
+    fehler: list[str] | None = None,
+) -> Uploadmanifest | None:
+    """
+    Upload-Manifest der gepackten Dateien eines Laufs (mit ``delta`` auch der
+    unveränderten aus dem vorigen Manifest); ``None`` nach Abbruch.
+    """
+    # Gepackte Dateien je Ordnerknoten: ganze Unterbäume, alle eigenen Dateien, einzelne
+    alle_eigenen: set[OrdnerKnoten] = set()
+    einzelne: dict[OrdnerKnoten, set[str]] = {}
+    for eintrag in paketvorschlaege:
+        for inhalt in eintrag["inhalte"]:
+            for knoten, dateien in inhalt:
+                if dateien is None:
+                    alle_eigenen.update(knoten.knoten_preorder())
+                elif dateien is knoten.dateien:
+                    alle_eigenen.add(knoten)
+                else:
+                    einzelne.setdefault(knoten, set()).update(n for n, _ in dateien)
+
+    knoten_nach_pfad = {k.pfad: k for k in ordnerbaum.knoten_preorder()}
+    status = delta["status"] if delta is not None else None
+    wurzel = str(quellpfad)
+    neu = DateiTabelle()
+    mtimes = array("q")
+    hashes = bytearray() if mit_hash or (delta is not None and delta["hashes"] is not None) else None
+    leer = bytes(HASH_LAENGE)
+
+    def auftraege() -> Iterator[tuple]:
+        anfang = 0
+        while anfang < len(tabelle):
+            verz_nr = tabelle.verz[anfang]
+            ende = bisect.bisect_right(tabelle.verz, verz_nr, anfang)
+            verz = tabelle.verzeichnisse[verz_nr]
+            knoten = knoten_nach_pfad.get(verz)
+            gepackt: set[str] | None = None  # None = alle Zeilen des Verzeichnisses
+            if knoten in alle_eigenen:
+                dateien = knoten.dateien
+                if not (isinstance(dateien, DateiAusschnitt) and dateien.tabelle is tabelle):
+                    gepackt = {n for n, _ in dateien}
+            else:
+                gepackt = einzelne.get(knoten, set())
+            neu_nr = neu.verzeichnis_nr(_relativer_ordner(verz, wurzel))
+            offen: dict[str, int] = {}
+            for i in range(anfang, ende):
+                name = tabelle.name(i)
+                unveraendert = status is not None and status[i] == DELTA_UNVERAENDERT
+                if not unveraendert and gepackt is not None and name not in gepackt:
+                    continue
+                zeile = len(neu)
+                neu.anhaengen(neu_nr, name, tabelle.groessen[i])
+                mtimes.append(delta["mtimes"][i] if unveraendert else -1)
+                digest = leer
+                if unveraendert and delta["hashes"] is not None:
+                    digest = bytes(delta["hashes"][i * HASH_LAENGE:(i + 1) * HASH_LAENGE])
+                if hashes is not None:
+                    hashes.extend(digest)
+                if not unveraendert:
+                    offen[name] = zeile
+            if offen:
+                yield offen, verz, offen.keys()
+            anfang = ende
+
+    if fehler is None:
+        fehler = []
+    for (offen, verz, _), zukunft in _arbeite_parallel(_ordner_mtimes, auftraege(),
+                                                       max(1, worker), fortschritt, "manifest"):
+        try:
+            aktuell = zukunft.result()
+        except OSError as ex:
+            fehler.append(f"Upload-Manifest: {verz}: {ex}")
+            aktuell = {}
+        for name, zeile in offen.items():
+            if name in aktuell:
+                mtimes[zeile] = aktuell[name]
+            else:
+                fehler.append(f"Upload-Manifest: {os.path.join(verz, name)}: nicht lesbar")
+
+    if mit_hash:
+        # Gepackte und unveränderte Dateien ohne bekannten Hash lesen
+        auftraege_hash = ((zeile, os.path.join(wurzel, neu.pfad(zeile)), 0) for zeile in range(len(neu))
+                          if mtimes[zeile] >= 0
+                          and hashes[zeile * HASH_LAENGE:(zeile + 1) * HASH_LAENGE] == leer)
+        for (zeile, pfad, _), zukunft in _arbeite_parallel(_voll_hash, auftraege_hash,
+                                                           max(1, worker), fortschritt, "manifest"):
+            try:
+                hashes[zeile * HASH_LAENGE:(zeile + 1) * HASH_LAENGE] = zukunft.result()[0]
+            except OSError as ex:
+                fehler.append(f"Upload-Manifest: {pfad}: {ex}")
+                mtimes[zeile] = -1
+    if fortschritt is not None and fortschritt.abgebrochen:
+        return None
+    return Uploadmanifest(neu, mtimes, hashes)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Duplikaterkennung
+===========================================
+Inhaltsgleiche Dateien finden und aus dem Ordnerbaum nehmen.
+"""
+
+import hashlib
+import os
+from typing import Callable, Iterator
+
+from dms_basis import DUPLIKAT_BLOCK, STANDARD_HASH_WORKER, Fortschritt, _arbeite_parallel
+from dms_daten import DateiAusschnitt, DateiTabelle, OrdnerKnoten
+
+
+# ---------------------------------------------------------------------------
+# Duplikaterkennung
+# ---------------------------------------------------------------------------
+
+def _teil_hash(pfad: str, groesse: int) -> tuple[bytes, bool]:
+    """Hash über Anfangs- und Endblock; ``(digest, vollstaendig)``."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(pfad, "rb") as f:
+        if groesse <= 2 * DUPLIKAT_BLOCK:
+            h.update(f.read())
+            return h.digest(), True
+        h.update(f.read(DUPLIKAT_BLOCK))
+        f.seek(-DUPLIKAT_BLOCK, os.SEEK_END)
+        h.update(f.read(DUPLIKAT_BLOCK))
+    return h.digest(), False
+
+
+def _voll_hash(pfad: str, groesse: int) -> tuple[bytes, bool]:
+    h = hashlib.blake2b(digest_size=16)
+    puffer = bytearray(1024 * 1024)
+    ansicht = memoryview(puffer)
+    with open(pfad, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(puffer)
+            if not n:
+                break
+            h.update(ansicht[:n])  # hashlib gibt das GIL bei großen Puffern frei
+    return h.digest(), True
+
+
+def _hashe_parallel(
+    hashfunktion: Callable[[str, int], tuple[bytes, bool]],
+    auftraege: list[tuple[int, str, int]],
+    worker: int,
+    fortschritt: "Fortschritt | None",
+    fehler: list[str],
+) -> Iterator[tuple[int, bytes, bool]]:
+    """Hasht ``(index, pfad, groesse)``-Aufträge; nicht lesbare Dateien landen in ``fehler``."""
+    for (index, pfad, _), zukunft in _arbeite_parallel(hashfunktion, auftraege, worker,
+                                                        fortschritt, "hash"):
+        try:
+            digest, vollstaendig = zukunft.result()
+        except OSError as ex:
+            fehler.append(f"Duplikatprüfung: {pfad}: {ex}")
+            continue
+        yield index, digest, vollstaendig
+
+
+def finde_duplikate(
+    tabelle: DateiTabelle,
+    worker: int = STANDARD_HASH_WORKER,
+    fortschritt: "Fortschritt | None" = None,
+) -> dict:
+    """
+    Findet inhaltsgleiche Dateien: nach Größe, dann Teil-Hash, dann Voll-Hash.
+
+    Rückgabe: dict mit Schlüsseln:
+        - gruppen: list[{"groesse": int, "dateien": [Original, Duplikat, ...]}]
+        - duplikat_indizes: list[int]  (Zeilen der Tabelle, ohne Originale)
+        - anzahl_duplikate, bytes_gespart, kandidaten, bytes_gelesen: int
+        - fehler: list[str]
+        - abgebrochen: bool
+        - ausgeschlossen: bool
+    """
+    fehler: list[str] = []
+    worker = max(1, worker)
+
+    nach_groesse: dict[int, list[int]] = {}
+    for i, groesse in enumerate(tabelle.groessen):
+        if groesse > 0:
+            nach_groesse.setdefault(groesse, []).append(i)
+    kandidaten = [(i, tabelle.pfad(i), g) for g, indizes in nach_groesse.items()
+                  if len(indizes) > 1 for i in indizes]
+    bytes_gelesen = 0
+
+    # Stufe 2: Teil-Hash
+    nach_teilhash: dict[tuple[int, bytes], list[int]] = {}
+    vollstaendig_gelesen: set[int] = set()
+    for i, digest, vollstaendig in _hashe_parallel(_teil_hash, kandidaten, worker,
+                                                   fortschritt, fehler):
+        groesse = tabelle.groessen[i]
+        bytes_gelesen += min(groesse, 2 * DUPLIKAT_BLOCK)
+        nach_teilhash.setdefault((groesse, digest), []).append(i)
+        if vollstaendig:
+            vollstaendig_gelesen.add(i)
+
+    # Stufe 3: Voll-Hash nur bei gleichem Teil-Hash (kleine Dateien sind schon fertig)
+    nach_inhalt: dict[tuple[int, bytes], list[int]] = {}
+    voll_auftraege: list[tuple[int, str, int]] = []
+    for (groesse, digest), indizes in nach_teilhash.items():
+        if len(indizes) < 2:
+            continue
+        if indizes[0] in vollstaendig_gelesen:
+            nach_inhalt[(groesse, digest)] = indizes
+        else:
+            voll_auftraege.extend((i, tabelle.pfad(i), groesse) for i in indizes)
+    for i, digest, _ in _hashe_parallel(_voll_hash, voll_auftraege, worker, fortschritt, fehler):
+        groesse = tabelle.groessen[i]
+        bytes_gelesen += groesse
+        nach_inhalt.setdefault((groesse, digest), []).append(i)
+
+    abgebrochen = fortschritt is not None and fortschritt.abgebrochen
+    gruppen: list[dict] = []
+    duplikat_indizes: list[int] = []
+    bytes_gespart = 0
+    if not abgebrochen:
+        for (groesse, _), indizes in nach_inhalt.items():
+            if len(indizes) < 2:
+                continue
+            indizes.sort(key=tabelle.pfad)  # Original = alphabetisch erster Pfad
+            gruppen.append({"groesse": groesse, "dateien": [tabelle.pfad(i) for i in indizes]})
+            duplikat_indizes.extend(indizes[1:])
+            bytes_gespart += groesse * (len(indizes) - 1)
+        gruppen.sort(key=lambda g: g["dateien"][0])
+        duplikat_indizes.sort()
+
+    return {
+        "gruppen": gruppen,
+        "duplikat_indizes": duplikat_indizes,
+        "anzahl_duplikate": len(duplikat_indizes),
+        "bytes_gespart": bytes_gespart,
+        "kandidaten": len(kandidaten),
+        "bytes_gelesen": bytes_gelesen,
+        "fehler": fehler,
+        "abgebrochen": abgebrochen,
+        "ausgeschlossen": False,
+    }
+
+
+def schliesse_duplikate_aus(
+    ordnerbaum: "OrdnerKnoten", tabelle: DateiTabelle, duplikate: dict
+) -> None:
+    """
+    Nimmt die Duplikate aus dem Ordnerbaum (die Originale bleiben).
+    Danach müssen Ordnergrößen und Paketvorschläge neu berechnet werden.
+    """
+    weg_nach_verz: dict[int, set[int]] = {}
+    for i in duplikate["duplikat_indizes"]:
+        weg_nach_verz.setdefault(tabelle.verz[i], set()).add(i)
+    if not weg_nach_verz:
+        duplikate["ausgeschlossen"] = True
+        return
+
+    knoten_nach_pfad = {k.pfad: k for k in ordnerbaum.knoten_preorder()}
+    for verz_nr, weg in weg_nach_verz.items():
+        knoten = knoten_nach_pfad.get(tabelle.verzeichnisse[verz_nr])
+        if knoten is None:
+            continue
+        dateien = knoten.dateien
+        if isinstance(dateien, DateiAusschnitt) and dateien.tabelle is tabelle:
+            knoten.dateien = [(tabelle.name(i), tabelle.groessen[i])
+                              for i in range(dateien.anfang, dateien.ende) if i not in weg]
+        else:
+            namen = {tabelle.name(i) for i in weg}
+            knoten.dateien = [(n, g) for n, g in dateien if n not in namen]
+    duplikate["ausgeschlossen"] = True
@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Verschieben
+=====================================
+Logfile, Verschieber und Verschiebejournal (Wiederaufnahme nach Absturz).
+"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from dms_basis import (
+    STANDARD_VERSCHIEBE_WORKER,
+    Fortschritt,
+    Laufstatistik,
+    _normpfad,
+    _quellwurzelname,
+    messe_stufe,
+)
+from dms_daten import DateiTabelle, ordnerbaum_aus_tabelle
+from dms_regeln import normalisiere_regel, verschiebegrund
+
+
+# ---------------------------------------------------------------------------
+# Verschiebejournal (Wiederaufnahme nach Absturz)
+# ---------------------------------------------------------------------------
+
+VERSCHIEBEJOURNAL_VERSION = 1
+
+_JOURNAL_SCHEMA = """
+CREATE TABLE meta (
+    schluessel TEXT PRIMARY KEY,
+    wert       TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE verzeichnisse (
+    nr   INTEGER PRIMARY KEY,   -- Nummer in der Dateitabelle (Tiefensuche)
+    pfad TEXT NOT NULL
+);
+CREATE TABLE tabelle (
+    spalte TEXT PRIMARY KEY,
+    daten  BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE eintraege (
+    nr      INTEGER PRIMARY KEY,    -- Reihenfolge im Logfile
+    quelle  TEXT NOT NULL,
+    ziel    TEXT NOT NULL,
+    endung  TEXT NOT NULL,           -- getroffene Regel (siehe Dateiregeln)
+    groesse INTEGER NOT NULL,
+    aktion  TEXT,                   -- NULL: geplant, sonst Aktion der Logzeile
+    grund   TEXT,
+    zeit    TEXT
+);
+"""
+
+
+def journal_pfad(quellpfad: Path, zielbasis: Path, log_zusatz: str = "") -> Path:
+    """
+    Ort des Verschiebejournals eines Quellordners (in der Zielbasis, neben dem
+    Logfile). Der Name enthält neben dem Ordnernamen einen Hash des vollen
+    Quellpfads: ``U:\\FB51\\Akten`` und ``V:\\Akten`` teilen sich kein Journal.
+    """
+    zusatz = f"_{log_zusatz}" if log_zusatz else ""
+    kennung = hashlib.sha256(_normpfad(quellpfad.resolve()).encode("utf-8")).hexdigest()[:12]
+    name = f"{_quellwurzelname(quellpfad)}_{kennung}{zusatz}"
+    return zielbasis / f"Verschiebejournal_{name}.sqlite3"
+
+
+class Verschiebejournal:
+    """
+    Write-ahead-Journal der Verschiebungen eines echten Laufs, blockweise festgeschrieben.
+    Nach regulärem Ende gelöscht; ein liegengebliebenes Journal setzt
+    ``setze_verschiebungen_fort`` ohne neuen Scan fort.
+    """
+
+    def __init__(self, pfad: Path, block_zeilen: int = 500, sicher_intervall: float = 2.0) -> None:
+        self.pfad = pfad
+        self.block_zeilen = block_zeilen
+        self.sicher_intervall = sicher_intervall
+        self.fehler: str | None = None
+        # Nur für ein mit ``lade()`` gelesenes Journal
+        self.quellpfad: Path | None = None
+        self.zielbasis: Path | None = None
+        self.ungueltige_endungen: set[str] = set()
+        self.logdatei: Path | None = None
+        self.begonnen = ""
+        self.anzahl_ungueltig = 0
+        self.anzahl_offen = 0
+        self.anzahl_eintraege = 0
+        self.scan_fehler: list[str] = []
+        self.gueltige_dateien: "DateiTabelle | None" = None
+        self._db: sqlite3.Connection | None = None
+        self._erledigt: list[tuple[str, str, str, int]] = []
+        self._letzte_sicherung = time.monotonic()
+
+    @property
+    def geladen(self) -> bool:
+        """``True`` für ein unterbrochenes, mit ``lade()`` gelesenes Journal."""
+        return self.quellpfad is not None
+
+    def _verbinde(self) -> None:
+        self._db = sqlite3.connect(str(self.pfad))
+        self._db.execute("PRAGMA synchronous = FULL")
+        self._letzte_sicherung = time.monotonic()
+
+    def beginne(
+        self,
+        quellpfad: Path,
+        zielbasis: Path,
+        ungueltige_endungen: set[str],
+        logdatei: Path,
+        gueltige_dateien: "DateiTabelle",
+        anzahl_ungueltig: int,
+        scan_fehler: list[str],
+        protokolliert: list[tuple[str, str, str, int, str]],
+        verschiebungen: list[tuple[str, str, str, int]],
+    ) -> None:
+        """
+        Legt das Journal an. ``protokolliert`` sind bereits geschriebene
+        Logzeilen ``(aktion, grund, pfad, groesse, zeit)``, ``verschiebungen``
+        die geplanten ``(quelle, ziel, endung, groesse)``.
+        """
+        self.pfad.parent.mkdir(parents=True, exist_ok=True)
+        self.pfad.unlink(missing_ok=True)
+        self._verbinde()
+        with self._db:
+            self._db.executescript(_JOURNAL_SCHEMA)
+        with self._db:
+            self._db.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("version", str(VERSCHIEBEJOURNAL_VERSION)),
+                ("begonnen", datetime.now().isoformat(timespec="seconds")),
+                ("quellpfad", str(quellpfad)),
+                ("zielbasis", str(zielbasis)),
+                ("ungueltige_endungen", json.dumps(sorted(ungueltige_endungen))),
+                ("logdatei", str(logdatei)),
+                ("anzahl_ungueltig", str(anzahl_ungueltig)),
+                ("scan_fehler", json.dumps(scan_fehler, ensure_ascii=False)),
+                ("byteorder", sys.byteorder),
+            ])
+            self._db.executemany("INSERT INTO verzeichnisse VALUES (?, ?)",
+                                 enumerate(gueltige_dateien.verzeichnisse))
+            self._db.executemany("INSERT INTO tabelle VALUES (?, ?)",
+                                 gueltige_dateien.spalten().items())
+            self._db.executemany(
+                "INSERT INTO eintraege (quelle, ziel, endung, groesse, aktion, grund, zeit) "
+                "VALUES (?, ?, '', ?, ?, ?, ?)",
+                ((pfad, "-", groesse, aktion, grund, zeit)
+                 for aktion, grund, pfad, groesse, zeit in protokolliert))
+            self._db.executemany(
+                "INSERT INTO eintraege (quelle, ziel, endung, groesse) VALUES (?, ?, ?, ?)",
+                verschiebungen)
+
+    @classmethod
+    def lade(cls, pfad: Path) -> "Verschiebejournal | None":
+        """
+        Liest ein liegengebliebenes Journal; ``None``, wenn keines existiert.
+        ``ValueError`` bei fremdem Format.
+        """
+        if not pfad.is_file():
+            return None
+        journal = cls(pfad)
+        db = sqlite3.connect(str(pfad))  # nicht read-only: bricht halbe Transaktionen ab
+        try:
+            try:
+                meta = dict(db.execute("SELECT schluessel, wert FROM meta"))
+            except sqlite3.DatabaseError as ex:
+                raise ValueError(f"Kein Verschiebejournal: {pfad} ({ex})") from None
+            if not meta:
+                # Beim Anlegen unterbrochen – bis dahin wurde nichts verschoben
+                db.close()
+                pfad.unlink(missing_ok=True)
+                return None
+            if meta.get("version") != str(VERSCHIEBEJOURNAL_VERSION):
+                raise ValueError(f"Verschiebejournal-Version {meta.get('version')} wird nicht "
+                                 f"unterstützt: {pfad}")
+            journal.quellpfad = Path(meta["quellpfad"])
+            journal.zielbasis = Path(meta["zielbasis"])
+            journal.ungueltige_endungen = set(json.loads(meta["ungueltige_endungen"]))
+            journal.logdatei = Path(meta["logdatei"])
+            journal.begonnen = meta["begonnen"]
+            journal.anzahl_ungueltig = int(meta["anzahl_ungueltig"])
+            journal.scan_fehler = json.loads(meta["scan_fehler"])
+            journal.gueltige_dateien = DateiTabelle.aus_spalten(
+                [p for (p,) in db.execute("SELECT pfad FROM verzeichnisse ORDER BY nr")],
+                dict(db.execute("SELECT spalte, daten FROM tabelle")),
+                tausche_bytes=meta.get("byteorder") != sys.byteorder)
+            journal.anzahl_eintraege, journal.anzahl_offen = db.execute(
+                "SELECT COUNT(*), COUNT(*) - COUNT(aktion) FROM eintraege").fetchone()
+        finally:
+            db.close()
+        return journal
+
+    def abweichung(self, quellpfad: Path, ungueltige_endungen: set[str]) -> str | None:
+        """
+        Warum ein geladenes Journal nicht zu einem Aufruf mit ``quellpfad`` und
+        ``ungueltige_endungen`` passt; ``None``, wenn es fortgesetzt werden kann.
+        """
+        if _normpfad(self.quellpfad.resolve()) != _normpfad(quellpfad.resolve()):
+            return f"anderer Quellordner ({self.quellpfad})"
+        bisher = {normalisiere_regel(r) for r in self.ungueltige_endungen} - {""}
+        jetzt = {normalisiere_regel(r) for r in ungueltige_endungen} - {""}
+        if bisher != jetzt:
+            teile = []
+            if bisher - jetzt:
+                teile.append(f"fehlend: {', '.join(sorted(bisher - jetzt))}")
+            if jetzt - bisher:
+                teile.append(f"neu: {', '.join(sorted(jetzt - bisher))}")
+            return f"andere Regeln ({'; '.join(teile)})"
+        return None
+
+    def oeffne(self) -> None:
+        """Öffnet ein geladenes Journal zum Fortsetzen."""
+        self._verbinde()
+
+    def protokollierte(self) -> list[tuple[str, str, str, str, int, str]]:
+        """Bereits erledigte Einträge als ``(aktion, grund, quelle, ziel, groesse, zeit)``."""
+        return self._db.execute(
+            "SELECT aktion, grund, quelle, CASE aktion WHEN 'verschoben' THEN ziel ELSE '-' END, "
+            "groesse, zeit FROM eintraege WHERE aktion IS NOT NULL ORDER BY nr").fetchall()
+
+    def offene(self) -> list[tuple[int, str, str, str, int]]:
+        """Noch offene Verschiebungen als ``(nr, quelle, ziel, endung, groesse)``."""
+        return self._db.execute(
+            "SELECT nr, quelle, ziel, endung, groesse FROM eintraege "
+            "WHERE aktion IS NULL ORDER BY nr").fetchall()
+
+    def erledigt(self, nr: int, aktion: str, grund: str, zeit: str) -> None:
+        """Trägt das Ergebnis einer Verschiebung ein (blockweise festgeschrieben)."""
+        self._erledigt.append((aktion, grund, zeit, nr))
+        if (len(self._erledigt) >= self.block_zeilen
+                or time.monotonic() - self._letzte_sicherung >= self.sicher_intervall):
+            self.sichere()
+
+    def sichere(self) -> None:
+        """Schreibt die gesammelten Ergebnisse fest (eine Transaktion, ein fsync)."""
+        self._letzte_sicherung = time.monotonic()
+        if self._db is None or not self._erledigt:
+            return
+        try:
+            with self._db:
+                self._db.executemany(
+                    "UPDATE eintraege SET aktion = ?, grund = ?, zeit = ? WHERE nr = ?",
+                    self._erledigt)
+        except sqlite3.Error as ex:
+            # Ohne Journal geht es weiter wie bisher; das Logfile bleibt maßgeblich
+            self.fehler = f"Verschiebejournal konnte nicht geschrieben werden: {ex}"
+            self._schliesse_db()
+        self._erledigt.clear()
+
+    def schliesse(self) -> None:
+        self.sichere()
+        self._schliesse_db()
+
+    def _schliesse_db(self) -> None:
+        if self._db is not None:
+            try:
+                self._db.close()
+            except sqlite3.Error:
+                pass
+            self._db = None
+
+    def entferne(self) -> None:
+        """Löscht das Journal nach einem regulär beendeten Lauf."""
+        self._schliesse_db()
+        try:
+            self.pfad.unlink(missing_ok=True)
+        except OSError as ex:
+            self.fehler = f"Verschiebejournal konnte nicht gelöscht werden: {ex}"
+
+
+def oeffne_journal(quellpfad: Path, zielbasis: Path, log_zusatz: str = "") -> Verschiebejournal:
+    """
+    Journal für einen echten Lauf: das liegengebliebene eines unterbrochenen
+    Laufs (``geladen``, wird fortgesetzt) oder ein neues.
+    """
+    pfad = journal_pfad(quellpfad, zielbasis, log_zusatz)
+    return Verschiebejournal.lade(pfad) or Verschiebejournal(pfad)
+
+# ---------------------------------------------------------------------------
+# Logfile und Verschieber
+# ---------------------------------------------------------------------------
+
+class LogSchreiber:
+    """Schreibt das CSV-Logfile laufend, spätestens alle ``flush_intervall`` Sekunden."""
+
+    KOPFZEILE = "DatumZeit;Aktion;Grund;OriginalPfad;NeuerPfad;DateigroesseBytes"
+
+    def __init__(self, pfad: Path, block_zeilen: int = 500, flush_intervall: float = 2.0) -> None:
+        self.pfad = pfad
+        self.block_zeilen = block_zeilen
+        self.flush_intervall = flush_intervall
+        self.fehler: str | None = None
+        self._datei = None
+        self._puffer: list[str] = []
+        self._sperre = threading.Lock()
+        self._ende = threading.Event()
+        self._flusher: threading.Thread | None = None
+        self._sekunde = -1
+        self._zeitstempel = ""
+
+    def oeffne(self) -> bool:
+        """Legt den Ordner an und schreibt die Kopfzeile; ``False`` bei Fehler (siehe ``fehler``)."""
+        try:
+            self.pfad.parent.mkdir(parents=True, exist_ok=True)
+            self._datei = open(self.pfad, "w", encoding="utf-8")
+            self._datei.write(self.KOPFZEILE + "\n")
+            self._datei.flush()
+        except OSError as ex:
+            self.fehler = f"Logfile konnte nicht geschrieben werden: {ex}"
+            self._datei = None
+            return False
+        if self.flush_intervall > 0:
+            self._ende.clear()
+            self._flusher = threading.Thread(target=self._flush_schleife, name="log-flush",
+                                             daemon=True)
+            self._flusher.start()
+        return True
+
+    def _flush_schleife(self) -> None:
+        while not self._ende.wait(self.flush_intervall):
+            with self._sperre:
+                if self._puffer:
+                    self._flush()
+
+    def zeitstempel(self) -> str:
+        sekunde = int(time.time())
+        if sekunde != self._sekunde:
+            self._sekunde = sekunde
+            self._zeitstempel = datetime.fromtimestamp(sekunde).strftime("%Y-%m-%d %H:%M:%S")
+        return self._zeitstempel
+
+    def schreibe(self, aktion: str, grund: str, original: object, neu: object, groesse: int,
+                 zeit: str | None = None) -> None:
+        if self._datei is None:
+            return
+        zeit = zeit or self.zeitstempel()
+        zeile = f"{zeit};{aktion};{grund};{original};{neu};{groesse}\n"
+        with self._sperre:
+            self._puffer.append(zeile)
+            if len(self._puffer) >= self.block_zeilen:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._sperre:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._datei is None:
+            return
+        try:
+            if self._puffer:
+                self._datei.write("".join(self._puffer))
+                self._puffer.clear()
+            self._datei.flush()
+        except OSError as ex:
+            self.fehler = f"Logfile konnte nicht geschrieben werden: {ex}"
+            self._schliesse_datei()
+
+    def schliesse(self) -> None:
+        self._ende.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self._flusher = None
+        with self._sperre:
+            self._flush()
+            self._schliesse_datei()
+
+    def _schliesse_datei(self) -> None:
+        if self._datei is not None:
+            try:
+                self._datei.close()
+            except OSError as ex:
+                self.fehler = f"Logfile konnte nicht geschrieben werden: {ex}"
+            self._datei = None
+            self._puffer.clear()
+
+
+class Verschieber:
+    """
+    Verschiebt ungültige Dateien in die Zielbasis: per ``os.replace`` auf demselben Gerät,
+    sonst kopieren und löschen in ``worker`` Threads.
+    """
+
+    def __init__(
+        self,
+        zielbasis: Path,
+        log: LogSchreiber,
+        fehler: list[str],
+        worker: int = STANDARD_VERSCHIEBE_WORKER,
+        laufstatistik: "Laufstatistik | None" = None,
+        journal: Verschiebejournal | None = None,
+    ) -> None:
+        self.zielbasis = zielbasis
+        self.log = log
+        self.fehler = fehler
+        self.worker = max(1, worker)
+        self.laufstatistik = laufstatistik
+        self.journal = journal
+        self._angelegt: set[str] = set()
+        self._geraet_quelle: dict[str, int | None] = {}
+        self._geraet_ziel: int | None = None
+        self._pool: ThreadPoolExecutor | None = None
+        # Offene Aufträge in Reihenfolge: (Future | None, datei, zielpfad, endung, groesse, fehler, nr)
+        self._offen: deque = deque()
+        self.anzahl_umbenannt = 0
+        self.anzahl_kopiert = 0
+
+    def _geraet(self, pfad: str) -> int | None:
+        if self.laufstatistik is not None:
+            self.laufstatistik.zaehle_stat(1)
+        try:
+            return os.stat(pfad).st_dev
+        except OSError:
+            return None
+
+    def _gleiches_geraet(self, quellordner: str) -> bool:
+        if self._geraet_ziel is None:
+            self._geraet_ziel = self._geraet(str(self.zielbasis))
+        geraet = self._geraet_quelle.get(quellordner, -1)
+        if geraet == -1:
+            geraet = self._geraet_quelle[quellordner] = self._geraet(quellordner)
+        return geraet is not None and geraet == self._geraet_ziel
+
+    def _lege_ordner_an(self, ordner: str) -> None:
+        if ordner not in self._angelegt:
+            os.makedirs(ordner, exist_ok=True)
+            self._angelegt.add(ordner)
+
+    def verschiebe(self, quellordner: str, datei: Path, zielpfad: Path, endung: str, groesse: int,
+                   nr: int = -1) -> None:
+        """Plant eine Verschiebung ein (synchron per rename oder im Pool)."""
+        quelle, ziel = str(datei), str(zielpfad)
+        try:
+            self._lege_ordner_an(os.path.dirname(ziel))
+            umbenannt = False
+            if self._gleiches_geraet(quellordner):
+                try:
+                    os.replace(quelle, ziel)
+                    umbenannt = True
+                except OSError as ex:
+                    if ex.errno != errno.EXDEV:
+                        raise
+                    # Gleiches st_dev, aber doch kein rename (Bind-/Overlay-/SMB-Mounts):
+                    # dieser Ordner wird ab jetzt kopiert
+                    self._geraet_quelle[quellordner] = None
+            if umbenannt:
+                self.anzahl_umbenannt += 1
+                self._offen.append((None, datei, zielpfad, endung, groesse, None, nr))
+            else:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.worker,
+                                                    thread_name_prefix="verschieben")
+                zukunft = self._pool.submit(shutil.move, quelle, ziel)
+                self._offen.append((zukunft, datei, zielpfad, endung, groesse, None, nr))
+        except Exception as ex:
+            self._offen.append((None, datei, zielpfad, endung, groesse, ex, nr))
+        self._protokolliere(warten=len(self._offen) > 4 * self.worker)
+
+    def _protokolliere(self, warten: bool = False) -> None:
+        """Schreibt erledigte Aufträge vom Anfang der Warteschlange ins Log."""
+        while self._offen:
+            zukunft, datei, zielpfad, endung, groesse, ex, nr = self._offen[0]
+            if zukunft is not None:
+                if not warten and not zukunft.done():
+                    return
+                try:
+                    zukunft.result()
+                    self.anzahl_kopiert += 1
+                except Exception as fehler_ex:
+                    ex = fehler_ex
+            self._offen.popleft()
+            warten = False
+            zeit = self.log.zeitstempel()
+            if ex is None:
+                aktion, grund = "verschoben", verschiebegrund(endung)
+                self.log.schreibe(aktion, grund, datei, zielpfad, groesse, zeit)
+                if self.laufstatistik is not None:
+                    self.laufstatistik.datei_verschoben(groesse)
+            else:
+                aktion, grund = "fehler", str(ex)
+                self.fehler.append(f"{datei}: {ex}")
+                self.log.schreibe(aktion, grund, datei, "-", groesse, zeit)
+            if self.journal is not None:
+                self.journal.erledigt(nr, aktion, grund, zeit)
+
+    def warte(self) -> None:
+        """Wartet auf alle laufenden Verschiebungen und protokolliert sie."""
+        while self._offen:
+            self._protokolliere(warten=True)
+
+    def schliesse(self) -> None:
+        """Wie ``warte()``, beendet zusätzlich den Thread-Pool."""
+        self.warte()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+# ---------------------------------------------------------------------------
+# Fortsetzen aus dem Journal
+# ---------------------------------------------------------------------------
+
+def _verschiebe_aus_journal(
+    journal: Verschiebejournal,
+    verschieber: Verschieber,
+    fortschritt: Fortschritt | None,
+    pruefen: bool = False,
+) -> bool:
+    """
+    Führt die offenen Verschiebungen des Journals aus; ``True`` bei Abbruch.
+    ``pruefen``: nicht festgeschriebene Ergebnisse am Dateisystem erkennen (Fortsetzen).
+    """
+    offene = journal.offene()
+    for i, (nr, quelle, ziel, endung, groesse) in enumerate(offene):
+        if fortschritt is not None:
+            if fortschritt.abgebrochen:
+                return True
+            if not i % 256:
+                fortschritt.setze_phase(
+                    f"Verschiebe nicht uploadfähige Dateien… {i:,} von {len(offene):,}")
+        if pruefen and not os.path.lexists(quelle):
+            verschieber.warte()  # Logzeilen in Journal-Reihenfolge
+            zeit = verschieber.log.zeitstempel()
+            if os.path.lexists(ziel):
+                aktion, grund, neu = "verschoben", verschiebegrund(endung), ziel
+            else:
+                aktion, grund, neu = "uebersprungen", "nicht_mehr_vorhanden", "-"
+            verschieber.log.schreibe(aktion, grund, quelle, neu, groesse, zeit)
+            journal.erledigt(nr, aktion, grund, zeit)
+            continue
+        verschieber.verschiebe(os.path.dirname(quelle), Path(quelle), Path(ziel), endung, groesse,
+                               nr)
+    return False
+
+
+def setze_verschiebungen_fort(
+    journal: Verschiebejournal,
+    fortschritt: Fortschritt | None = None,
+    verschiebe_worker: int = STANDARD_VERSCHIEBE_WORKER,
+    laufstatistik: Laufstatistik | None = None,
+) -> dict:
+    """
+    Setzt einen unterbrochenen echten Lauf aus seinem Journal fort, ohne neuen Scan.
+    Rückgabe wie ``scanne_quellordner``, zusätzlich ``fortgesetzt``.
+    """
+    logdatei = journal.logdatei
+    fehler = list(journal.scan_fehler)
+    log = LogSchreiber(logdatei)
+    log.oeffne()
+    verschieber = Verschieber(journal.zielbasis, log, fehler, verschiebe_worker, laufstatistik,
+                              journal)
+    journal.oeffne()
+    try:
+        for aktion, grund, quelle, ziel, groesse, zeit in journal.protokollierte():
+            log.schreibe(aktion, grund, quelle, ziel, groesse, zeit)
+            if aktion == "fehler":
+                fehler.append(f"{quelle}: {grund}")
+        with messe_stufe(laufstatistik, "verschieben"):
+            abgebrochen = _verschiebe_aus_journal(journal, verschieber, fortschritt, pruefen=True)
+    finally:
+        with messe_stufe(laufstatistik, "verschieben"):
+            verschieber.schliesse()
+        journal.schliesse()
+        log.schliesse()
+
+    journal.entferne()
+    if journal.fehler:
+        fehler.append(journal.fehler)
+    if log.fehler:
+        fehler.append(log.fehler)
+        logdatei = None
+
+    return {
+        "gueltige_dateien": journal.gueltige_dateien,
+        "anzahl_ungueltig": journal.anzahl_ungueltig,
+        "logdatei": logdatei,
+        "fehler": fehler,
+        "index_statistik": None,
+        "plan_statistik": None,
+        "fortgesetzt": {"begonnen": journal.begonnen,
+                        "verschiebungen_offen": journal.anzahl_offen},
+        "ordnerbaum": ordnerbaum_aus_tabelle(journal.quellpfad, journal.gueltige_dateien),
+        "abgebrochen": abgebrochen,
+    }
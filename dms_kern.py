@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Kernfunktionen
+========================================
+Scan, Verschieben, Paketbildung und Ausgabe ohne GUI-Abhängigkeit.
+Wird von der Tkinter-Oberfläche (``main.py``) und der Kommandozeile
+(``dms_cli.py``) gemeinsam genutzt; importiert bewusst kein tkinter.
+
+Die Stufen liegen in eigenen Modulen (``dms_scan``, ``dms_journal``,
+``dms_planung``, ``dms_pakete``, ``dms_upload`` usw.); hier stehen der
+Analyse-Ablauf und der Ausgabetext, und ``from dms_kern import …`` liefert
+weiterhin die öffentlichen Namen aller Stufen.
+
+Nur Python-Standardbibliothek – keine externen Abhängigkeiten.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Callable
+
+from dms_basis import (  # noqa: F401
+    DEFAULT_UNGUELTIGE_ENDUNGEN,
+    DUPLIKAT_BLOCK,
+    INDEX_DATEINAME,
+    INHALT_KOPF,
+    INHALT_PRAEFIX,
+    INHALT_SIGNATUREN,
+    KONFIG_DATEINAME,
+    MAX_PAKET_GROESSE,
+    MAX_SCAN_WORKER,
+    OPTIMAL_MAX_EINHEITEN,
+    OPTIMAL_MAX_SUCHKNOTEN,
+    PACKSTRATEGIEN,
+    STANDARD_HASH_WORKER,
+    STANDARD_PACKSTRATEGIE,
+    STANDARD_SCAN_WORKER,
+    STANDARD_UPLOAD_RATE,
+    STANDARD_UPLOAD_VERBINDUNGEN,
+    STANDARD_UPLOAD_VERSUCHE,
+    STANDARD_VERSCHIEBE_WORKER,
+    STANDARD_ZIELORDNER_NAME,
+    STANDARD_ZIP_SICHERHEIT,
+    UPLOAD_BLOCK,
+    UPLOADMANIFEST_DATEINAME,
+    VERBOTENE_PFADE,
+    ZIP_EINTRAG_KOPF,
+    ZIP_ENDE,
+    ZIP_PROBE_BLOCK,
+    ZIP_PROBE_BLOECKE,
+    ZIP_STUFE,
+    Einheit,
+    Fortschritt,
+    Laufstatistik,
+    formatiere_groesse,
+    ist_verbotener_pfad,
+    messe_stufe,
+    programmverzeichnis,
+)
+from dms_daten import (  # noqa: F401
+    DateiAusschnitt,
+    DateiTabelle,
+    OrdnerKnoten,
+    baue_ordnerbaum,
+    ordnerbaum_aus_tabelle,
+)
+from dms_delta import (  # noqa: F401
+    DELTA_GEAENDERT,
+    DELTA_NEU,
+    DELTA_UNVERAENDERT,
+    HASH_LAENGE,
+    UPLOADMANIFEST_VERSION,
+    Uploadmanifest,
+    berechne_delta,
+    erfasse_uploadmanifest,
+    schliesse_unveraenderte_aus,
+)
+from dms_duplikate import (  # noqa: F401
+    finde_duplikate,
+    schliesse_duplikate_aus,
+)
+from dms_journal import (  # noqa: F401
+    VERSCHIEBEJOURNAL_VERSION,
+    LogSchreiber,
+    Verschiebejournal,
+    Verschieber,
+    journal_pfad,
+    oeffne_journal,
+    setze_verschiebungen_fort,
+)
+from dms_pakete import (  # noqa: F401
+    MANIFEST_CSV_KOPF,
+    MANIFEST_VERSION,
+    bereitstellung_zeilen,
+    erstelle_paketmanifest,
+    paket_id,
+    pakete_aus_vorschlaegen,
+    schreibe_manifest_csv,
+    schreibe_manifest_json,
+    stelle_pakete_bereit,
+)
+from dms_planung import (  # noqa: F401
+    TeilbaumPlaner,
+    berechne_ordnergroessen,
+    erstelle_paketvorschlaege,
+    packe_einheiten,
+    paket_dateien,
+)
+from dms_regeln import (  # noqa: F401
+    Dateiregeln,
+    lade_konfiguration,
+    normalisiere_regel,
+    speichere_konfiguration,
+    verschiebegrund,
+)
+from dms_scan import (  # noqa: F401
+    SCAN_INDEX_VERSION,
+    VERSCHIEBEPLAN_VERSION,
+    ScanIndex,
+    Verschiebeplan,
+    scanne_quellordner,
+)
+from dms_upload import (  # noqa: F401
+    STANDARD_UPLOAD_REIHENFOLGE,
+    UPLOAD_PAUSE_MAX_S,
+    UPLOAD_PAUSE_S,
+    UPLOAD_REIHENFOLGEN,
+    UPLOADZUSTAND_VERSION,
+    Uploadzustand,
+    formatiere_dauer,
+    lade_pakete_hoch,
+    plane_upload_zeitplan,
+    upload_rate,
+    upload_zeilen,
+    uploadzustand_pfad,
+    zeitplan_zeilen,
+)
+from dms_zip import (  # noqa: F401
+    Kompressionsschaetzer,
+    baue_zip_pakete,
+    kompression_zeilen,
+    schaetze_komprimierte_groessen,
+    zip_zeilen,
+)
+
+
+# ---------------------------------------------------------------------------
+# Ausgabetext
+# ---------------------------------------------------------------------------
+
+def plan_zeilen(plan_statistik: dict) -> list[str]:
+    """Zusammenfassung beim Anwenden eines gespeicherten Verschiebeplans."""
+    return [
+        "Gespeicherter Verschiebeplan:",
+        f"  Ordner aus dem Plan: {plan_statistik['verzeichnisse_aus_plan']}",
+        f"  Ordner geändert (neu gelesen): {plan_statistik['verzeichnisse_neu_gelistet']}",
+        f"  Geplante Verschiebungen geprüft: {plan_statistik['verschiebungen_geprueft']}",
+        f"  Davon geändert: {plan_statistik['verschiebungen_geaendert']} "
+        f"(übersprungen: {plan_statistik['verschiebungen_verweigert']}), "
+        f"nicht mehr vorhanden: {plan_statistik['verschiebungen_fehlend']}",
+    ]
+
+
+def duplikat_zeilen(duplikate: dict, max_gruppen: int = 20) -> list[str]:
+    """Zusammenfassung der Duplikate; die Gruppen mit der größten Ersparnis zuerst."""
+    zeilen = ["Duplikate (inhaltsgleiche Dateien):",
+              f"  Anzahl: {duplikate['anzahl_duplikate']} in {len(duplikate['gruppen'])} Gruppen",
+              f"  Einsparung: {formatiere_groesse(duplikate['bytes_gespart'])}"]
+    zeilen.append("  Aus den Paketen ausgeschlossen (nur Originale werden hochgeladen)"
+                  if duplikate["ausgeschlossen"] else "  In den Paketen enthalten")
+    gruppen = sorted(duplikate["gruppen"],
+                     key=lambda g: g["groesse"] * (len(g["dateien"]) - 1), reverse=True)
+    for gruppe in gruppen[:max_gruppen]:
+        original, *kopien = gruppe["dateien"]
+        zeilen.append(f"  {original} ({formatiere_groesse(gruppe['groesse'])}, "
+                      f"{len(kopien)}× doppelt):")
+        for kopie in kopien:
+            zeilen.append(f"    = {kopie}")
+    if len(gruppen) > max_gruppen:
+        zeilen.append(f"  … {len(gruppen) - max_gruppen} weitere Gruppen (siehe Paketmanifest)")
+    return zeilen
+
+
+def delta_zeilen(delta: dict) -> list[str]:
+    return [
+        f"Delta gegen Upload-Manifest vom {delta['manifest_erstellt']}:",
+        f"  Neu: {delta['anzahl_neu']} ({formatiere_groesse(delta['bytes_neu'])})",
+        f"  Geändert: {delta['anzahl_geaendert']} ({formatiere_groesse(delta['bytes_geaendert'])})",
+        f"  Unverändert (nicht gepackt): {delta['anzahl_unveraendert']} "
+        f"({formatiere_groesse(delta['bytes_unveraendert'])})",
+        f"  Nicht mehr vorhanden: {delta['anzahl_entfernt']}",
+    ]
+
+
+def erstelle_ausgabetext(
+    quellpfad: Path,
+    zielbasis: Path,
+    trockenlauf: bool,
+    scan_ergebnis: dict,
+    paketvorschlaege: list[dict],
+) -> str:
+    """Baut den finalen Text für das GUI."""
+    zeilen: list[str] = []
+    zeilen.append(f"Analyse für Quellordner: {quellpfad}")
+    zeilen.append(f"Zielbasis (nicht uploadfähige Dateien): {zielbasis}")
+    zeilen.append("")
+
+    modus = "Ja" if trockenlauf else "Nein"
+    zeilen.append(f"Trockenlauf: {modus}")
+    zeilen.append("")
+
+    if scan_ergebnis.get("abgebrochen"):
+        zeilen.append("ABGEBROCHEN – der Scan wurde vorzeitig beendet, das Ergebnis ist unvollständig.")
+        zeilen.append("")
+
+    fortgesetzt = scan_ergebnis.get("fortgesetzt")
+    if fortgesetzt:
+        zeilen.append(f"Fortgesetzt: unterbrochener Lauf vom {fortgesetzt['begonnen']} "
+                      f"({fortgesetzt['verschiebungen_offen']} offene Verschiebungen, "
+                      "kein neuer Scan)")
+        zeilen.append("")
+
+    zeilen.append("Nicht-uploadfähige Dateien:")
+    zeilen.append(f"  Anzahl: {scan_ergebnis['anzahl_ungueltig']}")
+    if scan_ergebnis["logdatei"]:
+        zeilen.append(f"  Logfile: {scan_ergebnis['logdatei']}")
+    zeilen.append("")
+
+    duplikate = scan_ergebnis.get("duplikate")
+    if duplikate:
+        zeilen.extend(duplikat_zeilen(duplikate))
+        zeilen.append("")
+
+    delta = scan_ergebnis.get("delta")
+    if delta:
+        zeilen.extend(delta_zeilen(delta))
+        zeilen.append("")
+
+    kompression = scan_ergebnis.get("kompression")
+    if kompression:
+        zeilen.extend(kompression_zeilen(kompression))
+        zeilen.append("")
+
+    index_statistik = scan_ergebnis.get("index_statistik")
+    if index_statistik:
+        zeilen.append("Scan-Index:")
+        zeilen.append(f"  Ordner aus Index: {index_statistik['aus_cache']}")
+        zeilen.append(f"  Ordner neu gelesen: {index_statistik['neu_gelistet']}")
+        if index_statistik["geprueft"]:
+            zeilen.append(f"  Korrigierte Dateigrößen: {index_statistik['groessen_korrigiert']}")
+        if index_statistik["verworfen"]:
+            zeilen.append("  (Index wurde neu aufgebaut)")
+        zeilen.append("")
+
+    plan_statistik = scan_ergebnis.get("plan_statistik")
+    if plan_statistik:
+        zeilen.extend(plan_zeilen(plan_statistik))
+        zeilen.append("")
+
+    # Paketvorschläge
+    for eintrag in paketvorschlaege:
+        ordner = eintrag["ordner"]
+        pakete = eintrag["pakete"]
+        warnungen = eintrag["warnungen"]
+        zu_gross = eintrag["unterordner_aufgeteilt"]
+
+        zeilen.append(f"Upload-Pakete auf Ebene: {ordner}")
+        zeilen.append("-" * 50)
+
+        if not pakete and not zu_gross:
+            zeilen.append("  (keine gültigen Dateien auf dieser Ebene)")
+        else:
+            komprimiert = eintrag.get("komprimiert")
+            for i, paket in enumerate(pakete, 1):
+                gesamt = sum(g for _, g in paket)
+                zip_info = (f", als ZIP {formatiere_groesse(komprimiert[i - 1])}"
+                            if komprimiert else "")
+                zeilen.append(f"  Paket {i} ({formatiere_groesse(gesamt)}{zip_info}):")
+                for name, groesse in paket:
+                    zeilen.append(f"    - {name} ({formatiere_groesse(groesse)})")
+
+        if zu_gross:
+            zeilen.append("")
+            zeilen.append("  Ordner mit Unterteilung aufgrund > 1 GiB:")
+            for uo in zu_gross:
+                zeilen.append(f"    - {uo.name} -> eigene Paketvorschläge unten")
+
+        if warnungen:
+            zeilen.append("")
+            zeilen.append("  WARNUNGEN:")
+            for w in warnungen:
+                zeilen.append(f"    ⚠ {w}")
+
+        zeilen.append("")
+
+    # Fehler
+    if scan_ergebnis["fehler"]:
+        zeilen.append("FEHLER:")
+        for f in scan_ergebnis["fehler"]:
+            zeilen.append(f"  ✗ {f}")
+
+    return "\n".join(zeilen)
+
+
+# ---------------------------------------------------------------------------
+# Analyse-Ablauf (gemeinsam für GUI und Kommandozeile)
+# ---------------------------------------------------------------------------
+
+def standard_zielbasis(quellpfad: Path) -> Path:
+    """Zielbasis, wenn keine gewählt wurde: ``_NichtUploadfaehig`` im Quellordner."""
+    return quellpfad / STANDARD_ZIELORDNER_NAME
+
+
+def fuehre_analyse_durch(
+    quellpfad: Path,
+    zielbasis: Path,
+    ungueltige_endungen: set[str],
+    trockenlauf: bool,
+    scan_worker: int = 1,
+    index_pfad: Path | None = None,
+    index_pruefen: bool = False,
+    index_verwerfen: bool = False,
+    strategie: str = STANDARD_PACKSTRATEGIE,
+    namensreihenfolge: bool = False,
+    max_groesse: int = MAX_PAKET_GROESSE,
+    fortschritt: Fortschritt | None = None,
+    log_zusatz: str = "",
+    laufstatistik: Laufstatistik | None = None,
+    duplikate_suchen: bool = False,
+    duplikate_ausschliessen: bool = False,
+    hash_worker: int = STANDARD_HASH_WORKER,
+    verschiebeplan: Verschiebeplan | None = None,
+    journal: Verschiebejournal | None = None,
+    teilergebnis: Callable[[dict], None] | None = None,
+    uploadmanifest: Uploadmanifest | None = None,
+    kompression: Kompressionsschaetzer | None = None,
+) -> dict:
+    """
+    Kompletter Ablauf ohne GUI: Scan, (Duplikate, Delta,) Ordnergrößen, Paketvorschläge.
+
+    Rückgabe: dict mit Schlüsseln:
+        - scan_ergebnis: dict  (siehe ``scanne_quellordner``)
+        - paketvorschlaege: list[dict]  (siehe ``erstelle_paketvorschlaege``)
+    """
+    # Scan-Index öffnen (optional)
+    scan_index: ScanIndex | None = None
+    index_fehler: str | None = None
+    fortsetzen = journal is not None and journal.geladen
+    if index_pfad is not None and verschiebeplan is None and not fortsetzen:
+        try:
+            scan_index = ScanIndex(index_pfad, pruefen=index_pruefen, verwerfen=index_verwerfen)
+        except sqlite3.Error as ex:
+            index_fehler = f"Scan-Index konnte nicht geöffnet werden: {ex}"
+
+    planer: TeilbaumPlaner | None = None
+    if (teilergebnis is not None and not fortsetzen and not duplikate_ausschliessen
+            and uploadmanifest is None and kompression is None):
+        planer = TeilbaumPlaner(max_groesse, strategie, namensreihenfolge, teilergebnis)
+
+    # 1. Scannen (bzw. unterbrochenen Lauf fortsetzen)
+    if fortschritt is not None:
+        fortschritt.setze_phase("Setze unterbrochenen Lauf fort…" if fortsetzen
+                                else "Scanne Ordner…")
+    try:
+        if fortsetzen:
+            scan_ergebnis = setze_verschiebungen_fort(journal, fortschritt=fortschritt,
+                                                      laufstatistik=laufstatistik)
+        else:
+            scan_ergebnis = scanne_quellordner(
+                quellpfad, zielbasis, ungueltige_endungen, trockenlauf,
+                scan_worker=scan_worker,
+                scan_index=scan_index,
+                fortschritt=fortschritt,
+                log_zusatz=log_zusatz,
+                laufstatistik=laufstatistik,
+                verschiebeplan=verschiebeplan,
+                journal=journal,
+                teilbaum_fertig=planer.teilbaum_fertig if planer is not None else None,
+                inhalt_worker=hash_worker,
+            )
+    except BaseException:
+        if planer is not None:
+            planer.schliesse()
+        raise
+    finally:
+        if scan_index is not None:
+            scan_index.schliesse()
+    if index_fehler:
+        scan_ergebnis["fehler"].append(index_fehler)
+
+    if duplikate_suchen and not scan_ergebnis["abgebrochen"]:
+        # Duplikate (optional)
+        if fortschritt is not None:
+            fortschritt.setze_phase("Suche Duplikate…")
+        with messe_stufe(laufstatistik, "duplikate"):
+            duplikate = finde_duplikate(scan_ergebnis["gueltige_dateien"], hash_worker,
+                                        fortschritt)
+            if duplikate_ausschliessen and not duplikate["abgebrochen"]:
+                schliesse_duplikate_aus(scan_ergebnis["ordnerbaum"],
+                                        scan_ergebnis["gueltige_dateien"], duplikate)
+        scan_ergebnis["duplikate"] = duplikate
+        scan_ergebnis["fehler"].extend(duplikate["fehler"])
+        if duplikate["abgebrochen"]:
+            scan_ergebnis["abgebrochen"] = True
+
+    if uploadmanifest is not None and not scan_ergebnis["abgebrochen"]:
+        # Delta gegen das Upload-Manifest (optional)
+        if fortschritt is not None:
+            fortschritt.setze_phase("Vergleiche mit Upload-Manifest…")
+        with messe_stufe(laufstatistik, "delta"):
+            delta = berechne_delta(quellpfad, scan_ergebnis["gueltige_dateien"], uploadmanifest,
+                                   hash_worker, fortschritt)
+            if not delta["abgebrochen"]:
+                schliesse_unveraenderte_aus(scan_ergebnis["ordnerbaum"],
+                                            scan_ergebnis["gueltige_dateien"], delta)
+        scan_ergebnis["delta"] = delta
+        scan_ergebnis["fehler"].extend(delta["fehler"])
+        if delta["abgebrochen"]:
+            scan_ergebnis["abgebrochen"] = True
+
+    komprimiert: dict | None = None
+    if kompression is not None and not scan_ergebnis["abgebrochen"]:
+        # Komprimierte Größen schätzen (optional)
+        if fortschritt is not None:
+            fortschritt.setze_phase("Schätze komprimierte Größen…")
+        with messe_stufe(laufstatistik, "kompression"):
+            komprimiert = schaetze_komprimierte_groessen(scan_ergebnis["ordnerbaum"], kompression,
+                                                         hash_worker, fortschritt)
+        scan_ergebnis["kompression"] = {schluessel: wert for schluessel, wert in komprimiert.items()
+                                        if schluessel not in ("dateien", "ordner")}
+        if komprimiert["abgebrochen"]:
+            scan_ergebnis["abgebrochen"] = True
+
+    paketvorschlaege: list[dict] = []
+    if planer is not None:
+        # 2./3. Restliche Planung im Fließband: nur noch die oberste Ebene
+        try:
+            if not scan_ergebnis["abgebrochen"]:
+                if fortschritt is not None:
+                    fortschritt.setze_phase("Berechne Upload-Pakete…")
+                with messe_stufe(laufstatistik, "paketbildung"):
+                    paketvorschlaege = planer.ergebnis(scan_ergebnis["ordnerbaum"])
+        finally:
+            planer.schliesse()
+    elif not scan_ergebnis["abgebrochen"]:
+        # 2. Ordnergrößen berechnen
+        if fortschritt is not None:
+            fortschritt.setze_phase("Berechne Upload-Pakete…")
+        ordnerbaum = scan_ergebnis["ordnerbaum"]
+        with messe_stufe(laufstatistik, "ordnergroessen"):
+            berechne_ordnergroessen(ordnerbaum)
+
+        # 3. Paketvorschläge
+        with messe_stufe(laufstatistik, "paketbildung"):
+            paketvorschlaege = erstelle_paketvorschlaege(
+                ordnerbaum, max_groesse,
+                strategie=strategie,
+                namensreihenfolge=namensreihenfolge,
+                komprimiert=komprimiert,
+            )
+
+    return {
+        "scan_ergebnis": scan_ergebnis,
+        "paketvorschlaege": paketvorschlaege,
+    }
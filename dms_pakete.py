@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Paketmanifest und Bereitstellung
+==========================================================
+Maschinenlesbarer Paketplan und Staging-Ordner je Paket.
+"""
+
+import csv
+import errno
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from dms_basis import (
+    STANDARD_VERSCHIEBE_WORKER,
+    Fortschritt,
+    Laufstatistik,
+    _arbeite_parallel,
+    _liegt_in,
+    _normpfad,
+    formatiere_groesse,
+)
+from dms_planung import paket_dateien
+
+
+# ---------------------------------------------------------------------------
+# Paketmanifest (maschinenlesbar)
+# ---------------------------------------------------------------------------
+
+MANIFEST_VERSION = 1
+
+
+def paket_id(ebene_nr: int, paket_nr: int) -> str:
+    """Stabile Kennung eines Pakets, z. B. ``E0003-P002`` (beide 1-basiert)."""
+    return f"E{ebene_nr:04d}-P{paket_nr:03d}"
+
+
+def erstelle_paketmanifest(
+    quellpfad: Path,
+    zielbasis: Path,
+    trockenlauf: bool,
+    scan_ergebnis: dict,
+    paketvorschlaege: list[dict],
+    laufstatistik: Laufstatistik | None = None,
+) -> dict:
+    """
+    Baut den Paketplan als JSON-fähiges dict: Pakete mit Einheiten,
+    Mitgliedsdateien und Größen, Warnungen und Fehler; mit
+    ``laufstatistik`` zusätzlich deren Werte unter ``laufstatistik``.
+    """
+    ebenen: list[dict] = []
+    anzahl_pakete = 0
+    gesamtgroesse = 0
+    anzahl_warnungen = 0
+
+    for ebene_nr, eintrag in enumerate(paketvorschlaege, 1):
+        pakete: list[dict] = []
+        inhalte = eintrag.get("inhalte") or [[] for _ in eintrag["pakete"]]
+        komprimiert = eintrag.get("komprimiert")
+        for paket_nr, (paket, inhalt) in enumerate(zip(eintrag["pakete"], inhalte), 1):
+            groesse = sum(g for _, g in paket)
+            pakete.append({
+                "id": paket_id(ebene_nr, paket_nr),
+                "groesse": groesse,
+                "einheiten": [{"name": name, "groesse": g} for name, g in paket],
+                "dateien": [{"pfad": pfad, "groesse": g} for pfad, g in paket_dateien(inhalt)],
+            })
+            if komprimiert:
+                pakete[-1]["groesse_zip"] = komprimiert[paket_nr - 1]
+            anzahl_pakete += 1
+            gesamtgroesse += groesse
+        anzahl_warnungen += len(eintrag["warnungen"])
+        ebenen.append({
+            "ordner": str(eintrag["ordner"]),
+            "pakete": pakete,
+            "warnungen": list(eintrag["warnungen"]),
+            "unterordner_aufgeteilt": [str(uo) for uo in eintrag["unterordner_aufgeteilt"]],
+        })
+
+    logdatei = scan_ergebnis.get("logdatei")
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "erstellt": datetime.now().isoformat(timespec="seconds"),
+        "quellordner": str(quellpfad),
+        "zielbasis": str(zielbasis),
+        "trockenlauf": trockenlauf,
+        "abgebrochen": bool(scan_ergebnis.get("abgebrochen")),
+        "anzahl_ungueltig": scan_ergebnis["anzahl_ungueltig"],
+        "logdatei": str(logdatei) if logdatei else None,
+        "anzahl_pakete": anzahl_pakete,
+        "gesamtgroesse": gesamtgroesse,
+        "anzahl_warnungen": anzahl_warnungen,
+        "fehler": list(scan_ergebnis["fehler"]),
+        "ebenen": ebenen,
+    }
+    plan_statistik = scan_ergebnis.get("plan_statistik")
+    if plan_statistik:
+        manifest["verschiebeplan"] = plan_statistik
+    if scan_ergebnis.get("fortgesetzt"):
+        manifest["fortgesetzt"] = scan_ergebnis["fortgesetzt"]
+    kompression = scan_ergebnis.get("kompression")
+    if kompression:
+        manifest["kompression"] = kompression
+    delta = scan_ergebnis.get("delta")
+    if delta:
+        manifest["delta"] = {schluessel: wert for schluessel, wert in delta.items()
+                             if schluessel.startswith(("anzahl_", "bytes_", "manifest_"))}
+    duplikate = scan_ergebnis.get("duplikate")
+    if duplikate:
+        manifest["duplikate"] = {
+            "anzahl": duplikate["anzahl_duplikate"],
+            "bytes_gespart": duplikate["bytes_gespart"],
+            "ausgeschlossen": duplikate["ausgeschlossen"],
+            "gruppen": duplikate["gruppen"],
+        }
+    if laufstatistik is not None:
+        manifest["laufstatistik"] = laufstatistik.als_dict()
+    return manifest
+
+
+def schreibe_manifest_json(manifest: dict, datei) -> None:
+    """Schreibt das Manifest als JSON in ein geöffnetes Textobjekt."""
+    json.dump(manifest, datei, indent=2, ensure_ascii=False)
+    datei.write("\n")
+
+
+MANIFEST_CSV_KOPF = ["Art", "PaketID", "Ebene", "PaketGroesseBytes", "Pfad", "GroesseBytes", "Meldung"]
+
+
+def schreibe_manifest_csv(manifest: dict, datei) -> None:
+    """Schreibt das Manifest als Semikolon-CSV (wie das Logfile), eine Zeile pro Mitgliedsdatei."""
+    schreiber = csv.writer(datei, delimiter=";", lineterminator="\n")
+    schreiber.writerow(MANIFEST_CSV_KOPF)
+    for ebene in manifest["ebenen"]:
+        for paket in ebene["pakete"]:
+            for eintrag in paket["dateien"]:
+                schreiber.writerow(["datei", paket["id"], ebene["ordner"], paket["groesse"],
+                                    eintrag["pfad"], eintrag["groesse"], ""])
+        for warnung in ebene["warnungen"]:
+            schreiber.writerow(["warnung", "", ebene["ordner"], "", "", "", warnung])
+    for fehler in manifest["fehler"]:
+        schreiber.writerow(["fehler", "", "", "", "", "", fehler])
+    for gruppe in manifest.get("duplikate", {}).get("gruppen", []):
+        original, *kopien = gruppe["dateien"]
+        for kopie in kopien:
+            schreiber.writerow(["duplikat", "", "", "", kopie, gruppe["groesse"],
+                                f"gleich wie {original}"])
+    laufstatistik = manifest.get("laufstatistik")
+    if laufstatistik:
+        werte = {f"{n}_s": d for n, d in laufstatistik["stufen_s"].items()}
+        werte.update((n, w) for n, w in laufstatistik.items() if n != "stufen_s" and w is not None)
+        for name, wert in werte.items():
+            schreiber.writerow(["statistik", "", "", "", "", "", f"{name}={wert}"])
+
+
+# ---------------------------------------------------------------------------
+# Paket-Bereitstellung (Staging-Ordner)
+# ---------------------------------------------------------------------------
+
+def pakete_aus_vorschlaegen(
+    paketvorschlaege: list[dict],
+    reihenfolge: list[str] | None = None,
+) -> Iterator[tuple[str, Iterator[tuple[str, int]]]]:
+    """
+    ``(paket_id, Dateien)`` für alle Pakete, Kennungen wie im Paketmanifest.
+    Mit ``reihenfolge`` (Paket-IDs) in dieser Reihenfolge statt in Planreihenfolge.
+    """
+    if reihenfolge is None:
+        for ebene_nr, eintrag in enumerate(paketvorschlaege, 1):
+            for paket_nr, inhalt in enumerate(eintrag["inhalte"], 1):
+                yield paket_id(ebene_nr, paket_nr), paket_dateien(inhalt)
+        return
+    inhalte = {paket_id(ebene_nr, paket_nr): inhalt
+               for ebene_nr, eintrag in enumerate(paketvorschlaege, 1)
+               for paket_nr, inhalt in enumerate(eintrag["inhalte"], 1)}
+    for pid in reihenfolge:
+        yield pid, paket_dateien(inhalte[pid])
+
+
+def _gleiche_mtime(ziel_ns: int, quelle_ns: int) -> bool:
+    """
+    Gleiche Änderungszeit nach ``copy2``. Ziele mit grober Zeitauflösung
+    (FAT: 2 s, manche SMB-Freigaben: 1 s) erkennt man an ganzen Sekunden;
+    nur dort gilt eine Abweichung unter 2 s noch als gleich.
+    """
+    if ziel_ns == quelle_ns:
+        return True
+    return ziel_ns % 1_000_000_000 == 0 and abs(ziel_ns - quelle_ns) < 2_000_000_000
+
+
+def _stelle_datei_bereit(quelle: str, ziel: str, groesse: int, zustand: dict) -> str:
+    """
+    Legt ``ziel`` als Hardlink oder Kopie von ``quelle`` an.
+    Rückgabe ``"verlinkt"``, ``"kopiert"`` oder ``"vorhanden"``.
+    """
+    st_quelle = os.stat(quelle)
+    if st_quelle.st_size != groesse:
+        raise OSError(f"Größe {st_quelle.st_size} statt {groesse} Bytes laut Plan "
+                      f"(Datei nach dem Scan geändert)")
+    try:
+        st_ziel = os.stat(ziel)
+    except FileNotFoundError:
+        st_ziel = None
+    if st_ziel is not None:
+        gleiche_datei = (st_ziel.st_ino, st_ziel.st_dev) == (st_quelle.st_ino, st_quelle.st_dev)
+        if st_ziel.st_size == groesse and (
+                gleiche_datei or _gleiche_mtime(st_ziel.st_mtime_ns, st_quelle.st_mtime_ns)):
+            return "vorhanden"
+        os.unlink(ziel)
+
+    art = "kopiert"
+    if zustand["verlinken"]:
+        try:
+            os.link(quelle, ziel)
+            art = "verlinkt"
+        except OSError as ex:
+            if ex.errno in (errno.EXDEV, errno.ENOTSUP, errno.EOPNOTSUPP):
+                zustand["verlinken"] = False  # Laufwerk kann keine Hardlinks: ab jetzt kopieren
+            elif ex.errno not in (errno.EPERM, errno.EACCES, errno.EMLINK, errno.EINVAL):
+                raise
+            # sonst nur diese Datei kopieren (Rechte, Link-Grenze, Sonderfall)
+    if art == "kopiert":
+        shutil.copy2(quelle, ziel)
+    if os.stat(ziel).st_size != groesse:
+        raise OSError("Größe nach dem Bereitstellen weicht vom Plan ab")
+    return art
+
+
+def stelle_pakete_bereit(
+    quellpfad: Path,
+    pakete: Iterable[tuple[str, Iterable[tuple[str, int]]]],
+    staging: Path,
+    worker: int = STANDARD_VERSCHIEBE_WORKER,
+    fortschritt: Fortschritt | None = None,
+) -> dict:
+    """
+    Legt pro Paket einen Ordner ``staging/<PaketID>`` mit Hardlinks oder Kopien der Dateien an.
+
+    Rückgabe: dict mit Schlüsseln:
+        - staging: Path
+        - methode: "hardlink" | "kopie"
+        - pakete, dateien, verlinkt, kopiert, vorhanden, bytes_kopiert: int
+        - fehler: list[str]
+        - abgebrochen: bool
+    """
+    quell_norm = _normpfad(quellpfad)
+    staging_norm = _normpfad(staging)
+    if _liegt_in(staging_norm, quell_norm):
+        raise ValueError(f"Der Staging-Ordner darf nicht im Quellordner liegen: {staging}")
+    os.makedirs(staging, exist_ok=True)
+
+    verlinken = os.stat(quellpfad).st_dev == os.stat(staging).st_dev
+    zustand = {"verlinken": verlinken}
+    quelle_praefix = os.path.join(str(quellpfad), "")
+    angelegt: set[str] = set()
+    ergebnis = {
+        "staging": staging,
+        "methode": "hardlink" if verlinken else "kopie",
+        "pakete": 0, "dateien": 0, "verlinkt": 0, "kopiert": 0, "vorhanden": 0,
+        "bytes_kopiert": 0, "fehler": [], "abgebrochen": False,
+    }
+    if fortschritt is not None:
+        fortschritt.setze_phase("Stelle Pakete bereit…")
+
+    def auftraege() -> Iterator[tuple]:
+        for pid, dateien in pakete:
+            ergebnis["pakete"] += 1
+            paketordner = os.path.join(str(staging), pid)
+            for pfad, groesse in dateien:
+                relativ = (pfad[len(quelle_praefix):] if pfad.startswith(quelle_praefix)
+                           else os.path.relpath(pfad, quellpfad))
+                ziel = os.path.join(paketordner, relativ)
+                ordner = os.path.dirname(ziel)
+                if ordner not in angelegt:  # Ordner im Hauptthread anlegen (einmal pro Lauf)
+                    os.makedirs(ordner, exist_ok=True)
+                    angelegt.add(ordner)
+                yield (pfad, pfad, ziel, groesse, zustand)
+
+    for (pfad, _, _, groesse, _), zukunft in _arbeite_parallel(
+            _stelle_datei_bereit, auftraege(), max(1, worker), fortschritt, "bereitstellen"):
+        ergebnis["dateien"] += 1
+        try:
+            art = zukunft.result()
+        except OSError as ex:
+            ergebnis["fehler"].append(f"Bereitstellen: {pfad}: {ex}")
+            continue
+        ergebnis[art] += 1
+        if art == "kopiert":
+            ergebnis["bytes_kopiert"] += groesse
+        if fortschritt is not None and not fortschritt.datei(groesse):
+            break
+    ergebnis["abgebrochen"] = fortschritt is not None and fortschritt.abgebrochen
+    return ergebnis
+
+
+def bereitstellung_zeilen(ergebnis: dict) -> list[str]:
+    """Kurzbericht über ``stelle_pakete_bereit``."""
+    methode = "Hardlinks" if ergebnis["methode"] == "hardlink" else "Kopien"
+    zeilen = [
+        "Paket-Bereitstellung:",
+        f"  Staging-Ordner: {ergebnis['staging']} ({methode})",
+        f"  Pakete: {ergebnis['pakete']}, Dateien: {ergebnis['dateien']}",
+        f"  Verlinkt: {ergebnis['verlinkt']}, kopiert: {ergebnis['kopiert']} "
+        f"({formatiere_groesse(ergebnis['bytes_kopiert'])}), "
+        f"bereits vorhanden: {ergebnis['vorhanden']}",
+    ]
+    if ergebnis["abgebrochen"]:
+        zeilen.append("  ABGEBROCHEN – erneut starten, um fortzusetzen")
+    for fehler in ergebnis["fehler"]:
+        zeilen.append(f"  ✗ {fehler}")
+    return zeilen
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Paketbildung
+======================================
+Paketvorschläge und Packstrategien; die Planung greift nicht auf das
+Dateisystem zu.
+"""
+
+import bisect
+import math
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator
+
+from dms_basis import (
+    MAX_PAKET_GROESSE,
+    OPTIMAL_MAX_EINHEITEN,
+    OPTIMAL_MAX_SUCHKNOTEN,
+    STANDARD_PACKSTRATEGIE,
+    ZIP_ENDE,
+    Einheit,
+    formatiere_groesse,
+)
+from dms_daten import DateiAusschnitt, OrdnerKnoten, _sortierschluessel_name
+
+
+# ---------------------------------------------------------------------------
+# Paketbildung
+# ---------------------------------------------------------------------------
+
+def berechne_ordnergroessen(ordnerbaum: OrdnerKnoten) -> int:
+    """
+    Berechnet die Gesamtgröße pro Ordner (rekursiv) bottom-up im Ordnerbaum.
+
+    Setzt ``groesse`` an jedem Knoten und gibt die Gesamtgröße der Wurzel zurück.
+    """
+    knoten_liste = ordnerbaum.knoten_preorder()
+    for knoten in knoten_liste:
+        dateien = knoten.dateien
+        knoten.groesse = (dateien.summe() if isinstance(dateien, DateiAusschnitt)
+                          else sum(g for _, g in dateien))
+    for knoten in reversed(knoten_liste):
+        if knoten is not ordnerbaum and knoten.eltern is not None:
+            knoten.eltern.groesse += knoten.groesse
+    return ordnerbaum.groesse
+
+
+def erstelle_paketvorschlaege(
+    ordnerbaum: OrdnerKnoten,
+    max_groesse: int = MAX_PAKET_GROESSE,
+    strategie: str = STANDARD_PACKSTRATEGIE,
+    namensreihenfolge: bool = False,
+    komprimiert: dict | None = None,
+) -> list[dict]:
+    """
+    Erstellt rekursive Paketvorschläge für einen Ordner (ohne Dateisystemzugriff).
+
+    Rückgabe: Liste von Einträgen mit:
+        - ordner: Path
+        - pakete: list[list[(str, int)]]
+        - inhalte: list[list[(OrdnerKnoten, list[(str, int)] | None)]]
+        - warnungen: list[str]
+        - unterordner_aufgeteilt: list[Path]  (rekursiv behandelt)
+        - komprimiert: list[int]  (nur mit ``komprimiert``)
+    """
+    ergebnisse: list[dict] = []
+    # Explizite Arbeitsliste statt Rekursion (tiefe Bäume); Reihenfolge wie rekursiv
+    stapel = [ordnerbaum]
+    while stapel:
+        knoten = stapel.pop()
+        zu_gross = _paketbildung_ebene(knoten, max_groesse, strategie,
+                                       namensreihenfolge, ergebnisse, komprimiert)
+        stapel.extend(reversed(zu_gross))
+    return ergebnisse
+
+
+def _paketbildung_ebene(
+    knoten: OrdnerKnoten,
+    max_groesse: int,
+    strategie: str,
+    namensreihenfolge: bool,
+    ergebnisse: list[dict],
+    komprimiert: dict | None = None,
+) -> list[OrdnerKnoten]:
+    """Paketbildung für eine Ebene; gibt die rekursiv aufzuteilenden Unterordner zurück."""
+    # Einheiten sammeln: (name, gewicht, (knoten, dateien | None), groesse); gepackt wird nach
+    # dem Gewicht – der Größe bzw. mit ``komprimiert`` der geschätzten ZIP-Größe
+    einheiten: list[Einheit] = []
+    warnungen: list[str] = []
+    zu_gross: list[OrdnerKnoten] = []
+    grenze = max_groesse - ZIP_ENDE if komprimiert is not None else max_groesse
+
+    # Dateien direkt im Ordner
+    dateien_im_ordner = knoten.dateien
+    summe_dateien = (dateien_im_ordner.summe() if isinstance(dateien_im_ordner, DateiAusschnitt)
+                     else sum(g for _, g in dateien_im_ordner))
+    gewichte = komprimiert["dateien"].get(knoten, ()) if komprimiert is not None else None
+    gewicht_dateien = sum(gewichte) if gewichte is not None else summe_dateien
+    if summe_dateien > 0:
+        if gewicht_dateien <= grenze:
+            einheiten.append(("[Dateien in diesem Ordner]", gewicht_dateien,
+                              (knoten, dateien_im_ordner), summe_dateien))
+        else:
+            # Auf Dateiebene aufteilen: (name, gewicht, groesse)
+            passende: list[tuple[str, int, int]] = []
+            for name, gewicht, groesse in sorted(
+                    ((n, g, g) for n, g in dateien_im_ordner) if gewichte is None
+                    else ((n, w, g) for (n, g), w in zip(dateien_im_ordner, gewichte)),
+                    key=lambda x: x[0]):
+                if gewicht > grenze:
+                    geschaetzt = (f", komprimiert ca. {formatiere_groesse(gewicht)}"
+                                  if gewichte is not None else "")
+                    warnungen.append(
+                        f"Datei {knoten.als_path() / name} ({formatiere_groesse(groesse)}"
+                        f"{geschaetzt}) ist größer als 1 GiB!"
+                    )
+                    continue
+                passende.append((name, gewicht, groesse))
+            for paket in packe_einheiten(passende, grenze, strategie, namensreihenfolge):
+                einheiten.append(
+                    (f"[Dateien-Paket: {len(paket)} Dateien]", sum(e[1] for e in paket),
+                     (knoten, [(n, g) for n, _, g in paket]), sum(e[2] for e in paket))
+                )
+
+    # Unterordner
+    for uo in sorted(knoten.kinder.values(), key=lambda k: _sortierschluessel_name(k.name)):
+        if uo.groesse == 0:
+            continue
+        gewicht = komprimiert["ordner"][uo] if komprimiert is not None else uo.groesse
+        if gewicht <= grenze:
+            einheiten.append((f"Ordner: {uo.name}", gewicht, (uo, None), uo.groesse))
+        else:
+            zu_gross.append(uo)
+
+    # Pakete bilden aus Einheiten
+    gepackt = packe_einheiten(einheiten, grenze, strategie, namensreihenfolge)
+
+    eintrag = {
+        "ordner": knoten.als_path(),
+        "pakete": [[(e[0], e[3]) for e in paket] for paket in gepackt],
+        "inhalte": [[e[2] for e in paket] for paket in gepackt],
+        "warnungen": warnungen,
+        "unterordner_aufgeteilt": [uo.als_path() for uo in zu_gross],
+    }
+    if komprimiert is not None:
+        eintrag["komprimiert"] = [sum(e[1] for e in paket) + ZIP_ENDE for paket in gepackt]
+    ergebnisse.append(eintrag)
+    return zu_gross
+
+
+def paket_dateien(
+    inhalt: list[tuple[OrdnerKnoten, list[tuple[str, int]] | None]],
+) -> Iterator[tuple[str, int]]:
+    """Alle Dateien eines Pakets als ``(voller Pfad, Größe)``, ganze Ordner in Namensreihenfolge."""
+    for knoten, name, groesse in _paket_eintraege(inhalt):
+        yield os.path.join(knoten.pfad, name), groesse
+
+
+def _paket_eintraege(
+    inhalt: list[tuple[OrdnerKnoten, list[tuple[str, int]] | None]],
+) -> Iterator[tuple[OrdnerKnoten, str, int]]:
+    """Wie ``paket_dateien``, aber ``(Ordnerknoten, Name, Größe)``."""
+    for knoten, dateien in inhalt:
+        if dateien is not None:
+            for name, groesse in dateien:
+                yield knoten, name, groesse
+            continue
+        stapel = [knoten]
+        while stapel:
+            k = stapel.pop()
+            for name, groesse in sorted(k.dateien, key=lambda x: x[0]):
+                yield k, name, groesse
+            stapel.extend(sorted(k.kinder.values(),
+                                 key=lambda u: _sortierschluessel_name(u.name), reverse=True))
+
+
+class TeilbaumPlaner:
+    """
+    Plant fertig gescannte Ordner der obersten Ebene, während der Scan weiterläuft.
+    ``ergebnis`` liefert denselben Plan wie ``erstelle_paketvorschlaege``.
+    """
+
+    def __init__(
+        self,
+        max_groesse: int = MAX_PAKET_GROESSE,
+        strategie: str = STANDARD_PACKSTRATEGIE,
+        namensreihenfolge: bool = False,
+        melde: Callable[[dict], None] | None = None,
+    ) -> None:
+        self.max_groesse = max_groesse
+        self.strategie = strategie
+        self.namensreihenfolge = namensreihenfolge
+        self.melde = melde
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planung")
+        self._teilplaene: dict[OrdnerKnoten, Future] = {}
+
+    def teilbaum_fertig(self, knoten: OrdnerKnoten) -> None:
+        self._teilplaene[knoten] = self._pool.submit(self._plane, knoten)
+
+    def _plane(self, knoten: OrdnerKnoten) -> list[dict]:
+        berechne_ordnergroessen(knoten)
+        eintraege: list[dict] = []
+        if knoten.groesse > self.max_groesse:
+            eintraege = erstelle_paketvorschlaege(knoten, self.max_groesse, self.strategie,
+                                                  self.namensreihenfolge)
+        if self.melde is not None and knoten.groesse:
+            self.melde({"ordner": knoten.als_path(), "groesse": knoten.groesse,
+                        "paketvorschlaege": eintraege})
+        return eintraege
+
+    def ergebnis(self, ordnerbaum: OrdnerKnoten) -> list[dict]:
+        """Gesamtplan wie ``erstelle_paketvorschlaege`` (wartet auf offene Teilpläne)."""
+        teilplaene = {knoten: future.result() for knoten, future in self._teilplaene.items()}
+        dateien = ordnerbaum.dateien
+        ordnerbaum.groesse = (dateien.summe() if isinstance(dateien, DateiAusschnitt)
+                              else sum(g for _, g in dateien))
+        for kind in ordnerbaum.kinder.values():
+            if kind not in teilplaene:
+                berechne_ordnergroessen(kind)
+            ordnerbaum.groesse += kind.groesse
+
+        ergebnisse: list[dict] = []
+        zu_gross = _paketbildung_ebene(ordnerbaum, self.max_groesse, self.strategie,
+                                       self.namensreihenfolge, ergebnisse)
+        for kind in zu_gross:
+            teilplan = teilplaene.get(kind)
+            if teilplan is None:
+                teilplan = erstelle_paketvorschlaege(kind, self.max_groesse, self.strategie,
+                                                     self.namensreihenfolge)
+            ergebnisse.extend(teilplan)
+        return ergebnisse
+
+    def schliesse(self) -> None:
+        """Verwirft noch nicht begonnene Teilpläne (z. B. nach Abbruch)."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Packstrategien
+# ---------------------------------------------------------------------------
+
+def packe_einheiten(
+    einheiten: list[Einheit],
+    max_groesse: int,
+    strategie: str = STANDARD_PACKSTRATEGIE,
+    namensreihenfolge: bool = False,
+) -> list[list[Einheit]]:
+    """
+    Verteilt Einheiten ``(name, groesse, ...)`` nach ``strategie`` auf Pakete ≤ ``max_groesse``.
+    Einheiten größer als ``max_groesse`` landen in einem eigenen Paket.
+    """
+    if namensreihenfolge or strategie == "namensreihenfolge":
+        return _packe_namensreihenfolge(einheiten, max_groesse)
+    if strategie == "first_fit_decreasing":
+        return _packe_first_fit_decreasing(einheiten, max_groesse)
+    if strategie == "best_fit_decreasing":
+        return _packe_best_fit_decreasing(einheiten, max_groesse)
+    if strategie == "optimal":
+        return _packe_optimal(einheiten, max_groesse)
+    raise ValueError(f"Unbekannte Packstrategie: {strategie}")
+
+
+def _absteigend(einheiten: list[Einheit]) -> list[Einheit]:
+    """Größte zuerst, bei gleicher Größe nach Name (deterministisch)."""
+    return sorted(einheiten, key=lambda e: (-e[1], e[0]))
+
+
+def _packe_namensreihenfolge(
+    einheiten: list[Einheit], max_groesse: int
+) -> list[list[Einheit]]:
+    pakete: list[list[Einheit]] = []
+    aktuelles_paket: list[Einheit] = []
+    aktuelle_groesse = 0
+
+    for einheit in sorted(einheiten, key=lambda x: x[0]):
+        groesse = einheit[1]
+        if aktuelle_groesse + groesse > max_groesse and aktuelles_paket:
+            pakete.append(aktuelles_paket)
+            aktuelles_paket = []
+            aktuelle_groesse = 0
+        aktuelles_paket.append(einheit)
+        aktuelle_groesse += groesse
+
+    if aktuelles_paket:
+        pakete.append(aktuelles_paket)
+    return pakete
+
+
+def _packe_first_fit_decreasing(
+    einheiten: list[Einheit], max_groesse: int
+) -> list[list[Einheit]]:
+    pakete: list[list[Einheit]] = []
+    rest: list[int] = []
+    for einheit in _absteigend(einheiten):
+        groesse = einheit[1]
+        for i, frei in enumerate(rest):
+            if groesse <= frei:
+                pakete[i].append(einheit)
+                rest[i] -= groesse
+                break
+        else:
+            pakete.append([einheit])
+            rest.append(max_groesse - groesse)
+    return pakete
+
+
+def _packe_best_fit_decreasing(
+    einheiten: list[Einheit], max_groesse: int
+) -> list[list[Einheit]]:
+    pakete: list[list[Einheit]] = []
+    # Sortiert nach (Restkapazität, Paketnummer) → kleinster passender Rest per bisect
+    offen: list[tuple[int, int]] = []
+    for einheit in _absteigend(einheiten):
+        groesse = einheit[1]
+        pos = bisect.bisect_left(offen, (groesse, -1))
+        if pos < len(offen):
+            frei, nr = offen.pop(pos)
+            pakete[nr].append(einheit)
+            frei -= groesse
+        else:
+            nr = len(pakete)
+            pakete.append([einheit])
+            frei = max_groesse - groesse
+        if frei > 0:
+            bisect.insort(offen, (frei, nr))
+    return pakete
+
+
+def _packe_optimal(
+    einheiten: list[Einheit], max_groesse: int
+) -> list[list[Einheit]]:
+    """Branch & Bound über die Zuordnung Einheit → Paket (größte zuerst)."""
+    beste = _packe_best_fit_decreasing(einheiten, max_groesse)
+    if len(einheiten) > OPTIMAL_MAX_EINHEITEN or any(e[1] > max_groesse for e in einheiten):
+        return beste
+
+    sortiert = _absteigend(einheiten)
+    n = len(sortiert)
+    untergrenze = math.ceil(sum(e[1] for e in sortiert) / max_groesse) if max_groesse > 0 else n
+    if len(beste) <= untergrenze:
+        return beste
+
+    # rest_ab[i] = Summe der Größen ab Einheit i (für die untere Schranke)
+    rest_ab = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        rest_ab[i] = rest_ab[i + 1] + sortiert[i][1]
+
+    zuordnung = [0] * n
+    frei: list[int] = []
+    beste_zuordnung: list[int] | None = None
+    beste_anzahl = len(beste)
+    suchknoten = 0
+
+    def suche(i: int) -> None:
+        nonlocal beste_zuordnung, beste_anzahl, suchknoten
+        suchknoten += 1
+        if suchknoten > OPTIMAL_MAX_SUCHKNOTEN or beste_anzahl <= untergrenze:
+            return
+        if i == n:
+            beste_anzahl = len(frei)
+            beste_zuordnung = zuordnung.copy()
+            return
+        ueberhang = rest_ab[i] - sum(frei)
+        schranke = len(frei) + (math.ceil(ueberhang / max_groesse) if ueberhang > 0 else 0)
+        if schranke >= beste_anzahl:
+            return
+
+        groesse = sortiert[i][1]
+        probiert: set[int] = set()
+        for nr, platz in enumerate(frei):
+            if groesse <= platz and platz not in probiert:
+                probiert.add(platz)  # Pakete mit gleichem Rest sind austauschbar
+                frei[nr] -= groesse
+                zuordnung[i] = nr
+                suche(i + 1)
+                frei[nr] += groesse
+        if len(frei) + 1 < beste_anzahl:
+            frei.append(max_groesse - groesse)
+            zuordnung[i] = len(frei) - 1
+            suche(i + 1)
+            frei.pop()
+
+    suche(0)
+    if beste_zuordnung is None:
+        return beste
+
+    pakete: list[list[Einheit]] = [[] for _ in range(beste_anzahl)]
+    for einheit, nr in zip(sortiert, beste_zuordnung):
+        pakete[nr].append(einheit)
+    return pakete
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Dateiregeln
+=====================================
+Regeln für nicht uploadfähige Dateien: Endungen, Muster, Dateinamen
+und Inhaltsprüfungen.
+"""
+
+import fnmatch
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Sequence
+
+from dms_basis import (
+    DEFAULT_UNGUELTIGE_ENDUNGEN,
+    INHALT_KOPF,
+    INHALT_PRAEFIX,
+    INHALT_SIGNATUREN,
+    KONFIG_DATEINAME,
+    programmverzeichnis,
+)
+
+
+# ---------------------------------------------------------------------------
+# Regeln für nicht uploadfähige Dateien
+# ---------------------------------------------------------------------------
+
+def _ist_muster(regel: str) -> bool:
+    return any(zeichen in regel for zeichen in "*?[")
+
+
+def normalisiere_regel(eingabe: str) -> str:
+    """
+    Schreibweise einer Regel wie in der Konfiguration: klein, ohne Leerraum.
+    Ein Eintrag ohne Punkt (``makefile``) bleibt ein Dateiname, Endungen
+    brauchen den Punkt (``.exe``). ValueError bei einer unbekannten Inhaltsprüfung.
+    """
+    regel = eingabe.strip().lower()
+    if regel.startswith(INHALT_PRAEFIX):
+        if regel[len(INHALT_PRAEFIX):] not in INHALT_SIGNATUREN:
+            raise ValueError(f"Unbekannte Inhaltsprüfung: {regel} (bekannt: "
+                             f"{', '.join(INHALT_PRAEFIX + a for a in INHALT_SIGNATUREN)})")
+    return regel
+
+
+def verschiebegrund(regel: str) -> str:
+    """Grund im Logfile: ``ungueltige_endung:.exe``, ``muster:~$*``, ``name:thumbs.db``, ``inhalt:mz``."""
+    if regel.startswith(INHALT_PRAEFIX):
+        return regel
+    if _ist_muster(regel):
+        return f"muster:{regel}"
+    if regel.startswith(".") and len(regel) > 1:
+        return f"ungueltige_endung:{regel}"
+    return f"name:{regel}"
+
+
+def _lies_kopf(pfad: str) -> bytes:
+    try:
+        with open(pfad, "rb", buffering=0) as f:
+            return f.read(INHALT_KOPF)
+    except OSError:
+        return b""  # Nicht lesbar: gilt als uploadfähig, wie ohne Inhaltsprüfung
+
+
+class Dateiregeln:
+    """
+    Übersetzte Regeln für nicht uploadfähige Dateien: Endungen (``.exe``, ``.tar.gz``),
+    Muster (``~$*.docx``), Dateinamen (``thumbs.db``) und Inhaltsprüfungen (``inhalt:mz``).
+    """
+
+    def __init__(self, regeln: Iterable[str]) -> None:
+        self.regeln = frozenset(normalisiere_regel(r) for r in regeln) - {""}
+        self._endungen: dict[str, str] = {}
+        self._namen: dict[str, str] = {}
+        # Länge der Endsilbe → Endsilbe → Länge der Vorsilbe → Vorsilbe → [(regel, ausdruck)]
+        muster: dict[int, dict[str, dict[int, dict[str, list[tuple[str, re.Pattern]]]]]] = {}
+        inhalt: list[tuple[str, bytes, int]] = []
+        for regel in sorted(self.regeln):
+            if regel.startswith(INHALT_PRAEFIX):
+                kopf, mindestgroesse = INHALT_SIGNATUREN[regel[len(INHALT_PRAEFIX):]]
+                inhalt.append((regel, kopf, mindestgroesse))
+            elif _ist_muster(regel):
+                vorsilbe = re.match(r"[^*?\[\]]*", regel).group()
+                endsilbe = re.search(r"[^*?\[\]]*\Z", regel).group()
+                (muster.setdefault(len(endsilbe), {}).setdefault(endsilbe, {})
+                 .setdefault(len(vorsilbe), {}).setdefault(vorsilbe, [])
+                 .append((regel, re.compile(fnmatch.translate(regel)))))
+            elif regel.startswith(".") and len(regel) > 1:
+                self._endungen[regel] = regel
+            else:
+                self._namen[regel] = regel
+        # Längste Endung in Teilen (".tar.gz" = 2): so oft wird je Datei höchstens nachgeschlagen
+        self._max_teile = max((r.count(".") for r in self._endungen), default=0)
+        self._muster = [(laenge, {silbe: sorted(nach_vorsilbe.items())
+                                  for silbe, nach_vorsilbe in nach_endsilbe.items()})
+                        for laenge, nach_endsilbe in sorted(muster.items())]
+        self._nur_endungen = self._max_teile <= 1 and not self._namen and not self._muster
+        self._endungen_ohne_punkt = frozenset(r[1:] for r in self._endungen)
+        self.inhalt = tuple(inhalt)
+        self._inhalt_mindestgroesse = min((m for _, _, m in inhalt), default=0)
+
+    def regel(self, name: str) -> str | None:
+        """Die Namensregel, die ``name`` trifft (z. B. ``.exe``), sonst ``None``."""
+        name = name.lower()
+        if self._namen:
+            regel = self._namen.get(name)
+            if regel is not None:
+                return regel
+        i = name.rfind(".")
+        if 0 < i < len(name) - 1:
+            regel = self._endungen.get(name[i:])
+            if regel is not None:
+                return regel
+            for _ in range(1, self._max_teile):  # mehrteilige Endungen
+                i = name.rfind(".", 0, i)
+                if i <= 0:
+                    break
+                regel = self._endungen.get(name[i:])
+                if regel is not None:
+                    return regel
+        laenge = len(name)
+        for laenge_endsilbe, nach_endsilbe in self._muster:
+            nach_vorsilbe = nach_endsilbe.get(name[laenge - laenge_endsilbe:])
+            if nach_vorsilbe is None:
+                continue
+            for laenge_vorsilbe, kandidaten in nach_vorsilbe:
+                for regel, ausdruck in kandidaten.get(name[:laenge_vorsilbe], ()):
+                    if ausdruck.match(name):
+                        return regel
+        return None
+
+    def regel_fuer_kopf(self, kopf: bytes, groesse: int) -> str | None:
+        """Die Inhaltsregel, deren Dateikopf ``kopf`` beginnt, sonst ``None``."""
+        for regel, signatur, mindestgroesse in self.inhalt:
+            if groesse >= mindestgroesse and kopf.startswith(signatur):
+                return regel
+        return None
+
+    def klassifiziere(
+        self,
+        verz: str,
+        dateien: Sequence[tuple[str, int]],
+        pool: ThreadPoolExecutor | None = None,
+    ) -> list[str | None]:
+        """Regel je Datei ``(name, groesse)`` in ``verz`` (``None``: uploadfähig)."""
+        if self._nur_endungen:  # häufigster Fall: nur einfache Endungen, ohne Methodenaufruf je Datei
+            endungen = self._endungen_ohne_punkt
+            treffer = []
+            for name, _ in dateien:
+                kopf, _, endung = name.rpartition(".")
+                endung = endung.lower()
+                treffer.append("." + endung if kopf and endung in endungen else None)
+        else:
+            treffer = [self.regel(name) for name, _ in dateien]
+        if not self.inhalt:
+            return treffer
+        offen = [i for i, (regel, (_, groesse)) in enumerate(zip(treffer, dateien))
+                 if regel is None and groesse >= self._inhalt_mindestgroesse]
+        if not offen:
+            return treffer
+        pfade = [os.path.join(verz, dateien[i][0]) for i in offen]
+        koepfe = (pool.map(_lies_kopf, pfade) if pool is not None and len(pfade) > 1
+                  else map(_lies_kopf, pfade))
+        for i, kopf in zip(offen, koepfe):
+            treffer[i] = self.regel_fuer_kopf(kopf, dateien[i][1])
+        return treffer
+
+# ---------------------------------------------------------------------------
+# Konfiguration
+# ---------------------------------------------------------------------------
+
+def lade_konfiguration() -> set[str]:
+    """
+    Lädt die Regeln für nicht uploadfähige Dateien (``ungueltige_endungen``)
+    aus der JSON-Konfigurationsdatei; Schreibweise siehe ``Dateiregeln``.
+    Unbekannte Inhaltsprüfungen werden übergangen.
+    """
+    konfig_pfad = programmverzeichnis() / KONFIG_DATEINAME
+    try:
+        if konfig_pfad.exists():
+            with open(konfig_pfad, "r", encoding="utf-8") as f:
+                daten = json.load(f)
+            endungen = set()
+            for eintrag in daten.get("ungueltige_endungen", []):
+                try:
+                    regel = normalisiere_regel(eintrag)
+                except ValueError:
+                    continue
+                if regel:
+                    endungen.add(regel)
+            if endungen:
+                return endungen
+    except (json.JSONDecodeError, OSError):
+        pass
+    return set(DEFAULT_UNGUELTIGE_ENDUNGEN)
+
+
+def speichere_konfiguration(ungueltige_endungen: set[str]) -> None:
+    """Schreibt die Endungen als JSON in die Konfigurationsdatei."""
+    konfig_pfad = programmverzeichnis() / KONFIG_DATEINAME
+    daten = {"ungueltige_endungen": sorted(ungueltige_endungen)}
+    with open(konfig_pfad, "w", encoding="utf-8") as f:
+        json.dump(daten, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,823 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Scan
+==============================
+Durchlauf des Quellordners mit Scan-Index und Verschiebeplan.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+from dms_basis import (
+    STANDARD_HASH_WORKER,
+    STANDARD_SCAN_WORKER,
+    STANDARD_VERSCHIEBE_WORKER,
+    Fortschritt,
+    Laufstatistik,
+    _liegt_in,
+    _normpfad,
+    _quellwurzelname,
+    messe_stufe,
+)
+from dms_daten import DateiTabelle, OrdnerKnoten
+from dms_journal import LogSchreiber, Verschiebejournal, Verschieber, _verschiebe_aus_journal
+from dms_regeln import Dateiregeln, verschiebegrund
+
+# ---------------------------------------------------------------------------
+# Verzeichnisdurchlauf
+# ---------------------------------------------------------------------------
+
+def _liste_verzeichnis(
+    verz: str, laufstatistik: "Laufstatistik | None" = None, mtimes: dict[str, int] | None = None
+) -> tuple[list[tuple[str, int]], list[str]] | None:
+    """
+    Listet ein Verzeichnis als ``(dateien, unterordner)``: ``[(name, groesse)]`` und volle
+    Pfade ohne Verzeichnis-Symlinks; ``None``, wenn es nicht lesbar ist.
+    """
+    try:
+        with os.scandir(verz) as it:
+            eintraege = list(it)
+    except OSError:
+        return None  # Wie os.walk: nicht lesbare Ordner still überspringen
+
+    dateien: list[tuple[str, int]] = []
+    unterordner: list[str] = []
+    for eintrag in eintraege:
+        try:
+            ist_ordner = eintrag.is_dir()
+        except OSError:
+            ist_ordner = False
+        if not ist_ordner:
+            try:
+                st = eintrag.stat()
+                groesse = st.st_size
+                if mtimes is not None:
+                    mtimes[eintrag.name] = st.st_mtime_ns
+            except OSError:
+                groesse = 0
+            dateien.append((eintrag.name, groesse))
+            continue
+        try:
+            if eintrag.is_symlink():
+                continue
+        except OSError:
+            pass
+        unterordner.append(eintrag.path)
+    if laufstatistik is not None:
+        laufstatistik.zaehle_stat(len(dateien))  # ein stat() pro Datei
+    return dateien, unterordner
+
+
+def _durchlaufe_verzeichnisse(
+    quellpfad: Path,
+    zielbasis: Path,
+    scan_worker: int = 1,
+    scan_index: "ScanIndex | None" = None,
+    laufstatistik: "Laufstatistik | None" = None,
+) -> Iterator[tuple[str, list[tuple[str, int]]]]:
+    """
+    Durchläuft den Quellordner mit einem ``os.scandir``-Stack in ``os.walk``-Reihenfolge.
+    Liefert pro Verzeichnis ``(verzeichnispfad, [(name, groesse), ...])``, ohne die Zielbasis.
+    """
+    ziel_norm = _normpfad(zielbasis)
+    wurzel = str(quellpfad)
+    if _liegt_in(_normpfad(wurzel), ziel_norm):
+        return
+
+    if scan_index is not None:
+        scan_index.laufstatistik = laufstatistik
+        listen = scan_index.liste_verzeichnis
+    elif laufstatistik is not None:
+        def listen(verz: str) -> tuple[list[tuple[str, int]], list[str]] | None:
+            return _liste_verzeichnis(verz, laufstatistik)
+    else:
+        listen = _liste_verzeichnis
+
+    if scan_worker > 1:
+        yield from _durchlaufe_verzeichnisse_parallel(wurzel, ziel_norm, scan_worker, listen)
+        return
+
+    stapel: list[str] = [wurzel]
+    while stapel:
+        verz = stapel.pop()
+        listing = listen(verz)
+        if listing is None:
+            continue
+        dateien, unterordner = listing
+        yield verz, dateien
+        stapel.extend(uo for uo in reversed(unterordner) if _normpfad(uo) != ziel_norm)
+
+
+def _durchlaufe_verzeichnisse_parallel(
+    wurzel: str,
+    ziel_norm: str,
+    scan_worker: int,
+    listen: Callable[[str], tuple[list[tuple[str, int]], list[str]] | None],
+) -> Iterator[tuple[str, list[tuple[str, int]]]]:
+    """Wie ``_durchlaufe_verzeichnisse``, die Listings laufen aber in ``scan_worker`` Threads."""
+    pool = ThreadPoolExecutor(max_workers=scan_worker, thread_name_prefix="scan")
+
+    def aufgabe(verz: str) -> tuple[str, list[tuple[str, int]], list[Future]] | None:
+        listing = listen(verz)
+        if listing is None:
+            return None
+        dateien, unterordner = listing
+        kinder: list[Future] = []
+        for uo in unterordner:
+            if _normpfad(uo) == ziel_norm:
+                continue  # Zielbasis samt Unterbaum nicht betreten
+            try:
+                kinder.append(pool.submit(aufgabe, uo))
+            except RuntimeError:
+                break  # Pool wurde beendet (Abbruch durch den Aufrufer)
+        return verz, dateien, kinder
+
+    try:
+        stapel: list[Future] = [pool.submit(aufgabe, wurzel)]
+        while stapel:
+            ergebnis = stapel.pop().result()
+            if ergebnis is None:
+                continue
+            verz, dateien, kinder = ergebnis
+            yield verz, dateien
+            stapel.extend(reversed(kinder))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Scan-Index (inkrementeller Scan)
+# ---------------------------------------------------------------------------
+
+SCAN_INDEX_VERSION = 1  # PRAGMA user_version; andere Versionen werden neu aufgebaut
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verzeichnisse (
+    pfad     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS eintraege (
+    verzeichnis TEXT NOT NULL,
+    nr          INTEGER NOT NULL,
+    name        TEXT NOT NULL,
+    groesse     INTEGER,          -- NULL = Unterordner
+    PRIMARY KEY (verzeichnis, nr)
+) WITHOUT ROWID;
+"""
+
+
+class ScanIndex:
+    """
+    Persistenter Scan-Index (SQLite): nur Verzeichnisse mit geänderter mtime werden neu gelistet.
+    ``pruefen=True`` prüft die gecachten Größen per stat; eine beschädigte oder veraltete
+    Indexdatei wird neu angelegt.
+    """
+
+    def __init__(self, pfad: Path, pruefen: bool = False, verwerfen: bool = False) -> None:
+        self.pfad = pfad
+        self.pruefen = pruefen
+        self.verwerfen = verwerfen
+        try:
+            self._db = self._oeffne(pfad)
+        except sqlite3.OperationalError:
+            raise  # z. B. gesperrt: nicht löschen
+        except sqlite3.DatabaseError:
+            pfad.unlink(missing_ok=True)
+            self._db = self._oeffne(pfad)
+        self._sperre = threading.Lock()
+        self._wurzel = ""
+        self._cache: dict[str, tuple[int, list[tuple[str, int]], list[str]]] = {}
+        self._besucht: set[str] = set()
+        self._geaendert: dict[str, tuple[int, list[tuple[str, int]], list[str]]] = {}
+        self.aus_cache = 0
+        self.neu_gelistet = 0
+        self.groessen_korrigiert = 0
+        self.laufstatistik: Laufstatistik | None = None
+
+    @staticmethod
+    def _oeffne(pfad: Path) -> sqlite3.Connection:
+        """Öffnet den Index; ``DatabaseError`` bei fremdem Inhalt oder anderer Version."""
+        db = sqlite3.connect(str(pfad))
+        try:
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            if (version != SCAN_INDEX_VERSION
+                    and db.execute("SELECT 1 FROM sqlite_master").fetchone() is not None):
+                raise sqlite3.DatabaseError(f"Scan-Index-Version {version}")
+            db.executescript(_INDEX_SCHEMA)
+            db.execute(f"PRAGMA user_version = {SCAN_INDEX_VERSION}")
+        except BaseException:
+            db.close()
+            raise
+        return db
+
+    @staticmethod
+    def _praefix_bedingung(spalte: str, wurzel: str) -> tuple[str, tuple]:
+        """SQL-Bedingung „liegt in ``wurzel``“ ohne LIKE (Pfade enthalten ``_``/``%``)."""
+        praefix = wurzel.rstrip("\\/") + os.sep
+        return (f"({spalte} = ? OR substr({spalte}, 1, ?) = ?)",
+                (wurzel, len(praefix), praefix))
+
+    def lade(self, wurzel: str) -> None:
+        """Liest alle Index-Einträge unterhalb von ``wurzel`` in den Speicher."""
+        self._wurzel = wurzel
+        self._cache = {}
+        self._besucht = set()
+        self._geaendert = {}
+        self.aus_cache = self.neu_gelistet = self.groessen_korrigiert = 0
+
+        if self.verwerfen:
+            self._loesche_unterhalb(wurzel)
+            return
+
+        bedingung, parameter = self._praefix_bedingung("pfad", wurzel)
+        for pfad, mtime_ns in self._db.execute(
+            f"SELECT pfad, mtime_ns FROM verzeichnisse WHERE {bedingung}", parameter
+        ):
+            self._cache[pfad] = (mtime_ns, [], [])
+
+        bedingung, parameter = self._praefix_bedingung("verzeichnis", wurzel)
+        for verz, name, groesse in self._db.execute(
+            f"SELECT verzeichnis, name, groesse FROM eintraege WHERE {bedingung} "
+            f"ORDER BY verzeichnis, nr", parameter
+        ):
+            eintrag = self._cache.get(verz)
+            if eintrag is None:
+                continue
+            if groesse is None:
+                eintrag[2].append(os.path.join(verz, name))
+            else:
+                eintrag[1].append((name, groesse))
+
+    def _loesche_unterhalb(self, wurzel: str) -> None:
+        with self._db:
+            bedingung, parameter = self._praefix_bedingung("pfad", wurzel)
+            self._db.execute(f"DELETE FROM verzeichnisse WHERE {bedingung}", parameter)
+            bedingung, parameter = self._praefix_bedingung("verzeichnis", wurzel)
+            self._db.execute(f"DELETE FROM eintraege WHERE {bedingung}", parameter)
+
+    def liste_verzeichnis(self, verz: str) -> tuple[list[tuple[str, int]], list[str]] | None:
+        """Wie ``_liste_verzeichnis``, aber aus dem Index, solange die mtime passt."""
+        try:
+            mtime_ns = os.stat(verz).st_mtime_ns
+        except OSError:
+            return None
+
+        if self.laufstatistik is not None:
+            self.laufstatistik.zaehle_stat(1)
+
+        treffer = self._cache.get(verz)
+        if treffer is not None and treffer[0] == mtime_ns:
+            dateien, unterordner = treffer[1], treffer[2]
+            korrigiert = 0
+            if self.pruefen:
+                if self.laufstatistik is not None:
+                    self.laufstatistik.zaehle_stat(len(dateien))
+                geprueft = self._pruefe_groessen(verz, dateien)
+                if geprueft is None:
+                    treffer = None
+                else:
+                    dateien, korrigiert = geprueft
+            if treffer is not None:
+                with self._sperre:
+                    self._besucht.add(verz)
+                    self.aus_cache += 1
+                    if korrigiert:
+                        self.groessen_korrigiert += korrigiert
+                        self._geaendert[verz] = (mtime_ns, dateien, unterordner)
+                return dateien, unterordner
+
+        listing = _liste_verzeichnis(verz, self.laufstatistik)
+        with self._sperre:
+            self.neu_gelistet += 1
+            if listing is not None:
+                self._besucht.add(verz)
+                self._geaendert[verz] = (mtime_ns, listing[0], listing[1])
+        return listing
+
+    @staticmethod
+    def _pruefe_groessen(
+        verz: str, dateien: list[tuple[str, int]]
+    ) -> tuple[list[tuple[str, int]], int] | None:
+        """Aktualisiert gecachte Größen per stat; ``None``, wenn eine Datei fehlt."""
+        geprueft: list[tuple[str, int]] = []
+        korrigiert = 0
+        for name, groesse in dateien:
+            try:
+                aktuell = os.stat(os.path.join(verz, name)).st_size
+            except FileNotFoundError:
+                return None  # Listing veraltet → neu listen
+            except OSError:
+                aktuell = 0
+            if aktuell != groesse:
+                korrigiert += 1
+            geprueft.append((name, aktuell))
+        return geprueft, korrigiert
+
+    def speichere(self) -> None:
+        """Schreibt geänderte Verzeichnisse zurück und entfernt verschwundene."""
+        veraltet = [p for p in self._cache if p not in self._besucht]
+        veraltet.extend(self._geaendert)
+        with self._db:
+            self._db.executemany("DELETE FROM verzeichnisse WHERE pfad = ?",
+                                 ((p,) for p in veraltet))
+            self._db.executemany("DELETE FROM eintraege WHERE verzeichnis = ?",
+                                 ((p,) for p in veraltet))
+            self._db.executemany(
+                "INSERT INTO verzeichnisse (pfad, mtime_ns) VALUES (?, ?)",
+                ((p, e[0]) for p, e in self._geaendert.items()),
+            )
+            self._db.executemany(
+                "INSERT INTO eintraege (verzeichnis, nr, name, groesse) VALUES (?, ?, ?, ?)",
+                self._zeilen_geaendert(),
+            )
+
+    def _zeilen_geaendert(self) -> Iterator[tuple[str, int, str, int | None]]:
+        for verz, (_, dateien, unterordner) in self._geaendert.items():
+            nr = 0
+            for name, groesse in dateien:
+                yield verz, nr, name, groesse
+                nr += 1
+            for uo in unterordner:
+                yield verz, nr, os.path.basename(uo), None
+                nr += 1
+
+    def statistik(self) -> dict:
+        return {
+            "aus_cache": self.aus_cache,
+            "neu_gelistet": self.neu_gelistet,
+            "groessen_korrigiert": self.groessen_korrigiert,
+            "geprueft": self.pruefen,
+            "verworfen": self.verwerfen,
+        }
+
+    def schliesse(self) -> None:
+        self._db.close()
+
+
+# ---------------------------------------------------------------------------
+# Verschiebeplan (Trockenlauf speichern und später ohne neuen Scan anwenden)
+# ---------------------------------------------------------------------------
+
+VERSCHIEBEPLAN_VERSION = 1
+
+_PLAN_SCHEMA = """
+CREATE TABLE meta (
+    schluessel TEXT PRIMARY KEY,
+    wert       TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE verzeichnisse (
+    nr       INTEGER PRIMARY KEY,   -- Nummer in der Dateitabelle (Tiefensuche)
+    pfad     TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE verschiebungen (
+    nr             INTEGER PRIMARY KEY,
+    verzeichnis_nr INTEGER NOT NULL,
+    name           TEXT NOT NULL,
+    groesse        INTEGER NOT NULL,
+    mtime_ns       INTEGER NOT NULL,
+    ziel           TEXT NOT NULL
+);
+CREATE TABLE tabelle (
+    spalte TEXT PRIMARY KEY,
+    daten  BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class Verschiebeplan:
+    """
+    Ergebnis eines Trockenlaufs zum späteren Anwenden ohne neuen Scan.
+    Beim Anwenden werden nur Verzeichnisse mit geänderter mtime neu gelistet; geänderte
+    Dateien werden mit aktueller Größe verschoben (``streng=True``: übersprungen).
+    """
+
+    def __init__(self, quellpfad: Path, zielbasis: Path, ungueltige_endungen: set[str]) -> None:
+        self.quellpfad = quellpfad
+        self.zielbasis = zielbasis
+        self.ungueltige_endungen = set(ungueltige_endungen)
+        self.regeln = Dateiregeln(self.ungueltige_endungen)
+        self.erstellt = ""
+        self.streng = False
+        self.pruefen = False
+        self.laufstatistik: Laufstatistik | None = None
+        self.abweichungen: list[tuple[str, str, str, int]] = []  # (aktion, grund, pfad, groesse)
+        self._sperre = threading.Lock()
+        # Erfassen (Trockenlauf): Ordner-mtimes (bzw. das laufende stat), Datei-mtimes
+        # eines Ordners bis zu seiner Klassifizierung, nicht lesbare Ordner (Elternordner)
+        self._mtimes: dict[str, int | Future] = {}
+        self._datei_mtimes: dict[str, dict[str, int]] = {}
+        self._ungueltig: dict[str, list[tuple[str, int, int]]] = {}
+        self._unlesbar_in: set[str] = set()
+        self._stat_pool: ThreadPoolExecutor | None = None
+        # Anwenden: verz → (mtime_ns, gültige Dateien, geplante Verschiebungen, Unterordner)
+        self._plan: dict[str, tuple[int, list[tuple[str, int]], list[tuple[str, int, int]],
+                                    list[str]]] | None = None
+        self._zaehler = dict.fromkeys(
+            ("verzeichnisse_aus_plan", "verzeichnisse_neu_gelistet", "verschiebungen_geprueft",
+             "verschiebungen_geaendert", "verschiebungen_fehlend", "verschiebungen_verweigert"), 0)
+
+    # ----- Protokoll wie ScanIndex (lade/liste_verzeichnis/speichere/statistik) -----
+
+    def liste_verzeichnis(self, verz: str) -> tuple[list[tuple[str, int]], list[str]] | None:
+        if self._plan is None:
+            return self._erfasse(verz)
+        try:
+            mtime_ns = os.stat(verz).st_mtime_ns
+        except OSError:
+            return None
+        if self.laufstatistik is not None:
+            self.laufstatistik.zaehle_stat(1)
+
+        geplant = self._plan.get(verz)
+        if geplant is None or geplant[0] != mtime_ns:
+            with self._sperre:
+                self._zaehler["verzeichnisse_neu_gelistet"] += 1
+            return _liste_verzeichnis(verz, self.laufstatistik)
+
+        _, dateien, verschiebungen, unterordner = geplant
+        if self.pruefen:
+            if self.laufstatistik is not None:
+                self.laufstatistik.zaehle_stat(len(dateien))
+            geprueft = ScanIndex._pruefe_groessen(verz, dateien)
+            if geprueft is None:
+                with self._sperre:
+                    self._zaehler["verzeichnisse_neu_gelistet"] += 1
+                return _liste_verzeichnis(verz, self.laufstatistik)
+            dateien = geprueft[0]
+        dateien = list(dateien)
+        abweichungen: list[tuple[str, str, str, int]] = []
+        zaehler = dict.fromkeys(("verschiebungen_geaendert", "verschiebungen_fehlend",
+                                 "verschiebungen_verweigert"), 0)
+        for name, groesse, mtime_datei in verschiebungen:
+            pfad = os.path.join(verz, name)
+            try:
+                st = os.stat(pfad)
+            except OSError:
+                zaehler["verschiebungen_fehlend"] += 1
+                abweichungen.append(("uebersprungen", "nicht_mehr_vorhanden", pfad, groesse))
+                continue
+            if st.st_size != groesse or st.st_mtime_ns != mtime_datei:
+                zaehler["verschiebungen_geaendert"] += 1
+                if self.streng:
+                    zaehler["verschiebungen_verweigert"] += 1
+                    abweichungen.append(("uebersprungen", "geaendert_seit_plan", pfad,
+                                         st.st_size))
+                    continue
+            dateien.append((name, st.st_size))
+        if self.laufstatistik is not None:
+            self.laufstatistik.zaehle_stat(len(verschiebungen))
+        with self._sperre:
+            self._zaehler["verzeichnisse_aus_plan"] += 1
+            self._zaehler["verschiebungen_geprueft"] += len(verschiebungen)
+            for schluessel, anzahl in zaehler.items():
+                self._zaehler[schluessel] += anzahl
+            self.abweichungen.extend(abweichungen)
+        return dateien, unterordner
+
+    def _erfasse(self, verz: str) -> tuple[list[tuple[str, int]], list[str]] | None:
+        """Trockenlauf: normal listen und die mtimes des Ordners und seiner Dateien festhalten."""
+        with self._sperre:
+            mtime_ns = self._mtimes.get(verz)
+        if isinstance(mtime_ns, Future):
+            mtime_ns = mtime_ns.result()
+        elif mtime_ns is None:
+            mtime_ns = self._stat_mtime(verz)
+        listing = None
+        if mtime_ns is not None:
+            datei_mtimes: dict[str, int] = {}
+            listing = _liste_verzeichnis(verz, self.laufstatistik, datei_mtimes)
+        with self._sperre:
+            if listing is None:
+                self._unlesbar_in.add(os.path.dirname(verz))
+                return None
+            self._mtimes[verz] = mtime_ns
+            self._datei_mtimes[verz] = datei_mtimes
+            if self._stat_pool is not None:
+                for uo in listing[1]:
+                    self._mtimes[uo] = self._stat_pool.submit(self._stat_mtime, uo)
+        return listing
+
+    def _stat_mtime(self, verz: str) -> int | None:
+        try:
+            mtime_ns = os.stat(verz).st_mtime_ns
+        except OSError:
+            return None
+        if self.laufstatistik is not None:
+            self.laufstatistik.zaehle_stat(1)
+        return mtime_ns
+
+    def erfasse_verschiebungen(self, verz: str, ungueltig: list[tuple[str, int]]) -> None:
+        """Trockenlauf: die vom Scan als ungültig erkannten Dateien eines Ordners (Name, Größe)."""
+        with self._sperre:
+            datei_mtimes = self._datei_mtimes.pop(verz, {})
+            if ungueltig:
+                self._ungueltig[verz] = [(name, groesse, datei_mtimes.get(name, 0))
+                                         for name, groesse in ungueltig]
+
+    def lade(self, wurzel: str) -> None:
+        self.abweichungen = []
+        for schluessel in self._zaehler:
+            self._zaehler[schluessel] = 0
+        if self._plan is None and self._stat_pool is None:
+            self._stat_pool = ThreadPoolExecutor(max_workers=STANDARD_SCAN_WORKER,
+                                                 thread_name_prefix="planstat")
+
+    def beende_scan(self) -> None:
+        """Beendet die Hintergrund-stats des Erfassens (nach dem Durchlauf)."""
+        if self._stat_pool is not None:
+            self._stat_pool.shutdown(wait=True, cancel_futures=True)
+            self._stat_pool = None
+
+    def speichere(self) -> None:
+        pass  # Der Plan selbst wird nur mit ``speichere_datei`` geschrieben
+
+    def statistik(self) -> dict:
+        return dict(self._zaehler)
+
+    # ----- Datei -----
+
+    def speichere_datei(self, pfad: Path, gueltige_dateien: "DateiTabelle") -> None:
+        """
+        Schreibt den erfassten Trockenlauf; ``gueltige_dateien`` ist die
+        Dateitabelle aus demselben Scan. Eine vorhandene Datei wird ersetzt.
+        """
+        quellwurzelname = _quellwurzelname(self.quellpfad)
+        temp = pfad.with_name(pfad.name + ".tmp")
+        temp.unlink(missing_ok=True)
+        db = sqlite3.connect(str(temp))
+        try:
+            with db:
+                db.executescript(_PLAN_SCHEMA)
+                db.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ("version", str(VERSCHIEBEPLAN_VERSION)),
+                    ("erstellt", datetime.now().isoformat(timespec="seconds")),
+                    ("quellpfad", str(self.quellpfad)),
+                    ("zielbasis", str(self.zielbasis)),
+                    ("ungueltige_endungen", json.dumps(sorted(self.ungueltige_endungen))),
+                    ("byteorder", sys.byteorder),
+                ])
+                db.executemany(
+                    "INSERT INTO verzeichnisse VALUES (?, ?, ?)",
+                    ((nr, verz, -1 if verz in self._unlesbar_in else self._mtimes.get(verz, -1))
+                     for nr, verz in enumerate(gueltige_dateien.verzeichnisse)))
+                db.executemany(
+                    "INSERT INTO verschiebungen (verzeichnis_nr, name, groesse, mtime_ns, ziel) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    ((nr, name, groesse, mtime_datei,
+                      str(self.zielbasis / quellwurzelname
+                          / Path(os.path.join(verz, name)).relative_to(self.quellpfad)))
+                     for nr, verz in enumerate(gueltige_dateien.verzeichnisse)
+                     for name, groesse, mtime_datei in self._ungueltig.get(verz, ())))
+                db.executemany("INSERT INTO tabelle VALUES (?, ?)",
+                               gueltige_dateien.spalten().items())
+        finally:
+            db.close()
+        os.replace(temp, pfad)
+
+    @classmethod
+    def lade_datei(cls, pfad: Path, streng: bool = False, pruefen: bool = False) -> "Verschiebeplan":
+        """Liest einen gespeicherten Plan; ``ValueError`` bei fremdem Format."""
+        db = sqlite3.connect(f"file:{pfad}?mode=ro", uri=True)
+        try:
+            try:
+                meta = dict(db.execute("SELECT schluessel, wert FROM meta"))
+            except sqlite3.DatabaseError as ex:
+                raise ValueError(f"Kein Verschiebeplan: {pfad} ({ex})") from None
+            if meta.get("version") != str(VERSCHIEBEPLAN_VERSION):
+                raise ValueError(f"Verschiebeplan-Version {meta.get('version')} wird nicht "
+                                 f"unterstützt: {pfad}")
+            plan = cls(Path(meta["quellpfad"]), Path(meta["zielbasis"]),
+                       set(json.loads(meta["ungueltige_endungen"])))
+            plan.erstellt = meta["erstellt"]
+            plan.streng = streng
+            plan.pruefen = pruefen
+            verzeichnisse = [(p, m) for p, m in
+                             db.execute("SELECT pfad, mtime_ns FROM verzeichnisse ORDER BY nr")]
+            tabelle = DateiTabelle.aus_spalten(
+                [p for p, _ in verzeichnisse], dict(db.execute("SELECT spalte, daten FROM tabelle")),
+                tausche_bytes=meta.get("byteorder") != sys.byteorder)
+            verschiebungen: dict[int, list[tuple[str, int, int]]] = {}
+            for nr, name, groesse, mtime_ns in db.execute(
+                    "SELECT verzeichnis_nr, name, groesse, mtime_ns FROM verschiebungen ORDER BY nr"):
+                verschiebungen.setdefault(nr, []).append((name, groesse, mtime_ns))
+        finally:
+            db.close()
+
+        # Dateien je Verzeichnis (Zeilen liegen zusammenhängend) und Unterordner
+        dateien: list[list[tuple[str, int]]] = [[] for _ in verzeichnisse]
+        for i, (verz_nr, groesse) in enumerate(zip(tabelle.verz, tabelle.groessen)):
+            dateien[verz_nr].append((tabelle.name(i), groesse))
+        unterordner: dict[str, list[str]] = {}
+        for verz, _ in verzeichnisse[1:]:
+            unterordner.setdefault(os.path.dirname(verz), []).append(verz)
+        plan._plan = {
+            verz: (mtime_ns, dateien[nr], verschiebungen.get(nr, []), unterordner.get(verz, []))
+            for nr, (verz, mtime_ns) in enumerate(verzeichnisse)
+        }
+        return plan
+
+    @property
+    def geladen(self) -> bool:
+        """``True`` für einen mit ``lade_datei`` gelesenen (anzuwendenden) Plan."""
+        return self._plan is not None
+
+    def anzahl_verschiebungen(self) -> int:
+        """Geplante Verschiebungen (nur für einen geladenen Plan)."""
+        return sum(len(e[2]) for e in (self._plan or {}).values())
+
+# ---------------------------------------------------------------------------
+# Scan & Verschieben
+# ---------------------------------------------------------------------------
+
+def scanne_quellordner(
+    quellpfad: Path,
+    zielbasis: Path,
+    ungueltige_endungen: set[str],
+    trockenlauf: bool,
+    scan_worker: int = 1,
+    scan_index: ScanIndex | None = None,
+    fortschritt: Fortschritt | None = None,
+    verschiebe_worker: int = STANDARD_VERSCHIEBE_WORKER,
+    log_zusatz: str = "",
+    laufstatistik: Laufstatistik | None = None,
+    verschiebeplan: Verschiebeplan | None = None,
+    journal: Verschiebejournal | None = None,
+    teilbaum_fertig: Callable[["OrdnerKnoten"], None] | None = None,
+    inhalt_worker: int = STANDARD_HASH_WORKER,
+) -> dict:
+    """
+    Scannt den Quellordner rekursiv.
+    Verschiebt (oder simuliert) ungültige Dateien und sammelt gültige Dateien.
+    Schreibt das Logfile laufend mit.
+
+    Rückgabe: dict mit Schlüsseln:
+        - gueltige_dateien: DateiTabelle  (iteriert als (Path, Größe))
+        - anzahl_ungueltig: int
+        - logdatei: Path | None
+        - fehler: list[str]
+        - index_statistik: dict | None  (nur mit scan_index)
+        - plan_statistik: dict | None  (nur beim Anwenden eines Verschiebeplans)
+        - ordnerbaum: OrdnerKnoten  (gültige Dateien als Baum, Größen noch nicht aggregiert)
+        - abgebrochen: bool
+    """
+    zeitstempel = datetime.now().strftime("%Y%m%d_%H%M%S")
+    zusatz = f"_{log_zusatz}" if log_zusatz else ""
+    logdatei = zielbasis / f"NichtUploadfaehig_Log_{zeitstempel}{zusatz}.txt"
+    quellwurzelname = _quellwurzelname(quellpfad)
+
+    gueltige_dateien = DateiTabelle()
+    fehler: list[str] = []
+    anzahl_ungueltig = 0
+    regeln = Dateiregeln(ungueltige_endungen)
+    inhaltspool = (ThreadPoolExecutor(max_workers=max(1, inhalt_worker), thread_name_prefix="inhalt")
+                   if regeln.inhalt else None)
+
+    log = LogSchreiber(logdatei)
+    log.oeffne()
+    if trockenlauf:
+        journal = None
+    verschieber = Verschieber(zielbasis, log, fehler, verschiebe_worker, laufstatistik, journal)
+    geplant: list[tuple[str, str, str, int]] = []  # (quelle, ziel, regel, groesse) mit Journal
+    journal_begonnen = False
+
+    erfassen = verschiebeplan is not None and not verschiebeplan.geladen
+    if verschiebeplan is not None:
+        verschiebeplan.lade(str(quellpfad))
+        scan_index = None
+    elif scan_index is not None:
+        with messe_stufe(laufstatistik, "index"):
+            scan_index.lade(str(quellpfad))
+
+    wurzel_str = str(quellpfad)
+    ordnerbaum = OrdnerKnoten(quellpfad.name, wurzel_str)
+    knoten_nach_pfad: dict[str, OrdnerKnoten] = {wurzel_str: ordnerbaum}
+
+    abgebrochen = False
+    teilbaum: OrdnerKnoten | None = None  # Ordner der obersten Ebene, der gerade läuft
+    durchlauf = _durchlaufe_verzeichnisse(quellpfad, zielbasis, scan_worker,
+                                          verschiebeplan or scan_index, laufstatistik)
+    with messe_stufe(laufstatistik, "scan"):
+        try:
+            for verz, dateien in durchlauf:
+                knoten = knoten_nach_pfad.get(verz)
+                if knoten is None:
+                    # Tiefensuche: der Elternordner wurde immer schon geliefert
+                    eltern = knoten_nach_pfad[os.path.dirname(verz)]
+                    knoten = eltern.neues_kind(os.path.basename(verz), verz)
+                    knoten_nach_pfad[verz] = knoten
+                    if eltern is ordnerbaum and teilbaum_fertig is not None:
+                        # Tiefensuche: der vorige Unterbaum ist damit vollständig
+                        if teilbaum is not None:
+                            teilbaum_fertig(teilbaum)
+                        teilbaum = knoten
+                if fortschritt is not None:
+                    fortschritt.neues_verzeichnis(verz)
+                if laufstatistik is not None:
+                    laufstatistik.ordner += 1
+                    laufstatistik.dateien += len(dateien)
+                verz_nr = gueltige_dateien.verzeichnis_nr(verz)
+                anfang = len(gueltige_dateien)
+                ungueltig_hier: list[tuple[str, int]] = []
+
+                for (name, groesse), regel in zip(dateien, regeln.klassifiziere(verz, dateien,
+                                                                                inhaltspool)):
+                    if fortschritt is not None and not fortschritt.datei(groesse):
+                        abgebrochen = True
+                        break
+
+                    if regel is not None:
+                        anzahl_ungueltig += 1
+                        if erfassen:
+                            ungueltig_hier.append((name, groesse))
+                        datei = Path(os.path.join(verz, name))
+                        relativ = datei.relative_to(quellpfad)
+                        zielpfad = zielbasis / quellwurzelname / relativ
+
+                        if trockenlauf:
+                            log.schreibe("wuerde_verschieben", verschiebegrund(regel),
+                                         datei, zielpfad, groesse)
+                        elif journal is not None:
+                            geplant.append((str(datei), str(zielpfad), regel, groesse))
+                        else:
+                            with messe_stufe(laufstatistik, "verschieben"):
+                                verschieber.verschiebe(verz, datei, zielpfad, regel, groesse)
+                    else:
+                        gueltige_dateien.anhaengen(verz_nr, name, groesse)
+
+                knoten.dateien = gueltige_dateien.ausschnitt(anfang, len(gueltige_dateien))
+                if erfassen:
+                    verschiebeplan.erfasse_verschiebungen(verz, ungueltig_hier)
+                if abgebrochen:
+                    break
+
+            if teilbaum is not None and not abgebrochen:
+                teilbaum_fertig(teilbaum)
+
+            if geplant and not abgebrochen:
+                # Alles geplant: erst ins Journal, dann verschieben. Die
+                # Abweichungen des Verschiebeplans stehen dabei vorn im Log.
+                protokolliert = []
+                if verschiebeplan is not None:
+                    zeit = log.zeitstempel()
+                    for aktion, grund, pfad, groesse in verschiebeplan.abweichungen:
+                        log.schreibe(aktion, grund, pfad, "-", groesse, zeit)
+                        protokolliert.append((aktion, grund, str(pfad), groesse, zeit))
+                with messe_stufe(laufstatistik, "verschieben"):
+                    journal.beginne(quellpfad, zielbasis, ungueltige_endungen, logdatei,
+                                    gueltige_dateien, anzahl_ungueltig, fehler,
+                                    protokolliert, geplant)
+                    journal_begonnen = True
+                    geplant.clear()
+                    abgebrochen = _verschiebe_aus_journal(journal, verschieber, fortschritt)
+        finally:
+            durchlauf.close()  # Beendet ggf. den Thread-Pool des parallelen Scans
+            if erfassen:
+                verschiebeplan.beende_scan()
+            if inhaltspool is not None:
+                inhaltspool.shutdown(wait=True)
+            with messe_stufe(None if trockenlauf else laufstatistik, "verschieben"):
+                verschieber.schliesse()  # Laufende Kopien abschließen und protokollieren
+            if journal_begonnen:
+                journal.schliesse()  # Bei einer Ausnahme bleibt es zum Fortsetzen liegen
+            elif verschiebeplan is not None:
+                for aktion, grund, pfad, groesse in verschiebeplan.abweichungen:
+                    log.schreibe(aktion, grund, pfad, "-", groesse)
+            log.schliesse()  # Auch bei Ausnahmen: bisherige Zeilen landen im Log
+
+    if journal_begonnen:
+        journal.entferne()  # Regulär beendet (auch nach Abbruch): nichts fortzusetzen
+        if journal.fehler:
+            fehler.append(journal.fehler)
+
+    index_statistik = None
+    if scan_index is not None and not abgebrochen:
+        try:
+            with messe_stufe(laufstatistik, "index"):
+                scan_index.speichere()
+        except sqlite3.Error as ex:
+            fehler.append(f"Scan-Index konnte nicht gespeichert werden: {ex}")
+        index_statistik = scan_index.statistik()
+
+    if log.fehler:
+        fehler.append(log.fehler)
+        logdatei = None
+
+    return {
+        "gueltige_dateien": gueltige_dateien,
+        "anzahl_ungueltig": anzahl_ungueltig,
+        "logdatei": logdatei,
+        "fehler": fehler,
+        "index_statistik": index_statistik,
+        "plan_statistik": (verschiebeplan.statistik()
+                           if verschiebeplan is not None and verschiebeplan.geladen else None),
+        "ordnerbaum": ordnerbaum,
+        "abgebrochen": abgebrochen,
+    }
@@ -0,0 +1,546 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – Upload
+================================
+HTTP-Upload der Pakete (Schnittstelle: ``benchmarks/ersatz_dms.py``)
+und Upload-Zeitplan.
+"""
+
+import hashlib
+import heapq
+import http.client
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from dms_basis import (
+    STANDARD_UPLOAD_RATE,
+    STANDARD_UPLOAD_VERBINDUNGEN,
+    STANDARD_UPLOAD_VERSUCHE,
+    UPLOAD_BLOCK,
+    Fortschritt,
+    _arbeite_parallel,
+    _quellwurzelname,
+    formatiere_groesse,
+)
+from dms_daten import OrdnerKnoten
+from dms_pakete import paket_id
+
+
+# ---------------------------------------------------------------------------
+# Upload (HTTP)
+# ---------------------------------------------------------------------------
+
+UPLOADZUSTAND_VERSION = 1
+UPLOAD_PAUSE_S = 0.5  # Wartezeit vor der ersten Wiederholung, danach verdoppelt
+UPLOAD_PAUSE_MAX_S = 30.0
+
+_UPLOADZUSTAND_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (schluessel TEXT PRIMARY KEY, wert TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS pakete (
+    paket_id TEXT PRIMARY KEY,
+    kennung TEXT NOT NULL,      -- Fingerabdruck aus relativen Pfaden und Größen
+    status TEXT NOT NULL,       -- 'laufend' | 'fertig'
+    bytes INTEGER NOT NULL,
+    dauer_s REAL
+);
+"""
+
+
+def uploadzustand_pfad(quellpfad: Path, zielbasis: Path) -> Path:
+    """Ort des Upload-Zustands eines Quellordners (in der Zielbasis, wie das Journal)."""
+    return zielbasis / f"Uploadzustand_{_quellwurzelname(quellpfad)}.sqlite3"
+
+
+class Uploadzustand:
+    """Fortsetzbarer Stand eines Uploads je Paket (SQLite): ``laufend`` oder ``fertig``."""
+
+    def __init__(self, pfad: Path, url: str) -> None:
+        self.pfad = pfad
+        self.url = url
+        self._sperre = threading.Lock()
+        pfad.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(pfad), check_same_thread=False)
+        try:
+            with self._db:
+                self._db.executescript(_UPLOADZUSTAND_SCHEMA)
+            meta = dict(self._db.execute("SELECT schluessel, wert FROM meta"))
+            if meta and meta.get("version") != str(UPLOADZUSTAND_VERSION):
+                raise ValueError(f"{pfad} ist kein Upload-Zustand dieser Version")
+            if meta.get("url") != url:
+                with self._db:
+                    self._db.execute("DELETE FROM pakete")
+                    self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                        ("version", str(UPLOADZUSTAND_VERSION)), ("url", url)])
+            self._stand: dict[str, tuple[str, str]] = {
+                pid: (kennung, status) for pid, kennung, status in
+                self._db.execute("SELECT paket_id, kennung, status FROM pakete")}
+        except BaseException:
+            self._db.close()
+            raise
+
+    @property
+    def anzahl_fertig(self) -> int:
+        return sum(1 for _, status in self._stand.values() if status == "fertig")
+
+    def status(self, paket_id: str, kennung: str) -> str | None:
+        """``"laufend"``, ``"fertig"`` oder ``None`` (unbekannt oder seitdem geändert)."""
+        eintrag = self._stand.get(paket_id)
+        return eintrag[1] if eintrag is not None and eintrag[0] == kennung else None
+
+    def setze(self, paket_id: str, kennung: str, status: str, groesse: int,
+              dauer_s: float | None = None) -> None:
+        """Darf aus mehreren Threads aufgerufen werden."""
+        with self._sperre:
+            self._stand[paket_id] = (kennung, status)
+            with self._db:
+                self._db.execute("INSERT OR REPLACE INTO pakete VALUES (?, ?, ?, ?, ?)",
+                                 (paket_id, kennung, status, groesse, dauer_s))
+
+    def schliesse(self) -> None:
+        self._db.close()
+
+    def entferne(self) -> None:
+        self.schliesse()
+        self.pfad.unlink(missing_ok=True)
+
+
+class _UploadFehler(Exception):
+    """Fehler, den ein neuer Versuch nicht behebt (4xx, Datei geändert oder nicht lesbar)."""
+
+
+class _Voruebergehend(Exception):
+    """Antwort, nach der sich ein neuer Versuch lohnt (5xx, 429)."""
+
+
+class _UploadAbbruch(Exception):
+    """Über ``Fortschritt.abbrechen()`` mitten im Senden angehalten."""
+
+
+class _Verbindungspool:
+    """Höchstens ``anzahl`` persistente HTTP(S)-Verbindungen zu einem Server."""
+
+    def __init__(self, url: str, anzahl: int, zeitlimit: float) -> None:
+        teile = urllib.parse.urlsplit(url)
+        if teile.scheme not in ("http", "https") or not teile.hostname:
+            raise ValueError(f"Ungültige Upload-URL: {url}")
+        klasse = (http.client.HTTPSConnection if teile.scheme == "https"
+                  else http.client.HTTPConnection)
+        self.basis = teile.path.rstrip("/")
+        self._alle = [klasse(teile.hostname, teile.port, timeout=zeitlimit)
+                      for _ in range(anzahl)]
+        self._frei: queue.LifoQueue = queue.LifoQueue()
+        for verbindung in self._alle:
+            self._frei.put(verbindung)
+
+    @contextmanager
+    def verbindung(self) -> Iterator[http.client.HTTPConnection]:
+        verbindung = self._frei.get()
+        try:
+            yield verbindung
+        finally:
+            self._frei.put(verbindung)
+
+    def schliesse(self) -> None:
+        for verbindung in self._alle:
+            verbindung.close()
+
+
+class _PaketUpload:
+    """Lädt ein Paket über eine Verbindung des Pools hoch (läuft im Worker-Thread)."""
+
+    def __init__(self, pool: _Verbindungspool, zustand: Uploadzustand | None, versuche: int,
+                 fortschritt: Fortschritt) -> None:
+        self.pool = pool
+        self.zustand = zustand
+        self.versuche = versuche
+        self.fortschritt = fortschritt
+        self.wiederholungen = 0
+        self.bytes_gesendet = 0
+        self._sperre = threading.Lock()
+        self._lokal = threading.local()
+
+    def _antwort(self, verbindung: http.client.HTTPConnection) -> http.client.HTTPResponse:
+        antwort = verbindung.getresponse()
+        antwort.read()
+        if antwort.status >= 500 or antwort.status == 429:
+            raise _Voruebergehend(f"HTTP {antwort.status} {antwort.reason}")
+        return antwort
+
+    def _wiederhole(self, verbindung: http.client.HTTPConnection,
+                    aktion: Callable[[int], None]) -> None:
+        """``aktion(versuch)`` mit exponentieller Wartezeit; danach neu verbinden."""
+        for versuch in range(self.versuche):
+            try:
+                aktion(versuch)
+                return
+            except (OSError, http.client.HTTPException, _Voruebergehend):
+                verbindung.close()
+                if versuch + 1 >= self.versuche or self.fortschritt.abgebrochen:
+                    raise
+                with self._sperre:
+                    self.wiederholungen += 1
+                time.sleep(min(UPLOAD_PAUSE_MAX_S, UPLOAD_PAUSE_S * 2 ** versuch))
+
+    def _sende(self, verbindung: http.client.HTTPConnection, url: str, pfad: str,
+               groesse: int, start: int) -> None:
+        puffer = getattr(self._lokal, "puffer", None)
+        if puffer is None:
+            puffer = self._lokal.puffer = memoryview(bytearray(UPLOAD_BLOCK))
+        try:
+            f = open(pfad, "rb")
+        except OSError as ex:  # lokaler Fehler: kein Netzwerkproblem, nicht wiederholen
+            raise _UploadFehler(f"{pfad}: nicht lesbar: {ex}") from ex
+        with f:
+            aktuell = os.fstat(f.fileno()).st_size
+            if aktuell != groesse:
+                raise _UploadFehler(f"{pfad}: Größe {aktuell} statt {groesse} Bytes laut Plan "
+                                    "(Datei nach dem Scan geändert)")
+            f.seek(start)
+            verbindung.putrequest("PUT", url, skip_accept_encoding=True)
+            verbindung.putheader("Content-Type", "application/octet-stream")
+            verbindung.putheader("Content-Length", str(groesse - start))
+            if start:
+                verbindung.putheader("Content-Range", f"bytes {start}-{groesse - 1}/{groesse}")
+            verbindung.endheaders()
+            rest = groesse - start
+            while rest:
+                if self.fortschritt.abgebrochen:
+                    raise _UploadAbbruch()
+                try:
+                    n = f.readinto(puffer[:min(rest, UPLOAD_BLOCK)])
+                except OSError as ex:
+                    raise _UploadFehler(f"{pfad}: Lesefehler: {ex}") from ex
+                if not n:
+                    raise _UploadFehler(f"{pfad}: endet nach {groesse - rest} von {groesse} Bytes")
+                verbindung.send(puffer[:n])
+                rest -= n
+                with self._sperre:
+                    self.bytes_gesendet += n
+        antwort = self._antwort(verbindung)
+        if start and antwort.status in (409, 416):  # Server hat einen anderen Stand: ganz senden
+            self._sende(verbindung, url, pfad, groesse, 0)
+        elif antwort.status not in (200, 201, 204):
+            raise _UploadFehler(f"{pfad}: HTTP {antwort.status} {antwort.reason}")
+
+    def _datei(self, verbindung: http.client.HTTPConnection, url: str, pfad: str,
+               groesse: int, nachfragen: bool) -> None:
+        """Sendet eine Datei; nach Unterbrechungen ab dem Stand, den der Server meldet."""
+        def versuch(nr: int) -> None:
+            start = 0
+            if nachfragen or nr:
+                verbindung.request("HEAD", url)
+                antwort = self._antwort(verbindung)
+                if antwort.status == 200:
+                    try:
+                        vorhanden = int(antwort.getheader("Content-Length") or 0)
+                    except ValueError:
+                        vorhanden = 0  # Stand unbekannt: ganz senden
+                    if vorhanden == groesse:
+                        return
+                    if vorhanden < groesse:
+                        start = vorhanden
+            self._sende(verbindung, url, pfad, groesse, start)
+
+        self._wiederhole(verbindung, versuch)
+
+    def paket(self, paket_id: str, dateien: list[tuple[str, str, int]], kennung: str,
+              fortsetzen: bool) -> tuple[int, float]:
+        """Alle Dateien, danach der Abschluss; Rückgabe ``(Bytes, Dauer in s)``."""
+        gesamt = sum(groesse for _, _, groesse in dateien)
+        start = time.perf_counter()
+        basis = f"{self.pool.basis}/{urllib.parse.quote(paket_id)}"
+        with self.pool.verbindung() as verbindung:
+            try:
+                if self.zustand is not None and not fortsetzen:
+                    self.zustand.setze(paket_id, kennung, "laufend", gesamt)
+                for relativ, pfad, groesse in dateien:
+                    url = f"{basis}/{urllib.parse.quote(relativ.replace(os.sep, '/'))}"
+                    self._datei(verbindung, url, pfad, groesse, fortsetzen)
+                    with self._sperre:
+                        self.fortschritt.datei(groesse)
+                koerper = json.dumps({"dateien": len(dateien), "bytes": gesamt}).encode("utf-8")
+
+                def abschluss(_nr: int) -> None:
+                    verbindung.request("POST", basis, body=koerper,
+                                       headers={"Content-Type": "application/json"})
+                    antwort = self._antwort(verbindung)
+                    if antwort.status not in (200, 201, 204):
+                        raise _UploadFehler(f"Abschluss abgelehnt: HTTP {antwort.status} "
+                                            f"{antwort.reason}")
+
+                self._wiederhole(verbindung, abschluss)
+            except BaseException:
+                verbindung.close()  # Halb gesendete Anfrage: Verbindung nicht wiederverwenden
+                raise
+        dauer = time.perf_counter() - start
+        if self.zustand is not None:
+            self.zustand.setze(paket_id, kennung, "fertig", gesamt, dauer)
+        return gesamt, dauer
+
+
+def lade_pakete_hoch(
+    quellpfad: Path,
+    pakete: Iterable[tuple[str, Iterable[tuple[str, int]]]],
+    url: str,
+    zustand: Uploadzustand | None = None,
+    verbindungen: int = STANDARD_UPLOAD_VERBINDUNGEN,
+    versuche: int = STANDARD_UPLOAD_VERSUCHE,
+    zeitlimit: float = 60.0,
+    fortschritt: Fortschritt | None = None,
+) -> dict:
+    """
+    Lädt die Pakete per HTTP zu ``url`` hoch (Schnittstelle: ``benchmarks/ersatz_dms.py``).
+
+    Rückgabe: dict mit Schlüsseln:
+        - url: str, verbindungen: int
+        - pakete, hochgeladen, bereits_fertig, dateien, bytes: int
+        - bytes_gesendet, wiederholungen: int
+        - dauer_s, durchsatz_bytes_s: float
+        - latenzen: list[(paket_id, bytes, dauer_s)]
+        - fehler: list[str]
+        - abgebrochen: bool
+    """
+    if fortschritt is None:
+        fortschritt = Fortschritt()  # Abbruchsignal für laufende Pakete nach KeyboardInterrupt
+    try:
+        pool = _Verbindungspool(url, max(1, verbindungen), zeitlimit)
+    except ValueError:
+        if zustand is not None:
+            zustand.schliesse()
+        raise
+    lader = _PaketUpload(pool, zustand, max(1, versuche), fortschritt)
+    quelle_praefix = os.path.join(str(quellpfad), "")
+    ergebnis = {
+        "url": url, "verbindungen": max(1, verbindungen),
+        "pakete": 0, "hochgeladen": 0, "bereits_fertig": 0, "dateien": 0, "bytes": 0,
+        "bytes_gesendet": 0, "wiederholungen": 0, "dauer_s": 0.0, "durchsatz_bytes_s": 0.0,
+        "latenzen": [], "fehler": [], "abgebrochen": False,
+    }
+    fortschritt.setze_phase("Lade Pakete hoch…")
+
+    def auftraege() -> Iterator[tuple]:
+        for pid, dateien in pakete:
+            ergebnis["pakete"] += 1
+            liste: list[tuple[str, str, int]] = []
+            kennung = hashlib.blake2b(digest_size=16)
+            for pfad, groesse in dateien:
+                relativ = (pfad[len(quelle_praefix):] if pfad.startswith(quelle_praefix)
+                           else os.path.relpath(pfad, quellpfad))
+                liste.append((relativ, pfad, groesse))
+                kennung.update(f"{relativ}\0{groesse}\n".encode("utf-8", "surrogatepass"))
+            status = zustand.status(pid, kennung.hexdigest()) if zustand is not None else None
+            if status == "fertig":
+                ergebnis["bereits_fertig"] += 1
+                continue
+            yield pid, pid, liste, kennung.hexdigest(), status == "laufend"
+
+    start = time.perf_counter()
+    durchlaufen = False
+    try:
+        for (pid, _, liste, _, _), zukunft in _arbeite_parallel(
+                lader.paket, auftraege(), max(1, verbindungen), fortschritt, "upload"):
+            try:
+                groesse, dauer = zukunft.result()
+            except _UploadAbbruch:
+                continue
+            except (OSError, ValueError, http.client.HTTPException, _UploadFehler,
+                    _Voruebergehend) as ex:
+                ergebnis["fehler"].append(f"Upload {pid}: {ex}")
+                continue
+            ergebnis["hochgeladen"] += 1
+            ergebnis["dateien"] += len(liste)
+            ergebnis["bytes"] += groesse
+            ergebnis["latenzen"].append((pid, groesse, dauer))
+        durchlaufen = True
+    finally:
+        pool.schliesse()
+        ergebnis["abgebrochen"] = fortschritt.abgebrochen
+        if zustand is not None:
+            if durchlaufen and not ergebnis["fehler"] and not ergebnis["abgebrochen"]:
+                zustand.entferne()
+            else:
+                zustand.schliesse()
+    ergebnis["dauer_s"] = time.perf_counter() - start
+    ergebnis["bytes_gesendet"] = lader.bytes_gesendet
+    ergebnis["wiederholungen"] = lader.wiederholungen
+    if ergebnis["dauer_s"] > 0:
+        ergebnis["durchsatz_bytes_s"] = lader.bytes_gesendet / ergebnis["dauer_s"]
+    return ergebnis
+
+
+def upload_zeilen(ergebnis: dict) -> list[str]:
+    """Kurzbericht über ``lade_pakete_hoch`` mit Durchsatz und Dauer je Paket."""
+    zeilen = [
+        "Upload:",
+        f"  Ziel: {ergebnis['url']} ({ergebnis['verbindungen']} Verbindungen)",
+        f"  Pakete: {ergebnis['hochgeladen']} hochgeladen, "
+        f"{ergebnis['bereits_fertig']} bereits fertig, {ergebnis['pakete']} gesamt",
+        f"  Dateien: {ergebnis['dateien']:,} ({formatiere_groesse(ergebnis['bytes'])})",
+        f"  Durchsatz: {formatiere_groesse(int(ergebnis['durchsatz_bytes_s']))}/s "
+        f"({formatiere_groesse(ergebnis['bytes_gesendet'])} in {ergebnis['dauer_s']:.1f} s)",
+    ]
+    dauern = sorted(d for _, _, d in ergebnis["latenzen"])
+    if dauern:
+        p95 = dauern[min(len(dauern) - 1, int(0.95 * len(dauern)))]
+        zeilen.append(f"  Dauer je Paket: Median {dauern[len(dauern) // 2]:.2f} s, "
+                      f"95 % {p95:.2f} s, Maximum {dauern[-1]:.2f} s")
+    rate = upload_rate(ergebnis)
+    if rate is not None:
+        zeilen.append(f"  Rate je Verbindung: {formatiere_groesse(int(rate))}/s")
+    if ergebnis["wiederholungen"]:
+        zeilen.append(f"  Wiederholte Anfragen: {ergebnis['wiederholungen']}")
+    if ergebnis["abgebrochen"]:
+        zeilen.append("  ABGEBROCHEN – erneut starten, um fortzusetzen")
+    for fehler in ergebnis["fehler"]:
+        zeilen.append(f"  ✗ {fehler}")
+    return zeilen
+
+
+# ---------------------------------------------------------------------------
+# Upload-Zeitplan (Makespan)
+# ---------------------------------------------------------------------------
+
+UPLOAD_REIHENFOLGEN: dict[str, str] = {
+    "lpt": "Längste zuerst (LPT)",
+    "plan": "Reihenfolge des Plans",
+}
+STANDARD_UPLOAD_REIHENFOLGE = "lpt"
+
+
+def upload_rate(ergebnis: dict) -> float | None:
+    """
+    Gemessene Rate je Verbindung in Bytes/s aus einem ``lade_pakete_hoch``-Ergebnis
+    (Bytes der hochgeladenen Pakete durch ihre Dauer, inkl. Anfragen je Datei);
+    ``None`` ohne hochgeladenes Paket.
+    """
+    bytes_gesamt = sum(b for _, b, _ in ergebnis["latenzen"])
+    dauer = sum(d for _, _, d in ergebnis["latenzen"])
+    if bytes_gesamt <= 0 or dauer <= 0:
+        return None
+    return bytes_gesamt / dauer
+
+
+def _paket_dateianzahl(
+    inhalt: list[tuple[OrdnerKnoten, list[tuple[str, int]] | None]],
+) -> int:
+    """Anzahl der Dateien eines Pakets, ohne die Pfade zu bilden."""
+    anzahl = 0
+    for knoten, dateien in inhalt:
+        if dateien is not None:
+            anzahl += len(dateien)
+        else:
+            anzahl += sum(len(k.dateien) for k in knoten.knoten_preorder())
+    return anzahl
+
+
+def _verteile_auf_slots(dauern: list[float], slots: int) -> list[tuple[int, float, float]]:
+    """
+    Listenplanung: jede Dauer in der gegebenen Reihenfolge an den Slot, der
+    als erster frei wird (bei Gleichstand der niedrigste). Rückgabe je Dauer
+    ``(slot, start_s, ende_s)``.
+    """
+    frei = [(0.0, slot) for slot in range(slots)]
+    zuteilung: list[tuple[int, float, float]] = []
+    for dauer in dauern:
+        start, slot = heapq.heappop(frei)
+        zuteilung.append((slot, start, start + dauer))
+        heapq.heappush(frei, (start + dauer, slot))
+    return zuteilung
+
+
+def plane_upload_zeitplan(
+    paketvorschlaege: list[dict],
+    slots: int = STANDARD_UPLOAD_VERBINDUNGEN,
+    bytes_pro_s: float = STANDARD_UPLOAD_RATE,
+    sekunden_je_datei: float = 0.0,
+    reihenfolge: str = STANDARD_UPLOAD_REIHENFOLGE,
+) -> dict:
+    """
+    Verteilt die Pakete auf ``slots`` parallele Upload-Verbindungen (LPT oder Planreihenfolge).
+
+    Rückgabe: dict mit Schlüsseln:
+        - slots, bytes_pro_s, sekunden_je_datei, reihenfolge
+        - pakete: list[str]  (Paket-IDs in Startreihenfolge)
+        - zeitplan: list[list[dict]]  (je Slot: id, groesse, dateien, start_s, ende_s)
+        - ende_s: list[float]
+        - gesamtdauer_s, gesamtdauer_plan_s, untere_schranke_s: float
+    """
+    if bytes_pro_s <= 0:
+        raise ValueError(f"Ungültige Upload-Rate: {bytes_pro_s}")
+    if reihenfolge not in UPLOAD_REIHENFOLGEN:
+        raise ValueError(f"Unbekannte Upload-Reihenfolge: {reihenfolge}")
+    slots = max(1, slots)
+
+    pakete: list[tuple[str, int, int, float]] = []  # (id, groesse, dateien, dauer)
+    for ebene_nr, eintrag in enumerate(paketvorschlaege, 1):
+        for paket_nr, (paket, inhalt) in enumerate(zip(eintrag["pakete"], eintrag["inhalte"]), 1):
+            groesse = sum(g for _, g in paket)
+            dateien = _paket_dateianzahl(inhalt)
+            pakete.append((paket_id(ebene_nr, paket_nr), groesse, dateien,
+                           groesse / bytes_pro_s + dateien * sekunden_je_datei))
+
+    def makespan(zuteilung: list[tuple[int, float, float]]) -> float:
+        return max((ende for _, _, ende in zuteilung), default=0.0)
+
+    gesamtdauer_plan = makespan(_verteile_auf_slots([p[3] for p in pakete], slots))
+    if reihenfolge == "lpt":
+        pakete.sort(key=lambda p: -p[3])  # stabil: bei Gleichstand Planreihenfolge
+    zuteilung = _verteile_auf_slots([p[3] for p in pakete], slots)
+
+    zeitplan: list[list[dict]] = [[] for _ in range(slots)]
+    ende = [0.0] * slots
+    for (pid, groesse, dateien, _), (slot, start_s, ende_s) in zip(pakete, zuteilung):
+        zeitplan[slot].append({"id": pid, "groesse": groesse, "dateien": dateien,
+                               "start_s": start_s, "ende_s": ende_s})
+        ende[slot] = ende_s
+    summe = sum(p[3] for p in pakete)
+    return {
+        "slots": slots,
+        "bytes_pro_s": bytes_pro_s,
+        "sekunden_je_datei": sekunden_je_datei,
+        "reihenfolge": reihenfolge,
+        "pakete": [p[0] for p in pakete],
+        "zeitplan": zeitplan,
+        "ende_s": ende,
+        "gesamtdauer_s": makespan(zuteilung),
+        "gesamtdauer_plan_s": gesamtdauer_plan,
+        "untere_schranke_s": max(summe / slots, max((p[3] for p in pakete), default=0.0)),
+    }
+
+
+def formatiere_dauer(sekunden: float) -> str:
+    """Dauer lesbar: ``42.0 s``, ``12 min 05 s``, ``3 h 07 min``."""
+    if sekunden < 60:
+        return f"{sekunden:.1f} s"
+    minuten, rest = divmod(int(round(sekunden)), 60)
+    if minuten < 60:
+        return f"{minuten} min {rest:02d} s"
+    stunden, minuten = divmod(minuten, 60)
+    return f"{stunden} h {minuten:02d} min"
+
+
+def zeitplan_zeilen(zeitplan: dict, max_pakete_je_slot: int = 8) -> list[str]:
+    """Kurzbericht über ``plane_upload_zeitplan``: Gesamtdauer und Pakete je Slot."""
+    zeilen = [
+        "Upload-Zeitplan:",
+        f"  {zeitplan['slots']} Verbindungen zu je {formatiere_groesse(int(zeitplan['bytes_pro_s']))}/s, "
+        f"{UPLOAD_REIHENFOLGEN[zeitplan['reihenfolge']]}",
+        f"  Geschätzte Dauer: {formatiere_dauer(zeitplan['gesamtdauer_s'])} "
+        f"(in Planreihenfolge {formatiere_dauer(zeitplan['gesamtdauer_plan_s'])}, "
+        f"untere Schranke {formatiere_dauer(zeitplan['untere_schranke_s'])})",
+    ]
+    for nr, (pakete, ende_s) in enumerate(zip(zeitplan["zeitplan"], zeitplan["ende_s"]), 1):
+        ids = ", ".join(p["id"] for p in pakete[:max_pakete_je_slot])
+        if len(pakete) > max_pakete_je_slot:
+            ids += f", … (+{len(pakete) - max_pakete_je_slot})"
+        zeilen.append(f"  Verbindung {nr}: {len(pakete)} Pakete, fertig nach "
+                      f"{formatiere_dauer(ende_s)}{' – ' + ids if ids else ''}")
+    return zeilen
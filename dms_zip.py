@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+"""
+DMS Upload-Vorbereitung – ZIP
+=============================
+Komprimierte Größe schätzen und ZIP-Pakete bauen.
+"""
+
+import math
+import os
+import shutil
+import threading
+import zipfile
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterator
+
+from dms_basis import (
+    MAX_PAKET_GROESSE,
+    STANDARD_HASH_WORKER,
+    STANDARD_PACKSTRATEGIE,
+    STANDARD_VERSCHIEBE_WORKER,
+    STANDARD_ZIP_SICHERHEIT,
+    UPLOAD_BLOCK,
+    ZIP_EINTRAG_KOPF,
+    ZIP_ENDE,
+    ZIP_PROBE_BLOCK,
+    ZIP_PROBE_BLOECKE,
+    ZIP_STUFE,
+    Fortschritt,
+    _arbeite_parallel,
+    _liegt_in,
+    _normpfad,
+    formatiere_groesse,
+)
+from dms_daten import OrdnerKnoten
+from dms_pakete import paket_id
+from dms_planung import _paket_eintraege, packe_einheiten
+
+# ---------------------------------------------------------------------------
+# Komprimierte Größe (ZIP)
+# ---------------------------------------------------------------------------
+
+def _deflate_laenge(daten: bytes) -> int:
+    """Länge von ``daten`` als Deflate-Strom wie in ``zipfile`` (ohne zlib-Rahmen)."""
+    packer = zlib.compressobj(ZIP_STUFE, zlib.DEFLATED, -15)
+    return len(packer.compress(daten)) + len(packer.flush())
+
+
+class Kompressionsschaetzer:
+    """
+    Schätzt die Größe einer Datei im ZIP (Deflate) aus Stichproben, mit Cache je Endung
+    und Signatur und dem Aufschlag ``sicherheit``.
+    """
+
+    STICHPROBEN = 8
+    STREUUNG = 0.05
+    SIGNATUR_LAENGE = 4
+
+    def __init__(self, sicherheit: float = STANDARD_ZIP_SICHERHEIT) -> None:
+        if sicherheit < 0:
+            raise ValueError(f"Sicherheitsaufschlag darf nicht negativ sein: {sicherheit}")
+        self.sicherheit = sicherheit
+        self._cache: dict[tuple, list] = {}  # Schlüssel → [Anzahl, kleinstes, größtes Verhältnis]
+        self._sperre = threading.Lock()
+        self.zaehler = {"gelesen": 0, "aus_endung": 0, "aus_signatur": 0, "unlesbar": 0,
+                        "bytes_gelesen": 0}
+
+    def _bekannt(self, schluessel: tuple) -> float | None:
+        werte = self._cache.get(schluessel)
+        if werte is not None and werte[0] >= self.STICHPROBEN and werte[2] - werte[1] <= self.STREUUNG:
+            return werte[2]
+        return None
+
+    def _zaehle(self, name: str, anzahl: int = 1) -> None:
+        with self._sperre:
+            self.zaehler[name] += anzahl
+
+    def verhaeltnis(self, pfad: str, groesse: int) -> float:
+        """Komprimierte durch ursprüngliche Größe (ohne Aufschlag und Kopfdaten)."""
+        if groesse <= 0:
+            return 0.0
+        name = os.path.basename(pfad)
+        i = name.rfind(".")
+        nach_endung = (name[i:].lower() if 0 < i < len(name) - 1 else "", groesse.bit_length())
+        bekannt = self._bekannt(nach_endung)
+        if bekannt is not None:
+            self._zaehle("aus_endung")
+            return bekannt
+        try:
+            with open(pfad, "rb") as f:
+                daten = f.read(ZIP_PROBE_BLOCK)
+                nach_signatur = nach_endung + (daten[:self.SIGNATUR_LAENGE],)
+                bekannt = self._bekannt(nach_signatur)
+                if bekannt is not None:
+                    self._zaehle("aus_signatur")
+                    return bekannt
+                if groesse <= ZIP_PROBE_BLOECKE * ZIP_PROBE_BLOCK:
+                    daten += f.read()
+                    roh, komprimiert = len(daten), _deflate_laenge(daten)
+                else:
+                    roh, komprimiert = len(daten), _deflate_laenge(daten)
+                    for nr in range(1, ZIP_PROBE_BLOECKE):
+                        f.seek((groesse - ZIP_PROBE_BLOCK) * nr // (ZIP_PROBE_BLOECKE - 1))
+                        block = f.read(ZIP_PROBE_BLOCK)
+                        roh += len(block)
+                        komprimiert += _deflate_laenge(block)
+        except OSError:
+            self._zaehle("unlesbar")
+            return 1.0
+        wert = komprimiert / roh if roh else 1.0
+        with self._sperre:
+            self.zaehler["gelesen"] += 1
+            self.zaehler["bytes_gelesen"] += roh
+            for schluessel in (nach_endung, nach_signatur):
+                werte = self._cache.get(schluessel)
+                if werte is None:
+                    self._cache[schluessel] = [1, wert, wert]
+                else:
+                    werte[0] += 1
+                    werte[1] = min(werte[1], wert)
+                    werte[2] = max(werte[2], wert)
+        return wert
+
+    def schaetze(self, pfad: str, groesse: int, name_laenge: int) -> int:
+        """Bytes der Datei im ZIP inkl. Aufschlag; ``name_laenge``: Name im ZIP in UTF-8-Bytes."""
+        komprimiert = math.ceil(groesse * self.verhaeltnis(pfad, groesse) * (1 + self.sicherheit))
+        return komprimiert + ZIP_EINTRAG_KOPF + 2 * name_laenge
+
+
+def schaetze_komprimierte_groessen(
+    ordnerbaum: OrdnerKnoten,
+    schaetzer: Kompressionsschaetzer,
+    worker: int = STANDARD_HASH_WORKER,
+    fortschritt: Fortschritt | None = None,
+) -> dict:
+    """
+    Geschätzte ZIP-Größe jeder gültigen Datei und jedes Ordners.
+
+    Rückgabe: dict mit Schlüsseln:
+        - dateien: dict[OrdnerKnoten, array]  (je Datei)
+        - ordner: dict[OrdnerKnoten, int]  (Summe des Teilbaums)
+        - anzahl_dateien, bytes, bytes_geschaetzt: int
+        - sicherheit: float
+        - gelesen, aus_endung, aus_signatur, unlesbar, bytes_gelesen: int
+        - abgebrochen: bool
+    """
+    knoten_liste = ordnerbaum.knoten_preorder()
+    wurzel_laenge = len(os.path.join(ordnerbaum.pfad, ""))
+    zaehler_vorher = dict(schaetzer.zaehler)
+
+    def schaetze_ordner(knoten: OrdnerKnoten) -> array:
+        relativ = knoten.pfad[wurzel_laenge:] if knoten is not ordnerbaum else ""
+        praefix = len(relativ.encode("utf-8", "surrogatepass")) + 1 if relativ else 0
+        return array("q", (schaetzer.schaetze(os.path.join(knoten.pfad, name), groesse,
+                                              praefix + len(name.encode("utf-8", "surrogatepass")))
+                           for name, groesse in knoten.dateien))
+
+    ergebnis: dict = {"dateien": {}, "ordner": {}, "anzahl_dateien": 0, "bytes": 0,
+                      "bytes_geschaetzt": 0, "sicherheit": schaetzer.sicherheit,
+                      "abgebrochen": False}
+    dateien: dict[OrdnerKnoten, array] = ergebnis["dateien"]
+    abgebrochen = False
+    for (knoten, _), zukunft in _arbeite_parallel(
+            schaetze_ordner, ((k, k) for k in knoten_liste if k.dateien), max(1, worker),
+            fortschritt, "kompression"):
+        dateien[knoten] = zukunft.result()
+        for _, groesse in knoten.dateien:
+            ergebnis["anzahl_dateien"] += 1
+            ergebnis["bytes"] += groesse
+            if fortschritt is not None and not fortschritt.datei(groesse):
+                abgebrochen = True
+        if abgebrochen:
+            break
+    ergebnis["abgebrochen"] = abgebrochen or (fortschritt is not None and fortschritt.abgebrochen)
+
+    ordner: dict[OrdnerKnoten, int] = ergebnis["ordner"]
+    for knoten in reversed(knoten_liste):  # Kinder vor Eltern
+        ordner[knoten] = (sum(dateien.get(knoten, ()))
+                          + sum(ordner[kind] for kind in knoten.kinder.values()))
+    ergebnis["bytes_geschaetzt"] = ordner[ordnerbaum]
+    for name, wert in schaetzer.zaehler.items():
+        ergebnis[name] = wert - zaehler_vorher[name]
+    return ergebnis
+
+
+def kompression_zeilen(kompression: dict) -> list[str]:
+    """Zusammenfassung von ``schaetze_komprimierte_groessen``."""
+    anteil = kompression["bytes_geschaetzt"] / kompression["bytes"] if kompression["bytes"] else 0.0
+    return [
+        "Komprimierte Größe (ZIP, geschätzt):",
+        f"  Dateien: {kompression['anzahl_dateien']:,} "
+        f"({formatiere_groesse(kompression['bytes'])}) → "
+        f"{formatiere_groesse(kompression['bytes_geschaetzt'])} ({anteil:.0%}), "
+        f"inkl. {kompression['sicherheit']:.0%} Sicherheitsaufschlag",
+        f"  Stichproben: {kompression['gelesen']:,} Dateien "
+        f"({formatiere_groesse(kompression['bytes_gelesen'])} gelesen), aus dem Cache: "
+        f"{kompression['aus_endung']:,} nach Endung, {kompression['aus_signatur']:,} nach Signatur",
+    ]
+
+
+# ---------------------------------------------------------------------------
+# ZIP-Pakete (komprimierte Größe prüfen)
+# ---------------------------------------------------------------------------
+
+def _baue_zip(ziel: str, dateien: list[tuple[str, str, int]],
+              fortschritt: Fortschritt | None) -> list[int] | None:
+    """
+    Schreibt ``dateien`` ``(voller Pfad, Name im ZIP, Größe)`` als ZIP nach ``ziel``.
+    Rückgabe: Bytes je Eintrag im ZIP; ``None`` nach einem Abbruch (ZIP gelöscht).
+    """
+    try:
+        with zipfile.ZipFile(ziel, "w", zipfile.ZIP_DEFLATED, compresslevel=ZIP_STUFE) as zf:
+            for pfad, name, groesse in dateien:
+                if fortschritt is not None and fortschritt.abgebrochen:
+                    break
+                with open(pfad, "rb") as quelle, \
+                        zf.open(name, "w", force_zip64=groesse >= zipfile.ZIP64_LIMIT) as eintrag:
+                    shutil.copyfileobj(quelle, eintrag, UPLOAD_BLOCK)
+            infos = zf.infolist()
+        if fortschritt is not None and fortschritt.abgebrochen:
+            os.unlink(ziel)
+            return None
+    except BaseException:
+        try:
+            os.unlink(ziel)
+        except OSError:
+            pass
+        raise
+    # Hinter dem letzten Eintrag folgen Verzeichnis und Endsatz
+    verzeichnis = [46 + len(i.filename.encode("utf-8")) + len(i.extra) + len(i.comment)
+                   for i in infos]
+    anfaenge = [i.header_offset for i in infos]
+    anfaenge.append(os.path.getsize(ziel) - sum(verzeichnis) - ZIP_ENDE)
+    return [anfaenge[k + 1] - anfaenge[k] + verzeichnis[k] for k in range(len(infos))]
+
+
+def _teile_zip_paket(
+    eintraege: list[tuple[OrdnerKnoten, str, int]],
+    kosten: list[int],
+    ordner: Path,
+    max_groesse: int,
+    strategie: str,
+) -> list[dict]:
+    """Packt die Dateien eines zu großen ZIPs nach ihrer tatsächlichen Größe im ZIP neu."""
+    einheiten = [(os.path.join(knoten.pfad, name), k, (knoten, name, groesse))
+                 for (knoten, name, groesse), k in zip(eintraege, kosten)]
+    teile: list[dict] = []
+    for teil in packe_einheiten(einheiten, max_groesse - ZIP_ENDE, strategie):
+        gruppen: dict[OrdnerKnoten, list[tuple[str, int]]] = {}
+        for _, _, (knoten, name, groesse) in sorted(teil, key=lambda e: e[0]):
+            gruppen.setdefault(knoten, []).append((name, groesse))
+        namen = []
+        for knoten, dateien in gruppen.items():
+            relativ = os.path.relpath(knoten.pfad, str(ordner))
+            wo = "in diesem Ordner" if relativ == os.curdir else f"aus {relativ}"
+            namen.append((f"[ZIP-Teil: {len(dateien)} Dateien {wo}]", sum(g for _, g in dateien)))
+        teile.append({"einheiten": namen, "inhalt": list(gruppen.items()), "schaetzung": None,
+                      "zip": None, "groesse": None})
+    return teile
+
+
+def baue_zip_pakete(
+    quellpfad: Path,
+    paketvorschlaege: list[dict],
+    zielordner: Path,
+    max_groesse: int = MAX_PAKET_GROESSE,
+    strategie: str = STANDARD_PACKSTRATEGIE,
+    worker: int = STANDARD_VERSCHIEBE_WORKER,
+    fortschritt: Fortschritt | None = None,
+) -> dict:
+    """
+    Baut je Paket ``zielordner/<PaketID>.zip`` und teilt zu große Pakete neu auf.
+
+    Rückgabe: dict mit Schlüsseln:
+        - zielordner: Path
+        - pakete, bytes, zips_bytes: int
+        - neu_aufgeteilt, zusaetzliche_pakete: int
+        - abweichung_max: float | None  (größtes Verhältnis ZIP / Schätzung)
+        - fehler: list[str]
+        - abgebrochen: bool
+    """
+    if _liegt_in(_normpfad(zielordner), _normpfad(quellpfad)):
+        raise ValueError(f"Der ZIP-Ordner darf nicht im Quellordner liegen: {zielordner}")
+    os.makedirs(zielordner, exist_ok=True)
+    quelle_praefix = os.path.join(str(quellpfad), "")
+    ergebnis = {
+        "zielordner": zielordner,
+        "pakete": 0, "bytes": 0, "zips_bytes": 0, "neu_aufgeteilt": 0, "zusaetzliche_pakete": 0,
+        "abweichung_max": None, "fehler": [], "abgebrochen": False,
+    }
+    if fortschritt is not None:
+        fortschritt.setze_phase("Baue ZIP-Pakete…")
+
+    ebenen: list[list[dict]] = []
+    for eintrag in paketvorschlaege:
+        schaetzungen = eintrag.get("komprimiert") or [None] * len(eintrag["pakete"])
+        ebenen.append([{"einheiten": paket, "inhalt": inhalt, "schaetzung": schaetzung,
+                        "zip": None, "groesse": None}
+                       for paket, inhalt, schaetzung in zip(eintrag["pakete"], eintrag["inhalte"],
+                                                            schaetzungen)])
+    anzahl_vorher = sum(len(ebene) for ebene in ebenen)
+    laufende_nr = 0
+
+    def auftraege(offen: list[tuple[int, dict]]) -> Iterator[tuple]:
+        nonlocal laufende_nr
+        for ebene_nr, paket in offen:
+            laufende_nr += 1
+            paket["zip"] = os.path.join(str(zielordner), f"_zip_{laufende_nr:06d}.tmp")
+            eintraege = list(_paket_eintraege(paket["inhalt"]))
+            dateien = []
+            for knoten, name, groesse in eintraege:
+                pfad = os.path.join(knoten.pfad, name)
+                relativ = (pfad[len(quelle_praefix):] if pfad.startswith(quelle_praefix)
+                           else os.path.relpath(pfad, quellpfad))
+                dateien.append((pfad, relativ, groesse))
+            yield (ebene_nr, paket, eintraege), paket["zip"], dateien, fortschritt
+
+    fertig = False
+    try:
+        offen = [(ebene_nr, paket) for ebene_nr, ebene in enumerate(ebenen) for paket in ebene]
+        while offen and not ergebnis["abgebrochen"]:
+            geteilt: list[tuple[int, dict]] = []
+            for ((ebene_nr, paket, eintraege), *_), zukunft in _arbeite_parallel(
+                    _baue_zip, auftraege(offen), max(1, worker), fortschritt, "zip"):
+                eintrag = paketvorschlaege[ebene_nr]
+                try:
+                    kosten = zukunft.result()
+                except (OSError, ValueError, RuntimeError) as ex:
+                    paket["zip"] = None
+                    ergebnis["fehler"].append(f"ZIP für {paket['einheiten'][0][0]} in "
+                                              f"{eintrag['ordner']}: {ex}")
+                    continue
+                if kosten is None:
+                    break
+                paket["groesse"] = os.path.getsize(paket["zip"])
+                if fortschritt is not None:
+                    for _, _, groesse in eintraege:
+                        fortschritt.datei(groesse)
+                if paket["schaetzung"]:
+                    abweichung = paket["groesse"] / paket["schaetzung"]
+                    if ergebnis["abweichung_max"] is None or abweichung > ergebnis["abweichung_max"]:
+                        ergebnis["abweichung_max"] = abweichung
+                if paket["groesse"] <= max_groesse:
+                    continue
+                teile = _teile_zip_paket(eintraege, kosten, eintrag["ordner"], max_groesse,
+                                         strategie)
+                if len(teile) < 2:
+                    knoten, name, _ = eintraege[0]
+                    eintrag["warnungen"].append(
+                        f"Datei {knoten.als_path() / name} ist auch als ZIP größer als "
+                        f"{formatiere_groesse(max_groesse)}! ({formatiere_groesse(paket['groesse'])})")
+                    continue
+                os.unlink(paket["zip"])
+                paket["zip"] = None
+                ebene = ebenen[ebene_nr]
+                pos = next(i for i, p in enumerate(ebene) if p is paket)
+                ebene[pos:pos + 1] = teile
+                ergebnis["neu_aufgeteilt"] += 1
+                geteilt.extend((ebene_nr, teil) for teil in teile)
+            ergebnis["abgebrochen"] = fortschritt is not None and fortschritt.abgebrochen
+            offen = geteilt
+        if ergebnis["abgebrochen"]:
+            return ergebnis
+
+        for ebene_nr, (eintrag, ebene) in enumerate(zip(paketvorschlaege, ebenen), 1):
+            for paket_nr, paket in enumerate(ebene, 1):
+                if paket["zip"] is not None:
+                    os.replace(paket["zip"],
+                               os.path.join(str(zielordner), f"{paket_id(ebene_nr, paket_nr)}.zip"))
+                    paket["zip"] = None
+                    ergebnis["pakete"] += 1
+                    ergebnis["zips_bytes"] += paket["groesse"]
+                ergebnis["bytes"] += sum(g for _, g in paket["einheiten"])
+            eintrag["pakete"] = [paket["einheiten"] for paket in ebene]
+            eintrag["inhalte"] = [paket["inhalt"] for paket in ebene]
+            eintrag["komprimiert"] = [
+                paket["groesse"] if paket["groesse"] is not None
+                else paket["schaetzung"] or sum(g for _, g in paket["einheiten"])
+                for paket in ebene]
+        ergebnis["zusaetzliche_pakete"] = sum(len(ebene) for ebene in ebenen) - anzahl_vorher
+        fertig = True
+    finally:
+        if not fertig:  # Abbruch oder Ausnahme: halbfertige ZIPs entfernen
+            for ebene in ebenen:
+                for paket in ebene:
+                    if paket["zip"] is not None:
+                        try:
+                            os.unlink(paket["zip"])
+                        except OSError:
+                            pass
+    return ergebnis
+
+
+def zip_zeilen(ergebnis: dict) -> list[str]:
+    """Kurzbericht über ``baue_zip_pakete``."""
+    zeilen = [
+        "ZIP-Pakete:",
+        f"  Ordner: {ergebnis['zielordner']}",
+        f"  ZIPs: {ergebnis['pakete']}, {formatiere_groesse(ergebnis['bytes'])} → "
+        f"{formatiere_groesse(ergebnis['zips_bytes'])}",
+        f"  Zu groß und neu aufgeteilt: {ergebnis['neu_aufgeteilt']} "
+        f"({ergebnis['zusaetzliche_pakete']:+} Pakete)",
+    ]
+    if ergebnis["abweichung_max"] is not None:
+        zeilen.append(f"  Größtes ZIP im Verhältnis zur Schätzung: {ergebnis['abweichung_max']:.1%}")
+    if ergebnis["abgebrochen"]:
+        zeilen.append("  ABGEBROCHEN – Plan unverändert, erneut starten")
+    for fehler in ergebnis["fehler"]:
+        zeilen.append(f"  ✗ {fehler}")
+    return zeilen
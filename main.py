@@ -11,400 +11,302 @@ in ein DMS (Fabasoft) unterstützt.
 - Logfile im CSV-Format.
 - Trockenlauf-Modus.
 
+Die Kernlogik liegt in ``dms_kern.py``, die Kommandozeile in ``dms_cli.py``.
+
 Nur Python-Standardbibliothek – keine externen Abhängigkeiten.
 """
 
-import json
-import os
-import shutil
-import sys
+import queue
+import sqlite3
+import threading
 import tkinter as tk
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
-from tkinter import filedialog, messagebox, scrolledtext
-
-# ---------------------------------------------------------------------------
-# Konstanten
-# ---------------------------------------------------------------------------
-MAX_PAKET_GROESSE: int = 1 * 1024 * 1024 * 1024  # 1 GiB
-
-DEFAULT_UNGUELTIGE_ENDUNGEN: set[str] = {
-    ".exe", ".bat", ".cmd", ".com",
-    ".ps1", ".psm1", ".vbs", ".js",
-    ".msi", ".msp", ".lnk",
-}
-
-KONFIG_DATEINAME = "dms_vorbereitung_config.json"
-
-VERBOTENE_PFADE = [
-    os.path.normcase(r"C:\\"),
-    os.path.normcase(r"C:\Windows"),
-    os.path.normcase(r"C:\Program Files"),
-    os.path.normcase(r"C:\Program Files (x86)"),
-]
-
-
-# ---------------------------------------------------------------------------
-# Hilfsfunktionen
-# ---------------------------------------------------------------------------
-
-def programmverzeichnis() -> Path:
-    """Gibt das Verzeichnis zurück, in dem das Programm (oder die EXE) liegt."""
-    if getattr(sys, "frozen", False):
-        return Path(sys.executable).parent
-    return Path(__file__).resolve().parent
-
-
-def lade_konfiguration() -> set[str]:
-    """Lädt die Liste ungültiger Endungen aus der JSON-Konfigurationsdatei."""
-    konfig_pfad = programmverzeichnis() / KONFIG_DATEINAME
-    try:
-        if konfig_pfad.exists():
-            with open(konfig_pfad, "r", encoding="utf-8") as f:
-                daten = json.load(f)
-            endungen = {e.lower() for e in daten.get("ungueltige_endungen", [])}
-            if endungen:
-                return endungen
-    except (json.JSONDecodeError, OSError):
-        pass
-    return set(DEFAULT_UNGUELTIGE_ENDUNGEN)
-
-
-def speichere_konfiguration(ungueltige_endungen: set[str]) -> None:
-    """Schreibt die Endungen als JSON in die Konfigurationsdatei."""
-    konfig_pfad = programmverzeichnis() / KONFIG_DATEINAME
-    daten = {"ungueltige_endungen": sorted(ungueltige_endungen)}
-    with open(konfig_pfad, "w", encoding="utf-8") as f:
-        json.dump(daten, f, indent=2, ensure_ascii=False)
-
-
-def ist_verbotener_pfad(pfad: Path) -> bool:
-    """Prüft, ob der Pfad ein geschützter Systempfad ist."""
-    norm = os.path.normcase(str(pfad.resolve()))
-    for verboten in VERBOTENE_PFADE:
-        if norm == verboten or norm.startswith(verboten + os.sep):
-            return True
-    # Direkt C:\ ohne Unterordner
-    if len(norm) <= 3 and norm.endswith(("\\", "/")):
-        return True
-    return False
-
-
-# ---------------------------------------------------------------------------
-# Scan & Verschieben
-# ---------------------------------------------------------------------------
-
-def scanne_quellordner(
-    quellpfad: Path,
-    zielbasis: Path,
-    ungueltige_endungen: set[str],
-    trockenlauf: bool,
-) -> dict:
-    """
-    Scannt den Quellordner rekursiv.
-    Verschiebt (oder simuliert) ungültige Dateien und sammelt gültige Dateien.
-    Schreibt ein Logfile.
-
-    Rückgabe: dict mit Schlüsseln:
-        - gueltige_dateien: list[(Path, int)]   (Pfad, Größe)
-        - anzahl_ungueltig: int
-        - logdatei: Path | None
-        - fehler: list[str]
-    """
-    zeitstempel = datetime.now().strftime("%Y%m%d_%H%M%S")
-    logdatei = zielbasis / f"NichtUploadfaehig_Log_{zeitstempel}.txt"
-    quellwurzelname = quellpfad.name or quellpfad.anchor.replace("\\", "").replace(":", "")
-
-    gueltige_dateien: list[tuple[Path, int]] = []
-    log_zeilen: list[str] = []
-    fehler: list[str] = []
-    anzahl_ungueltig = 0
-
-    header = "DatumZeit;Aktion;Grund;OriginalPfad;NeuerPfad;DateigroesseBytes"
-    log_zeilen.append(header)
-
-    for verz, _, dateien in os.walk(quellpfad):
-        verz_pfad = Path(verz)
-
-        # Zielbasis-Ordner beim Scan ignorieren
-        try:
-            verz_pfad.relative_to(zielbasis)
-            continue  # Liegt innerhalb der Zielbasis → überspringen
-        except ValueError:
-            pass
-
-        for dateiname in dateien:
-            datei = verz_pfad / dateiname
-            try:
-                groesse = datei.stat().st_size
-            except OSError:
-                groesse = 0
-
-            endung = datei.suffix.lower()
-
-            if endung in ungueltige_endungen:
-                anzahl_ungueltig += 1
-                relativ = datei.relative_to(quellpfad)
-                zielpfad = zielbasis / quellwurzelname / relativ
-                jetzt = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-                if trockenlauf:
-                    aktion = "wuerde_verschieben"
-                    log_zeilen.append(
-                        f"{jetzt};{aktion};ungueltige_endung:{endung};"
-                        f"{datei};{zielpfad};{groesse}"
-                    )
-                else:
-                    try:
-                        zielpfad.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.move(str(datei), str(zielpfad))
-                        aktion = "verschoben"
-                        log_zeilen.append(
-                            f"{jetzt};{aktion};ungueltige_endung:{endung};"
-                            f"{datei};{zielpfad};{groesse}"
-                        )
-                    except Exception as ex:
-                        aktion = "fehler"
-                        fehler.append(f"{datei}: {ex}")
-                        log_zeilen.append(
-                            f"{jetzt};{aktion};{ex};{datei};-;{groesse}"
-                        )
-            else:
-                gueltige_dateien.append((datei, groesse))
-
-    # Logfile schreiben
-    try:
-        zielbasis.mkdir(parents=True, exist_ok=True)
-        with open(logdatei, "w", encoding="utf-8") as f:
-            f.write("\n".join(log_zeilen) + "\n")
-    except OSError as ex:
-        fehler.append(f"Logfile konnte nicht geschrieben werden: {ex}")
-        logdatei = None
-
-    return {
-        "gueltige_dateien": gueltige_dateien,
-        "anzahl_ungueltig": anzahl_ungueltig,
-        "logdatei": logdatei,
-        "fehler": fehler,
-    }
+from tkinter import filedialog, messagebox, simpledialog, ttk
+from typing import Callable
+
+from dms_kern import (
+    INDEX_DATEINAME,
+    KONFIG_DATEINAME,
+    MAX_SCAN_WORKER,
+    PACKSTRATEGIEN,
+    STANDARD_PACKSTRATEGIE,
+    STANDARD_SCAN_WORKER,
+    STANDARD_UPLOAD_RATE,
+    UPLOADMANIFEST_DATEINAME,
+    Fortschritt,
+    Kompressionsschaetzer,
+    Laufstatistik,
+    Uploadmanifest,
+    Uploadzustand,
+    Verschiebejournal,
+    Verschiebeplan,
+    bereitstellung_zeilen,
+    delta_zeilen,
+    duplikat_zeilen,
+    erfasse_uploadmanifest,
+    erstelle_ausgabetext,
+    formatiere_dauer,
+    formatiere_groesse,
+    fuehre_analyse_durch,
+    ist_verbotener_pfad,
+    journal_pfad,
+    kompression_zeilen,
+    lade_konfiguration,
+    lade_pakete_hoch,
+    normalisiere_regel,
+    oeffne_journal,
+    paket_dateien,
+    pakete_aus_vorschlaegen,
+    plan_zeilen,
+    plane_upload_zeitplan,
+    programmverzeichnis,
+    speichere_konfiguration,
+    standard_zielbasis,
+    stelle_pakete_bereit,
+    upload_rate,
+    upload_zeilen,
+    uploadzustand_pfad,
+)
 
 
 # ---------------------------------------------------------------------------
-# Paketbildung
+# Ergebnisansicht
 # ---------------------------------------------------------------------------
 
-def berechne_ordnergroessen(gueltige_dateien: list[tuple[Path, int]]) -> dict[Path, int]:
-    """Berechnet die Gesamtgröße pro Ordner (rekursiv)."""
-    groessen: dict[Path, int] = {}
-    for datei, groesse in gueltige_dateien:
-        ordner = datei.parent
-        while True:
-            groessen[ordner] = groessen.get(ordner, 0) + groesse
-            eltern = ordner.parent
-            if eltern == ordner:
-                break
-            ordner = eltern
-    return groessen
-
-
-def erstelle_paketvorschlaege(
-    ordner: Path,
-    gueltige_dateien: list[tuple[Path, int]],
-    ordnergroessen: dict[Path, int],
-    max_groesse: int = MAX_PAKET_GROESSE,
-) -> list[dict]:
-    """
-    Erstellt rekursive Paketvorschläge für einen Ordner.
-
-    Rückgabe: Liste von Einträgen mit:
-        - ordner: Path
-        - pakete: list[list[(str, int)]]
-        - warnungen: list[str]
-        - unterordner_aufgeteilt: list[Path]  (rekursiv behandelt)
-    """
-    ergebnisse: list[dict] = []
-    _paketbildung_rekursiv(ordner, gueltige_dateien, ordnergroessen, max_groesse, ergebnisse)
-    return ergebnisse
-
-
-def _paketbildung_rekursiv(
-    ordner: Path,
-    alle_dateien: list[tuple[Path, int]],
-    ordnergroessen: dict[Path, int],
-    max_groesse: int,
-    ergebnisse: list[dict],
-) -> None:
-    """Rekursive Paketbildung für einen Ordner."""
-    # Direkte Unterordner
-    unterordner: set[Path] = set()
-    dateien_im_ordner: list[tuple[Path, int]] = []
-
-    for datei, groesse in alle_dateien:
-        if datei.parent == ordner:
-            dateien_im_ordner.append((datei, groesse))
-        else:
-            try:
-                rel = datei.relative_to(ordner)
-                erster_teil = ordner / rel.parts[0]
-                if erster_teil.is_dir():
-                    unterordner.add(erster_teil)
-            except ValueError:
-                pass
-
-    # Einheiten sammeln
-    einheiten: list[tuple[str, int]] = []
-    warnungen: list[str] = []
-    zu_gross: list[Path] = []
-
-    # Dateien direkt im Ordner
-    summe_dateien = sum(g for _, g in dateien_im_ordner)
-    if summe_dateien > 0:
-        if summe_dateien <= max_groesse:
-            einheiten.append(("[Dateien in diesem Ordner]", summe_dateien))
+class ErgebnisAnsicht(tk.Frame):
+    """Ergebnis als ``ttk.Treeview``; Pakete und Dateien entstehen erst beim Aufklappen."""
+
+    PLATZHALTER = "…"
+    MAX_DATEIZEILEN = 2000  # Dateien pro aufgeklappter Einheit
+
+    def __init__(self, master: tk.Misc, exportiere: Callable[[], None],
+                 bereitstellen: Callable[[], None], hochladen: Callable[[], None]) -> None:
+        super().__init__(master)
+
+        leiste = tk.Frame(self)
+        leiste.pack(fill="x", pady=(0, 4))
+        tk.Label(leiste, text="Filter:").pack(side="left", padx=(0, 2))
+        self.var_filter = tk.StringVar()
+        eingabe = tk.Entry(leiste, textvariable=self.var_filter, width=30)
+        eingabe.pack(side="left")
+        eingabe.bind("<Return>", lambda e: self.filtern())
+        self.var_nur_warnungen = tk.BooleanVar(value=False)
+        tk.Checkbutton(leiste, text="Nur Ebenen mit Warnungen", variable=self.var_nur_warnungen,
+                       command=self.filtern).pack(side="left", padx=4)
+        tk.Button(leiste, text="Filtern", command=self.filtern).pack(side="left", padx=2)
+        tk.Button(leiste, text="⚠ Nächste Warnung",
+                  command=self.naechste_warnung).pack(side="left", padx=2)
+        self.btn_export = tk.Button(leiste, text="Als Text exportieren…", state="disabled",
+                                    command=exportiere)
+        self.btn_export.pack(side="right", padx=2)
+        self.btn_bereitstellen = tk.Button(leiste, text="Pakete bereitstellen…", state="disabled",
+                                           command=bereitstellen)
+        self.btn_bereitstellen.pack(side="right", padx=2)
+        self.btn_hochladen = tk.Button(leiste, text="Hochladen…", state="disabled",
+                                       command=hochladen)
+        self.btn_hochladen.pack(side="right", padx=2)
+
+        rahmen = tk.Frame(self)
+        rahmen.pack(fill="both", expand=True)
+        self.baum = ttk.Treeview(rahmen, columns=("groesse", "info"), selectmode="browse")
+        self.baum.heading("#0", text="Ebene / Paket / Inhalt")
+        self.baum.heading("groesse", text="Größe")
+        self.baum.heading("info", text="Hinweis")
+        self.baum.column("#0", width=520, stretch=True)
+        self.baum.column("groesse", width=100, anchor="e", stretch=False)
+        self.baum.column("info", width=220, stretch=True)
+        self.baum.tag_configure("warnung", foreground="#b36b00")
+        self.baum.tag_configure("fehler", foreground="#c00000")
+        rollen = ttk.Scrollbar(rahmen, orient="vertical", command=self.baum.yview)
+        self.baum.configure(yscrollcommand=rollen.set)
+        self.baum.pack(side="left", fill="both", expand=True)
+        rollen.pack(side="right", fill="y")
+        self.baum.bind("<<TreeviewOpen>>", self._beim_aufklappen)
+
+        self._paketvorschlaege: list[dict] = []
+        self._ebenen_ids: list[str] = []
+        self._ebenen_menge: set[str] = set()
+        self._anzahl_uebersicht = 0
+        self._suchtexte: dict[int, str] = {}
+        self._nachladen: dict[str, Callable[[str], None]] = {}
+        self._vorlaeufig: str | None = None
+        self._anzahl_teilergebnisse = 0
+
+    # ----- Befüllen -----
+
+    def leeren(self) -> None:
+        self.baum.delete(*self.baum.get_children())
+        self._paketvorschlaege = []
+        self._ebenen_ids = []
+        self._ebenen_menge = set()
+        self._anzahl_uebersicht = 0
+        self._suchtexte = {}
+        self._nachladen = {}
+        self._vorlaeufig = None
+        self._anzahl_teilergebnisse = 0
+        self.btn_export.config(state="disabled")
+        self.btn_bereitstellen.config(state="disabled")
+        self.btn_hochladen.config(state="disabled")
+
+    def zeige(self, uebersicht: list[tuple[str, list[str]]], paketvorschlaege: list[dict],
+              fehler: list[str]) -> None:
+        """Übersichtsblöcke ``(titel, zeilen)``, eine Zeile pro Ebene, Fehler."""
+        self.leeren()
+        self._anzahl_uebersicht = len(uebersicht)
+        for titel, zeilen in uebersicht:
+            block = self.baum.insert("", "end", text=titel, open=True)
+            for zeile in zeilen:
+                self.baum.insert(block, "end", text=zeile)
+
+        self._paketvorschlaege = paketvorschlaege
+        for nr, eintrag in enumerate(paketvorschlaege):
+            iid = f"E{nr}"
+            gesamt = sum(g for paket in eintrag["pakete"] for _, g in paket)
+            info = f"{len(eintrag['pakete'])} Pakete"
+            if eintrag["unterordner_aufgeteilt"]:
+                info += f", {len(eintrag['unterordner_aufgeteilt'])} aufgeteilt"
+            if eintrag["warnungen"]:
+                info += f", ⚠ {len(eintrag['warnungen'])} Warnungen"
+            self.baum.insert("", "end", iid=iid, text=str(eintrag["ordner"]),
+                             values=(formatiere_groesse(gesamt), info),
+                             tags=("warnung",) if eintrag["warnungen"] else ())
+            self._lazy(iid, lambda iid, eintrag=eintrag: self._lade_ebene(iid, eintrag))
+            self._ebenen_ids.append(iid)
+        self._ebenen_menge = set(self._ebenen_ids)
+
+        if fehler:
+            block = self.baum.insert("", "end", text=f"FEHLER ({len(fehler)})",
+                                     open=True, tags=("fehler",))
+            for f in fehler:
+                self.baum.insert(block, "end", text=f"✗ {f}", tags=("fehler",))
+        self.btn_export.config(state="normal")
+        self.btn_bereitstellen.config(state="normal" if paketvorschlaege else "disabled")
+        self.btn_hochladen.config(state="normal" if paketvorschlaege else "disabled")
+        self.filtern()
+
+    def zeige_teilergebnis(self, ereignis: dict) -> None:
+        """Ein fertig geplanter Ordner der obersten Ebene (siehe ``TeilbaumPlaner``)."""
+        if self._vorlaeufig is None:
+            self._vorlaeufig = self.baum.insert("", "end", open=True)
+        self._anzahl_teilergebnisse += 1
+        self.baum.item(self._vorlaeufig, text=f"Vorläufig – Scan läuft "
+                                              f"({self._anzahl_teilergebnisse} Ordner geplant)")
+        eintraege = ereignis["paketvorschlaege"]
+        iid = f"T{self._anzahl_teilergebnisse}"
+        if eintraege:
+            info = (f"{sum(len(e['pakete']) for e in eintraege)} Pakete "
+                    f"in {len(eintraege)} Ebenen")
         else:
-            # Auf Dateiebene aufteilen
-            dateien_im_ordner.sort(key=lambda x: x[0].name)
-            paket: list[tuple[str, int]] = []
-            paket_groesse = 0
-            for datei, groesse in dateien_im_ordner:
-                if groesse > max_groesse:
-                    warnungen.append(
-                        f"Datei {datei} ({_formatiere_groesse(groesse)}) "
-                        f"ist größer als 1 GiB!"
-                    )
-                    continue
-                if paket_groesse + groesse > max_groesse:
-                    einheiten.append(
-                        (f"[Dateien-Paket: {len(paket)} Dateien]", paket_groesse)
-                    )
-                    paket = []
-                    paket_groesse = 0
-                paket.append((datei.name, groesse))
-                paket_groesse += groesse
-            if paket:
-                einheiten.append(
-                    (f"[Dateien-Paket: {len(paket)} Dateien]", paket_groesse)
-                )
-
-    # Unterordner
-    for uo in sorted(unterordner):
-        uo_groesse = ordnergroessen.get(uo, 0)
-        if uo_groesse == 0:
-            continue
-        if uo_groesse <= max_groesse:
-            einheiten.append((f"Ordner: {uo.name}", uo_groesse))
-        else:
-            zu_gross.append(uo)
-
-    # Pakete bilden aus Einheiten
-    einheiten.sort(key=lambda x: x[0])
-    pakete: list[list[tuple[str, int]]] = []
-    aktuelles_paket: list[tuple[str, int]] = []
-    aktuelle_groesse = 0
-
-    for name, groesse in einheiten:
-        if aktuelle_groesse + groesse > max_groesse and aktuelles_paket:
-            pakete.append(aktuelles_paket)
-            aktuelles_paket = []
-            aktuelle_groesse = 0
-        aktuelles_paket.append((name, groesse))
-        aktuelle_groesse += groesse
-
-    if aktuelles_paket:
-        pakete.append(aktuelles_paket)
-
-    ergebnisse.append({
-        "ordner": ordner,
-        "pakete": pakete,
-        "warnungen": warnungen,
-        "unterordner_aufgeteilt": zu_gross,
-    })
-
-    # Rekursiv für zu große Unterordner
-    for uo in sorted(zu_gross):
-        uo_dateien = [(d, g) for d, g in alle_dateien
-                      if str(d).startswith(str(uo) + os.sep) or d.parent == uo]
-        _paketbildung_rekursiv(uo, uo_dateien, ordnergroessen, max_groesse, ergebnisse)
-
-
-def _formatiere_groesse(bytes_wert: int) -> str:
-    """Formatiert Bytes als lesbare Größe."""
-    if bytes_wert >= 1024 * 1024 * 1024:
-        return f"{bytes_wert / (1024**3):.2f} GB"
-    if bytes_wert >= 1024 * 1024:
-        return f"{bytes_wert / (1024**2):.2f} MB"
-    if bytes_wert >= 1024:
-        return f"{bytes_wert / 1024:.2f} KB"
-    return f"{bytes_wert} Bytes"
-
-
-# ---------------------------------------------------------------------------
-# Ausgabetext
-# ---------------------------------------------------------------------------
-
-def erstelle_ausgabetext(
-    quellpfad: Path,
-    zielbasis: Path,
-    trockenlauf: bool,
-    scan_ergebnis: dict,
-    paketvorschlaege: list[dict],
-) -> str:
-    """Baut den finalen Text für das GUI."""
-    zeilen: list[str] = []
-    zeilen.append(f"Analyse für Quellordner: {quellpfad}")
-    zeilen.append(f"Zielbasis (nicht uploadfähige Dateien): {zielbasis}")
-    zeilen.append("")
-
-    modus = "Ja" if trockenlauf else "Nein"
-    zeilen.append(f"Trockenlauf: {modus}")
-    zeilen.append("")
-
-    zeilen.append("Nicht-uploadfähige Dateien:")
-    zeilen.append(f"  Anzahl: {scan_ergebnis['anzahl_ungueltig']}")
-    if scan_ergebnis["logdatei"]:
-        zeilen.append(f"  Logfile: {scan_ergebnis['logdatei']}")
-    zeilen.append("")
-
-    # Paketvorschläge
-    for eintrag in paketvorschlaege:
-        ordner = eintrag["ordner"]
-        pakete = eintrag["pakete"]
-        warnungen = eintrag["warnungen"]
-        zu_gross = eintrag["unterordner_aufgeteilt"]
-
-        zeilen.append(f"Upload-Pakete auf Ebene: {ordner}")
-        zeilen.append("-" * 50)
-
-        if not pakete and not zu_gross:
-            zeilen.append("  (keine gültigen Dateien auf dieser Ebene)")
-        else:
-            for i, paket in enumerate(pakete, 1):
-                gesamt = sum(g for _, g in paket)
-                zeilen.append(f"  Paket {i} ({_formatiere_groesse(gesamt)}):")
-                for name, groesse in paket:
-                    zeilen.append(f"    - {name} ({_formatiere_groesse(groesse)})")
-
-        if zu_gross:
-            zeilen.append("")
-            zeilen.append("  Ordner mit Unterteilung aufgrund > 1 GiB:")
-            for uo in zu_gross:
-                zeilen.append(f"    - {uo.name} -> eigene Paketvorschläge unten")
-
-        if warnungen:
-            zeilen.append("")
-            zeilen.append("  WARNUNGEN:")
-            for w in warnungen:
-                zeilen.append(f"    ⚠ {w}")
-
-        zeilen.append("")
-
-    # Fehler
-    if scan_ergebnis["fehler"]:
-        zeilen.append("FEHLER:")
-        for f in scan_ergebnis["fehler"]:
-            zeilen.append(f"  ✗ {f}")
-
-    return "\n".join(zeilen)
+            info = "Einheit der obersten Ebene"
+        warnend = any(e["warnungen"] for e in eintraege)
+        self.baum.insert(self._vorlaeufig, "end", iid=iid, text=str(ereignis["ordner"]),
+                         values=(formatiere_groesse(ereignis["groesse"]), info),
+                         tags=("warnung",) if warnend else ())
+        for k, eintrag in enumerate(eintraege):
+            ebene_iid = f"{iid}E{k}"
+            self.baum.insert(iid, "end", iid=ebene_iid, text=str(eintrag["ordner"]),
+                             values=("", f"{len(eintrag['pakete'])} Pakete"),
+                             tags=("warnung",) if eintrag["warnungen"] else ())
+            self._lazy(ebene_iid, lambda e, eintrag=eintrag: self._lade_ebene(e, eintrag))
+
+    def _lazy(self, iid: str, lader: Callable[[str], None]) -> None:
+        self.baum.insert(iid, "end", text=self.PLATZHALTER)
+        self._nachladen[iid] = lader
+
+    def _beim_aufklappen(self, _event: object = None) -> None:
+        self._lade_kinder(self.baum.focus())
+
+    def _lade_kinder(self, iid: str) -> None:
+        lader = self._nachladen.pop(iid, None)
+        if lader is not None:
+            self.baum.delete(*self.baum.get_children(iid))
+            lader(iid)
+
+    def _lade_ebene(self, iid: str, eintrag: dict) -> None:
+        inhalte = eintrag.get("inhalte") or [[] for _ in eintrag["pakete"]]
+        komprimiert = eintrag.get("komprimiert")
+        for i, (paket, inhalt) in enumerate(zip(eintrag["pakete"], inhalte), 1):
+            paket_iid = f"{iid}P{i}"
+            info = f"{len(paket)} Einheiten"
+            if komprimiert:
+                info += f", als ZIP ca. {formatiere_groesse(komprimiert[i - 1])}"
+            self.baum.insert(iid, "end", iid=paket_iid, text=f"Paket {i}",
+                             values=(formatiere_groesse(sum(g for _, g in paket)), info))
+            self._lazy(paket_iid, lambda p, paket=paket, inhalt=inhalt:
+                       self._lade_paket(p, paket, inhalt))
+        for uo in eintrag["unterordner_aufgeteilt"]:
+            self.baum.insert(iid, "end", text=f"{uo.name} → eigene Ebene",
+                             values=("", "> 1 GiB, aufgeteilt"))
+        for w in eintrag["warnungen"]:
+            self.baum.insert(iid, "end", text=f"⚠ {w}", tags=("warnung",))
+
+    def _lade_paket(self, iid: str, paket: list, inhalt: list) -> None:
+        for k, (name, groesse) in enumerate(paket):
+            einheit_iid = f"{iid}U{k}"
+            self.baum.insert(iid, "end", iid=einheit_iid, text=name,
+                             values=(formatiere_groesse(groesse), ""))
+            if k < len(inhalt):
+                self._lazy(einheit_iid, lambda u, teil=inhalt[k]: self._lade_dateien(u, teil))
+
+    def _lade_dateien(self, iid: str, teil: tuple) -> None:
+        anzahl = 0
+        for pfad, groesse in paket_dateien([teil]):
+            if anzahl == self.MAX_DATEIZEILEN:
+                rest = sum(1 for _ in paket_dateien([teil])) - anzahl
+                self.baum.insert(iid, "end", text=f"… {rest:,} weitere Dateien",
+                                 values=("", "siehe Paketmanifest (dms_cli.py)"))
+                return
+            self.baum.insert(iid, "end", text=pfad, values=(formatiere_groesse(groesse), ""))
+            anzahl += 1
+
+    # ----- Filter und Suche -----
+
+    def _suchtext(self, nr: int) -> str:
+        """Ordnerpfad und Einheitennamen einer Ebene (klein, einmal berechnet)."""
+        text = self._suchtexte.get(nr)
+        if text is None:
+            eintrag = self._paketvorschlaege[nr]
+            teile = [str(eintrag["ordner"])]
+            teile += [name for paket in eintrag["pakete"] for name, _ in paket]
+            teile += eintrag["warnungen"]
+            text = self._suchtexte[nr] = "\n".join(teile).lower()
+        return text
+
+    def filtern(self) -> None:
+        """Blendet nicht passende Ebenen aus (Reihenfolge bleibt erhalten)."""
+        muster = self.var_filter.get().strip().lower()
+        nur_warnungen = self.var_nur_warnungen.get()
+        position = self._anzahl_uebersicht  # Ebenen folgen direkt auf die Übersicht
+        for nr, iid in enumerate(self._ebenen_ids):
+            eintrag = self._paketvorschlaege[nr]
+            passt = ((not nur_warnungen or eintrag["warnungen"])
+                     and (not muster or muster in self._suchtext(nr)))
+            if passt:
+                self.baum.move(iid, "", position)
+                position += 1
+            else:
+                self.baum.detach(iid)
+
+    def naechste_warnung(self) -> None:
+        """Springt zur ersten Warnung der nächsten sichtbaren Ebene mit Warnungen."""
+        sichtbar = [iid for iid in self.baum.get_children("") if iid in self._ebenen_menge]
+        auswahl = self.baum.focus()
+        while auswahl and self.baum.parent(auswahl):
+            auswahl = self.baum.parent(auswahl)
+        start = sichtbar.index(auswahl) + 1 if auswahl in sichtbar else 0
+        for iid in sichtbar[start:] + sichtbar[:start]:
+            if self._paketvorschlaege[int(iid[1:])]["warnungen"]:
+                self._lade_kinder(iid)
+                self.baum.item(iid, open=True)
+                ziel = next(k for k in self.baum.get_children(iid)
+                            if "warnung" in self.baum.item(k, "tags"))
+                self.baum.selection_set(ziel)
+                self.baum.focus(ziel)
+                self.baum.see(ziel)
+                return
+        self.bell()
 
 
 # ---------------------------------------------------------------------------
@@ -423,10 +325,22 @@ class DMSVorbereitungApp(tk.Tk):
         self.ungueltige_endungen: set[str] = lade_konfiguration()
         self.quellpfad: Path | None = None
         self.zielbasis: Path | None = None
+        self.uploadmanifest: Path | None = None
+
+        # Hintergrund-Analyse: Worker-Thread meldet über die Queue, GUI pollt per after()
+        self._worker: threading.Thread | None = None
+        self._fortschritt: Fortschritt | None = None
+        self._meldungen: queue.Queue = queue.Queue()
+        self._schliessen_angefordert = False
+        self._letztes_ergebnis: dict | None = None  # für „Als Text exportieren“
+        self._upload_url = "http://localhost:8080/dms"
+        self._upload_rate = float(STANDARD_UPLOAD_RATE)  # je Verbindung; nach einem Upload gemessen
+        self._upload_schaetzung_s = 0.0
 
         self._erstelle_gui()
         self._aktualisiere_endungen_listbox()
         self._setze_status("Bereit")
+        self.protocol("WM_DELETE_WINDOW", self._beim_schliessen)
 
     # ----- GUI-Aufbau -----
 
@@ -465,7 +379,8 @@ class DMSVorbereitungApp(tk.Tk):
                   command=self._waehle_zielbasis).pack(side="right", padx=4)
 
         # --- Endungen ---
-        frame_endungen = tk.LabelFrame(self, text="Nicht uploadfähige Dateiendungen")
+        frame_endungen = tk.LabelFrame(
+            self, text="Nicht uploadfähige Dateien (Endungen, Muster wie ~$*.docx, Namen, inhalt:mz)")
         frame_endungen.pack(fill="x", **pad)
 
         self.listbox_endungen = tk.Listbox(frame_endungen, height=5, width=20,
@@ -478,13 +393,81 @@ class DMSVorbereitungApp(tk.Tk):
         self.var_neue_endung = tk.StringVar()
         tk.Entry(frame_end_buttons, textvariable=self.var_neue_endung,
                  width=12).pack(pady=2)
-        tk.Button(frame_end_buttons, text="Endung hinzufügen",
+        tk.Button(frame_end_buttons, text="Regel hinzufügen",
                   command=self._endung_hinzufuegen).pack(fill="x", pady=2)
         tk.Button(frame_end_buttons, text="Markierte entfernen",
                   command=self._endung_entfernen).pack(fill="x", pady=2)
-        tk.Button(frame_end_buttons, text="Endungen speichern",
+        tk.Button(frame_end_buttons, text="Regeln speichern",
                   command=self._endungen_speichern).pack(fill="x", pady=2)
 
+        # --- Scan-Index ---
+        frame_index = tk.LabelFrame(self, text="Scan-Index (schnellere Wiederholungsläufe)")
+        frame_index.pack(fill="x", **pad)
+
+        self.var_index_nutzen = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_index, text="Index nutzen (nur geänderte Ordner neu lesen)",
+                       variable=self.var_index_nutzen).pack(side="left", padx=4)
+        self.var_index_pruefen = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_index, text="Dateigrößen prüfen",
+                       variable=self.var_index_pruefen).pack(side="left", padx=4)
+        self.var_index_verwerfen = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_index, text="Index neu aufbauen",
+                       variable=self.var_index_verwerfen).pack(side="left", padx=4)
+
+        # --- Paketbildung ---
+        frame_pakete = tk.LabelFrame(self, text="Paketbildung")
+        frame_pakete.pack(fill="x", **pad)
+
+        tk.Label(frame_pakete, text="Strategie:").pack(side="left", padx=4)
+        self.var_packstrategie = tk.StringVar(value=PACKSTRATEGIEN[STANDARD_PACKSTRATEGIE])
+        tk.OptionMenu(frame_pakete, self.var_packstrategie,
+                      *PACKSTRATEGIEN.values()).pack(side="left", padx=4)
+        self.var_komprimiert = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_pakete, text="Gegen ZIP-Größe planen (geschätzt)",
+                       variable=self.var_komprimiert).pack(side="left", padx=4)
+
+        # --- Duplikate ---
+        frame_duplikate = tk.LabelFrame(self, text="Duplikate")
+        frame_duplikate.pack(fill="x", **pad)
+
+        self.var_duplikate = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_duplikate, text="Inhaltsgleiche Dateien suchen",
+                       variable=self.var_duplikate).pack(side="left", padx=4)
+        self.var_duplikate_ausschliessen = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_duplikate, text="Duplikate nicht hochladen (nur Originale packen)",
+                       variable=self.var_duplikate_ausschliessen).pack(side="left", padx=4)
+
+        # --- Upload-Manifest ---
+        frame_upload = tk.LabelFrame(self, text="Upload-Manifest (Delta)")
+        frame_upload.pack(fill="x", **pad)
+
+        self.var_uploadmanifest = tk.StringVar(
+            value=f"(Standard: {UPLOADMANIFEST_DATEINAME} in der Zielbasis)")
+        tk.Entry(frame_upload, textvariable=self.var_uploadmanifest,
+                 state="readonly", width=50).pack(side="left", padx=4, pady=4, expand=True, fill="x")
+        tk.Button(frame_upload, text="Datei auswählen…",
+                  command=self._waehle_uploadmanifest).pack(side="left", padx=4)
+        self.var_delta = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_upload, text="Nur Neues und Geändertes packen",
+                       variable=self.var_delta).pack(side="left", padx=4)
+        self.var_uploadmanifest_speichern = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_upload, text="Nach der Analyse speichern",
+                       variable=self.var_uploadmanifest_speichern).pack(side="left", padx=4)
+        self.var_uploadmanifest_hash = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_upload, text="mit Inhaltshash",
+                       variable=self.var_uploadmanifest_hash).pack(side="left", padx=4)
+
+        # --- Laufstatistik ---
+        frame_statistik = tk.LabelFrame(self, text="Laufstatistik")
+        frame_statistik.pack(fill="x", **pad)
+
+        self.var_statistik = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_statistik, text="Zeiten und Zähler je Stufe erfassen",
+                       variable=self.var_statistik).pack(side="left", padx=4)
+        self.var_speicher_messen = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_statistik, text="Speicher-Spitze messen (tracemalloc, langsamer)",
+                       variable=self.var_speicher_messen).pack(side="left", padx=4)
+
         # --- Trockenlauf + Start ---
         frame_aktion = tk.Frame(self)
         frame_aktion.pack(fill="x", **pad)
@@ -492,15 +475,31 @@ class DMSVorbereitungApp(tk.Tk):
         self.var_trockenlauf = tk.BooleanVar(value=True)
         tk.Checkbutton(frame_aktion, text="Trockenlauf (nur prüfen, nichts verschieben)",
                        variable=self.var_trockenlauf).pack(side="left", padx=4)
-
-        tk.Button(frame_aktion, text="▶  Analyse starten", font=("Segoe UI", 10, "bold"),
-                  bg="#4CAF50", fg="white",
-                  command=self._analyse_starten).pack(side="right", padx=4)
-
-        # --- Textbereich ---
-        self.textbereich = scrolledtext.ScrolledText(self, wrap="word", height=18,
-                                                     font=("Consolas", 9))
-        self.textbereich.pack(fill="both", expand=True, **pad)
+        self.var_plan_speichern = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_aktion, text="Als Verschiebeplan speichern",
+                       variable=self.var_plan_speichern).pack(side="left", padx=4)
+
+        tk.Label(frame_aktion, text="Parallele Ordner-Scans:").pack(side="left", padx=(16, 2))
+        self.var_scan_worker = tk.IntVar(value=STANDARD_SCAN_WORKER)
+        tk.Spinbox(frame_aktion, from_=1, to=MAX_SCAN_WORKER, width=4,
+                   textvariable=self.var_scan_worker).pack(side="left")
+
+        self.btn_start = tk.Button(frame_aktion, text="▶  Analyse starten",
+                                   font=("Segoe UI", 10, "bold"), bg="#4CAF50", fg="white",
+                                   command=self._analyse_starten)
+        self.btn_start.pack(side="right", padx=4)
+        self.btn_abbrechen = tk.Button(frame_aktion, text="■  Abbrechen", state="disabled",
+                                       command=self._analyse_abbrechen)
+        self.btn_abbrechen.pack(side="right", padx=4)
+        self.btn_plan = tk.Button(frame_aktion, text="Plan anwenden…",
+                                  command=self._plan_anwenden)
+        self.btn_plan.pack(side="right", padx=4)
+
+        # --- Ergebnis ---
+        self.ergebnisansicht = ErgebnisAnsicht(self, exportiere=self._als_text_exportieren,
+                                               bereitstellen=self._pakete_bereitstellen,
+                                               hochladen=self._pakete_hochladen)
+        self.ergebnisansicht.pack(fill="both", expand=True, **pad)
 
         # --- Status ---
         self.var_status = tk.StringVar(value="Bereit")
@@ -521,12 +520,26 @@ class DMSVorbereitungApp(tk.Tk):
             self.zielbasis = Path(pfad)
             self.var_zielbasis.set(str(self.zielbasis))
 
+    def _waehle_uploadmanifest(self) -> None:
+        pfad = filedialog.asksaveasfilename(
+            title="Upload-Manifest auswählen",
+            initialdir=str(self.zielbasis) if self.zielbasis else None,
+            initialfile=UPLOADMANIFEST_DATEINAME,
+            filetypes=[("Upload-Manifest", "*.sqlite3"), ("Alle Dateien", "*.*")],
+            confirmoverwrite=False,
+        )
+        if pfad:
+            self.uploadmanifest = Path(pfad)
+            self.var_uploadmanifest.set(str(self.uploadmanifest))
+
     def _endung_hinzufuegen(self) -> None:
-        eingabe = self.var_neue_endung.get().strip().lower()
+        try:
+            eingabe = normalisiere_regel(self.var_neue_endung.get())
+        except ValueError as ex:
+            messagebox.showerror("Fehler", str(ex))
+            return
         if not eingabe:
             return
-        if not eingabe.startswith("."):
-            eingabe = "." + eingabe
         if eingabe in self.ungueltige_endungen:
             messagebox.showinfo("Info", f"'{eingabe}' ist bereits in der Liste.")
             return
@@ -537,7 +550,7 @@ class DMSVorbereitungApp(tk.Tk):
     def _endung_entfernen(self) -> None:
         auswahl = self.listbox_endungen.curselection()
         if not auswahl:
-            messagebox.showwarning("Hinweis", "Bitte zuerst eine Endung auswählen.")
+            messagebox.showwarning("Hinweis", "Bitte zuerst eine Regel auswählen.")
             return
         endung = self.listbox_endungen.get(auswahl[0])
         self.ungueltige_endungen.discard(endung)
@@ -547,7 +560,7 @@ class DMSVorbereitungApp(tk.Tk):
         try:
             speichere_konfiguration(self.ungueltige_endungen)
             messagebox.showinfo("Gespeichert",
-                                f"Endungen gespeichert in:\n{programmverzeichnis() / KONFIG_DATEINAME}")
+                                f"Regeln gespeichert in:\n{programmverzeichnis() / KONFIG_DATEINAME}")
         except OSError as ex:
             messagebox.showerror("Fehler", f"Speichern fehlgeschlagen:\n{ex}")
 
@@ -579,40 +592,527 @@ class DMSVorbereitungApp(tk.Tk):
 
         # Zielbasis
         if not self.zielbasis:
-            self.zielbasis = self.quellpfad / "_NichtUploadfaehig"
+            self.zielbasis = standard_zielbasis(self.quellpfad)
             self.var_zielbasis.set(str(self.zielbasis))
 
-        trockenlauf = self.var_trockenlauf.get()
+        try:
+            scan_worker = max(1, min(MAX_SCAN_WORKER, int(self.var_scan_worker.get())))
+        except (tk.TclError, ValueError):
+            scan_worker = STANDARD_SCAN_WORKER
 
-        # Textbereich leeren
-        self.textbereich.delete("1.0", tk.END)
+        uploadmanifest_pfad = self.uploadmanifest or self.zielbasis / UPLOADMANIFEST_DATEINAME
+        uploadmanifest = None
+        if self.var_delta.get():
+            try:
+                uploadmanifest = Uploadmanifest.lade_datei(uploadmanifest_pfad)
+            except (OSError, ValueError, sqlite3.Error) as ex:
+                messagebox.showerror("Fehler", f"Upload-Manifest nicht lesbar:\n"
+                                     f"{uploadmanifest_pfad}\n{ex}")
+                return
+
+        # Alle Tk-Variablen hier im GUI-Thread auslesen – der Worker fasst Tk nicht an
+        parameter = {
+            "quellpfad": self.quellpfad,
+            "zielbasis": self.zielbasis,
+            "ungueltige_endungen": set(self.ungueltige_endungen),
+            "trockenlauf": self.var_trockenlauf.get(),
+            "scan_worker": scan_worker,
+            "index_nutzen": self.var_index_nutzen.get(),
+            "index_pruefen": self.var_index_pruefen.get(),
+            "index_verwerfen": self.var_index_verwerfen.get(),
+            "strategie": next((k for k, v in PACKSTRATEGIEN.items()
+                               if v == self.var_packstrategie.get()), STANDARD_PACKSTRATEGIE),
+            "komprimiert": self.var_komprimiert.get(),
+            "duplikate": self.var_duplikate.get() or self.var_duplikate_ausschliessen.get(),
+            "duplikate_ausschliessen": self.var_duplikate_ausschliessen.get(),
+            "statistik": self.var_statistik.get() or self.var_speicher_messen.get(),
+            "speicher_messen": self.var_speicher_messen.get(),
+            "plan_speichern": self.var_trockenlauf.get() and self.var_plan_speichern.get(),
+            "verschiebeplan": None,
+            "journal": None,
+            "uploadmanifest": uploadmanifest,
+            "uploadmanifest_pfad": (uploadmanifest_pfad
+                                    if self.var_uploadmanifest_speichern.get() else None),
+            "uploadmanifest_hash": self.var_uploadmanifest_hash.get(),
+        }
+        if not parameter["trockenlauf"]:
+            parameter["journal"] = self._journal_fuer(self.quellpfad, self.zielbasis,
+                                                      parameter["ungueltige_endungen"])
+            if parameter["journal"] is None:
+                return
+        self._starte_analyse(parameter)
+
+    def _journal_fuer(self, quellpfad: Path, zielbasis: Path,
+                      ungueltige_endungen: set[str]) -> Verschiebejournal | None:
+        """
+        Journal für einen echten Lauf (fragt bei einem unterbrochenen Lauf nach);
+        ``None``, wenn der Benutzer abbricht.
+        """
+        try:
+            journal = oeffne_journal(quellpfad, zielbasis)
+        except (OSError, ValueError, sqlite3.Error) as ex:
+            pfad = journal_pfad(quellpfad, zielbasis)
+            if not messagebox.askyesno("Verschiebejournal",
+                                       f"Das Verschiebejournal ist nicht lesbar:\n{ex}\n\n"
+                                       "Verwerfen und neu scannen?"):
+                return None
+            pfad.unlink(missing_ok=True)
+            return Verschiebejournal(pfad)
+        if not journal.geladen:
+            return journal
+        abweichung = journal.abweichung(quellpfad, ungueltige_endungen)
+        if abweichung is not None:
+            if not messagebox.askyesno(
+                "Unterbrochener Lauf",
+                f"Ein echter Lauf vom {journal.begonnen} wurde nicht beendet, sein "
+                f"Verschiebejournal passt aber nicht zu diesem Lauf:\n{abweichung}\n\n"
+                "Journal verwerfen und neu scannen?",
+            ):
+                return None
+            journal.entferne()
+            return Verschiebejournal(journal.pfad)
+        antwort = messagebox.askyesnocancel(
+            "Unterbrochener Lauf",
+            f"Ein echter Lauf vom {journal.begonnen} wurde nicht beendet.\n"
+            f"Offen: {journal.anzahl_offen:,} von {journal.anzahl_eintraege:,} Einträgen.\n\n"
+            "Ja: ohne neuen Scan fortsetzen (Logfile wird vervollständigt)\n"
+            "Nein: verwerfen und neu scannen",
+        )
+        if antwort is None:
+            return None
+        if not antwort:
+            journal.entferne()
+            return Verschiebejournal(journal.pfad)
+        return journal
+
+    def _plan_anwenden(self) -> None:
+        """Führt einen gespeicherten Verschiebeplan aus, ohne die Quelle neu zu scannen."""
+        if self._worker is not None:
+            return
+        pfad = filedialog.askopenfilename(
+            title="Verschiebeplan auswählen",
+            initialdir=str(self.zielbasis) if self.zielbasis else None,
+            filetypes=[("Verschiebeplan", "*.sqlite3"), ("Alle Dateien", "*.*")],
+        )
+        if not pfad:
+            return
+        try:
+            plan = Verschiebeplan.lade_datei(Path(pfad), pruefen=self.var_index_pruefen.get())
+        except (OSError, ValueError, sqlite3.Error) as ex:
+            messagebox.showerror("Fehler", f"Verschiebeplan nicht lesbar:\n{ex}")
+            return
+        if not plan.quellpfad.is_dir():
+            messagebox.showerror("Fehler", f"Der Quellordner existiert nicht:\n{plan.quellpfad}")
+            return
+        if not messagebox.askyesno(
+            "Verschiebeplan anwenden",
+            f"Plan vom {plan.erstellt}\n\nQuellordner: {plan.quellpfad}\n"
+            f"Zielbasis: {plan.zielbasis}\n"
+            f"Geplante Verschiebungen: {plan.anzahl_verschiebungen():,}\n\n"
+            "Nur geänderte Ordner werden neu gelesen. Jetzt verschieben?",
+        ):
+            return
 
-        # 1. Scannen
-        self._setze_status("Scanne Ordner…")
-        scan_ergebnis = scanne_quellordner(
-            self.quellpfad, self.zielbasis,
-            self.ungueltige_endungen, trockenlauf,
+        journal = self._journal_fuer(plan.quellpfad, plan.zielbasis, plan.ungueltige_endungen)
+        if journal is None:
+            return
+        self.quellpfad, self.zielbasis = plan.quellpfad, plan.zielbasis
+        self.var_quellpfad.set(str(plan.quellpfad))
+        self.var_zielbasis.set(str(plan.zielbasis))
+        try:
+            scan_worker = max(1, min(MAX_SCAN_WORKER, int(self.var_scan_worker.get())))
+        except (tk.TclError, ValueError):
+            scan_worker = STANDARD_SCAN_WORKER
+        self._starte_analyse({
+            "quellpfad": plan.quellpfad,
+            "zielbasis": plan.zielbasis,
+            "ungueltige_endungen": plan.ungueltige_endungen,
+            "trockenlauf": False,
+            "scan_worker": scan_worker,
+            "index_nutzen": False,
+            "index_pruefen": False,
+            "index_verwerfen": False,
+            "strategie": next((k for k, v in PACKSTRATEGIEN.items()
+                               if v == self.var_packstrategie.get()), STANDARD_PACKSTRATEGIE),
+            "komprimiert": self.var_komprimiert.get(),
+            "duplikate": self.var_duplikate.get() or self.var_duplikate_ausschliessen.get(),
+            "duplikate_ausschliessen": self.var_duplikate_ausschliessen.get(),
+            "statistik": self.var_statistik.get() or self.var_speicher_messen.get(),
+            "speicher_messen": self.var_speicher_messen.get(),
+            "plan_speichern": False,
+            "verschiebeplan": plan,
+            "journal": journal,
+            "uploadmanifest": None,
+            "uploadmanifest_pfad": None,
+            "uploadmanifest_hash": False,
+        })
+
+    def _starte_analyse(self, parameter: dict) -> None:
+        # Ergebnis leeren
+        self.ergebnisansicht.leeren()
+        self._letztes_ergebnis = None
+
+        self.btn_start.config(state="disabled")
+        self.btn_plan.config(state="disabled")
+        self.btn_abbrechen.config(state="normal")
+        self._fortschritt = Fortschritt(
+            rueckruf=lambda meldung: self._meldungen.put(("fortschritt", meldung))
+        )
+        self._worker = threading.Thread(
+            target=self._analyse_ausfuehren, args=(parameter, self._fortschritt),
+            name="analyse", daemon=True,
         )
+        self._worker.start()
+        self.after(100, self._pruefe_meldungen)
+
+    def _analyse_ausfuehren(self, parameter: dict, fortschritt: Fortschritt) -> None:
+        """Läuft im Worker-Thread: Scan und Paketbildung (die Ansicht baut der GUI-Thread)."""
+        laufstatistik = (Laufstatistik(speicher_messen=parameter["speicher_messen"])
+                         if parameter["statistik"] else None)
+        verschiebeplan = parameter["verschiebeplan"]
+        if parameter["plan_speichern"]:
+            verschiebeplan = Verschiebeplan(parameter["quellpfad"], parameter["zielbasis"],
+                                            parameter["ungueltige_endungen"])
+        try:
+            with laufstatistik if laufstatistik is not None else nullcontext():
+                ergebnis = fuehre_analyse_durch(
+                    parameter["quellpfad"], parameter["zielbasis"],
+                    parameter["ungueltige_endungen"], parameter["trockenlauf"],
+                    scan_worker=parameter["scan_worker"],
+                    index_pfad=(programmverzeichnis() / INDEX_DATEINAME
+                                if parameter["index_nutzen"] else None),
+                    index_pruefen=parameter["index_pruefen"],
+                    index_verwerfen=parameter["index_verwerfen"],
+                    strategie=parameter["strategie"],
+                    fortschritt=fortschritt,
+                    laufstatistik=laufstatistik,
+                    duplikate_suchen=parameter["duplikate"],
+                    duplikate_ausschliessen=parameter["duplikate_ausschliessen"],
+                    verschiebeplan=verschiebeplan,
+                    journal=parameter["journal"],
+                    teilergebnis=lambda e: self._meldungen.put(("teilergebnis", e)),
+                    uploadmanifest=parameter["uploadmanifest"],
+                    kompression=(Kompressionsschaetzer() if parameter["komprimiert"] else None),
+                )
+                scan_ergebnis = ergebnis["scan_ergebnis"]
+                scan_ergebnis["abgebrochen"] = fortschritt.abgebrochen
+
+            if parameter["plan_speichern"] and not scan_ergebnis["abgebrochen"]:
+                zielbasis = parameter["zielbasis"]
+                plandatei = zielbasis / f"Verschiebeplan_{datetime.now():%Y%m%d_%H%M%S}.sqlite3"
+                try:
+                    zielbasis.mkdir(parents=True, exist_ok=True)
+                    verschiebeplan.speichere_datei(plandatei, scan_ergebnis["gueltige_dateien"])
+                    scan_ergebnis["plandatei"] = str(plandatei)
+                except (OSError, sqlite3.Error) as ex:
+                    scan_ergebnis["fehler"].append(
+                        f"Verschiebeplan konnte nicht gespeichert werden: {ex}")
+
+            uploadmanifest_pfad = parameter["uploadmanifest_pfad"]
+            if uploadmanifest_pfad is not None and not scan_ergebnis["abgebrochen"]:
+                fortschritt.setze_phase("Erfasse Upload-Manifest…")
+                upload = erfasse_uploadmanifest(
+                    parameter["quellpfad"], scan_ergebnis["gueltige_dateien"],
+                    scan_ergebnis["ordnerbaum"], ergebnis["paketvorschlaege"],
+                    delta=scan_ergebnis.get("delta"), mit_hash=parameter["uploadmanifest_hash"],
+                    fortschritt=fortschritt, fehler=scan_ergebnis["fehler"])
+                if upload is not None:
+                    try:
+                        uploadmanifest_pfad.parent.mkdir(parents=True, exist_ok=True)
+                        upload.speichere_datei(uploadmanifest_pfad, parameter["quellpfad"])
+                        scan_ergebnis["uploadmanifest_datei"] = str(uploadmanifest_pfad)
+                    except (OSError, sqlite3.Error) as ex:
+                        scan_ergebnis["fehler"].append(
+                            f"Upload-Manifest konnte nicht gespeichert werden: {ex}")
+
+            if laufstatistik is not None and scan_ergebnis["logdatei"]:
+                log_fehler = laufstatistik.haenge_an_log(scan_ergebnis["logdatei"])
+                if log_fehler:
+                    scan_ergebnis["fehler"].append(log_fehler)
+            self._meldungen.put(("fertig", {
+                "parameter": parameter,
+                "scan_ergebnis": scan_ergebnis,
+                "paketvorschlaege": ergebnis["paketvorschlaege"],
+                "laufstatistik": laufstatistik,
+            }))
+        except Exception as ex:
+            self._meldungen.put(("fehler", f"{type(ex).__name__}: {ex}"))
+
+    def _pruefe_meldungen(self) -> None:
+        """Holt Meldungen des Workers ab (nur die jeweils letzte Fortschrittsmeldung zählt)."""
+        letzter_fortschritt: dict | None = None
+        ende: tuple[str, object] | None = None
+        try:
+            while True:
+                art, inhalt = self._meldungen.get_nowait()
+                if art == "fortschritt":
+                    letzter_fortschritt = inhalt
+                elif art == "teilergebnis":
+                    self.ergebnisansicht.zeige_teilergebnis(inhalt)
+                else:
+                    ende = (art, inhalt)
+        except queue.Empty:
+            pass
+
+        if letzter_fortschritt is not None and ende is None:
+            self._zeige_fortschritt(letzter_fortschritt)
+
+        if ende is not None:
+            self._analyse_beendet(*ende)
+        elif (self._worker is not None and self._worker.is_alive()) or not self._meldungen.empty():
+            self.after(100, self._pruefe_meldungen)
+        else:
+            self._analyse_beendet("fehler", "Analyse wurde unerwartet beendet.")
+
+    def _zeige_fortschritt(self, meldung: dict) -> None:
+        text = meldung["phase"]
+        if meldung["dateien"]:
+            text += (f"  {meldung['dateien']:,} Dateien ({meldung['dateien_pro_s']:,.0f}/s), "
+                     f"{formatiere_groesse(meldung['bytes'])}")
+        verz = meldung["verzeichnis"]
+        if verz and meldung["phase"].startswith("Scanne"):
+            text += f"  –  {verz if len(verz) <= 80 else '…' + verz[-79:]}"
+        if self._fortschritt is not None and self._fortschritt.abgebrochen:
+            text = "Breche ab…  " + text
+        self.var_status.set(text)
 
-        # 2. Ordnergrößen berechnen
-        self._setze_status("Berechne Upload-Pakete…")
-        ordnergroessen = berechne_ordnergroessen(scan_ergebnis["gueltige_dateien"])
+    def _analyse_beendet(self, art: str, inhalt: object) -> None:
+        self._worker = None
+        self.btn_start.config(state="normal")
+        self.btn_plan.config(state="normal")
+        self.btn_abbrechen.config(state="disabled")
+        if art == "fertig":
+            self._letztes_ergebnis = inhalt
+            scan_ergebnis = inhalt["scan_ergebnis"]
+            self.ergebnisansicht.zeige(self._uebersicht(inhalt), inhalt["paketvorschlaege"],
+                                       scan_ergebnis["fehler"])
+            status = "Abgebrochen" if scan_ergebnis["abgebrochen"] else "Fertig ✓"
+            if inhalt["laufstatistik"] is not None:
+                status += f"  –  {inhalt['laufstatistik'].kurztext()}"
+            self._setze_status(status)
+        elif art == "bereitgestellt":
+            zeilen = bereitstellung_zeilen(inhalt)
+            status = (f"Bereitgestellt: {inhalt['dateien']:,} Dateien in {inhalt['staging']}"
+                      if not inhalt["abgebrochen"] else "Bereitstellen abgebrochen")
+            self._setze_status(status)
+            anzeige = "\n".join(z.strip() for z in zeilen[1:21])
+            if inhalt["fehler"]:
+                messagebox.showwarning("Paket-Bereitstellung", anzeige)
+            else:
+                messagebox.showinfo("Paket-Bereitstellung", anzeige)
+        elif art == "hochgeladen":
+            zeilen = upload_zeilen(inhalt)
+            status = (f"Hochgeladen: {inhalt['hochgeladen']} Pakete, "
+                      f"{formatiere_groesse(int(inhalt['durchsatz_bytes_s']))}/s"
+                      if not inhalt["abgebrochen"]
+                      else "Upload abgebrochen – erneut hochladen, um fortzusetzen")
+            self._setze_status(status)
+            rate = upload_rate(inhalt)
+            if rate is not None:
+                self._upload_rate = rate
+            anzeige = "\n".join([z.strip() for z in zeilen[1:21]] + [
+                f"Geschätzt laut Zeitplan: {formatiere_dauer(self._upload_schaetzung_s)}"])
+            if inhalt["fehler"]:
+                messagebox.showwarning("Upload", anzeige)
+            else:
+                messagebox.showinfo("Upload", anzeige)
+        else:
+            self._setze_status(f"Fehler: {inhalt}")
+            messagebox.showerror("Fehler", f"Der Vorgang ist fehlgeschlagen:\n{inhalt}")
+        if self._schliessen_angefordert:
+            self.destroy()
+
+    @staticmethod
+    def _uebersicht(inhalt: dict) -> list[tuple[str, list[str]]]:
+        """Kopfdaten des Ergebnisses als Blöcke für die Ergebnisansicht."""
+        parameter = inhalt["parameter"]
+        scan_ergebnis = inhalt["scan_ergebnis"]
+        paketvorschlaege = inhalt["paketvorschlaege"]
+        analyse = [
+            f"Quellordner: {parameter['quellpfad']}",
+            f"Zielbasis (nicht uploadfähige Dateien): {parameter['zielbasis']}",
+            f"Trockenlauf: {'Ja' if parameter['trockenlauf'] else 'Nein'}",
+            f"Upload-Pakete: {sum(len(e['pakete']) for e in paketvorschlaege):,} "
+            f"auf {len(paketvorschlaege):,} Ebenen",
+            f"Warnungen: {sum(len(e['warnungen']) for e in paketvorschlaege):,}",
+        ]
+        if scan_ergebnis.get("abgebrochen"):
+            analyse.insert(0, "ABGEBROCHEN – das Ergebnis ist unvollständig.")
+        fortgesetzt = scan_ergebnis.get("fortgesetzt")
+        if fortgesetzt:
+            analyse.append(f"Fortgesetzt: Lauf vom {fortgesetzt['begonnen']} "
+                           f"({fortgesetzt['verschiebungen_offen']:,} offene Verschiebungen, "
+                           "kein neuer Scan)")
+        ungueltig = [f"Anzahl: {scan_ergebnis['anzahl_ungueltig']}"]
+        if scan_ergebnis["logdatei"]:
+            ungueltig.append(f"Logfile: {scan_ergebnis['logdatei']}")
+        if scan_ergebnis.get("plandatei"):
+            ungueltig.append(f"Verschiebeplan: {scan_ergebnis['plandatei']}")
+        bloecke = [("Analyse", analyse), ("Nicht-uploadfähige Dateien", ungueltig)]
+
+        index_statistik = scan_ergebnis.get("index_statistik")
+        if index_statistik:
+            bloecke.append(("Scan-Index", [
+                f"Ordner aus Index: {index_statistik['aus_cache']}",
+                f"Ordner neu gelesen: {index_statistik['neu_gelistet']}",
+            ]))
+        plan_statistik = scan_ergebnis.get("plan_statistik")
+        if plan_statistik:
+            zeilen = plan_zeilen(plan_statistik)
+            bloecke.append((zeilen[0].rstrip(":"), [z.strip() for z in zeilen[1:]]))
+        duplikate = scan_ergebnis.get("duplikate")
+        if duplikate:
+            zeilen = duplikat_zeilen(duplikate, max_gruppen=5)
+            bloecke.append((zeilen[0].rstrip(":"), [z.strip() for z in zeilen[1:]]))
+        delta = scan_ergebnis.get("delta")
+        if delta or scan_ergebnis.get("uploadmanifest_datei"):
+            zeilen = delta_zeilen(delta) if delta else ["Upload-Manifest:"]
+            if scan_ergebnis.get("uploadmanifest_datei"):
+                zeilen.append(f"  Gespeichert: {scan_ergebnis['uploadmanifest_datei']}")
+            bloecke.append((zeilen[0].rstrip(":"), [z.strip() for z in zeilen[1:]]))
+        kompression = scan_ergebnis.get("kompression")
+        if kompression:
+            zeilen = kompression_zeilen(kompression)
+            bloecke.append((zeilen[0].rstrip(":"), [z.strip() for z in zeilen[1:]]))
+        if inhalt["laufstatistik"] is not None:
+            zeilen = inhalt["laufstatistik"].zeilen()
+            bloecke.append((zeilen[0].rstrip(":"), [z.strip() for z in zeilen[1:]]))
+        return bloecke
+
+    def _pakete_bereitstellen(self) -> None:
+        """Legt die Pakete des letzten Ergebnisses als Staging-Ordner an (im Hintergrund)."""
+        inhalt = self._letztes_ergebnis
+        if inhalt is None or self._worker is not None:
+            return
+        if inhalt["scan_ergebnis"]["abgebrochen"]:
+            messagebox.showwarning("Hinweis", "Die Analyse wurde abgebrochen; "
+                                   "bitte zuerst eine vollständige Analyse durchführen.")
+            return
+        staging = filedialog.askdirectory(title="Staging-Ordner für die Pakete auswählen")
+        if not staging:
+            return
 
-        # 3. Paketvorschläge
-        paketvorschlaege = erstelle_paketvorschlaege(
-            self.quellpfad,
-            scan_ergebnis["gueltige_dateien"],
-            ordnergroessen,
+        self.btn_start.config(state="disabled")
+        self.btn_plan.config(state="disabled")
+        self.btn_abbrechen.config(state="normal")
+        self._fortschritt = Fortschritt(
+            rueckruf=lambda meldung: self._meldungen.put(("fortschritt", meldung))
+        )
+        self._worker = threading.Thread(
+            target=self._bereitstellung_ausfuehren,
+            args=(inhalt["parameter"]["quellpfad"], inhalt["paketvorschlaege"], Path(staging),
+                  self._fortschritt),
+            name="bereitstellen", daemon=True,
         )
+        self._worker.start()
+        self.after(100, self._pruefe_meldungen)
 
-        # 4. Ausgabetext
-        text = erstelle_ausgabetext(
-            self.quellpfad, self.zielbasis, trockenlauf,
-            scan_ergebnis, paketvorschlaege,
+    def _bereitstellung_ausfuehren(self, quellpfad: Path, paketvorschlaege: list[dict],
+                                   staging: Path, fortschritt: Fortschritt) -> None:
+        """Läuft im Worker-Thread: Hardlinks bzw. Kopien je Paket anlegen."""
+        try:
+            ergebnis = stelle_pakete_bereit(quellpfad, pakete_aus_vorschlaegen(paketvorschlaege),
+                                            staging, fortschritt=fortschritt)
+            self._meldungen.put(("bereitgestellt", ergebnis))
+        except Exception as ex:
+            self._meldungen.put(("fehler", f"Bereitstellen: {type(ex).__name__}: {ex}"))
+
+    def _pakete_hochladen(self) -> None:
+        """Lädt die Pakete des letzten Ergebnisses per HTTP hoch (im Hintergrund, fortsetzbar)."""
+        inhalt = self._letztes_ergebnis
+        if inhalt is None or self._worker is not None:
+            return
+        if inhalt["scan_ergebnis"]["abgebrochen"]:
+            messagebox.showwarning("Hinweis", "Die Analyse wurde abgebrochen; "
+                                   "bitte zuerst eine vollständige Analyse durchführen.")
+            return
+        url = simpledialog.askstring("Pakete hochladen", "Ziel-URL (http:// oder https://):",
+                                     initialvalue=self._upload_url, parent=self)
+        if not url:
+            return
+        url = url.strip()
+        if not url.lower().startswith(("http://", "https://")):
+            messagebox.showerror("Fehler", f"Ungültige Upload-URL:\n{url}")
+            return
+        parameter = inhalt["parameter"]
+        try:
+            zustand = Uploadzustand(uploadzustand_pfad(parameter["quellpfad"],
+                                                       parameter["zielbasis"]), url)
+        except (OSError, ValueError, sqlite3.Error) as ex:
+            messagebox.showerror("Fehler", f"Upload-Zustand nicht lesbar:\n{ex}")
+            return
+        self._upload_url = url
+        # Längste Pakete zuerst, damit am Ende keine Verbindung allein ein großes Paket sendet
+        zeitplan = plane_upload_zeitplan(inhalt["paketvorschlaege"], bytes_pro_s=self._upload_rate)
+        self._upload_schaetzung_s = zeitplan["gesamtdauer_s"]
+
+        self.btn_start.config(state="disabled")
+        self.btn_plan.config(state="disabled")
+        self.btn_abbrechen.config(state="normal")
+        self._fortschritt = Fortschritt(
+            rueckruf=lambda meldung: self._meldungen.put(("fortschritt", meldung))
+        )
+        self._worker = threading.Thread(
+            target=self._upload_ausfuehren,
+            args=(parameter["quellpfad"], inhalt["paketvorschlaege"], zeitplan["pakete"], url,
+                  zustand, self._fortschritt),
+            name="upload", daemon=True,
+        )
+        self._worker.start()
+        self.after(100, self._pruefe_meldungen)
+
+    def _upload_ausfuehren(self, quellpfad: Path, paketvorschlaege: list[dict],
+                           reihenfolge: list[str], url: str, zustand: Uploadzustand,
+                           fortschritt: Fortschritt) -> None:
+        """Läuft im Worker-Thread: Pakete über mehrere Verbindungen hochladen."""
+        try:
+            ergebnis = lade_pakete_hoch(quellpfad,
+                                        pakete_aus_vorschlaegen(paketvorschlaege, reihenfolge),
+                                        url, zustand=zustand, fortschritt=fortschritt)
+            self._meldungen.put(("hochgeladen", ergebnis))
+        except Exception as ex:
+            self._meldungen.put(("fehler", f"Upload: {type(ex).__name__}: {ex}"))
+
+    def _als_text_exportieren(self) -> None:
+        """Schreibt das Ergebnis im bisherigen Textformat (``erstelle_ausgabetext``)."""
+        inhalt = self._letztes_ergebnis
+        if inhalt is None:
+            return
+        ziel = filedialog.asksaveasfilename(
+            title="Ergebnis als Text exportieren", defaultextension=".txt",
+            filetypes=[("Textdatei", "*.txt"), ("Alle Dateien", "*.*")],
         )
-        self.textbereich.insert("1.0", text)
+        if not ziel:
+            return
+        parameter = inhalt["parameter"]
+        text = erstelle_ausgabetext(parameter["quellpfad"], parameter["zielbasis"],
+                                    parameter["trockenlauf"], inhalt["scan_ergebnis"],
+                                    inhalt["paketvorschlaege"])
+        if inhalt["laufstatistik"] is not None:
+            text += "\n\n" + "\n".join(inhalt["laufstatistik"].zeilen())
+        try:
+            with open(ziel, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        except OSError as ex:
+            messagebox.showerror("Fehler", f"Export fehlgeschlagen:\n{ex}")
+            return
+        self._setze_status(f"Exportiert: {ziel}")
+
+    def _analyse_abbrechen(self) -> None:
+        if self._fortschritt is not None:
+            self._fortschritt.abbrechen()
+            self.btn_abbrechen.config(state="disabled")
+            self._setze_status("Breche ab…")
 
-        self._setze_status("Fertig ✓")
+    def _beim_schliessen(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self.destroy()
+            return
+        if messagebox.askyesno("Analyse läuft",
+                               "Die Analyse läuft noch. Abbrechen und Programm beenden?"):
+            # Nach der aktuellen Datei anhalten (keine halb verschobenen Dateien), dann schließen
+            self._schliessen_angefordert = True
+            self._analyse_abbrechen()
 
 
 # ---------------------------------------------------------------------------
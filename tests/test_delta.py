@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Delta gegen das Upload-Manifest: ``berechne_delta`` erkennt neue, geänderte
+(andere Größe, andere mtime, mit Hash: anderer Inhalt), unveränderte und
+entfernte Dateien. Das Manifest übersteht Speichern und Laden unverändert,
+auch mit Inhaltshashes und für einen an einen anderen Ort kopierten
+Quellordner (Pfade relativ).
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+
+import dms_kern  # noqa: E402
+
+DATEIEN = {
+    "a.txt": b"a" * 100,
+    "groesser.txt": b"g" * 200,
+    "inhalt.txt": b"i" * 300,
+    "angefasst.txt": b"t" * 400,
+    "geloescht.txt": b"d" * 500,
+    "akten/brief.docx": b"b" * 600,
+    "akten/tief/notiz.txt": b"n" * 700,
+    "weg/ganz.pdf": b"w" * 800,
+    "weg/auch.pdf": b"w" * 900,
+}
+MTIME_NS = 1_600_000_000_000_000_000
+
+
+def erzeuge_baum(quelle: Path) -> None:
+    for name, inhalt in DATEIEN.items():
+        pfad = quelle / name
+        pfad.parent.mkdir(parents=True, exist_ok=True)
+        pfad.write_bytes(inhalt)
+        os.utime(pfad, ns=(MTIME_NS, MTIME_NS))
+
+
+def aendere_baum(quelle: Path) -> None:
+    with open(quelle / "groesser.txt", "ab") as f:
+        f.write(b"+")
+    (quelle / "inhalt.txt").write_bytes(b"I" * 300)  # gleiche Größe, neue mtime
+    os.utime(quelle / "angefasst.txt", ns=(MTIME_NS + 10**9, MTIME_NS + 10**9))
+    (quelle / "geloescht.txt").unlink()
+    shutil.rmtree(quelle / "weg")
+    (quelle / "neu.txt").write_bytes(b"x" * 10)
+    (quelle / "akten" / "neu" / "anlage.pdf").parent.mkdir()
+    (quelle / "akten" / "neu" / "anlage.pdf").write_bytes(b"x" * 20)
+
+
+class Delta(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory(prefix="dms_test_")
+        self.tmp = Path(self._tmp.name)
+        self.quelle = self.tmp / "quelle"
+        erzeuge_baum(self.quelle)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _scan(self, quelle: Path | None = None) -> dict:
+        return dms_kern.scanne_quellordner(quelle or self.quelle, self.tmp / "ziel", set(), True)
+
+    def _manifest(self, mit_hash: bool) -> dms_kern.Uploadmanifest:
+        scan = self._scan()
+        dms_kern.berechne_ordnergroessen(scan["ordnerbaum"])
+        plan = dms_kern.erstelle_paketvorschlaege(scan["ordnerbaum"])
+        fehler: list[str] = []
+        manifest = dms_kern.erfasse_uploadmanifest(self.quelle, scan["gueltige_dateien"],
+                                                   scan["ordnerbaum"], plan, mit_hash=mit_hash,
+                                                   fehler=fehler)
+        self.assertEqual(fehler, [])
+        return manifest
+
+    def _speichere_lade(self, manifest: dms_kern.Uploadmanifest) -> dms_kern.Uploadmanifest:
+        pfad = self.tmp / "upload.manifest"
+        manifest.speichere_datei(pfad, self.quelle)
+        return dms_kern.Uploadmanifest.lade_datei(pfad)
+
+    def _delta(self, manifest: dms_kern.Uploadmanifest, quelle: Path | None = None) -> tuple:
+        quelle = quelle or self.quelle
+        tabelle = self._scan(quelle)["gueltige_dateien"]
+        delta = dms_kern.berechne_delta(quelle, tabelle, manifest, worker=2)
+        self.assertEqual(delta["fehler"], [])
+        status = {os.path.relpath(tabelle.pfad(i), quelle).replace(os.sep, "/"): s
+                  for i, s in enumerate(delta["status"])}
+        return delta, status
+
+    def test_rundreise(self) -> None:
+        for mit_hash in (False, True):
+            with self.subTest(mit_hash=mit_hash):
+                manifest = self._manifest(mit_hash)
+                self.assertEqual(len(manifest), len(DATEIEN))
+                self.assertTrue(all(m == MTIME_NS for m in manifest.mtimes))
+                geladen = self._speichere_lade(manifest)
+                self.assertEqual(list(geladen.tabelle.eintraege()),
+                                 list(manifest.tabelle.eintraege()))
+                self.assertEqual(geladen.mtimes, manifest.mtimes)
+                self.assertEqual(geladen.bereiche(), manifest.bereiche())
+                self.assertEqual(geladen.quellpfad, str(self.quelle))
+                self.assertTrue(geladen.erstellt)
+                if mit_hash:
+                    self.assertEqual(bytes(geladen.hashes), bytes(manifest.hashes))
+                    self.assertIsNotNone(geladen.hash(0))
+                else:
+                    self.assertIsNone(geladen.hashes)
+
+    def test_unveraendert(self) -> None:
+        kopie = self.tmp / "anderswo" / "quelle"
+        shutil.copytree(self.quelle, kopie)  # copy2: mtimes bleiben
+        geladen = self._speichere_lade(self._manifest(mit_hash=False))
+        for quelle in (self.quelle, kopie):
+            with self.subTest(quelle=str(quelle)):
+                delta, status = self._delta(geladen, quelle)
+                self.assertEqual(set(status.values()), {dms_kern.DELTA_UNVERAENDERT})
+                self.assertEqual((delta["anzahl_unveraendert"], delta["anzahl_entfernt"]),
+                                 (len(DATEIEN), 0))
+                self.assertEqual(delta["bytes_unveraendert"],
+                                 sum(len(i) for i in DATEIEN.values()))
+
+    def test_aenderungen(self) -> None:
+        neu, geaendert, unveraendert = (dms_kern.DELTA_NEU, dms_kern.DELTA_GEAENDERT,
+                                        dms_kern.DELTA_UNVERAENDERT)
+        erwartet = {
+            "a.txt": unveraendert,
+            "groesser.txt": geaendert,
+            "inhalt.txt": geaendert,
+            "angefasst.txt": geaendert,
+            "akten/brief.docx": unveraendert,
+            "akten/tief/notiz.txt": unveraendert,
+            "neu.txt": neu,
+            "akten/neu/anlage.pdf": neu,
+        }
+        manifeste = {m: self._speichere_lade(self._manifest(m)) for m in (False, True)}
+        aendere_baum(self.quelle)
+        for mit_hash, manifest in manifeste.items():
+            with self.subTest(mit_hash=mit_hash):
+                delta, status = self._delta(manifest)
+                # Mit Hash zählt bei gleicher Größe der Inhalt: nur angefasst ist unverändert
+                self.assertEqual(status, dict(erwartet, **{
+                    "angefasst.txt": unveraendert if mit_hash else geaendert}))
+                self.assertEqual(delta["anzahl_entfernt"], 3)
+                self.assertEqual(
+                    (delta["anzahl_neu"], delta["anzahl_geaendert"], delta["anzahl_unveraendert"]),
+                    (2, 2 if mit_hash else 3, 4 if mit_hash else 3))
+                self.assertEqual(delta["bytes_neu"], 30)
+                self.assertEqual(delta["bytes_geaendert"], 201 + 300 + (0 if mit_hash else 400))
+                if mit_hash:
+                    tabelle = self._scan()["gueltige_dateien"]
+                    i = next(i for i in range(len(tabelle))
+                             if tabelle.name(i) == "angefasst.txt")
+                    self.assertEqual(delta["mtimes"][i], MTIME_NS + 10**9)
+                    self.assertEqual(
+                        bytes(delta["hashes"][i * dms_kern.HASH_LAENGE:
+                                              (i + 1) * dms_kern.HASH_LAENGE]),
+                        manifest.hash(next(j for j in range(len(manifest))
+                                           if manifest.tabelle.name(j) == "angefasst.txt")))
+
+    def test_fremde_datei(self) -> None:
+        pfad = self.tmp / "kein.manifest"
+        pfad.write_bytes(b"kein SQLite" * 100)
+        with self.assertRaisesRegex(ValueError, "Kein Upload-Manifest"):
+            dms_kern.Uploadmanifest.lade_datei(pfad)
+        self._manifest(mit_hash=False).speichere_datei(pfad, self.quelle)
+        db = sqlite3.connect(str(pfad))
+        with db:
+            db.execute("UPDATE meta SET wert = '0' WHERE schluessel = 'version'")
+        db.close()
+        with self.assertRaisesRegex(ValueError, "Version 0"):
+            dms_kern.Uploadmanifest.lade_datei(pfad)
+
+
+if __name__ == "__main__":
+    unittest.main()
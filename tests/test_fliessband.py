@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Paketbildung im Fließband: ``TeilbaumPlaner.ergebnis`` liefert nach einem
+Scan mit ``teilbaum_fertig`` denselben Plan wie ``erstelle_paketvorschlaege``
+auf dem fertigen Baum – für jede Packstrategie, seriell und parallel
+gescannt, und nachdem Unterbäume hinzugekommen, geändert und entfernt wurden.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+sys.path.insert(0, str(WURZEL / "benchmarks"))
+
+import dms_kern  # noqa: E402
+from bench_fliessband import vergleichbar  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+ENDUNGEN = set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN)
+MAX_GROESSE = 48 * 1024  # klein, damit Unterbäume über mehrere Ebenen aufgeteilt werden
+
+
+def schreibe(pfad: Path, groesse: int) -> None:
+    pfad.parent.mkdir(parents=True, exist_ok=True)
+    pfad.write_bytes(b"x" * groesse)
+
+
+class Fliessband(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory(prefix="dms_test_")
+        self.tmp = Path(self._tmp.name)
+        self.quelle = self.tmp / "quelle"
+        erzeuge_baum(self.quelle, tiefe=3, verzweigung=4, dateien_pro_ordner=5,
+                     anteil_ungueltig=0.1, max_dateigroesse=8 * 1024, seed=7)
+        schreibe(self.quelle / "wurzeldatei.txt", 1000)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _scan(self, **kwargs) -> dict:
+        return dms_kern.scanne_quellordner(self.quelle, self.tmp / "ziel", ENDUNGEN, True,
+                                           **kwargs)
+
+    def _vergleiche(self) -> None:
+        referenz_scan = self._scan()
+        dms_kern.berechne_ordnergroessen(referenz_scan["ordnerbaum"])
+        for strategie in dms_kern.PACKSTRATEGIEN:
+            referenz = vergleichbar(dms_kern.erstelle_paketvorschlaege(
+                referenz_scan["ordnerbaum"], MAX_GROESSE, strategie))
+            self.assertGreater(len(referenz), 1)
+            for scan_worker in (1, 4):
+                with self.subTest(strategie=strategie, scan_worker=scan_worker):
+                    gemeldet: list[dict] = []
+                    planer = dms_kern.TeilbaumPlaner(MAX_GROESSE, strategie,
+                                                     melde=gemeldet.append)
+                    try:
+                        scan = self._scan(scan_worker=scan_worker,
+                                          teilbaum_fertig=planer.teilbaum_fertig)
+                        ergebnis = planer.ergebnis(scan["ordnerbaum"])
+                    finally:
+                        planer.schliesse()
+                    self.assertEqual(vergleichbar(ergebnis), referenz)
+                    kinder = referenz_scan["ordnerbaum"].kinder.values()
+                    self.assertEqual(sorted((str(m["ordner"]), m["groesse"]) for m in gemeldet),
+                                     sorted((str(k.als_path()), k.groesse)
+                                            for k in kinder if k.groesse))
+
+    def test_unveraendert(self) -> None:
+        self._vergleiche()
+
+    def test_unterbaum_hinzugefuegt(self) -> None:
+        for nr in range(12):
+            schreibe(self.quelle / "neu_gross" / f"teil{nr % 3}" / f"datei{nr}.bin", 9000)
+        schreibe(self.quelle / "neu_klein" / "a.txt", 100)
+        schreibe(self.quelle / "0_zuerst" / "leer" / "programm.exe", 100)  # nur ungültige Dateien
+        self._vergleiche()
+
+    def test_unterbaum_geaendert(self) -> None:
+        ordner = sorted(p for p in self.quelle.iterdir() if p.is_dir())
+        for datei in sorted(ordner[0].rglob("*"))[:10]:
+            if datei.is_file():
+                with open(datei, "ab") as f:
+                    f.write(b"y" * 5000)
+        schreibe(ordner[1] / "tief" / "tiefer" / "gross.bin", MAX_GROESSE + 1)  # zu groß
+        self._vergleiche()
+
+    def test_unterbaum_entfernt(self) -> None:
+        ordner = sorted(p for p in self.quelle.iterdir() if p.is_dir())
+        shutil.rmtree(ordner[0])
+        shutil.rmtree(ordner[-1])
+        self._vergleiche()
+
+
+if __name__ == "__main__":
+    unittest.main()
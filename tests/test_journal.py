@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Verschiebejournal: Ein echter Lauf, der mitten im Verschieben mit einer
+Ausnahme abbricht, wird mit ``setze_verschiebungen_fort`` zu demselben
+Logfile und derselben Zielbasis fortgesetzt wie ein ununterbrochener Lauf –
+auch wenn der letzte Block von Ergebnissen nicht mehr festgeschrieben wurde.
+Ein Journal mit anderem Quellordner oder anderen Regeln wird nicht
+fortgesetzt; nach einem regulären Ende ist es gelöscht.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+
+import dms_cli  # noqa: E402
+import dms_kern  # noqa: E402
+
+ENDUNGEN = {".exe", ".lnk"}
+ABSTURZ_NACH = 9  # Verschiebungen bis zur Ausnahme
+
+
+def erzeuge_baum(quelle: Path) -> None:
+    for ordner in range(4):
+        for nr in range(5):
+            for endung, groesse in ((".txt", 10), (".exe", 20), (".pdf", 30)):
+                pfad = quelle / f"ordner{ordner}" / f"datei{nr}{endung}"
+                pfad.parent.mkdir(parents=True, exist_ok=True)
+                pfad.write_bytes(b"x" * (groesse + nr))
+    (quelle / "verknuepfung.lnk").write_bytes(b"l")
+
+
+def lies_log(logdatei: Path, basis: str) -> list[str]:
+    """Logzeilen ohne Zeitstempel, Pfade relativ zu ``basis``."""
+    with open(logdatei, encoding="utf-8") as f:
+        return [z.split(";", 1)[1].replace(basis, "") for z in f.read().splitlines()[1:]]
+
+
+def zieldateien(zielbasis: Path) -> list[str]:
+    return sorted(str(p.relative_to(zielbasis)) for p in zielbasis.rglob("*") if p.is_file()
+                  and not p.name.startswith(("NichtUploadfaehig_Log_", "Verschiebejournal_")))
+
+
+def absturz_nach(anzahl: int):
+    """``Verschieber.verschiebe``, das nach ``anzahl`` Aufrufen eine Ausnahme wirft."""
+    original = dms_kern.Verschieber.verschiebe
+    zaehler = iter(range(anzahl))
+
+    def verschiebe(self, *args, **kwargs):
+        if next(zaehler, None) is None:
+            raise RuntimeError("Absturz beim Verschieben")
+        return original(self, *args, **kwargs)
+
+    return mock.patch.object(dms_kern.Verschieber, "verschiebe", verschiebe)
+
+
+class Verschiebejournal(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory(prefix="dms_test_")
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _baum(self, name: str) -> tuple[Path, Path]:
+        quelle = self.tmp / name / "quelle"
+        erzeuge_baum(quelle)
+        return quelle, self.tmp / name / "ziel"
+
+    def _ergebnis(self, ergebnis: dict, basis: str, zielbasis: Path) -> dict:
+        return {
+            "gueltige": [(str(p).replace(basis, ""), g) for p, g in ergebnis["gueltige_dateien"]],
+            "anzahl_ungueltig": ergebnis["anzahl_ungueltig"],
+            "log": lies_log(ergebnis["logdatei"], basis),
+            "ziel": zieldateien(zielbasis),
+            "fehler": ergebnis["fehler"],
+        }
+
+    def _ununterbrochen(self) -> dict:
+        quelle, zielbasis = self._baum("ununterbrochen")
+        journal = dms_kern.oeffne_journal(quelle, zielbasis)
+        ergebnis = dms_kern.scanne_quellordner(quelle, zielbasis, ENDUNGEN, False, journal=journal)
+        self.assertFalse(journal.pfad.exists())
+        return self._ergebnis(ergebnis, str(self.tmp / "ununterbrochen"), zielbasis)
+
+    def _unterbreche(self, quelle: Path, zielbasis: Path, absturz: bool) -> Path:
+        """Echter Lauf bis zur Ausnahme; mit ``absturz`` geht der offene Block verloren."""
+        journal = dms_kern.oeffne_journal(quelle, zielbasis)
+        self.assertFalse(journal.geladen)
+        journal.block_zeilen = 4
+        with contextlib.ExitStack() as stapel:
+            stapel.enter_context(absturz_nach(ABSTURZ_NACH))
+            if absturz:
+                stapel.enter_context(mock.patch.object(
+                    dms_kern.Verschiebejournal, "schliesse",
+                    dms_kern.Verschiebejournal._schliesse_db))
+            with self.assertRaisesRegex(RuntimeError, "Absturz"):
+                dms_kern.scanne_quellordner(quelle, zielbasis, ENDUNGEN, False, journal=journal)
+        self.assertTrue(journal.pfad.is_file())
+        return journal.pfad
+
+    def test_fortsetzen_wie_ununterbrochen(self) -> None:
+        referenz = self._ununterbrochen()
+        self.assertEqual(referenz["anzahl_ungueltig"], 21)
+        for absturz in (False, True):
+            with self.subTest(absturz=absturz):
+                name = f"unterbrochen_{absturz}"
+                quelle, zielbasis = self._baum(name)
+                pfad = self._unterbreche(quelle, zielbasis, absturz)
+                self.assertEqual(len(zieldateien(zielbasis)), ABSTURZ_NACH)
+
+                journal = dms_kern.oeffne_journal(quelle, zielbasis)
+                self.assertTrue(journal.geladen)
+                self.assertIsNone(journal.abweichung(quelle, ENDUNGEN))
+                erledigt = 8 if absturz else ABSTURZ_NACH  # Blöcke zu 4 Zeilen
+                self.assertEqual(journal.anzahl_offen, 21 - erledigt)
+                ergebnis = dms_kern.setze_verschiebungen_fort(journal)
+                self.assertFalse(pfad.exists())
+                self.assertEqual(self._ergebnis(ergebnis, str(self.tmp / name), zielbasis),
+                                 referenz)
+
+    def test_abweichung(self) -> None:
+        quelle, zielbasis = self._baum("abweichung")
+        self._unterbreche(quelle, zielbasis, absturz=False)
+        journal = dms_kern.oeffne_journal(quelle, zielbasis)
+        self.assertIsNone(journal.abweichung(quelle, {".EXE", " .lnk", ""}))
+        faelle = {
+            "anderer Quellordner": (self.tmp / "anderswo" / "quelle", ENDUNGEN),
+            "neu: .bat": (quelle, ENDUNGEN | {".bat"}),
+            "fehlend: .lnk": (quelle, {".exe"}),
+        }
+        for erwartet, (pfad, endungen) in faelle.items():
+            with self.subTest(erwartet):
+                self.assertIn(erwartet, journal.abweichung(pfad, endungen))
+
+    def test_cli_verweigert_fortsetzen(self) -> None:
+        quelle, zielbasis = self._baum("cli")
+        pfad = self._unterbreche(quelle, zielbasis, absturz=False)
+        vorher = zieldateien(zielbasis)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            code = dms_cli.main([str(quelle), "--zielbasis", str(zielbasis), "--verschieben",
+                                 "--endungen", ".exe,.lnk,.bat"])
+        self.assertEqual(code, dms_cli.EXIT_EINGABE)
+        self.assertIn("passt nicht", stderr.getvalue())
+        self.assertTrue(pfad.is_file())
+        self.assertEqual(zieldateien(zielbasis), vorher)
+
+    def test_regulaeres_ende_loescht_journal(self) -> None:
+        quelle, zielbasis = self._baum("abbruch")
+        fortschritt = dms_kern.Fortschritt()
+        original = fortschritt.setze_phase
+
+        def setze_phase(text: str) -> None:
+            fortschritt.abbrechen()  # nach der ersten Verschiebung
+            original(text)
+
+        fortschritt.setze_phase = setze_phase
+        journal = dms_kern.oeffne_journal(quelle, zielbasis)
+        ergebnis = dms_kern.scanne_quellordner(quelle, zielbasis, ENDUNGEN, False,
+                                               journal=journal, fortschritt=fortschritt)
+        self.assertTrue(ergebnis["abgebrochen"])
+        self.assertEqual(len(zieldateien(zielbasis)), 1)
+        self.assertFalse(journal.pfad.exists())
+        # Ein Trockenlauf legt gar keins an
+        journal = dms_kern.oeffne_journal(quelle, zielbasis)
+        dms_kern.scanne_quellordner(quelle, zielbasis, ENDUNGEN, True, journal=journal)
+        self.assertFalse(journal.pfad.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
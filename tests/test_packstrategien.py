@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Packstrategien: Die Standardstrategie ``namensreihenfolge`` (der Reihe nach
+auffüllen) liefert genau die Pakete der früheren Paketbildung; First-Fit
+und Best-Fit Decreasing überschreiten nie die Grenze, ``optimal`` findet die
+kleinste Paketanzahl (auch dort, wo die Heuristiken eine zu viel brauchen);
+eine zu große Einheit bekommt bei jeder Strategie ein eigenes Paket.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+sys.path.insert(0, str(WURZEL / "benchmarks"))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+MAX_GROESSE = 40 * 1024
+
+
+def referenz_packen(einheiten: list[tuple[str, int]], max_groesse: int) -> list[list]:
+    """Das frühere Packen: nach Namen sortiert der Reihe nach auffüllen."""
+    pakete: list[list[tuple[str, int]]] = []
+    aktuelles_paket: list[tuple[str, int]] = []
+    aktuelle_groesse = 0
+    for name, groesse in sorted(einheiten, key=lambda x: x[0]):
+        if aktuelle_groesse + groesse > max_groesse and aktuelles_paket:
+            pakete.append(aktuelles_paket)
+            aktuelles_paket = []
+            aktuelle_groesse = 0
+        aktuelles_paket.append((name, groesse))
+        aktuelle_groesse += groesse
+    if aktuelles_paket:
+        pakete.append(aktuelles_paket)
+    return pakete
+
+
+def referenz_paketbildung(ordner: Path, alle_dateien: list[tuple[Path, int]],
+                          max_groesse: int, ergebnisse: list[dict]) -> None:
+    """Die Paketbildung vor den Packstrategien (Dateiliste statt Ordnerbaum)."""
+    ordnergroessen: dict[Path, int] = {}
+    for datei, groesse in alle_dateien:
+        for eltern in datei.parents:
+            ordnergroessen[eltern] = ordnergroessen.get(eltern, 0) + groesse
+    unterordner: set[Path] = set()
+    dateien_im_ordner: list[tuple[Path, int]] = []
+    for datei, groesse in alle_dateien:
+        if datei.parent == ordner:
+            dateien_im_ordner.append((datei, groesse))
+        else:
+            unterordner.add(ordner / datei.relative_to(ordner).parts[0])
+
+    einheiten: list[tuple[str, int]] = []
+    warnungen: list[str] = []
+    zu_gross: list[Path] = []
+    summe_dateien = sum(g for _, g in dateien_im_ordner)
+    if summe_dateien > 0:
+        if summe_dateien <= max_groesse:
+            einheiten.append(("[Dateien in diesem Ordner]", summe_dateien))
+        else:
+            dateien_im_ordner.sort(key=lambda x: x[0].name)
+            paket: list[tuple[str, int]] = []
+            paket_groesse = 0
+            for datei, groesse in dateien_im_ordner:
+                if groesse > max_groesse:
+                    warnungen.append(f"Datei {datei} ({dms_kern.formatiere_groesse(groesse)}) "
+                                     f"ist größer als 1 GiB!")
+                    continue
+                if paket_groesse + groesse > max_groesse:
+                    einheiten.append((f"[Dateien-Paket: {len(paket)} Dateien]", paket_groesse))
+                    paket = []
+                    paket_groesse = 0
+                paket.append((datei.name, groesse))
+                paket_groesse += groesse
+            if paket:
+                einheiten.append((f"[Dateien-Paket: {len(paket)} Dateien]", paket_groesse))
+    for uo in sorted(unterordner):
+        if ordnergroessen.get(uo, 0) == 0:
+            continue
+        if ordnergroessen[uo] <= max_groesse:
+            einheiten.append((f"Ordner: {uo.name}", ordnergroessen[uo]))
+        else:
+            zu_gross.append(uo)
+
+    pakete = referenz_packen(einheiten, max_groesse)
+    ergebnisse.append({"ordner": ordner, "pakete": pakete, "warnungen": warnungen,
+                       "unterordner_aufgeteilt": zu_gross})
+    for uo in zu_gross:
+        referenz_paketbildung(uo, [(d, g) for d, g in alle_dateien
+                                   if str(d).startswith(str(uo) + os.sep)],
+                              max_groesse, ergebnisse)
+
+
+def kleinste_paketanzahl(groessen: list[int], max_groesse: int) -> int:
+    """Optimum durch vollständige Suche (nur für wenige Einheiten)."""
+    beste = len(groessen)
+
+    def suche(i: int, pakete: list[int]) -> None:
+        nonlocal beste
+        if len(pakete) >= beste:
+            return
+        if i == len(groessen):
+            beste = len(pakete)
+            return
+        for nr in range(len(pakete)):
+            if pakete[nr] + groessen[i] <= max_groesse:
+                pakete[nr] += groessen[i]
+                suche(i + 1, pakete)
+                pakete[nr] -= groessen[i]
+        pakete.append(groessen[i])
+        suche(i + 1, pakete)
+        pakete.pop()
+
+    suche(0, [])
+    return beste
+
+
+def einheiten(groessen: list[int]) -> list[tuple[str, int]]:
+    return [(f"einheit{nr:02d}", groesse) for nr, groesse in enumerate(groessen)]
+
+
+class Packstrategien(unittest.TestCase):
+
+    def _pruefe_vollstaendig(self, eingabe: list, pakete: list[list]) -> None:
+        self.assertEqual(sorted(e for paket in pakete for e in paket), sorted(eingabe))
+        self.assertTrue(all(pakete))
+
+    def test_namensreihenfolge_wie_bisher(self) -> None:
+        self.assertEqual(dms_kern.STANDARD_PACKSTRATEGIE, "namensreihenfolge")
+        with tempfile.TemporaryDirectory(prefix="dms_test_") as tmp:
+            quelle = Path(tmp) / "quelle"
+            erzeuge_baum(quelle, tiefe=3, verzweigung=4, dateien_pro_ordner=8,
+                         anteil_ungueltig=0.0, max_dateigroesse=12 * 1024, seed=5)
+            (quelle / "ordner_0_00" / "riesig.bin").write_bytes(bytes(MAX_GROESSE + 1))
+            scan = dms_kern.scanne_quellordner(quelle, Path(tmp) / "ziel", set(), True)
+            dms_kern.berechne_ordnergroessen(scan["ordnerbaum"])
+            referenz: list[dict] = []
+            referenz_paketbildung(quelle, list(scan["gueltige_dateien"]), MAX_GROESSE, referenz)
+        self.assertGreater(len(referenz), 3)
+        self.assertTrue(any(e["warnungen"] for e in referenz))
+        for argumente in ({}, {"strategie": "best_fit_decreasing", "namensreihenfolge": True}):
+            with self.subTest(**argumente):
+                neu = dms_kern.erstelle_paketvorschlaege(scan["ordnerbaum"], MAX_GROESSE,
+                                                         **argumente)
+                self.assertEqual([{s: e[s] for s in referenz[0]} for e in neu], referenz)
+
+    def test_namensreihenfolge_einheiten(self) -> None:
+        zufall = random.Random(7)
+        for durchlauf in range(300):
+            # Kleine Größen: Pakete, die die Grenze genau erreichen, kommen oft vor
+            eingabe = einheiten([zufall.randint(1, 50) for _ in range(zufall.randint(0, 30))])
+            zufall.shuffle(eingabe)
+            with self.subTest(durchlauf=durchlauf):
+                self.assertEqual(dms_kern.packe_einheiten(eingabe, 100),
+                                 referenz_packen(eingabe, 100))
+
+    def test_grenze_eingehalten(self) -> None:
+        zufall = random.Random(11)
+        for durchlauf in range(300):
+            groessen = [zufall.randint(1, 100) for _ in range(zufall.randint(1, 40))]
+            eingabe = einheiten(groessen)
+            for strategie in dms_kern.PACKSTRATEGIEN:
+                with self.subTest(durchlauf=durchlauf, strategie=strategie):
+                    pakete = dms_kern.packe_einheiten(eingabe, 100, strategie)
+                    self._pruefe_vollstaendig(eingabe, pakete)
+                    self.assertLessEqual(max(sum(e[1] for e in p) for p in pakete), 100)
+
+    def test_optimal(self) -> None:
+        # Beide Heuristiken brauchen hier 4 Pakete: {9} {5 4} {4 3 2} {2}; optimal sind 3
+        eingabe = einheiten([9, 5, 4, 4, 3, 2, 2])
+        for strategie in ("first_fit_decreasing", "best_fit_decreasing"):
+            self.assertEqual(len(dms_kern.packe_einheiten(eingabe, 10, strategie)), 4)
+        pakete = dms_kern.packe_einheiten(eingabe, 10, "optimal")
+        self._pruefe_vollstaendig(eingabe, pakete)
+        self.assertEqual(sorted(sorted(e[1] for e in p) for p in pakete),
+                         [[2, 3, 5], [2, 4, 4], [9]])
+
+        zufall = random.Random(3)
+        for durchlauf in range(200):
+            groessen = [zufall.randint(1, 10) for _ in range(zufall.randint(1, 9))]
+            with self.subTest(groessen=groessen):
+                pakete = dms_kern.packe_einheiten(einheiten(groessen), 10, "optimal")
+                self._pruefe_vollstaendig(einheiten(groessen), pakete)
+                self.assertLessEqual(max(sum(e[1] for e in p) for p in pakete), 10)
+                self.assertEqual(len(pakete), kleinste_paketanzahl(
+                    sorted(groessen, reverse=True), 10))
+
+    def test_zu_grosse_einheit(self) -> None:
+        eingabe = einheiten([30, 150, 40, 20, 100])
+        for strategie in dms_kern.PACKSTRATEGIEN:
+            with self.subTest(strategie=strategie):
+                pakete = dms_kern.packe_einheiten(eingabe, 100, strategie)
+                self._pruefe_vollstaendig(eingabe, pakete)
+                self.assertIn([("einheit01", 150)], pakete)
+                self.assertEqual(max(sum(e[1] for e in p) for p in pakete
+                                     if p != [("einheit01", 150)]), 100)
+
+    def test_unbekannte_strategie(self) -> None:
+        with self.assertRaisesRegex(ValueError, "Unbekannte Packstrategie"):
+            dms_kern.packe_einheiten(einheiten([1]), 10, "zufall")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Der parallele Verzeichnisdurchlauf liefert für jede Worker-Zahl genau das
+Ergebnis des seriellen: dieselben Verzeichnisse in derselben Reihenfolge,
+dieselben gültigen Dateien und Logzeilen. Geprüft werden auch nicht lesbare
+Ordner, ein Fehler im Listing, das vorzeitige Beenden des Durchlaufs und
+der Abbruch über ``Fortschritt``.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+sys.path.insert(0, str(WURZEL / "benchmarks"))
+
+import dms_basis  # noqa: E402
+import dms_kern  # noqa: E402
+import dms_scan  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+WORKER = (1, 2, 8)
+ENDUNGEN = set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN)
+
+
+def _scan_threads() -> list[threading.Thread]:
+    return [t for t in threading.enumerate() if t.name.startswith("scan")]
+
+
+def zufaellige_latenz(seed: int):
+    """``os.scandir`` mit zufälliger Verzögerung: Listings werden in wechselnder Folge fertig."""
+    original = os.scandir
+    zufall = random.Random(seed)
+    sperre = threading.Lock()
+
+    def scandir(pfad=".", *args, **kwargs):
+        with sperre:
+            pause = zufall.random() / 1000
+        time.sleep(pause)
+        return original(pfad, *args, **kwargs)
+
+    return mock.patch.object(os, "scandir", scandir)
+
+
+class ParallelerScan(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory(prefix="dms_test_")
+        cls.tmp = Path(cls._tmp.name)
+        cls.quelle = cls.tmp / "quelle"
+        erzeuge_baum(cls.quelle, tiefe=3, verzweigung=4, dateien_pro_ordner=3,
+                     anteil_ungueltig=0.2, max_dateigroesse=512)
+        cls.zielbasis = cls.quelle / "_Ziel"  # im Quellordner: wird beim Durchlauf ausgeschnitten
+        cls.zielbasis.mkdir()
+        (cls.zielbasis / "alt.exe").write_bytes(b"x")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmp.cleanup()
+
+    def _durchlauf(self, worker: int) -> list[tuple[str, list[tuple[str, int]]]]:
+        return list(dms_scan._durchlaufe_verzeichnisse(self.quelle, self.zielbasis, worker))
+
+    def _scan(self, worker: int, **kwargs) -> tuple:
+        ergebnis = dms_kern.scanne_quellordner(self.quelle, self.zielbasis, ENDUNGEN, True,
+                                               scan_worker=worker, **kwargs)
+        with open(ergebnis["logdatei"], encoding="utf-8") as f:
+            log = [zeile.split(";", 1)[1] for zeile in f.read().splitlines()[1:]]
+        os.unlink(ergebnis["logdatei"])
+        return ergebnis["gueltige_dateien"], ergebnis["anzahl_ungueltig"], log
+
+    def test_durchlauf_wie_seriell(self) -> None:
+        seriell = self._durchlauf(1)
+        self.assertGreater(len(seriell), 20)
+        self.assertFalse(any(v.startswith(str(self.zielbasis)) for v, _ in seriell))
+        for worker in WORKER[1:]:
+            with self.subTest(worker=worker), zufaellige_latenz(worker):
+                self.assertEqual(self._durchlauf(worker), seriell)
+
+    def test_scan_wie_seriell(self) -> None:
+        seriell = self._scan(1)
+        self.assertTrue(seriell[1])
+        for worker in WORKER[1:]:
+            with self.subTest(worker=worker), zufaellige_latenz(worker):
+                self.assertEqual(self._scan(worker), seriell)
+
+    def test_nicht_lesbarer_ordner(self) -> None:
+        gesperrt = str(next(p for p in sorted(self.quelle.iterdir())
+                            if p.is_dir() and p != self.zielbasis))
+        original = os.scandir
+
+        def scandir(pfad=".", *args, **kwargs):
+            if os.fspath(pfad) == gesperrt:
+                raise PermissionError(13, "Zugriff verweigert", gesperrt)
+            return original(pfad, *args, **kwargs)
+
+        with mock.patch.object(os, "scandir", scandir):
+            ergebnisse = {w: self._durchlauf(w) for w in WORKER}
+        self.assertFalse(any(v.startswith(gesperrt) for v, _ in ergebnisse[1]))
+        for worker in WORKER[1:]:
+            with self.subTest(worker=worker):
+                self.assertEqual(ergebnisse[worker], ergebnisse[1])
+
+    def test_fehler_im_listing(self) -> None:
+        def listen(verz: str):
+            if verz.count(os.sep) > str(self.quelle).count(os.sep) + 1:
+                raise RuntimeError(f"Listing kaputt: {verz}")
+            return dms_scan._liste_verzeichnis(verz)
+
+        for worker in WORKER[1:]:
+            with self.subTest(worker=worker):
+                durchlauf = dms_scan._durchlaufe_verzeichnisse_parallel(
+                    str(self.quelle), dms_basis._normpfad(self.zielbasis), worker, listen)
+                with self.assertRaisesRegex(RuntimeError, "Listing kaputt"):
+                    list(durchlauf)
+                self.assertEqual(_scan_threads(), [])
+
+    def test_vorzeitig_beendet(self) -> None:
+        for worker in WORKER[1:]:
+            with self.subTest(worker=worker):
+                durchlauf = dms_scan._durchlaufe_verzeichnisse(self.quelle, self.zielbasis, worker)
+                erste = [next(durchlauf) for _ in range(3)]
+                durchlauf.close()
+                self.assertEqual(erste, self._durchlauf(1)[:3])
+                self.assertEqual(_scan_threads(), [])
+
+    def test_abbruch(self) -> None:
+        def abbruch_nach(anzahl: int) -> dms_kern.Fortschritt:
+            fortschritt = dms_kern.Fortschritt()
+            zaehler = iter(range(anzahl))
+            original = fortschritt.datei
+
+            def datei(groesse: int) -> bool:
+                if next(zaehler, None) is None:
+                    fortschritt.abbrechen()
+                return original(groesse)
+
+            fortschritt.datei = datei
+            return fortschritt
+
+        seriell = self._scan(1, fortschritt=abbruch_nach(25))
+        self.assertLess(len(seriell[0]), 25)
+        for worker in WORKER[1:]:
+            with self.subTest(worker=worker):
+                self.assertEqual(self._scan(worker, fortschritt=abbruch_nach(25)), seriell)
+                self.assertEqual(_scan_threads(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Regressionstest: Die Paketplanung greift nicht auf das Dateisystem zu.
+
+Nach dem Scan werden Quellbaum gelöscht und alle Dateisystem-Aufrufe
+(``os.stat``, ``os.scandir``, ``Path.stat`` usw.) gesperrt; Ordnergrößen,
+Paketvorschläge und Paketinhalte müssen trotzdem entstehen und dem Plan
+mit intaktem Baum gleichen – für jede Packstrategie und für die Planung
+gegen geschätzte ZIP-Größen.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+sys.path.insert(0, str(WURZEL / "benchmarks"))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+GESPERRTE_OS_FUNKTIONEN = ["stat", "lstat", "scandir", "listdir", "open", "mkdir", "replace"]
+GESPERRTE_PATH_METHODEN = ["stat", "lstat", "exists", "is_dir", "is_file", "iterdir", "open"]
+MAX_GROESSE = 64 * 1024  # klein, damit mehrere Ebenen und geteilte Dateigruppen entstehen
+
+
+class DateisystemZugriff(AssertionError):
+    pass
+
+
+def _sperre(name: str):
+    def gesperrt(*args, **kwargs):
+        raise DateisystemZugriff(f"Dateisystemzugriff in der Planung: {name}{args!r}")
+    return gesperrt
+
+
+def plane(scan: dict, strategie: str, komprimiert: dict | None = None) -> list:
+    """Plan samt aufgelöster Paketinhalte (vergleichbar, ohne Knotenobjekte)."""
+    dms_kern.berechne_ordnergroessen(scan["ordnerbaum"])
+    vorschlaege = dms_kern.erstelle_paketvorschlaege(scan["ordnerbaum"], MAX_GROESSE, strategie,
+                                                     komprimiert=komprimiert)
+    return [(str(e["ordner"]), e["pakete"], e["warnungen"], e.get("komprimiert"),
+             [list(dms_kern.paket_dateien(inhalt)) for inhalt in e["inhalte"]])
+            for e in vorschlaege]
+
+
+class PlanungOhneIO(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory(prefix="dms_test_")
+        tmp = Path(cls._tmp.name)
+        quelle = tmp / "quelle"
+        erzeuge_baum(quelle, tiefe=3, verzweigung=4, dateien_pro_ordner=8,
+                     max_dateigroesse=16 * 1024)
+        cls.scan = dms_kern.scanne_quellordner(quelle, tmp / "ziel",
+                                               set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN),
+                                               trockenlauf=True)
+        cls.komprimiert = dms_kern.schaetze_komprimierte_groessen(
+            cls.scan["ordnerbaum"], dms_kern.Kompressionsschaetzer())
+        cls.referenz = {s: plane(cls.scan, s) for s in dms_kern.PACKSTRATEGIEN}
+        cls.referenz_komprimiert = plane(cls.scan, dms_kern.STANDARD_PACKSTRATEGIE,
+                                         cls.komprimiert)
+        shutil.rmtree(quelle)  # Snapshot-Eigenschaft: ohne Quelle derselbe Plan
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmp.cleanup()
+
+    def _ohne_dateisystem(self, funktion):
+        with ExitStack() as stapel:
+            for n in GESPERRTE_OS_FUNKTIONEN:
+                stapel.enter_context(mock.patch.object(os, n, _sperre(f"os.{n}")))
+            for n in GESPERRTE_PATH_METHODEN:
+                stapel.enter_context(mock.patch.object(Path, n, _sperre(f"Path.{n}")))
+            return funktion()
+
+    def test_strategien(self) -> None:
+        for strategie in dms_kern.PACKSTRATEGIEN:
+            with self.subTest(strategie=strategie):
+                plan = self._ohne_dateisystem(lambda: plane(self.scan, strategie))
+                self.assertTrue(plan)
+                self.assertEqual(plan, self.referenz[strategie])
+
+    def test_komprimiert(self) -> None:
+        plan = self._ohne_dateisystem(
+            lambda: plane(self.scan, dms_kern.STANDARD_PACKSTRATEGIE, self.komprimiert))
+        self.assertEqual(plan, self.referenz_komprimiert)
+
+    def test_sperre_greift(self) -> None:
+        with self.assertRaises(DateisystemZugriff):
+            self._ohne_dateisystem(lambda: os.stat(WURZEL))
+
+
+if __name__ == "__main__":
+    unittest.main()
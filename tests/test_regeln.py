@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Dateiregeln als Tabelle: Endungen ohne Rücksicht auf Groß-/Kleinschreibung,
+mehrteilige Endungen (``.tar.gz``), Einträge ohne Punkt als Dateinamen,
+Muster, Dateien ohne Endung und Inhaltsprüfungen. Der schnelle Weg von
+``klassifiziere`` (nur einfache Endungen) liefert dasselbe wie ``regel`` und
+wie die frühere Prüfung mit ``Path.suffix``.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+
+import dms_kern  # noqa: E402
+
+# (Regeln, Dateiname, erwartete Regel oder None)
+FAELLE = [
+    # Endungen, Groß-/Kleinschreibung
+    ({".exe"}, "setup.exe", ".exe"),
+    ({".exe"}, "SETUP.EXE", ".exe"),
+    ({".EXE"}, "setup.Exe", ".exe"),
+    ({" .Exe "}, "setup.exe", ".exe"),
+    ({".exe"}, "setup.exe.txt", None),
+    ({".exe"}, "setup.exe.", None),
+    ({".exe"}, "a..exe", ".exe"),
+    ({".exe"}, "ÄNDERUNG.EXE", ".exe"),
+    # Punkt am Namensanfang zählt nicht (wie Path.suffix)
+    ({".exe"}, ".exe", None),
+    ({".exe"}, ".versteckt.exe", ".exe"),
+    ({".gitignore"}, ".gitignore", None),
+    # Mehrteilige Endungen
+    ({".tar.gz"}, "archiv.tar.gz", ".tar.gz"),
+    ({".tar.gz"}, "ARCHIV.TAR.GZ", ".tar.gz"),
+    ({".tar.gz"}, "archiv.gz", None),
+    ({".tar.gz"}, ".tar.gz", None),
+    ({".tar.gz"}, "x.backup.tar.gz", ".tar.gz"),
+    ({".tar.gz", ".gz"}, "archiv.tar.gz", ".gz"),
+    ({".tar.gz", ".gz"}, "archiv.gz", ".gz"),
+    # Einträge ohne Punkt sind Dateinamen
+    ({"exe"}, "setup.exe", None),
+    ({"exe"}, "exe", "exe"),
+    ({"thumbs.db"}, "Thumbs.db", "thumbs.db"),
+    ({"makefile"}, "Makefile", "makefile"),
+    ({"makefile"}, "makefile.txt", None),
+    ({"desktop.ini", ".ini"}, "desktop.ini", "desktop.ini"),
+    # Muster für den ganzen Namen
+    ({"~$*.docx"}, "~$brief.docx", "~$*.docx"),
+    ({"~$*.docx"}, "~$BRIEF.DOCX", "~$*.docx"),
+    ({"~$*.docx"}, "brief.docx", None),
+    ({"*.tmp"}, "x.tmp", "*.tmp"),
+    ({"*.tmp"}, ".tmp", "*.tmp"),
+    ({"*.tmp"}, "x.tmp.bak", None),
+    ({"backup_??.*"}, "backup_01.zip", "backup_??.*"),
+    ({"backup_??.*"}, "backup_001.zip", None),
+    ({"[0-9]*.log"}, "2024.log", "[0-9]*.log"),
+    ({"[0-9]*.log"}, "a2024.log", None),
+    ({".exe", "*.tmp", "thumbs.db"}, "thumbs.db", "thumbs.db"),
+    # Ohne Endung
+    ({".exe"}, "README", None),
+    ({".exe"}, "ordner.", None),
+    ({".exe"}, ".", None),
+    ({".exe"}, "..", None),
+    ({".exe", "readme"}, "README", "readme"),
+    # Leere Regeln werden ignoriert
+    ({"", " "}, "datei", None),
+]
+
+
+def ohne_schnellen_weg(regeln: dms_kern.Dateiregeln, namen: list[str]) -> list:
+    return [regeln.regel(name) for name in namen]
+
+
+def mit_schnellem_weg(regeln: dms_kern.Dateiregeln, namen: list[str]) -> list:
+    return regeln.klassifiziere("", [(name, 0) for name in namen])
+
+
+class Dateiregeln(unittest.TestCase):
+
+    def test_tabelle(self) -> None:
+        for regeln, name, erwartet in FAELLE:
+            with self.subTest(regeln=sorted(regeln), name=name):
+                dateiregeln = dms_kern.Dateiregeln(regeln)
+                self.assertEqual(dateiregeln.regel(name), erwartet)
+                self.assertEqual(mit_schnellem_weg(dateiregeln, [name]), [erwartet])
+
+    def test_schneller_weg_wie_regel(self) -> None:
+        zufall = random.Random(1)
+        zeichen = "aAeExX.~$ _ä"
+        namen = ["".join(zufall.choice(zeichen) for _ in range(zufall.randint(1, 8)))
+                 for _ in range(5000)]
+        namen += [name + endung for name in namen[:500]
+                  for endung in (".exe", ".EXE", ".Exe.", ".tar.gz", ".lnk")]
+        for regeln in (dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN, {".exe"}, {".E", ".x"}):
+            dateiregeln = dms_kern.Dateiregeln(regeln)
+            self.assertTrue(dateiregeln._nur_endungen)
+            with self.subTest(regeln=sorted(regeln)):
+                # Bisherige Prüfung im Scan: Path(name).suffix.lower() in ungueltige_endungen
+                klein = {r.lower() for r in regeln}
+                bisher = [Path(n).suffix.lower() if Path(n).suffix.lower() in klein else None
+                          for n in namen]
+                abweichungen = [
+                    (name, schnell, langsam, alt) for name, schnell, langsam, alt in zip(
+                        namen, mit_schnellem_weg(dateiregeln, namen),
+                        ohne_schnellen_weg(dateiregeln, namen), bisher)
+                    if not schnell == langsam == alt]
+                self.assertEqual(abweichungen[:10], [])
+
+    def test_inhalt(self) -> None:
+        with tempfile.TemporaryDirectory(prefix="dms_test_") as tmp:
+            dateien = {
+                "programm.dat": b"MZ" + bytes(100),
+                "zu_klein.dat": b"MZ" + bytes(10),
+                "verknuepfung": dms_kern.INHALT_SIGNATUREN["lnk"][0] + bytes(100),
+                "text.txt": b"MZ ist auch ein Wort" * 10,
+                "setup.exe": b"MZ" + bytes(100),
+            }
+            for name, inhalt in dateien.items():
+                with open(os.path.join(tmp, name), "wb") as f:
+                    f.write(inhalt)
+            regeln = dms_kern.Dateiregeln({".exe", "INHALT:MZ", "inhalt:lnk"})
+            liste = [(name, len(inhalt)) for name, inhalt in dateien.items()]
+            self.assertEqual(regeln.klassifiziere(tmp, liste),
+                             ["inhalt:mz", None, "inhalt:lnk", "inhalt:mz", ".exe"])
+        with self.assertRaisesRegex(ValueError, "Unbekannte Inhaltsprüfung"):
+            dms_kern.Dateiregeln({"inhalt:pdf"})
+
+    def test_verschiebegrund(self) -> None:
+        gruende = {
+            ".exe": "ungueltige_endung:.exe",
+            ".tar.gz": "ungueltige_endung:.tar.gz",
+            "~$*.docx": "muster:~$*.docx",
+            "thumbs.db": "name:thumbs.db",
+            "exe": "name:exe",
+            "inhalt:mz": "inhalt:mz",
+        }
+        for regel, grund in gruende.items():
+            with self.subTest(regel=regel):
+                self.assertEqual(dms_kern.verschiebegrund(regel), grund)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Der ``os.scandir``-Durchlauf von ``scanne_quellordner`` liefert dasselbe wie
+der frühere Scan mit ``os.walk`` und ``Path.stat``: gültige Dateien in
+derselben Reihenfolge, dieselbe Anzahl ungültiger Dateien, dieselben
+Logzeilen und keine Dateien aus der Zielbasis – auch mit versteckten
+Dateien, Verzeichnis-Symlinks, einem nicht lesbaren Ordner und einer Datei,
+die zwischen Listing und stat verschwindet.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+
+import dms_kern  # noqa: E402
+
+ENDUNGEN = {".exe", ".lnk"}
+
+
+def referenz_scan(quellpfad: Path, zielbasis: Path, trockenlauf: bool) -> dict:
+    """Der Scan vor dem ``os.scandir``-Stack: ``os.walk``, ``Path.stat``, ``Path.suffix``."""
+    quellwurzelname = quellpfad.name
+    gueltige: list[tuple[str, int]] = []
+    log: list[str] = []
+    fehler: list[str] = []
+    anzahl_ungueltig = 0
+    for verz, _, dateien in os.walk(quellpfad):
+        verz_pfad = Path(verz)
+        try:
+            verz_pfad.relative_to(zielbasis)
+            continue
+        except ValueError:
+            pass
+        for dateiname in dateien:
+            datei = verz_pfad / dateiname
+            try:
+                groesse = datei.stat().st_size
+            except OSError:
+                groesse = 0
+            endung = datei.suffix.lower()
+            if endung in ENDUNGEN:
+                anzahl_ungueltig += 1
+                zielpfad = zielbasis / quellwurzelname / datei.relative_to(quellpfad)
+                if trockenlauf:
+                    log.append(f"wuerde_verschieben;ungueltige_endung:{endung};{datei};"
+                               f"{zielpfad};{groesse}")
+                    continue
+                try:
+                    zielpfad.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.move(str(datei), str(zielpfad))
+                    log.append(f"verschoben;ungueltige_endung:{endung};{datei};"
+                               f"{zielpfad};{groesse}")
+                except Exception as ex:
+                    fehler.append(f"{datei}: {ex}")
+                    log.append(f"fehler;{ex};{datei};-;{groesse}")
+            else:
+                gueltige.append((str(datei), groesse))
+    return {"gueltige": gueltige, "anzahl_ungueltig": anzahl_ungueltig, "log": log,
+            "fehler": fehler}
+
+
+def _ohne_fehlertext(zeile: str) -> str:
+    aktion, grund, rest = zeile.split(";", 2)
+    return f"{aktion};;{rest}" if aktion == "fehler" else zeile
+
+
+def neuer_scan(quellpfad: Path, zielbasis: Path, trockenlauf: bool, **kwargs) -> dict:
+    ergebnis = dms_kern.scanne_quellordner(quellpfad, zielbasis, ENDUNGEN, trockenlauf, **kwargs)
+    with open(ergebnis["logdatei"], encoding="utf-8") as f:
+        log = [zeile.split(";", 1)[1] for zeile in f.read().splitlines()[1:]]
+    return {"gueltige": [(str(p), g) for p, g in ergebnis["gueltige_dateien"]],
+            "anzahl_ungueltig": ergebnis["anzahl_ungueltig"], "log": log,
+            "fehler": ergebnis["fehler"]}
+
+
+def erzeuge_baum(quelle: Path, zielbasis: Path) -> None:
+    dateien = {
+        "a.txt": 10, "b.EXE": 20, ".versteckt": 3, ".versteckt.exe": 4, ".exe": 5,
+        "ohne_endung": 6, "archiv.tar.gz": 7, "archiv.gz": 8,
+        "akten/brief.docx": 100, "akten/start.lnk": 30, "akten/.git/config": 11,
+        "akten/tief/tiefer/x.exe": 40, "akten/tief/tiefer/y.pdf": 50,
+        "gesperrt/geheim.exe": 60, "gesperrt/geheim.txt": 61,
+        "fluechtig/bleibt.txt": 70, "fluechtig/weg.exe": 71, "fluechtig/weg.txt": 72,
+        "leer/.keep": 0,
+        # liegt in der Zielbasis (Reste eines früheren Laufs) und wird nicht gescannt
+        "_Ziel/quelle/alt.exe": 80, "_Ziel/alt.txt": 81,
+    }
+    for name, groesse in dateien.items():
+        pfad = quelle / name
+        pfad.parent.mkdir(parents=True, exist_ok=True)
+        pfad.write_bytes(b"x" * groesse)
+    (quelle / "link_auf_akten").symlink_to(quelle / "akten", target_is_directory=True)
+    (quelle / "link_auf_datei.exe").symlink_to(quelle / "a.txt")
+    (quelle / "kaputter_link.txt").symlink_to(quelle / "gibt_es_nicht")
+    assert zielbasis == quelle / "_Ziel"
+
+
+class _Listing:
+    """Fertiges Listing mit der Schnittstelle des ``os.scandir``-Iterators."""
+
+    def __init__(self, eintraege: list) -> None:
+        self._eintraege = iter(eintraege)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._eintraege)
+
+    def close(self) -> None:
+        pass
+
+
+def stoerungen(quelle: Path):
+    """``os.scandir``, das ``gesperrt`` verweigert und in ``fluechtig`` nach dem Listing löscht."""
+    original = os.scandir
+    gesperrt = str(quelle / "gesperrt")
+    fluechtig = str(quelle / "fluechtig")
+
+    def scandir(pfad=".", *args, **kwargs):
+        if os.fspath(pfad) == gesperrt:
+            raise PermissionError(13, "Zugriff verweigert", gesperrt)
+        if os.fspath(pfad) != fluechtig:
+            return original(pfad, *args, **kwargs)
+        with original(pfad, *args, **kwargs) as it:
+            eintraege = list(it)
+        for name in ("weg.exe", "weg.txt"):
+            os.unlink(os.path.join(fluechtig, name))
+        return _Listing(eintraege)
+
+    return mock.patch.object(os, "scandir", scandir)
+
+
+@unittest.skipIf(sys.platform == "win32", "Symlinks brauchen unter Windows Sonderrechte")
+class ScanWieOsWalk(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory(prefix="dms_test_")
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _vergleiche(self, trockenlauf: bool, **kwargs) -> dict:
+        ergebnisse = {}
+        for name in ("referenz", "neu"):
+            quelle = self.tmp / name / "quelle"
+            zielbasis = quelle / "_Ziel"
+            erzeuge_baum(quelle, zielbasis)
+            with stoerungen(quelle):
+                if name == "referenz":
+                    ergebnis = referenz_scan(quelle, zielbasis, trockenlauf)
+                else:
+                    ergebnis = neuer_scan(quelle, zielbasis, trockenlauf, **kwargs)
+            basis = str(self.tmp / name)
+            ergebnis["gueltige"] = [(p.replace(basis, ""), g) for p, g in ergebnis["gueltige"]]
+            # Fehlertexte hängen vom Weg ab (rename oder Kopie), verglichen wird die Zeile ohne sie
+            ergebnis["log"] = [_ohne_fehlertext(z.replace(basis, "")) for z in ergebnis["log"]]
+            ergebnis["ziel"] = sorted(
+                str(p.relative_to(zielbasis)) for p in zielbasis.rglob("*")
+                if p.is_file() and not p.name.startswith("NichtUploadfaehig_Log_"))
+            ergebnisse[name] = ergebnis
+        referenz, neu = ergebnisse["referenz"], ergebnisse["neu"]
+        self.assertEqual(neu["gueltige"], referenz["gueltige"])
+        self.assertEqual(neu["anzahl_ungueltig"], referenz["anzahl_ungueltig"])
+        self.assertEqual(neu["log"], referenz["log"])
+        self.assertEqual(neu["ziel"], referenz["ziel"])
+        self.assertEqual(len(neu["fehler"]), len(referenz["fehler"]))
+        return neu
+
+    def test_trockenlauf(self) -> None:
+        neu = self._vergleiche(trockenlauf=True)
+        namen = {p for p, _ in neu["gueltige"]}
+        self.assertIn("/quelle/.versteckt", namen)
+        self.assertIn("/quelle/.exe", namen)
+        self.assertIn(("/quelle/kaputter_link.txt", 0), neu["gueltige"])
+        self.assertFalse(any("/_Ziel/" in p or "link_auf_akten" in p or "gesperrt" in p
+                             for p in namen))
+        self.assertIn(("/quelle/fluechtig/weg.txt", 0), neu["gueltige"])
+
+    def test_echter_lauf(self) -> None:
+        neu = self._vergleiche(trockenlauf=False)
+        self.assertIn("quelle/akten/tief/tiefer/x.exe", neu["ziel"])
+        self.assertEqual(len(neu["fehler"]), 1)  # fluechtig/weg.exe war schon weg
+
+    def test_paralleler_durchlauf(self) -> None:
+        self._vergleiche(trockenlauf=True, scan_worker=4)
+
+
+if __name__ == "__main__":
+    unittest.main()
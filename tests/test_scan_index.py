@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Scan-Index: Ein unveränderter Baum kommt vollständig aus dem Index und
+ergibt dasselbe wie ein frischer Scan. Ein Ordner mit geänderter mtime wird
+neu gelistet; eine überschriebene Datei (Ordner-mtime unverändert) wird mit
+``pruefen`` per stat korrigiert, eine verschwundene führt zum neuen Listing.
+Eine beschädigte oder veraltete Indexdatei wird neu angelegt.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+sys.path.insert(0, str(WURZEL / "benchmarks"))
+
+import dms_kern  # noqa: E402
+from synthetik import erzeuge_baum  # noqa: E402
+
+ENDUNGEN = set(dms_kern.DEFAULT_UNGUELTIGE_ENDUNGEN)
+
+
+class ScanIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory(prefix="dms_test_")
+        self.tmp = Path(self._tmp.name)
+        self.quelle = self.tmp / "quelle"
+        erzeuge_baum(self.quelle, tiefe=2, verzweigung=3, dateien_pro_ordner=4,
+                     anteil_ungueltig=0.2, max_dateigroesse=256)
+        self.index_pfad = self.tmp / dms_kern.INDEX_DATEINAME
+        self.anzahl_ordner = sum(1 for _ in os.walk(self.quelle))
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _scan(self, index: dms_kern.ScanIndex | None = None, **kwargs) -> tuple:
+        ergebnis = dms_kern.scanne_quellordner(self.quelle, self.tmp / "ziel", ENDUNGEN, True,
+                                               scan_index=index, **kwargs)
+        with open(ergebnis["logdatei"], encoding="utf-8") as f:
+            log = [zeile.split(";", 1)[1] for zeile in f.read().splitlines()[1:]]
+        os.unlink(ergebnis["logdatei"])
+        return (list(ergebnis["gueltige_dateien"]), ergebnis["anzahl_ungueltig"], log), \
+            ergebnis["index_statistik"]
+
+    def _scan_mit_index(self, pruefen: bool = False, **kwargs) -> tuple:
+        index = dms_kern.ScanIndex(self.index_pfad, pruefen=pruefen)
+        try:
+            return self._scan(index, **kwargs)
+        finally:
+            index.schliesse()
+
+    def _ordner(self) -> Path:
+        return next(p for p in sorted(self.quelle.iterdir()) if p.is_dir())
+
+    def test_unveraendert_aus_index(self) -> None:
+        frisch, _ = self._scan()
+        ergebnis, statistik = self._scan_mit_index()
+        self.assertEqual(ergebnis, frisch)
+        self.assertEqual((statistik["aus_cache"], statistik["neu_gelistet"]),
+                         (0, self.anzahl_ordner))
+        for scan_worker in (1, 4):
+            with self.subTest(scan_worker=scan_worker):
+                ergebnis, statistik = self._scan_mit_index(scan_worker=scan_worker)
+                self.assertEqual(ergebnis, frisch)
+                self.assertEqual((statistik["aus_cache"], statistik["neu_gelistet"]),
+                                 (self.anzahl_ordner, 0))
+
+    def test_geaenderte_mtime(self) -> None:
+        self._scan_mit_index()
+        ordner = self._ordner()
+        (ordner / "neu.txt").write_bytes(b"neu")
+        (ordner / "programm.exe").write_bytes(b"MZ")
+        ergebnis, statistik = self._scan_mit_index()
+        self.assertEqual(ergebnis, self._scan()[0])
+        self.assertEqual((statistik["aus_cache"], statistik["neu_gelistet"]),
+                         (self.anzahl_ordner - 1, 1))
+
+    def test_geaenderte_groesse(self) -> None:
+        self._scan_mit_index()
+        ordner = self._ordner()
+        datei = next(p for p in sorted(ordner.iterdir()) if p.is_file()
+                     and p.suffix.lower() not in ENDUNGEN)
+        mtime_ordner = ordner.stat().st_mtime_ns
+        datei.write_bytes(b"x" * 10_000)  # überschrieben: die Ordner-mtime bleibt
+        self.assertEqual(ordner.stat().st_mtime_ns, mtime_ordner)
+        frisch, _ = self._scan()
+
+        veraltet, _ = self._scan_mit_index()
+        self.assertNotEqual(veraltet, frisch)  # ohne pruefen: Größe aus dem Index
+        ergebnis, statistik = self._scan_mit_index(pruefen=True)
+        self.assertEqual(ergebnis, frisch)
+        self.assertEqual(statistik["groessen_korrigiert"], 1)
+        self.assertEqual(statistik["neu_gelistet"], 0)
+        # Die korrigierte Größe steht danach im Index
+        ergebnis, _ = self._scan_mit_index()
+        self.assertEqual(ergebnis, frisch)
+
+    def test_verschwundene_datei(self) -> None:
+        self._scan_mit_index()
+        ordner = self._ordner()
+        stat = ordner.stat()
+        next(p for p in sorted(ordner.iterdir()) if p.is_file()).unlink()
+        os.utime(ordner, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # mtime wie vorher
+        ergebnis, statistik = self._scan_mit_index(pruefen=True)
+        self.assertEqual(ergebnis, self._scan()[0])
+        self.assertEqual(statistik["neu_gelistet"], 1)
+
+    def test_beschaedigter_index(self) -> None:
+        frisch, _ = self._scan()
+        self.index_pfad.write_bytes(b"kein SQLite-Index " * 500)
+        ergebnis, statistik = self._scan_mit_index()
+        self.assertEqual(ergebnis, frisch)
+        self.assertEqual(statistik["neu_gelistet"], self.anzahl_ordner)
+        ergebnis, statistik = self._scan_mit_index()
+        self.assertEqual(statistik["aus_cache"], self.anzahl_ordner)
+
+    def test_andere_version(self) -> None:
+        self._scan_mit_index()
+        db = sqlite3.connect(str(self.index_pfad))
+        db.execute(f"PRAGMA user_version = {dms_kern.SCAN_INDEX_VERSION + 1}")
+        db.close()
+        ergebnis, statistik = self._scan_mit_index()
+        self.assertEqual(ergebnis, self._scan()[0])
+        self.assertEqual((statistik["aus_cache"], statistik["neu_gelistet"]),
+                         (0, self.anzahl_ordner))
+        # Über fuehre_analyse_durch: kein Fehler, der Index wird einfach neu aufgebaut
+        self.index_pfad.write_bytes(b"\0" * 4096)
+        ergebnis = dms_kern.fuehre_analyse_durch(self.quelle, self.tmp / "ziel", ENDUNGEN, True,
+                                                 index_pfad=self.index_pfad)
+        self.assertEqual(ergebnis["scan_ergebnis"]["fehler"], [])
+        self.assertEqual(ergebnis["scan_ergebnis"]["index_statistik"]["neu_gelistet"],
+                         self.anzahl_ordner)
+
+
+if __name__ == "__main__":
+    unittest.main()
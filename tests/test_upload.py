@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Upload gegen den Ersatz-Server ``benchmarks/ersatz_dms.py`` (im selben
+Prozess): vollständiger Upload, Fortsetzen nach einem Abbruch über den
+``Uploadzustand`` (HEAD-Nachfrage und ``Content-Range``), 409/416 mit
+vollständigem Neusenden, Wiederholung nach 503, eine nach dem Scan
+geänderte Datei und eine geänderte URL.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import hashlib
+import sys
+import tempfile
+import unittest
+import urllib.parse
+from pathlib import Path
+from unittest import mock
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+sys.path.insert(0, str(WURZEL / "benchmarks"))
+
+import dms_kern  # noqa: E402
+import dms_upload  # noqa: E402
+import ersatz_dms  # noqa: E402
+
+DATEIEN = {"P001": {"a.bin": 2000, "unter/b.bin": 3000}, "P002": {"c.bin": 1500}}
+
+
+class _PruefAnfrage(ersatz_dms._Anfrage):
+    """Protokolliert die Anfragen und spielt die Störungen ein, die ein Test vorgibt."""
+
+    def _datei(self) -> str:
+        return urllib.parse.unquote(self.path).split("/", 3)[-1]
+
+    def do_HEAD(self) -> None:
+        self.server.protokoll.append(("HEAD", self._datei(), None))
+        falsch = self.server.head_laenge.pop(self._datei(), None)
+        if falsch is not None:
+            self._antworte(200, falsch)
+            return
+        super().do_HEAD()
+
+    def do_PUT(self) -> None:
+        self.server.protokoll.append(("PUT", self._datei(), self.headers.get("Content-Range")))
+        if self.server.antworte_503.pop(self._datei(), None):
+            self._antworte(503, schliessen=True)
+            return
+        super().do_PUT()
+
+
+class Upload(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory(prefix="dms_test_")
+        tmp = Path(self._tmp.name)
+        self.quelle = tmp / "quelle"
+        self.zielbasis = tmp / "ziel"
+        self.ablage = tmp / "ablage"
+        self.pakete = []
+        for pid, dateien in DATEIEN.items():
+            liste = []
+            for nr, (name, groesse) in enumerate(dateien.items()):
+                pfad = self.quelle / name
+                pfad.parent.mkdir(parents=True, exist_ok=True)
+                pfad.write_bytes(bytes((nr + i) % 251 for i in range(groesse)))
+                liste.append((str(pfad), groesse))
+            self.pakete.append((pid, liste))
+        self.server = self._starte_server()
+        pause = mock.patch.object(dms_upload, "UPLOAD_PAUSE_S", 0.0)
+        pause.start()
+        self.addCleanup(pause.stop)
+
+    def tearDown(self) -> None:
+        self._stoppe_server()
+        self._tmp.cleanup()
+
+    def _starte_server(self, port: int = 0) -> ersatz_dms.ErsatzDMS:
+        server = ersatz_dms.ErsatzDMS(self.ablage, port)
+        server.RequestHandlerClass = _PruefAnfrage
+        server.daemon_threads = False  # server_close() wartet auf laufende Anfragen
+        server.protokoll = []
+        server.head_laenge = {}
+        server.antworte_503 = {}
+        server.starte()
+        return server
+
+    def _stoppe_server(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _zustand(self, url: str | None = None) -> dms_kern.Uploadzustand:
+        return dms_kern.Uploadzustand(dms_kern.uploadzustand_pfad(self.quelle, self.zielbasis),
+                                      url or self.server.url)
+
+    def _lade_hoch(self, zustand=None, fortschritt=None, url: str | None = None) -> dict:
+        return dms_kern.lade_pakete_hoch(self.quelle, self.pakete, url or self.server.url,
+                                         zustand=zustand, verbindungen=1, versuche=3,
+                                         zeitlimit=10, fortschritt=fortschritt)
+
+    def _pruefe_ablage(self) -> None:
+        for pid, dateien in DATEIEN.items():
+            for name in dateien:
+                with self.subTest(datei=f"{pid}/{name}"):
+                    self.assertEqual((self.ablage / pid / name).read_bytes(),
+                                     (self.quelle / name).read_bytes())
+        self.assertEqual(self.server.abgeschlossen, set(DATEIEN))
+
+    def test_vollstaendig(self) -> None:
+        ergebnis = self._lade_hoch(self._zustand())
+        self.assertEqual(ergebnis["fehler"], [])
+        self.assertEqual((ergebnis["pakete"], ergebnis["hochgeladen"], ergebnis["dateien"]),
+                         (2, 2, 3))
+        self.assertEqual(ergebnis["bytes"], 6500)
+        self.assertEqual(ergebnis["bytes_gesendet"], 6500)
+        self.assertEqual(ergebnis["wiederholungen"], 0)
+        self.assertFalse(any(m == "HEAD" for m, _, _ in self.server.protokoll))
+        self._pruefe_ablage()
+        # Ohne Fehler und Abbruch wird der Zustand gelöscht
+        self.assertFalse(dms_kern.uploadzustand_pfad(self.quelle, self.zielbasis).exists())
+
+    def test_fortsetzen_nach_abbruch(self) -> None:
+        fortschritt = dms_kern.Fortschritt()
+        original = fortschritt.datei
+
+        def datei(groesse: int) -> bool:
+            fortschritt.abbrechen()  # nach der ersten Datei
+            return original(groesse)
+
+        fortschritt.datei = datei
+        ergebnis = self._lade_hoch(self._zustand(), fortschritt)
+        self.assertTrue(ergebnis["abgebrochen"])
+        self.assertEqual(ergebnis["hochgeladen"], 0)
+        self.assertTrue(dms_kern.uploadzustand_pfad(self.quelle, self.zielbasis).exists())
+
+        # Neuer Server auf demselben Port (gleiche URL); von b.bin ist ein Drittel angekommen
+        port = self.server.server_address[1]
+        self._stoppe_server()
+        teil = (self.quelle / "unter" / "b.bin").read_bytes()[:1000]
+        (self.ablage / "P001" / "unter" / "b.bin").write_bytes(teil)
+        self.server = self._starte_server(port)
+
+        zustand = self._zustand()
+        self.assertEqual(zustand.anzahl_fertig, 0)
+        ergebnis = self._lade_hoch(zustand)
+        self.assertEqual(ergebnis["fehler"], [])
+        self.assertEqual(ergebnis["hochgeladen"], 2)
+        self.assertEqual(ergebnis["bytes_gesendet"], 2000 + 1500)  # Rest von b.bin und c.bin
+        # P001 war ``laufend``: nachfragen, a.bin ist vollständig, b.bin ab Byte 1000
+        self.assertEqual([a for a in self.server.protokoll if a[1] != "c.bin"], [
+            ("HEAD", "a.bin", None),
+            ("HEAD", "unter/b.bin", None),
+            ("PUT", "unter/b.bin", "bytes 1000-2999/3000"),
+        ])
+        self.assertEqual([a for a in self.server.protokoll if a[0] == "PUT"][-1],
+                         ("PUT", "c.bin", None))
+        self._pruefe_ablage()
+
+    def test_409_416_sendet_ganz(self) -> None:
+        # Der Server meldet per HEAD weniger Bytes, als er hat: die Fortsetzung passt nicht (416)
+        (self.ablage / "P001" / "unter").mkdir(parents=True)
+        (self.ablage / "P001" / "unter" / "b.bin").write_bytes(b"alt" * 400)
+        self.server.head_laenge["unter/b.bin"] = 500
+        zustand = self._zustand()
+        kennung = _kennung(self.quelle, self.pakete[0][1])
+        zustand.setze("P001", kennung, "laufend", 5000)
+        ergebnis = self._lade_hoch(zustand)
+        self.assertEqual(ergebnis["fehler"], [])
+        puts = [(d, b) for m, d, b in self.server.protokoll if m == "PUT" and d == "unter/b.bin"]
+        self.assertEqual(puts, [("unter/b.bin", "bytes 500-2999/3000"), ("unter/b.bin", None)])
+        self.assertEqual(ergebnis["wiederholungen"], 0)
+        self._pruefe_ablage()
+
+    def test_503_wird_wiederholt(self) -> None:
+        self.server.antworte_503["c.bin"] = True
+        ergebnis = self._lade_hoch()
+        self.assertEqual(ergebnis["fehler"], [])
+        self.assertEqual(ergebnis["wiederholungen"], 1)
+        self.assertEqual([m for m, d, _ in self.server.protokoll if d == "c.bin"],
+                         ["PUT", "HEAD", "PUT"])
+        self._pruefe_ablage()
+
+    def test_geaenderte_datei(self) -> None:
+        inhalt = (self.quelle / "c.bin").read_bytes()
+        with open(self.quelle / "c.bin", "ab") as f:
+            f.write(b"nach dem Scan")
+        ergebnis = self._lade_hoch(self._zustand())
+        self.assertEqual(ergebnis["hochgeladen"], 1)
+        self.assertEqual(len(ergebnis["fehler"]), 1)
+        self.assertIn("P002", ergebnis["fehler"][0])
+        self.assertIn("nach dem Scan geändert", ergebnis["fehler"][0])
+        self.assertEqual(ergebnis["wiederholungen"], 0)
+        self.assertFalse(any(d == "c.bin" for _, d, _ in self.server.protokoll))
+        # Mit Fehler bleibt der Zustand zum Fortsetzen liegen: P001 ist fertig
+        zustand = self._zustand()
+        self.assertEqual(zustand.anzahl_fertig, 1)
+        (self.quelle / "c.bin").write_bytes(inhalt)
+        ergebnis = self._lade_hoch(zustand)
+        self.assertEqual((ergebnis["bereits_fertig"], ergebnis["hochgeladen"]), (1, 1))
+        self._pruefe_ablage()
+
+    def test_andere_url_verwirft_zustand(self) -> None:
+        zustand = self._zustand()
+        kennung = _kennung(self.quelle, self.pakete[0][1])
+        zustand.setze("P001", kennung, "fertig", 5000)
+        zustand.schliesse()
+
+        zustand = self._zustand()
+        self.assertEqual(zustand.status("P001", kennung), "fertig")
+        zustand.schliesse()
+
+        andere_url = self.server.url.replace("/dms", "/dms2")
+        zustand = self._zustand(andere_url)
+        self.assertIsNone(zustand.status("P001", kennung))
+        self.assertEqual(zustand.anzahl_fertig, 0)
+        zustand.schliesse()
+
+        # Die alte URL findet danach ebenfalls nichts mehr: alles wird neu gesendet
+        zustand = self._zustand()
+        ergebnis = self._lade_hoch(zustand)
+        self.assertEqual((ergebnis["bereits_fertig"], ergebnis["hochgeladen"]), (0, 2))
+        self._pruefe_ablage()
+
+
+def _kennung(quelle: Path, dateien: list[tuple[str, int]]) -> str:
+    """Fingerabdruck eines Pakets wie in ``lade_pakete_hoch``."""
+    kennung = hashlib.blake2b(digest_size=16)
+    for pfad, groesse in dateien:
+        relativ = str(Path(pfad).relative_to(quelle))
+        kennung.update(f"{relativ}\0{groesse}\n".encode("utf-8", "surrogatepass"))
+    return kennung.hexdigest()
+
+
+if __name__ == "__main__":
+    unittest.main()
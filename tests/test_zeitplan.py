@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Upload-Zeitplan: ``plane_upload_zeitplan`` teilt Pakete bekannter Größe den
+Slots zu, wie sie frei werden; die Gesamtdauer liegt nie unter der unteren
+Schranke, LPT ist im klassischen schlechten Fall (großes Paket zuletzt) nie
+schlechter als die Planreihenfolge und bleibt innerhalb von
+(4/3 − 1/(3·slots)) des Optimums. Ungültige Rate und Reihenfolge ergeben
+einen ValueError.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import itertools
+import random
+import sys
+import unittest
+from pathlib import Path
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+
+import dms_kern  # noqa: E402
+
+
+def paketplan(*ebenen: list[int], dateien: int = 1) -> list[dict]:
+    """Paketvorschläge aus Paketgrößen je Ebene, jedes Paket mit ``dateien`` Dateien."""
+    plan = []
+    for ebene_nr, groessen in enumerate(ebenen):
+        knoten = dms_kern.OrdnerKnoten(f"ebene{ebene_nr}", f"/quelle/ebene{ebene_nr}")
+        plan.append({
+            "pakete": [[(f"Ordner: p{nr}", g)] for nr, g in enumerate(groessen)],
+            "inhalte": [[(knoten, [(f"d{i}", g // dateien) for i in range(dateien)])]
+                        for g in groessen],
+        })
+    return plan
+
+
+def optimum(dauern: list[float], slots: int) -> float:
+    """Kleinste Gesamtdauer durch vollständige Suche (nur für wenige Pakete)."""
+    beste = float("inf")
+    for zuordnung in itertools.product(range(slots), repeat=len(dauern)):
+        ende = [0.0] * slots
+        for dauer, slot in zip(dauern, zuordnung):
+            ende[slot] += dauer
+        beste = min(beste, max(ende))
+    return beste
+
+
+class UploadZeitplan(unittest.TestCase):
+
+    def _slots(self, zeitplan: dict) -> list[list[tuple[str, float, float]]]:
+        return [[(p["id"], p["start_s"], p["ende_s"]) for p in slot]
+                for slot in zeitplan["zeitplan"]]
+
+    def _pruefe_zeitplan(self, zeitplan: dict, anzahl: int) -> None:
+        ids = [p["id"] for slot in zeitplan["zeitplan"] for p in slot]
+        self.assertEqual(sorted(ids), sorted(zeitplan["pakete"]))
+        self.assertEqual(len(ids), anzahl)
+        for slot, ende in zip(zeitplan["zeitplan"], zeitplan["ende_s"]):
+            # Lückenlos hintereinander, ab 0
+            self.assertEqual([p["start_s"] for p in slot],
+                             [0.0, *(p["ende_s"] for p in slot)][:len(slot)])
+            self.assertEqual(ende, slot[-1]["ende_s"] if slot else 0.0)
+        self.assertEqual(zeitplan["gesamtdauer_s"], max(zeitplan["ende_s"]))
+
+    def test_zuteilung(self) -> None:
+        # 1 Byte/s: Dauer = Größe
+        plan = paketplan([1, 2, 3], [5, 2, 3])
+        lpt = dms_kern.plane_upload_zeitplan(plan, slots=2, bytes_pro_s=1)
+        self._pruefe_zeitplan(lpt, 6)
+        self.assertEqual(lpt["pakete"], ["E0002-P001", "E0001-P003", "E0002-P003",
+                                         "E0001-P002", "E0002-P002", "E0001-P001"])
+        self.assertEqual(self._slots(lpt), [
+            [("E0002-P001", 0, 5), ("E0001-P002", 5, 7), ("E0001-P001", 7, 8)],
+            [("E0001-P003", 0, 3), ("E0002-P003", 3, 6), ("E0002-P002", 6, 8)],
+        ])
+        self.assertEqual((lpt["gesamtdauer_s"], lpt["gesamtdauer_plan_s"],
+                          lpt["untere_schranke_s"]), (8, 9, 8))
+
+        in_plan = dms_kern.plane_upload_zeitplan(plan, slots=2, bytes_pro_s=1,
+                                                 reihenfolge="plan")
+        self._pruefe_zeitplan(in_plan, 6)
+        self.assertEqual(in_plan["pakete"], ["E0001-P001", "E0001-P002", "E0001-P003",
+                                             "E0002-P001", "E0002-P002", "E0002-P003"])
+        self.assertEqual(self._slots(in_plan), [
+            [("E0001-P001", 0, 1), ("E0001-P003", 1, 4), ("E0002-P002", 4, 6),
+             ("E0002-P003", 6, 9)],
+            [("E0001-P002", 0, 2), ("E0002-P001", 2, 7)],
+        ])
+        self.assertEqual((in_plan["gesamtdauer_s"], in_plan["gesamtdauer_plan_s"]), (9, 9))
+
+    def test_sekunden_je_datei(self) -> None:
+        # 400 Bytes bei 100 Bytes/s plus 4 Dateien zu je 0,5 s
+        plan = paketplan([400, 100], dateien=4)
+        zeitplan = dms_kern.plane_upload_zeitplan(plan, slots=1, bytes_pro_s=100,
+                                                  sekunden_je_datei=0.5)
+        self.assertEqual([(p["groesse"], p["dateien"]) for p in zeitplan["zeitplan"][0]],
+                         [(400, 4), (100, 4)])
+        self.assertEqual(self._slots(zeitplan), [[("E0001-P001", 0, 6), ("E0001-P002", 6, 9)]])
+        self.assertEqual(zeitplan["untere_schranke_s"], 9)
+
+    def test_untere_schranke(self) -> None:
+        zufall = random.Random(5)
+        for durchlauf in range(300):
+            ebenen = [[zufall.randint(1, 1000) for _ in range(zufall.randint(0, 8))]
+                      for _ in range(zufall.randint(1, 3))]
+            slots = zufall.randint(1, 6)
+            for reihenfolge in dms_kern.UPLOAD_REIHENFOLGEN:
+                with self.subTest(durchlauf=durchlauf, reihenfolge=reihenfolge):
+                    zeitplan = dms_kern.plane_upload_zeitplan(
+                        paketplan(*ebenen), slots, bytes_pro_s=7, sekunden_je_datei=0.3,
+                        reihenfolge=reihenfolge)
+                    self._pruefe_zeitplan(zeitplan, sum(len(e) for e in ebenen))
+                    self.assertGreaterEqual(zeitplan["gesamtdauer_s"],
+                                            zeitplan["untere_schranke_s"] - 1e-9)
+                    if reihenfolge == "plan":
+                        self.assertEqual(zeitplan["gesamtdauer_s"],
+                                         zeitplan["gesamtdauer_plan_s"])
+
+    def test_lpt_im_schlechten_fall(self) -> None:
+        # slots·(slots−1) kleine Pakete, das große zuletzt: in Planreihenfolge
+        # 2·slots − 1, mit LPT optimal slots
+        for slots in range(1, 9):
+            with self.subTest(slots=slots):
+                plan = paketplan([1] * (slots * (slots - 1)) + [slots])
+                lpt = dms_kern.plane_upload_zeitplan(plan, slots, bytes_pro_s=1)
+                self.assertEqual(lpt["gesamtdauer_s"], slots)
+                self.assertEqual(lpt["gesamtdauer_s"], lpt["untere_schranke_s"])
+                self.assertEqual(lpt["gesamtdauer_plan_s"], 2 * slots - 1)
+                self.assertEqual(lpt["zeitplan"][0][0]["id"],
+                                 dms_kern.paket_id(1, slots * (slots - 1) + 1))
+
+    def test_lpt_schranke(self) -> None:
+        zufall = random.Random(9)
+        for durchlauf in range(150):
+            groessen = [zufall.randint(1, 30) for _ in range(zufall.randint(1, 7))]
+            slots = zufall.randint(2, 3)
+            with self.subTest(groessen=groessen, slots=slots):
+                lpt = dms_kern.plane_upload_zeitplan(paketplan(groessen), slots, bytes_pro_s=1)
+                beste = optimum(groessen, slots)
+                self.assertLessEqual(lpt["gesamtdauer_s"],
+                                     (4 / 3 - 1 / (3 * slots)) * beste + 1e-9)
+                self.assertLessEqual(lpt["gesamtdauer_s"],
+                                     max(lpt["gesamtdauer_plan_s"], beste * 4 / 3))
+
+    def test_randfaelle(self) -> None:
+        leer = dms_kern.plane_upload_zeitplan([], slots=3)
+        self.assertEqual((leer["pakete"], leer["gesamtdauer_s"], leer["untere_schranke_s"]),
+                         ([], 0.0, 0.0))
+        self.assertEqual(leer["zeitplan"], [[], [], []])
+        # Weniger als ein Slot zählt als einer
+        zeitplan = dms_kern.plane_upload_zeitplan(paketplan([3, 4]), slots=0, bytes_pro_s=1)
+        self.assertEqual((zeitplan["slots"], zeitplan["gesamtdauer_s"]), (1, 7))
+
+    def test_ungueltige_eingaben(self) -> None:
+        plan = paketplan([1])
+        for rate in (0, -1.5):
+            with self.subTest(rate=rate):
+                with self.assertRaisesRegex(ValueError, "Ungültige Upload-Rate"):
+                    dms_kern.plane_upload_zeitplan(plan, bytes_pro_s=rate)
+        with self.assertRaisesRegex(ValueError, "Unbekannte Upload-Reihenfolge"):
+            dms_kern.plane_upload_zeitplan(plan, reihenfolge="spt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+ZIP-Pakete mit kleiner Grenze: ``baue_zip_pakete`` teilt zu große ZIPs neu
+auf, bis jedes Teil-ZIP die Grenze einhält; zusammen enthalten die ZIPs
+jede Datei genau einmal und unverändert. Eine einzelne Datei, die auch als
+ZIP zu groß ist, ergibt eine Warnung mit der tatsächlichen Grenze.
+
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+WURZEL = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WURZEL))
+
+import dms_kern  # noqa: E402
+
+MAX_GROESSE = 24 * 1024
+
+
+def erzeuge_baum(quelle: Path) -> dict[str, bytes]:
+    """Unkomprimierbare und gut komprimierbare Dateien, eine davon größer als die Grenze."""
+    zufall = random.Random(4)
+    dateien: dict[str, bytes] = {}
+    for ordner in ("akten", "akten/unter", "bilder", ""):
+        for nr in range(6):
+            if nr % 2:
+                inhalt = b"Aktenvermerk " * zufall.randint(100, 1500)
+            else:
+                inhalt = zufall.randbytes(zufall.randint(2000, 9000))
+            dateien[os.path.join(ordner, f"datei{nr}.bin")] = inhalt
+    dateien["bilder/riesig.jpg"] = zufall.randbytes(MAX_GROESSE + 1000)
+    for name, inhalt in dateien.items():
+        pfad = quelle / name
+        pfad.parent.mkdir(parents=True, exist_ok=True)
+        pfad.write_bytes(inhalt)
+    return dateien
+
+
+class ZipPakete(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory(prefix="dms_test_")
+        self.tmp = Path(self._tmp.name)
+        self.quelle = self.tmp / "quelle"
+        self.dateien = erzeuge_baum(self.quelle)
+        self.scan = dms_kern.scanne_quellordner(self.quelle, self.tmp / "ziel", set(), True)
+        dms_kern.berechne_ordnergroessen(self.scan["ordnerbaum"])
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_teilen(self) -> None:
+        for strategie in ("namensreihenfolge", "best_fit_decreasing"):
+            with self.subTest(strategie=strategie):
+                # Geplant mit vierfacher Grenze: die ZIPs sind zu groß und werden geteilt
+                plan = dms_kern.erstelle_paketvorschlaege(self.scan["ordnerbaum"],
+                                                          4 * MAX_GROESSE)
+                zielordner = self.tmp / f"zips_{strategie}"
+                ergebnis = dms_kern.baue_zip_pakete(self.quelle, plan, zielordner,
+                                                    max_groesse=MAX_GROESSE, strategie=strategie,
+                                                    worker=2)
+                self.assertEqual(ergebnis["fehler"], [])
+                self.assertFalse(ergebnis["abgebrochen"])
+                self.assertGreater(ergebnis["neu_aufgeteilt"], 0)
+                self.assertGreater(ergebnis["zusaetzliche_pakete"], 0)
+                zips = sorted(zielordner.iterdir())
+                self.assertEqual(len(zips), ergebnis["pakete"])
+                self.assertEqual(len(zips), sum(len(e["pakete"]) for e in plan))
+
+                gefunden: list[str] = []
+                zu_gross = []
+                for zip_pfad in zips:
+                    with zipfile.ZipFile(zip_pfad) as zf:
+                        namen = zf.namelist()
+                        for name in namen:
+                            self.assertEqual(zf.read(name), self.dateien[name])
+                    gefunden.extend(namen)
+                    if zip_pfad.stat().st_size > MAX_GROESSE:
+                        zu_gross.append(namen)
+                self.assertEqual(sorted(gefunden), sorted(self.dateien))
+                self.assertEqual(zu_gross, [[os.path.join("bilder", "riesig.jpg")]])
+
+                # Der Plan beschreibt die gebauten ZIPs
+                for ebene_nr, eintrag in enumerate(plan, 1):
+                    for paket_nr, groesse in enumerate(eintrag["komprimiert"], 1):
+                        zip_pfad = zielordner / f"{dms_kern.paket_id(ebene_nr, paket_nr)}.zip"
+                        self.assertEqual(zip_pfad.stat().st_size, groesse)
+                warnungen = [w for e in plan for w in e["warnungen"] if "auch als ZIP" in w]
+                self.assertEqual(len(warnungen), 1)
+                self.assertIn("riesig.jpg", warnungen[0])
+                self.assertIn(f"größer als {dms_kern.formatiere_groesse(MAX_GROESSE)}!",
+                              warnungen[0])
+                self.assertNotIn("1 GiB", warnungen[0])
+
+
+if __name__ == "__main__":
+    unittest.main()